@@ -10,11 +10,13 @@ from existing tables without adding new schema.
 # This file is legacy/supporting code - update if actively maintained.
 
 
+import asyncio
 from typing import Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from uuid import UUID
 
+from app.repositories import BlocksRepository, ProposalsRepository, execute_async, rows_of
 from ..utils.jwt import verify_jwt
 from ..utils.supabase_client import supabase_client as supabase
 
@@ -38,51 +40,37 @@ async def get_dump_processing_status(
     - blocks/context_items: Created substrate
     """
     try:
-        # 1. Verify dump exists and user has access
-        dump_response = supabase.table("raw_dumps").select(
+        # 1. Verify dump exists and user has access (user-scoped client)
+        dump_response = await execute_async(supabase.table("raw_dumps").select(
             "id, basket_id, workspace_id, created_at"
-        ).eq("id", dump_id).single().execute()
+        ).eq("id", dump_id).single())
         
         if not dump_response.data:
             raise HTTPException(status_code=404, detail="Dump not found")
             
         dump = dump_response.data
         
-        # 2. Check canonical queue for current processing
-        queue_response = supabase.table("canonical_queue").select(
-            "id, work_type, status, created_at, updated_at, worker_id, error_details"
-        ).eq("dump_id", dump_id).order("created_at", desc=True).execute()
-        
-        queue_entries = queue_response.data or []
-        
-        # 3. Check for proposals created from this dump
-        proposals_response = supabase.table("proposals").select(
-            "id, status, ops, created_at, is_executed"
-        ).contains("provenance", [dump_id]).execute()
-        
-        proposals = proposals_response.data or []
-        
-        # 4. Check timeline events for processing milestones
-        events_response = supabase.table("timeline_events").select(
-            "event_type, event_data, created_at"
-        ).eq("basket_id", dump["basket_id"]).filter(
-            "event_data", "cs", f'"{dump_id}"'  # Contains dump_id in event_data
-        ).order("created_at", desc=True).limit(10).execute()
-        
-        events = events_response.data or []
-        
-        # 5. Count created substrate
-        blocks_count = supabase.table("blocks").select(
-            "id", count="exact"
-        ).eq("basket_id", dump["basket_id"]).gte(
-            "created_at", dump["created_at"]
-        ).execute().count
-        
-        items_count = supabase.table("context_items").select(
-            "id", count="exact"
-        ).eq("basket_id", dump["basket_id"]).gte(
-            "created_at", dump["created_at"]
-        ).execute().count
+        # 2-5 are independent: queue stage, proposals from this dump,
+        # timeline milestones and created substrate
+        queue_entries, proposals, events, blocks_count, items_count = await asyncio.gather(
+            _fetch_rows(supabase.table("canonical_queue").select(
+                "id, work_type, status, created_at, updated_at, worker_id, error_details"
+            ).eq("dump_id", dump_id).order("created_at", desc=True)),
+            ProposalsRepository(supabase).list_from_source(dump_id),
+            _fetch_rows(supabase.table("timeline_events").select(
+                "event_type, event_data, created_at"
+            ).eq("basket_id", dump["basket_id"]).filter(
+                "event_data", "cs", f'"{dump_id}"'  # Contains dump_id in event_data
+            ).order("created_at", desc=True).limit(10)),
+            BlocksRepository(supabase).count_for_basket(
+                dump["basket_id"], created_since=dump["created_at"]
+            ),
+            _fetch_count(supabase.table("context_items").select(
+                "id", count="exact"
+            ).eq("basket_id", dump["basket_id"]).gte(
+                "created_at", dump["created_at"]
+            )),
+        )
         
         # Derive current stage and status
         stage_info = _derive_processing_stage(
@@ -123,6 +111,14 @@ async def get_dump_processing_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _fetch_rows(query) -> list:
+    return rows_of(await execute_async(query))
+
+
+async def _fetch_count(query) -> Optional[int]:
+    return (await execute_async(query)).count
+
+
 def _derive_processing_stage(
     dump: Dict,
     queue_entries: list,
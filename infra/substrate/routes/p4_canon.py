@@ -13,6 +13,7 @@ Note: Separate from existing p4_composition.py which handles general document co
 # Entity/anchor metadata is derived from block fields; no context_items access remains.
 
 
+import asyncio
 import logging
 from collections import Counter
 
@@ -25,7 +26,9 @@ from datetime import datetime
 from shared.utils.supabase import supabase_admin
 from lib.freshness import (
     should_regenerate_document_canon,
-    compute_basket_substrate_hash
+    compute_basket_substrate_hash,
+    capture_substrate_snapshot,
+    store_substrate_snapshot
 )
 from shared.utils.jwt import verify_jwt
 
@@ -171,6 +174,15 @@ async def generate_document_canon(
         version_hash = f"doc_v{raw_hash[:58]}"
 
     substrate_hash = compute_basket_substrate_hash(supabase, request.basket_id)
+    # Sync PostgREST calls: keep them off the event loop. A snapshot already
+    # stored for this hash describes it exactly; never overwrite it
+    snapshot, snapshot_stored = await asyncio.to_thread(
+        capture_substrate_snapshot, supabase, request.basket_id, substrate_hash
+    )
+    if not snapshot_stored:
+        await asyncio.to_thread(
+            store_substrate_snapshot, supabase, request.basket_id, substrate_hash, snapshot
+        )
 
     generated_at = datetime.utcnow().isoformat()
     derived_from = {
@@ -468,7 +480,8 @@ async def _compose_document_canon_structured(
     response = await llm.get_json_response(
         prompt,
         max_tokens=2200,
-        schema_name="p4_document_canon_v1"
+        schema_name="p4_document_canon_v1",
+        cache=True,
     )
 
     if response.success and response.parsed:
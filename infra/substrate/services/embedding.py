@@ -5,7 +5,9 @@ from __future__ import annotations
 YARNNN currently standardises on OpenAI embeddings so that basket signatures
 and session fingerprints are comparable across adapters.  The helpers below
 wrap the OpenAI client and provide a lightweight cache so callers do not need
-to manage client lifecycle themselves.
+to manage client lifecycle themselves.  Vectors are looked up in (and written
+to) the shared content-addressed embedding cache so identical texts are only
+embedded once per model.
 """
 
 import logging
@@ -15,6 +17,8 @@ from typing import List, Optional
 
 from openai import OpenAI
 
+from services.embedding_cache import get_embedding_cache, normalize_embedding_text
+
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -34,12 +38,19 @@ class EmbeddingService:
             raise ValueError("Cannot embed empty text")
 
         # OpenAI embeddings expect <= 8192 tokens; guard with a hard character cap.
-        trimmed = text[:8000]
+        trimmed = normalize_embedding_text(text)
+        cache = get_embedding_cache()
+        cached = cache.get(self.model, trimmed)
+        if cached is not None:
+            return cached
+
         response = self.client.embeddings.create(
             model=self.model,
             input=trimmed,
         )
-        return list(response.data[0].embedding)
+        embedding = list(response.data[0].embedding)
+        cache.put(self.model, trimmed, embedding)
+        return embedding
 
 
 @lru_cache(maxsize=1)
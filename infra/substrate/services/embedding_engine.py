@@ -0,0 +1,182 @@
+"""
+Async embedding engine with request coalescing.
+
+Semantic search, relationship inference and governance duplicate checks all
+embed short texts one at a time. Issuing one ``embeddings.create`` call per text
+(and building a fresh synchronous client for each) stalls the event loop and
+pays full request overhead for every block. This engine sends requests through
+the shared LLM transport (one pooled ``AsyncOpenAI`` client) and coalesces
+concurrent single-text requests into batched
+``embeddings.create(input=[...])`` calls.
+
+Batching rules:
+- Requests arriving within ``max_wait_ms`` of each other share one API call
+- A batch is flushed immediately once it reaches ``max_batch_size`` texts
+- Identical texts waiting at the same time resolve to the same vector
+
+Errors are logged and surfaced as ``None`` per text so callers keep the
+graceful-degradation contract of ``generate_embedding``.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from services.llm_transport import get_llm_transport
+
+logger = logging.getLogger("uvicorn.error")
+
+# OpenAI embeddings expect <= 8192 tokens; guard with a hard character cap.
+MAX_EMBEDDING_CHARS = 8000
+
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+DEFAULT_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10"))
+
+
+class EmbeddingEngine:
+    """Coalescing async embedding client shared by all semantic operations."""
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int,
+        *,
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_BATCH_WAIT_MS,
+        client: Optional[AsyncOpenAI] = None,
+    ) -> None:
+        self.model = model
+        self.dimensions = dimensions
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._client = client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.stats = {"requests": 0, "coalesced": 0, "api_calls": 0, "texts_embedded": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embed a single text, sharing an API call with concurrent callers."""
+        if not text or not text.strip():
+            logger.warning("EmbeddingEngine.embed: Empty text provided")
+            return None
+
+        key = text[:MAX_EMBEDDING_CHARS]
+        self._bind_loop()
+        self.stats["requests"] += 1
+
+        future = self._pending.get(key)
+        if future is not None:
+            # Identical text already waiting for a batch: share its result
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = self._loop.create_future()
+        self._pending[key] = future
+        self._queue.append(key)
+
+        if len(self._queue) >= self.max_batch_size:
+            self._schedule_flush(immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(immediate=False)
+
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed several texts; results are returned in input order."""
+        if not texts:
+            return []
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed pre-packed texts in exactly one API call (bulk jobs).
+
+        Bypasses coalescing: callers such as backfills already pack inputs to a
+        token budget. Raises on API errors so callers can retry the batch.
+        """
+        if not texts:
+            return []
+        return await self._create_embeddings([text[:MAX_EMBEDDING_CHARS] for text in texts])
+
+    # ------------------------------------------------------------------
+    # Batching internals
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            # New event loop (e.g. CLI jobs calling asyncio.run repeatedly):
+            # futures are loop-bound, so start fresh. The transport rebinds
+            # its own HTTP pool.
+            self._pending = {}
+            self._queue = []
+            self._flush_handle = None
+        self._loop = loop
+
+    def _schedule_flush(self, *, immediate: bool) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if immediate:
+            self._loop.create_task(self._flush())
+        else:
+            self._flush_handle = self._loop.call_later(
+                self.max_wait, lambda: self._loop.create_task(self._flush())
+            )
+
+    async def _flush(self) -> None:
+        self._flush_handle = None
+        batch, self._queue = self._queue[: self.max_batch_size], self._queue[self.max_batch_size:]
+        if self._queue:
+            # Overflow from a burst: keep draining without waiting for the window
+            self._schedule_flush(immediate=True)
+        if not batch:
+            return
+
+        futures = [self._pending.pop(key) for key in batch]
+        try:
+            vectors = await self._create_embeddings(batch)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"EmbeddingEngine batch of {len(batch)} failed: {exc}")
+            vectors = [None] * len(batch)
+
+        for future, vector in zip(futures, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def _create_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if self._client is not None:
+            response = await self._client.embeddings.create(model=self.model, input=texts)
+        else:
+            response = await get_llm_transport().embeddings(model=self.model, input=texts)
+        self.stats["api_calls"] += 1
+        self.stats["texts_embedded"] += len(texts)
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for item in response.data:
+            embedding = list(item.embedding)
+            if len(embedding) != self.dimensions:
+                logger.error(
+                    f"Unexpected embedding dimension: {len(embedding)} (expected {self.dimensions})"
+                )
+                continue
+            vectors[item.index] = embedding
+        return vectors
+
+
+__all__ = [
+    "EmbeddingEngine",
+    "MAX_EMBEDDING_CHARS",
+]
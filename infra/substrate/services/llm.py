@@ -13,14 +13,19 @@ This file provides a minimal provider interface and an OpenAI-backed implementat
 by agents. Keep Canon boundaries: providers never bypass pipeline rules.
 """
 
+import asyncio
 from dataclasses import dataclass
 import json
 import logging
 import os
+import re
 from typing import Any, Dict, Optional
 
 from openai import AsyncOpenAI
 
+from services.llm_cache import get_llm_cache
+from services.llm_transport import get_llm_transport
+
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -32,6 +37,7 @@ class LLMResponse:
     parsed: Optional[Dict[str, Any]] = None
     usage: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    cached: bool = False
 
 
 class LLMProvider:
@@ -44,6 +50,7 @@ class LLMProvider:
         temperature: float = 1.0,
         max_tokens: int = 4000,
         schema_name: Optional[str] = None,
+        cache: bool = False,
     ) -> LLMResponse:  # pragma: no cover - interface only
         raise NotImplementedError
 
@@ -53,10 +60,23 @@ class LLMProvider:
         *,
         temperature: float = 1.0,
         max_tokens: int = 4000,
+        schema_name: Optional[str] = None,
+        cache: bool = False,
     ) -> LLMResponse:  # pragma: no cover - interface only
         raise NotImplementedError
 
 
+def _parse_json_content(raw: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        # If the model didn't adhere strictly, try to extract JSON body
+        m = re.search(r"\{[\s\S]*\}", raw)
+        if m:
+            return json.loads(m.group(0))
+    return None
+
+
 def _p3_schema(name: str) -> Optional[Dict[str, Any]]:
     """JSON Schemas for P3 reflection outputs."""
     if name == "p3_reflection":
@@ -319,6 +339,10 @@ class OpenAIProvider(LLMProvider):
     - We validate model availability at init; if unavailable, fallback to o4-mini.
     - We use chat.completions with response_format json_schema (aligned with P1 usage).
       We can migrate to Responses API seamlessly later with identical interface.
+    - Calls go through the shared LLM transport (pooled client, concurrency
+      limits, Retry-After aware backoff, usage accounting per schema_name).
+    - Call sites whose prompts are pure functions of substrate pass
+      ``cache=True`` to reuse responses from the LLM response cache.
     """
 
     def __init__(self):
@@ -326,7 +350,7 @@ class OpenAIProvider(LLMProvider):
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY not set")
 
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.transport = get_llm_transport()
 
         # Model configuration with graceful fallback
         desired_json_model = os.getenv("OPENAI_MODEL_P4_JSON", os.getenv("LLM_MODEL_P4_JSON", "gpt-5"))
@@ -343,6 +367,11 @@ class OpenAIProvider(LLMProvider):
             f"OpenAIProvider initialized (json_model={self.json_model}, text_model={self.text_model})"
         )
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Pooled client shared through the LLM transport."""
+        return self.transport.client
+
     def _is_model_available(self, model: str) -> bool:
         # NOTE: Skipping model validation during init with AsyncOpenAI
         # Model availability will be validated on first API call
@@ -362,6 +391,36 @@ class OpenAIProvider(LLMProvider):
         )
         return preferred
 
+    async def _cache_get(
+        self,
+        cache: bool,
+        model: str,
+        schema_name: str,
+        temperature: float,
+        prompt: str,
+        max_tokens: int,
+    ) -> Optional[Dict[str, Any]]:
+        """Cached payload for an opted-in call site (see services/llm_cache)."""
+        store = get_llm_cache() if cache else None
+        if store is None or not store.enabled_for(schema_name):
+            return None
+        return await asyncio.to_thread(store.get, model, schema_name, temperature, prompt, max_tokens)
+
+    async def _cache_put(
+        self,
+        cache: bool,
+        model: str,
+        schema_name: str,
+        temperature: float,
+        prompt: str,
+        max_tokens: int,
+        payload: Dict[str, Any],
+    ) -> None:
+        store = get_llm_cache() if cache else None
+        if store is None or not store.enabled_for(schema_name):
+            return
+        await asyncio.to_thread(store.put, model, schema_name, temperature, prompt, payload, max_tokens)
+
     def _schema_wrapper(self, name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "type": "json_schema",
@@ -379,6 +438,7 @@ class OpenAIProvider(LLMProvider):
         temperature: float = 1.0,
         max_tokens: int = 4000,
         schema_name: Optional[str] = None,
+        cache: bool = False,
     ) -> LLMResponse:
         try:
             response_format = None
@@ -404,20 +464,28 @@ class OpenAIProvider(LLMProvider):
             # Some models don't support custom temperature values
             if temperature != 1.0:
                 request_params["temperature"] = temperature
-            
-            resp = await self.client.chat.completions.create(**request_params)
 
-            raw = resp.choices[0].message.content or ""
-            parsed: Optional[Dict[str, Any]] = None
-            try:
-                parsed = json.loads(raw)
-            except json.JSONDecodeError:
-                # If the model didn't adhere strictly, try to extract JSON body
-                import re
+            cache_schema = schema_name or "json_response"
+            hit = await self._cache_get(
+                cache, self.json_model, cache_schema, temperature, prompt, max_tokens
+            )
+            if hit is not None:
+                return LLMResponse(
+                    success=True,
+                    content=hit["content"],
+                    parsed=_parse_json_content(hit["content"]),
+                    usage={"input_tokens": 0, "output_tokens": 0},
+                    cached=True,
+                )
+
+            resp = await self.transport.chat(schema_name=cache_schema, **request_params)
 
-                m = re.search(r"\{[\s\S]*\}", raw)
-                if m:
-                    parsed = json.loads(m.group(0))
+            raw = resp.choices[0].message.content or ""
+            parsed = _parse_json_content(raw)
+            if parsed is not None:
+                await self._cache_put(
+                    cache, self.json_model, cache_schema, temperature, prompt, max_tokens, {"content": raw}
+                )
 
             return LLMResponse(
                 success=parsed is not None,
@@ -439,6 +507,8 @@ class OpenAIProvider(LLMProvider):
         *,
         temperature: float = 1.0,
         max_tokens: int = 4000,
+        schema_name: Optional[str] = None,
+        cache: bool = False,
     ) -> LLMResponse:
         try:
             # Build request parameters
@@ -453,7 +523,20 @@ class OpenAIProvider(LLMProvider):
             if temperature != 1.0:
                 request_params["temperature"] = temperature
 
-            resp = await self.client.chat.completions.create(**request_params)
+            cache_schema = schema_name or "text_response"
+            hit = await self._cache_get(
+                cache, self.text_model, cache_schema, temperature, prompt, max_tokens
+            )
+            if hit is not None:
+                return LLMResponse(
+                    success=True,
+                    content=hit["content"],
+                    parsed=None,
+                    usage={"input_tokens": 0, "output_tokens": 0},
+                    cached=True,
+                )
+
+            resp = await self.transport.chat(schema_name=cache_schema, **request_params)
             choice = resp.choices[0]
             raw_content = choice.message.content
 
@@ -497,6 +580,18 @@ class OpenAIProvider(LLMProvider):
                     "Insight prompt preview: %s",
                     (prompt[:400] + "…") if len(prompt) > 400 else prompt,
                 )
+            elif finish_reason == "length":
+                # Cut off at max_tokens: usable now, but a retry may do better
+                logger.debug(
+                    "Not caching truncated completion (model=%s, schema=%s, max_tokens=%s)",
+                    self.text_model,
+                    cache_schema,
+                    max_tokens,
+                )
+            else:
+                await self._cache_put(
+                    cache, self.text_model, cache_schema, temperature, prompt, max_tokens, {"content": content}
+                )
 
             return LLMResponse(
                 success=True,
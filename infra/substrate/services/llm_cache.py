@@ -0,0 +1,217 @@
+"""
+Opt-in response cache for deterministic LLM calls.
+
+Several calls are pure functions of their prompt: P1 extraction pins a seed,
+and P4 scoring/narrative and document canon/insight prompts are rendered from
+substrate content. Retries, re-runs after partial failures, recomposition of
+unchanged documents and quality-harness runs would otherwise pay the full
+token cost again. Successful, complete (not truncated) responses are cached under
+
+    (model, schema_name, temperature, sha256(prompt)[, max_tokens])
+
+in a local SQLite file with a TTL and a bounded entry count (least recently
+used entries are evicted first).
+
+Enabling:
+- A call site opts in with ``cache=True`` (``get_json_response`` /
+  ``get_text_response``) or by using ``get_llm_cache()`` directly
+- LLM_CACHE_ENABLED=true turns the cache on for the process
+- LLM_CACHE_SCHEMAS (comma separated) optionally limits caching to those
+  schema names, so single call sites can be switched on/off in deployment
+
+Cache failures are logged and treated as misses; the cache must never break
+an LLM path.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+LLM_CACHE_TABLE = "llm_response_cache"
+DEFAULT_LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite"))
+DEFAULT_LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def llm_cache_key(
+    model: str, schema_name: str, temperature: float, prompt: str, max_tokens: Optional[int] = None
+) -> str:
+    """Cache key for one call: sha256 over (model, schema, temperature, sha256(prompt), max_tokens)."""
+    prompt_hash = hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()
+    parts: List[Any] = [model, schema_name, round(float(temperature), 4), prompt_hash]
+    if max_tokens is not None:
+        # A larger budget can produce a longer answer to the same prompt
+        parts.append(int(max_tokens))
+    material = json.dumps(parts)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed TTL cache with LRU eviction and per-schema metrics."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LLM_CACHE_PATH,
+        *,
+        ttl_seconds: int = DEFAULT_LLM_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_LLM_CACHE_MAX_ENTRIES,
+        schemas: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.schemas = {s for s in (schemas or []) if s} or None
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {LLM_CACHE_TABLE} ("
+            " cache_key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " schema_name TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {LLM_CACHE_TABLE}_last_used_idx"
+            f" ON {LLM_CACHE_TABLE} (last_used_at)"
+        )
+        self._conn.commit()
+
+    def enabled_for(self, schema_name: str) -> bool:
+        return self.schemas is None or schema_name in self.schemas
+
+    def _count(self, schema_name: str, metric: str, amount: int = 1) -> None:
+        entry = self.stats.setdefault(
+            schema_name, {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        )
+        entry[metric] += amount
+
+    def get(
+        self,
+        model: str,
+        schema_name: str,
+        temperature: float,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Cached payload for the call, or ``None`` on a miss/expiry."""
+        key = llm_cache_key(model, schema_name, temperature, prompt, max_tokens)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT payload, expires_at FROM {LLM_CACHE_TABLE} WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._conn.execute(
+                        f"UPDATE {LLM_CACHE_TABLE} SET last_used_at = ? WHERE cache_key = ?",
+                        (now, key),
+                    )
+                    self._conn.commit()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"LLM cache lookup failed: {exc}")
+            row = None
+
+        if row is None or row[1] <= now:
+            self._count(schema_name, "misses")
+            return None
+        self._count(schema_name, "hits")
+        return json.loads(row[0])
+
+    def put(
+        self,
+        model: str,
+        schema_name: str,
+        temperature: float,
+        prompt: str,
+        payload: Any,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        """Store a JSON-serializable payload, evicting expired and LRU entries."""
+        key = llm_cache_key(model, schema_name, temperature, prompt, max_tokens)
+        now = time.time()
+        try:
+            encoded = json.dumps(payload)
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {LLM_CACHE_TABLE}"
+                    " (cache_key, model, schema_name, payload, expires_at, last_used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, schema_name, encoded, now + self.ttl_seconds, now),
+                )
+                evicted = self._conn.execute(
+                    f"DELETE FROM {LLM_CACHE_TABLE} WHERE expires_at <= ?", (now,)
+                ).rowcount
+                evicted += self._conn.execute(
+                    f"DELETE FROM {LLM_CACHE_TABLE} WHERE cache_key IN ("
+                    f" SELECT cache_key FROM {LLM_CACHE_TABLE}"
+                    "  ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+                self._conn.commit()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"LLM cache write failed: {exc}")
+            return
+        self._count(schema_name, "writes")
+        if evicted:
+            self._count(schema_name, "evictions", evicted)
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Per-schema counters plus totals and hit rate."""
+        totals = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        for entry in self.stats.values():
+            for metric, value in entry.items():
+                totals[metric] += value
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 3) if lookups else 0.0
+        return {"schemas": {k: dict(v) for k, v in self.stats.items()}, "totals": totals}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {LLM_CACHE_TABLE}")
+            self._conn.commit()
+
+
+_cache_singleton: Optional[LLMResponseCache] = None
+_cache_initialized = False
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide LLM response cache, or ``None`` when disabled.
+
+    Controlled by LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES and LLM_CACHE_SCHEMAS.
+    """
+    global _cache_singleton, _cache_initialized
+    if not _cache_initialized:
+        _cache_initialized = True
+        if os.getenv("LLM_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}:
+            schemas = os.getenv("LLM_CACHE_SCHEMAS", "")
+            try:
+                _cache_singleton = LLMResponseCache(
+                    schemas=[s.strip() for s in schemas.split(",")],
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"LLM response cache unavailable: {exc}")
+    return _cache_singleton
+
+
+__all__ = [
+    "LLMResponseCache",
+    "get_llm_cache",
+    "llm_cache_key",
+]
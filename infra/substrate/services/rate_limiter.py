@@ -0,0 +1,78 @@
+"""
+Token-bucket rate limiting for OpenAI calls.
+
+Backfill jobs used fixed ``asyncio.sleep`` pauses between blocks, which is
+both too slow when we have quota headroom and too fast under bursts. The
+limiter below models OpenAI's two budgets explicitly:
+
+- RPM: requests per minute
+- TPM: tokens per minute
+
+Callers ``await limiter.acquire(requests=..., tokens=...)`` before issuing
+work; the call sleeps only as long as needed for both buckets to refill.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+DEFAULT_OPENAI_RPM = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+DEFAULT_OPENAI_TPM = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        self._refill()
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate_per_second
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+
+class OpenAIRateLimiter:
+    """Combined RPM/TPM limiter shared by concurrent workers."""
+
+    def __init__(self, rpm: int = DEFAULT_OPENAI_RPM, tpm: int = DEFAULT_OPENAI_TPM) -> None:
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+        self.total_requests = 0
+        self.total_tokens = 0
+
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> None:
+        # The lock keeps waiters FIFO so large requests are not starved
+        async with self._lock:
+            while True:
+                delay = max(self.requests.delay_for(requests), self.tokens.delay_for(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.consume(requests)
+            self.tokens.consume(tokens)
+            self.total_requests += requests
+            self.total_tokens += tokens
+
+
+__all__ = ["OpenAIRateLimiter", "TokenBucket"]
@@ -14,8 +14,12 @@ Reference: docs/SEMANTIC_LAYER_INTEGRATION_DESIGN.md
 Canon: docs/YARNNN_CANON.md v3.1
 """
 
+import asyncio
+import json
 import logging
+import math
 import os
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from uuid import UUID
@@ -23,6 +27,10 @@ from uuid import UUID
 from supabase import Client
 from openai import OpenAI
 
+from services.embedding_cache import get_embedding_cache, normalize_embedding_text
+from services.embedding_engine import EmbeddingEngine
+from services.llm_transport import get_llm_transport
+
 logger = logging.getLogger("uvicorn.error")
 
 # ============================================================================
@@ -105,9 +113,94 @@ class BlockWithDepth:
 # Core Primitives: Embedding Generation
 # ============================================================================
 
+@lru_cache(maxsize=1)
+def _get_sync_client() -> OpenAI:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not set")
+    return OpenAI(api_key=api_key)
+
+
+_embedding_engine: Optional[EmbeddingEngine] = None
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Get the process-wide coalescing embedding engine."""
+    global _embedding_engine
+    if _embedding_engine is None:
+        _embedding_engine = EmbeddingEngine(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS)
+    return _embedding_engine
+
+
+async def embed_texts(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Generate vector embeddings for several texts without blocking the event loop.
+
+    Texts are normalized and looked up in the content-addressed embedding cache
+    first; only misses go to the shared EmbeddingEngine (coalesced, batched API
+    calls) and are written back to the cache.
+
+    Returns:
+        One 1536-dimensional vector (or None on error/empty text) per input
+    """
+    normalized = [normalize_embedding_text(text) for text in texts]
+    cache = get_embedding_cache()
+
+    try:
+        results = await asyncio.to_thread(cache.get_many, EMBEDDING_MODEL, normalized)
+    except Exception as exc:
+        logger.warning(f"embed_texts cache lookup failed: {exc}")
+        results = [None] * len(normalized)
+
+    misses = [i for i, vector in enumerate(results) if vector is None and normalized[i]]
+    if not misses:
+        return results
+
+    try:
+        fresh = await get_embedding_engine().embed_many([normalized[i] for i in misses])
+    except Exception as exc:
+        logger.error(f"embed_texts failed: {exc}")
+        return results
+
+    for i, vector in zip(misses, fresh):
+        results[i] = vector
+
+    try:
+        await asyncio.to_thread(
+            cache.put_many, EMBEDDING_MODEL, [(normalized[i], results[i]) for i in misses]
+        )
+    except Exception as exc:
+        logger.warning(f"embed_texts cache write failed: {exc}")
+
+    return results
+
+
+async def embed_text(text: str) -> Optional[List[float]]:
+    """
+    Generate vector embedding for text without blocking the event loop.
+
+    Preferred over generate_embedding() in async code: results are cached by
+    (model, text hash) and concurrent misses are coalesced into batched API
+    calls by the shared EmbeddingEngine.
+
+    Returns:
+        1536-dimensional embedding vector, or None if error
+    """
+    if not text or not text.strip():
+        logger.warning("embed_text: Empty text provided")
+        return None
+    return (await embed_texts([text]))[0]
+
+
 def generate_embedding(text: str) -> Optional[List[float]]:
     """
-    Generate vector embedding for text using OpenAI API.
+    Generate vector embedding for text using OpenAI API (synchronous).
+
+    Kept for sync callers (scripts, background threads). Async code should
+    use embed_text() so the event loop is never blocked. Both consult the
+    shared embedding cache. Outside an event loop this runs embed_text()
+    (shared LLM transport); the blocking client is only a last resort when
+    called from a thread that already runs a loop.
 
     Args:
         text: Text content to embed (title + content typically)
@@ -125,14 +218,23 @@ def generate_embedding(text: str) -> Optional[List[float]]:
         return None
 
     try:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY not set")
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop in this thread: use the async path
+        return asyncio.run(embed_text(text))
 
-        client = OpenAI(api_key=api_key)
+    logger.warning("generate_embedding called on a running event loop; use embed_text() instead")
 
-        # Truncate to prevent token limit errors
-        trimmed = text[:8000]
+    try:
+        # Normalize + truncate to prevent token limit errors
+        trimmed = normalize_embedding_text(text)
+
+        cache = get_embedding_cache()
+        cached = cache.get(EMBEDDING_MODEL, trimmed)
+        if cached is not None:
+            return cached
+
+        client = _get_sync_client()
 
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
@@ -148,6 +250,7 @@ def generate_embedding(text: str) -> Optional[List[float]]:
             )
             return None
 
+        cache.put(EMBEDDING_MODEL, trimmed, embedding)
         return embedding
 
     except Exception as exc:
@@ -204,26 +307,52 @@ async def semantic_search(
             )
         )
     """
-    try:
-        # Generate query embedding
-        query_embedding = generate_embedding(query_text)
-        if not query_embedding:
-            logger.error("semantic_search: Failed to generate query embedding")
-            return []
+    # Generate query embedding
+    query_embedding = await embed_text(query_text)
+    if not query_embedding:
+        logger.error("semantic_search: Failed to generate query embedding")
+        return []
+
+    return await semantic_search_by_vector(
+        supabase=supabase,
+        basket_id=basket_id,
+        query_embedding=query_embedding,
+        filters=filters,
+        limit=limit
+    )
 
+
+async def semantic_search_by_vector(
+    supabase: Client,
+    basket_id: str,
+    query_embedding: List[float],
+    filters: SemanticSearchFilters,
+    limit: int = 20
+) -> List[BlockWithSimilarity]:
+    """
+    Hybrid semantic search with a precomputed query embedding.
+
+    Same contract as semantic_search(); lets callers that issue several
+    searches for the same text (e.g. one per relationship type) embed once.
+    The RPC runs in a worker thread so concurrent searches do not block the
+    event loop.
+    """
+    try:
         # Call database function (hybrid search with filters)
-        response = supabase.rpc(
-            'semantic_search_blocks',
-            {
-                'p_basket_id': str(basket_id),
-                'p_query_embedding': query_embedding,
-                'p_semantic_types': filters.semantic_types,
-                'p_anchor_roles': filters.anchor_roles,
-                'p_states': filters.states or ['ACCEPTED', 'LOCKED', 'CONSTANT'],
-                'p_min_similarity': filters.min_similarity,
-                'p_limit': limit
-            }
-        ).execute()
+        response = await asyncio.to_thread(
+            supabase.rpc(
+                'semantic_search_blocks',
+                {
+                    'p_basket_id': str(basket_id),
+                    'p_query_embedding': query_embedding,
+                    'p_semantic_types': filters.semantic_types,
+                    'p_anchor_roles': filters.anchor_roles,
+                    'p_states': filters.states or ['ACCEPTED', 'LOCKED', 'CONSTANT'],
+                    'p_min_similarity': filters.min_similarity,
+                    'p_limit': limit
+                }
+            ).execute
+        )
 
         if not response.data:
             return []
@@ -284,7 +413,7 @@ async def semantic_search_cross_basket(
     """
     try:
         # Generate query embedding
-        query_embedding = generate_embedding(query_text)
+        query_embedding = await embed_text(query_text)
         if not query_embedding:
             logger.error("semantic_search_cross_basket: Failed to generate query embedding")
             return []
@@ -326,6 +455,235 @@ async def semantic_search_cross_basket(
         return []
 
 
+async def find_semantic_duplicates_batch(
+    supabase: Client,
+    basket_id: str,
+    items: List[Dict[str, Any]],
+    limit: int = 5
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Duplicate detection for several candidate blocks in one RPC.
+
+    Batched form of the per-block check used by governance execution:
+    vector matches (same semantic type, ACCEPTED+ states, similarity >=
+    DUPLICATE_MEDIUM_CONFIDENCE) take precedence; without any, an ACCEPTED
+    block with the same metadata content_hash counts as an exact duplicate.
+
+    Args:
+        supabase: Supabase client (service role)
+        basket_id: Basket to search within
+        items: [{'semantic_type': str, 'embedding': List[float] | None,
+                 'content_hash': str | None}, ...]
+        limit: Vector matches kept per item
+
+    Returns:
+        One entry per item: None (no similar blocks) or
+        {'is_duplicate', 'similarity', 'existing_block_id', 'similar_blocks'}
+
+    Raises on RPC failure so callers can fall back to per-item checks.
+    """
+    if not items:
+        return []
+
+    response = await asyncio.to_thread(
+        supabase.rpc(
+            'fn_find_block_duplicates',
+            {
+                'p_basket_id': str(basket_id),
+                'p_items': [
+                    {
+                        'index': index,
+                        'semantic_type': item.get('semantic_type'),
+                        'embedding': item.get('embedding'),
+                        'content_hash': item.get('content_hash'),
+                    }
+                    for index, item in enumerate(items)
+                ],
+                'p_min_similarity': DUPLICATE_MEDIUM_CONFIDENCE,
+                'p_limit': limit
+            }
+        ).execute
+    )
+
+    vector_matches: Dict[int, List[Dict[str, Any]]] = {}
+    hash_matches: Dict[int, str] = {}
+    for row in response.data or []:
+        index = row['item_index']
+        if row['match_kind'] == 'hash':
+            hash_matches.setdefault(index, row['block_id'])
+        else:
+            vector_matches.setdefault(index, []).append(row)
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for index in range(len(items)):
+        matches = sorted(
+            vector_matches.get(index, []),
+            key=lambda row: float(row['similarity_score']),
+            reverse=True
+        )[:limit]
+        if matches:
+            top_similarity = float(matches[0]['similarity_score'])
+            results.append({
+                'is_duplicate': top_similarity >= DUPLICATE_HIGH_CONFIDENCE,
+                'similarity': top_similarity,
+                'existing_block_id': matches[0]['block_id'],
+                'similar_blocks': [
+                    {
+                        'id': row['block_id'],
+                        'similarity': float(row['similarity_score']),
+                        'title': (row.get('content') or '')[:100]  # Preview
+                    }
+                    for row in matches
+                ]
+            })
+        elif index in hash_matches:
+            results.append({
+                'is_duplicate': True,
+                'similarity': 1.0,
+                'existing_block_id': hash_matches[index],
+                'similar_blocks': []
+            })
+        else:
+            results.append(None)
+
+    return results
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _normalized(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def mmr_select(
+    query_embedding: List[float],
+    embeddings: List[Optional[List[float]]],
+    k: int,
+    lambda_: float = 0.7,
+    relevance: Optional[List[float]] = None
+) -> List[int]:
+    """
+    Maximal Marginal Relevance ordering of candidates.
+
+    Greedily picks the candidate maximizing
+        lambda_ * sim(query, c) - (1 - lambda_) * max sim(c, already selected)
+    so near-duplicate candidates do not crowd out other relevant ones.
+    Candidates without an embedding are skipped.
+
+    Args:
+        query_embedding: Query vector
+        embeddings: One vector (or None) per candidate
+        k: Number of candidates to select
+        lambda_: Relevance vs diversity balance (1.0 = pure relevance)
+        relevance: Precomputed query similarity per candidate (e.g. from
+            pgvector); computed from the vectors when omitted
+
+    Returns:
+        Selected candidate indices in selection order
+    """
+    available = [i for i, vector in enumerate(embeddings) if vector]
+    if not available or k <= 0:
+        return []
+
+    unit = {i: _normalized(embeddings[i]) for i in available}
+    if relevance is None:
+        query_unit = _normalized(query_embedding)
+        relevance_by_index = {
+            i: sum(x * y for x, y in zip(query_unit, unit[i])) for i in available
+        }
+    else:
+        relevance_by_index = {i: float(relevance[i]) for i in available}
+
+    # Max similarity to the selected set, updated incrementally per pick
+    redundancy = {i: 0.0 for i in available}
+    selected: List[int] = []
+    remaining = set(available)
+    while remaining and len(selected) < k:
+        best = max(
+            remaining,
+            key=lambda i: (lambda_ * relevance_by_index[i] - (1 - lambda_) * redundancy[i], -i),
+        )
+        selected.append(best)
+        remaining.discard(best)
+        best_unit = unit[best]
+        for i in remaining:
+            similarity = sum(x * y for x, y in zip(best_unit, unit[i]))
+            if similarity > redundancy[i]:
+                redundancy[i] = similarity
+
+    return selected
+
+
+def collapse_batch_duplicates(
+    items: List[Dict[str, Any]],
+    embeddings: Optional[List[Optional[List[float]]]] = None,
+    min_similarity: float = DUPLICATE_HIGH_CONFIDENCE
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    In-memory duplicate detection among the candidate blocks of one batch.
+
+    The database checks only see blocks that already exist, so two
+    near-identical candidates in the same batch would both be created. Items
+    are scanned in order and the first of each duplicate group is kept:
+    a later item is a duplicate if it shares a kept item's content_hash, or
+    (when embeddings are given) its vector is within min_similarity of a kept
+    item with the same semantic type.
+
+    Args:
+        items: [{'semantic_type': str, 'content_hash': str | None}, ...]
+        embeddings: Optional vector per item (None entries are hash-only)
+        min_similarity: Cosine similarity at which two items collapse
+
+    Returns:
+        One entry per item: None (keep) or
+        {'duplicate_of': kept item index, 'similarity': float,
+         'match_kind': 'hash' | 'vector'}
+    """
+    results: List[Optional[Dict[str, Any]]] = []
+    kept_by_hash: Dict[str, int] = {}
+    kept_vectors: Dict[Any, List[tuple]] = {}
+
+    for index, item in enumerate(items):
+        content_hash = item.get('content_hash')
+        if content_hash and content_hash in kept_by_hash:
+            results.append({
+                'duplicate_of': kept_by_hash[content_hash],
+                'similarity': 1.0,
+                'match_kind': 'hash'
+            })
+            continue
+
+        vector = embeddings[index] if embeddings else None
+        semantic_type = item.get('semantic_type')
+        best_index, best_similarity = None, 0.0
+        if vector:
+            for kept_index, kept_vector in kept_vectors.get(semantic_type, []):
+                similarity = _cosine_similarity(vector, kept_vector)
+                if similarity > best_similarity:
+                    best_index, best_similarity = kept_index, similarity
+
+        if best_index is not None and best_similarity >= min_similarity:
+            results.append({
+                'duplicate_of': best_index,
+                'similarity': best_similarity,
+                'match_kind': 'vector'
+            })
+            continue
+
+        results.append(None)
+        if content_hash:
+            kept_by_hash[content_hash] = index
+        if vector:
+            kept_vectors.setdefault(semantic_type, []).append((index, vector))
+
+    return results
+
+
 # ============================================================================
 # Core Primitives: Relationship Traversal (Week 2+)
 # ============================================================================
@@ -493,6 +851,33 @@ Respond in JSON format:
 }
 
 
+# Relationship verification settings
+RELATIONSHIP_VERIFICATION_MODEL = "gpt-4o-mini"
+RELATIONSHIP_CANDIDATES_PER_TYPE = 3   # Top-N candidates verified per relationship type
+RELATIONSHIP_VERIFY_BATCH_SIZE = int(os.getenv("RELATIONSHIP_VERIFY_BATCH_SIZE", "6"))
+RELATIONSHIP_VERIFY_CONCURRENCY = int(os.getenv("RELATIONSHIP_VERIFY_CONCURRENCY", "4"))
+
+_verify_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_verify_semaphore() -> asyncio.Semaphore:
+    global _verify_semaphore
+    if _verify_semaphore is None:
+        _verify_semaphore = asyncio.Semaphore(max(1, RELATIONSHIP_VERIFY_CONCURRENCY))
+    return _verify_semaphore
+
+
+def _rejected_verification(reason: str) -> Dict[str, Any]:
+    return {'exists': False, 'confidence_score': 0.0, 'reasoning': reason}
+
+
+def _ontology_criteria(relationship_type: str) -> str:
+    """Criteria section of a verification prompt (shared by batch verification)."""
+    prompt = RELATIONSHIP_ONTOLOGY[relationship_type]['verification_prompt']
+    criteria = prompt.split('Criteria:', 1)[-1].split('Respond in JSON format:', 1)[0]
+    return criteria.strip()
+
+
 async def verify_relationship_with_llm(
     from_block: Dict[str, Any],
     to_block: Dict[str, Any],
@@ -534,17 +919,15 @@ async def verify_relationship_with_llm(
             logger.warning("OPENAI_API_KEY not set, skipping LLM verification")
             return {'exists': False, 'confidence_score': 0.0, 'reasoning': 'API key not set'}
 
-        client = OpenAI(api_key=api_key)
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await get_llm_transport().chat(
+            schema_name="relationship_verification",
+            model=RELATIONSHIP_VERIFICATION_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.1,  # Low temperature for consistent verification
             max_tokens=150
         )
 
-        import json
         result = json.loads(response.choices[0].message.content)
 
         # Validate response format
@@ -563,24 +946,123 @@ async def verify_relationship_with_llm(
         return {'exists': False, 'confidence_score': 0.0, 'reasoning': f'Error: {str(exc)}'}
 
 
+async def verify_relationships_batch_with_llm(
+    from_block: Dict[str, Any],
+    candidates: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Verify several candidate relationships for one source block in a single LLM call.
+
+    Args:
+        from_block: Source block (dict with id, content, semantic_type)
+        candidates: [{'relationship_type': str, 'to_block': {id, content, semantic_type}}]
+
+    Returns:
+        One verification dict per candidate, in input order, with the same shape
+        as verify_relationship_with_llm(). Pairs the model omits are returned as
+        not existing.
+    """
+    if not candidates:
+        return []
+
+    if len(candidates) == 1:
+        only = candidates[0]
+        async with _get_verify_semaphore():
+            return [await verify_relationship_with_llm(from_block, only['to_block'], only['relationship_type'])]
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.warning("OPENAI_API_KEY not set, skipping LLM verification")
+        return [_rejected_verification('API key not set') for _ in candidates]
+
+    relationship_types = sorted({c['relationship_type'] for c in candidates})
+    criteria_section = "\n\n".join(
+        f"{rel_type.upper()} ({RELATIONSHIP_ONTOLOGY[rel_type]['description']}):\n{_ontology_criteria(rel_type)}"
+        for rel_type in relationship_types
+    )
+    pairs_section = "\n\n".join(
+        f"[{index}] {candidate['relationship_type'].upper()}\n"
+        f"TO: \"{candidate['to_block']['content'][:500]}\""
+        for index, candidate in enumerate(candidates)
+    )
+
+    prompt = f"""You are verifying causal relationships from one source statement to several candidates.
+
+FROM: "{from_block['content'][:500]}"
+
+Relationship criteria:
+{criteria_section}
+
+Candidate pairs (judge each independently against its relationship's criteria):
+{pairs_section}
+
+Respond in JSON format:
+{{
+    "results": [
+        {{"index": 0, "exists": true/false, "confidence_score": 0.0-1.0, "reasoning": "Brief explanation (1-2 sentences)"}}
+    ]
+}}
+Include exactly one result per candidate index."""
+
+    try:
+        async with _get_verify_semaphore():
+            response = await get_llm_transport().chat(
+                schema_name="relationship_verification_batch",
+                model=RELATIONSHIP_VERIFICATION_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.1,  # Low temperature for consistent verification
+                max_tokens=120 * len(candidates)
+            )
+
+        payload = json.loads(response.choices[0].message.content)
+        by_index: Dict[int, Dict[str, Any]] = {}
+        for item in payload.get('results', []):
+            try:
+                by_index[int(item['index'])] = item
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        results = []
+        for index in range(len(candidates)):
+            item = by_index.get(index)
+            if not item or 'exists' not in item or 'confidence_score' not in item:
+                results.append(_rejected_verification('Invalid response'))
+                continue
+            results.append({
+                'exists': bool(item['exists']),
+                'confidence_score': float(item.get('confidence_score', 0.0)),
+                'reasoning': item.get('reasoning', 'No reasoning provided')
+            })
+        return results
+
+    except Exception as exc:
+        logger.error(f"Batch LLM verification failed: {exc}")
+        return [_rejected_verification(f'Error: {str(exc)}') for _ in candidates]
+
+
 async def infer_relationships(
     supabase: Client,
     block_id: str,
-    basket_id: str
+    basket_id: str,
+    raise_errors: bool = False
 ) -> List[RelationshipProposal]:
     """
     Infer causal relationships for a block using semantic search + LLM verification.
 
-    Week 2 Implementation Process:
+    Process:
     1. Fetch source block and determine relationship types to search for
-    2. For each relationship type, semantic search for candidate target blocks
-    3. LLM verification for each candidate (confirm causal relationship)
-    4. Return high-confidence proposals (>0.70)
+    2. Embed the source block once
+    3. Semantic search for candidate target blocks, all types concurrently
+    4. Batched LLM verification of candidates (bounded concurrency)
+    5. Return high-confidence proposals (>0.70)
 
     Args:
         supabase: Supabase client (service role)
         block_id: Block to infer relationships for
         basket_id: Basket containing the block
+        raise_errors: Raise on embedding/verification/database failures instead
+            of returning [] (backfills must not checkpoint failed blocks)
 
     Returns:
         List of relationship proposals with confidence scores
@@ -597,9 +1079,11 @@ async def infer_relationships(
     """
     try:
         # Fetch source block
-        response = supabase.table('blocks').select('id, content, semantic_type').eq(
-            'id', str(block_id)
-        ).single().execute()
+        response = await asyncio.to_thread(
+            supabase.table('blocks').select('id, content, semantic_type').eq(
+                'id', str(block_id)
+            ).single().execute
+        )
 
         if not response.data:
             logger.error(f"Block {block_id} not found")
@@ -620,16 +1104,20 @@ async def infer_relationships(
 
         logger.info(f"Inferring relationships for block {block_id}: {len(relationship_types_to_search)} types")
 
-        proposals = []
+        # Embed once; every relationship type searches with the same vector
+        query_embedding = await embed_text(source_block['content'])
+        if not query_embedding:
+            logger.error(f"infer_relationships: Failed to embed block {block_id}")
+            if raise_errors:
+                raise RuntimeError(f"Failed to embed block {block_id}")
+            return []
 
-        # For each relationship type, search for candidates and verify
-        for rel_type, ontology in relationship_types_to_search:
-            try:
-                # Semantic search for candidate target blocks
-                candidates = await semantic_search(
+        searches = await asyncio.gather(
+            *(
+                semantic_search_by_vector(
                     supabase=supabase,
                     basket_id=basket_id,
-                    query_text=source_block['content'],
+                    query_embedding=query_embedding,
                     filters=SemanticSearchFilters(
                         semantic_types=ontology['to_types'],
                         states=['ACCEPTED', 'LOCKED', 'CONSTANT'],
@@ -637,50 +1125,75 @@ async def infer_relationships(
                     ),
                     limit=5  # Limit to top 5 candidates per type
                 )
+                for _, ontology in relationship_types_to_search
+            ),
+            return_exceptions=True
+        )
 
-                if not candidates:
-                    logger.debug(f"No candidates found for {rel_type}")
+        # Collect (type, candidate) pairs; top 3 per type for cost efficiency
+        pairs: List[Dict[str, Any]] = []
+        for (rel_type, _), candidates in zip(relationship_types_to_search, searches):
+            if isinstance(candidates, Exception):
+                logger.warning(f"Failed to process relationship type {rel_type}: {candidates}")
+                continue
+            if not candidates:
+                logger.debug(f"No candidates found for {rel_type}")
+                continue
+            for candidate in candidates[:RELATIONSHIP_CANDIDATES_PER_TYPE]:
+                if candidate.id == str(block_id):
                     continue
+                pairs.append({
+                    'relationship_type': rel_type,
+                    'to_block': {
+                        'id': candidate.id,
+                        'content': candidate.content,
+                        'semantic_type': candidate.semantic_type
+                    }
+                })
+
+        if not pairs:
+            logger.info(f"Inferred 0 relationship proposals for block {block_id}")
+            return []
 
-                logger.info(f"Found {len(candidates)} candidates for {rel_type}, verifying with LLM...")
-
-                # Verify each candidate with LLM (limit to top 3 for cost efficiency)
-                for candidate in candidates[:3]:
-                    verification = await verify_relationship_with_llm(
-                        from_block=source_block,
-                        to_block={
-                            'id': candidate.id,
-                            'content': candidate.content,
-                            'semantic_type': candidate.semantic_type
-                        },
-                        relationship_type=rel_type
-                    )
+        logger.info(f"Found {len(pairs)} candidate pairs for block {block_id}, verifying with LLM...")
 
-                    # Only include if LLM confirms and confidence >= 0.70
-                    if verification['exists'] and verification['confidence_score'] >= RELATIONSHIP_MEDIUM_CONFIDENCE:
-                        proposals.append(RelationshipProposal(
-                            from_block_id=block_id,
-                            to_block_id=candidate.id,
-                            relationship_type=rel_type,
-                            confidence_score=verification['confidence_score'],
-                            inference_method='llm_verification',
-                            reasoning=verification['reasoning']
-                        ))
-
-                        logger.info(
-                            f"Relationship proposal: {rel_type} "
-                            f"(confidence={verification['confidence_score']:.2f})"
-                        )
-
-            except Exception as rel_error:
-                logger.warning(f"Failed to process relationship type {rel_type}: {rel_error}")
-                continue
+        batch_size = max(1, RELATIONSHIP_VERIFY_BATCH_SIZE)
+        chunks = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+        chunk_results = await asyncio.gather(
+            *(verify_relationships_batch_with_llm(source_block, chunk) for chunk in chunks)
+        )
+
+        if raise_errors and any(
+            v['reasoning'].startswith('Error:') for verifications in chunk_results for v in verifications
+        ):
+            raise RuntimeError(f"LLM verification failed for block {block_id}")
+
+        proposals = []
+        for chunk, verifications in zip(chunks, chunk_results):
+            for pair, verification in zip(chunk, verifications):
+                # Only include if LLM confirms and confidence >= 0.70
+                if verification['exists'] and verification['confidence_score'] >= RELATIONSHIP_MEDIUM_CONFIDENCE:
+                    proposals.append(RelationshipProposal(
+                        from_block_id=block_id,
+                        to_block_id=pair['to_block']['id'],
+                        relationship_type=pair['relationship_type'],
+                        confidence_score=verification['confidence_score'],
+                        inference_method='llm_verification',
+                        reasoning=verification['reasoning']
+                    ))
+
+                    logger.info(
+                        f"Relationship proposal: {pair['relationship_type']} "
+                        f"(confidence={verification['confidence_score']:.2f})"
+                    )
 
         logger.info(f"Inferred {len(proposals)} relationship proposals for block {block_id}")
         return proposals
 
     except Exception as exc:
         logger.error(f"infer_relationships failed for block {block_id}: {exc}")
+        if raise_errors:
+            raise
         return []
 
 
@@ -722,7 +1235,7 @@ async def generate_and_store_embedding(
 
         # Generate embedding (title + content for richer semantic representation)
         text = f"{block.get('title', '')} {block.get('content', '')}".strip()
-        embedding = generate_embedding(text)
+        embedding = await embed_text(text)
 
         if not embedding:
             logger.error(f"Failed to generate embedding for block {block_id}")
@@ -753,11 +1266,19 @@ __all__ = [
     'BlockWithDepth',
     # Core primitives
     'generate_embedding',
+    'embed_text',
+    'embed_texts',
+    'get_embedding_engine',
     'semantic_search',
+    'semantic_search_by_vector',
     'semantic_search_cross_basket',
+    'find_semantic_duplicates_batch',
+    'collapse_batch_duplicates',
+    'mmr_select',
     'traverse_relationships',
     'infer_relationships',
     'verify_relationship_with_llm',
+    'verify_relationships_batch_with_llm',
     # Helpers
     'generate_and_store_embedding',
     # Constants
@@ -9,21 +9,81 @@ If they have none, we create one and add the caller as owner/member.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from typing import Iterator
 
 from fastapi import HTTPException
 from .supabase import supabase_admin
 
 log = logging.getLogger("uvicorn.error")
 
+# user_id -> workspace_id. A user's workspace never changes once created, the
+# TTL only bounds how long a deleted workspace can be served from memory.
+WORKSPACE_CACHE_TTL = float(os.getenv("WORKSPACE_CACHE_TTL_SECONDS", "300"))
+WORKSPACE_CACHE_SIZE = int(os.getenv("WORKSPACE_CACHE_SIZE", "10000"))
+
+_workspace_cache: dict[str, tuple[float, str]] = {}
+_cache_lock = threading.Lock()
+# Per-user locks single-flight the lookup/create path within the process;
+# a lock lives only while some caller holds or waits on it
+_user_locks: dict[str, threading.Lock] = {}
+_user_lock_refs: dict[str, int] = {}
+
+
+def _cached_workspace(user_id: str) -> str | None:
+    entry = _workspace_cache.get(user_id)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _remember_workspace(user_id: str, workspace_id: str) -> None:
+    with _cache_lock:
+        if len(_workspace_cache) >= WORKSPACE_CACHE_SIZE:
+            now = time.monotonic()
+            for key in [k for k, (expires, _) in _workspace_cache.items() if expires <= now]:
+                del _workspace_cache[key]
+            if len(_workspace_cache) >= WORKSPACE_CACHE_SIZE:
+                _workspace_cache.pop(next(iter(_workspace_cache)))
+        _workspace_cache[user_id] = (time.monotonic() + WORKSPACE_CACHE_TTL, workspace_id)
+
+
+@contextmanager
+def _user_lock(user_id: str) -> Iterator[None]:
+    with _cache_lock:
+        lock = _user_locks.setdefault(user_id, threading.Lock())
+        _user_lock_refs[user_id] = _user_lock_refs.get(user_id, 0) + 1
+    try:
+        with lock:
+            yield
+    finally:
+        with _cache_lock:
+            _user_lock_refs[user_id] -= 1
+            if not _user_lock_refs[user_id]:
+                del _user_lock_refs[user_id]
+                del _user_locks[user_id]
+
+
+def clear_workspace_cache() -> None:
+    """Forget all resolved workspaces."""
+    with _cache_lock:
+        _workspace_cache.clear()
+
+
 def get_or_create_workspace(user_id: str) -> str:
     """
     Ensure the user operates in exactly one workspace.
     If no workspace exists → create one and add membership.
+
+    Resolved ids are cached in-process; concurrent first calls for the same
+    user share one lookup/insert.
     """
-    sb = supabase_admin()  # service role → bypass RLS
-    
     # Validate user_id is a UUID
     try:
         uuid.UUID(user_id)
@@ -31,11 +91,35 @@ def get_or_create_workspace(user_id: str) -> str:
         log.error("Invalid user_id for workspace: %s", user_id)
         raise HTTPException(status_code=401, detail="Invalid user_id")
 
+    wid = _cached_workspace(user_id)
+    if wid is not None:
+        return wid
+
+    with _user_lock(user_id):
+        # Another caller may have resolved it while we waited
+        wid = _cached_workspace(user_id)
+        if wid is None:
+            wid = _lookup_or_create_workspace(user_id)
+            _remember_workspace(user_id, wid)
+        return wid
+
+
+async def resolve_workspace(user_id: str) -> str:
+    """Async variant: cache hits return immediately, misses run off the event loop."""
+    wid = _cached_workspace(user_id)
+    if wid is not None:
+        return wid
+    return await asyncio.to_thread(get_or_create_workspace, user_id)
+
+
+def _lookup_or_create_workspace(user_id: str) -> str:
+    sb = supabase_admin()  # service role → bypass RLS
+
     # Try lookup first
     res = sb.table("workspaces").select("id").eq("owner_id", user_id).limit(1).execute()
     if res.data:
         wid = res.data[0]["id"]
-        log.info("WS: found existing workspace id=%s for user=%s", wid, user_id)
+        log.debug("WS: found existing workspace id=%s for user=%s", wid, user_id)
         return wid
 
     # Create if missing (use select() to get id back)
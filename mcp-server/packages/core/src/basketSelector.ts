@@ -14,13 +14,14 @@ export type BasketConfidence = 'auto' | 'confirm' | 'pick';
 export interface BasketSignature {
   id: string;
   name: string;
-  embedding: number[];
+  embedding?: number[]; // omitted when the backend ranks server-side
   summary?: string;
   lastUpdated?: string;
 }
 
 export interface BasketCandidate {
   signature: BasketSignature;
+  similarity?: number; // server-side cosine similarity (0..1)
   recencyBoost?: number; // 0..1
   userAffinity?: number; // 0..1
   conflict?: boolean;
@@ -91,9 +92,9 @@ function scoreCandidate(
   fingerprint: SessionFingerprint,
   now: Date
 ): BasketScore {
-  const similarity = cosineSimilarity(
+  const similarity = candidate.similarity ?? cosineSimilarity(
     fingerprint.embedding,
-    candidate.signature.embedding
+    candidate.signature.embedding ?? []
   );
 
   const recencyBoost = candidate.recencyBoost ?? recencyFromTimestamp(candidate.signature.lastUpdated, now);
@@ -32,6 +32,8 @@ except ImportError:
 # Route imports
 from middleware.auth import AuthMiddleware
 from middleware.correlation import CorrelationIdMiddleware
+from .utils.substrate_view import BasketSubstrateScopeMiddleware
+from .repositories import close_pool as close_repository_pool
 
 from .agent_entrypoints import router as agent_router, run_agent, run_agent_direct
 from .routes.reflections import router as reflections_router
@@ -108,6 +110,7 @@ async def lifespan(app: FastAPI):
         # Clean shutdown
         await stop_canonical_queue_processor()
         logger.info("Canonical agent queue processor stopped")
+        await close_repository_pool()
 
 app = FastAPI(title="RightNow Agent Server", lifespan=lifespan)
 
@@ -127,6 +130,7 @@ app.add_middleware(
         "/api/baskets",  # Service-to-service basket creation (Phase 6 BFF)
         "/api/substrate",  # Phase 1: MCP tools (query_substrate, get_reference_assets)
     },
+    preresolve_workspace=True,
 )
 
 # Include routers
@@ -174,6 +178,8 @@ routers = (
 
 # Add correlation middleware
 app.add_middleware(CorrelationIdMiddleware)
+# Basket substrate loaded once per request across intelligence services
+app.add_middleware(BasketSubstrateScopeMiddleware)
 
 for r in routers:
     app.include_router(r, prefix="/api")
@@ -225,6 +231,18 @@ async def health_queue():
     """Canonical agent queue health check"""
     return await get_canonical_queue_health()
 
+@app.get("/health/llm", include_in_schema=False)
+async def health_llm():
+    """LLM usage per schema_name and response cache hit/miss counters"""
+    from services.llm_cache import get_llm_cache
+    from services.llm_transport import get_llm_transport
+
+    cache = get_llm_cache()
+    return {
+        "usage": get_llm_transport().usage_snapshot(),
+        "cache": cache.stats_snapshot() if cache is not None else {"enabled": False},
+    }
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
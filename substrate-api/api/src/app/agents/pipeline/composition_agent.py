@@ -22,13 +22,15 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, Any, List, Optional, Tuple
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timezone, timedelta
 from uuid import UUID
 import math
 
 from infra.utils.supabase_client import supabase_admin_client as supabase
 from infra.substrate.services.llm import get_llm
+from services.semantic_primitives import embed_text, mmr_select
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -83,6 +85,57 @@ class CompositionMetrics:
 
 logger = logging.getLogger("uvicorn.error")
 
+# Sections are independent LLM calls; bound how many run at once per document
+P4_SECTION_CONCURRENCY = int(os.getenv("P4_SECTION_CONCURRENCY", "4"))
+
+# Retrieval stage: blocks ranked against the intent embedding (pgvector), then
+# MMR-ordered; only the top candidates reach the LLM scoring prompt
+P4_VECTOR_PREFILTER_LIMIT = int(os.getenv("P4_VECTOR_PREFILTER_LIMIT", "60"))
+P4_LLM_CANDIDATES = int(os.getenv("P4_LLM_CANDIDATES", "20"))
+# Recent blocks without an embedding yet (new or not backfilled) are merged
+# into the vector hits; at most a quarter of the MMR slots go to them
+P4_UNEMBEDDED_CANDIDATES = int(os.getenv("P4_UNEMBEDDED_CANDIDATES", "20"))
+P4_UNEMBEDDED_SHARE = float(os.getenv("P4_UNEMBEDDED_SHARE", "0.25"))
+# Fast mode skips LLM scoring and takes the MMR top-k directly
+P4_FAST_SELECTION = os.getenv("P4_FAST_SELECTION", "false").lower() == "true"
+P4_FAST_SELECTION_K = int(os.getenv("P4_FAST_SELECTION_K", "12"))
+
+
+def _terms(text: Optional[str]) -> Set[str]:
+    return {word for word in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(word) > 3}
+
+
+def _term_overlap(intent_terms: Set[str], text: str) -> float:
+    """Share of the intent's terms found in ``text`` (lexical stand-in for similarity)."""
+    if not intent_terms:
+        return 0.0
+    return len(intent_terms & _terms(text)) / len(intent_terms)
+
+
+def _parse_embedding(value: Any) -> Optional[List[float]]:
+    # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    try:
+        return [float(v) for v in value]
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
 
 class CompositionRequest:
     """Request for P4 document composition"""
@@ -93,7 +146,8 @@ class CompositionRequest:
         workspace_id: str,
         intent: str,
         window: Optional[Dict[str, Any]] = None,
-        pinned_ids: Optional[List[str]] = None
+        pinned_ids: Optional[List[str]] = None,
+        fast: bool = False
     ):
         self.document_id = document_id
         self.basket_id = basket_id
@@ -101,6 +155,10 @@ class CompositionRequest:
         self.intent = intent
         self.window = window or {}
         self.pinned_ids = pinned_ids or []
+        # Fast mode: MMR selection without LLM scoring
+        self.fast = fast
+        # Set by the retrieval stage (_query_substrate)
+        self.intent_embedding: Optional[List[float]] = None
 
 
 class P4CompositionAgent:
@@ -241,7 +299,14 @@ Example response:
         logger.info(f"P4 Phase 1: Applying retrieval budget - total={budget.total_budget}, recency_days={budget.recency_days}")
         
         # Query blocks with budget and recency constraints
+        ranked_blocks = None
         if strategy["substrate_priorities"].get("blocks", True) and budget.per_type_caps["blocks"] > 0:
+            ranked_blocks = await self._rank_blocks_by_intent(request, strategy, recency_cutoff)
+
+        if ranked_blocks is not None:
+            blocks_response = type("Response", (), {"data": ranked_blocks})()
+            metrics.candidates_found["blocks"] = len(ranked_blocks)
+        elif strategy["substrate_priorities"].get("blocks", True) and budget.per_type_caps["blocks"] > 0:
             blocks_query = supabase.table("blocks").select("*").eq("basket_id", request.basket_id)
             
             # Apply recency filter (Phase 1 improvement)
@@ -270,8 +335,10 @@ Example response:
                 "semantic_type": block.get("semantic_type"),
                 "confidence_score": block.get("confidence_score", 0.7),
                 "created_at": block["created_at"],
-                "metadata": block,
-                "freshness_score": self._calculate_freshness(block["created_at"], recency_cutoff)
+                "metadata": {k: v for k, v in block.items() if k not in ("embedding", "similarity_score")},
+                "freshness_score": self._calculate_freshness(block["created_at"], recency_cutoff),
+                "embedding": _parse_embedding(block.get("embedding")),
+                "similarity": block.get("similarity_score")
             })
         
         # V3.0: No context_items table - entities are blocks with semantic_type='entity'
@@ -320,6 +387,126 @@ Example response:
         logger.info(f"P4 Phase 1: Found {total_found} substrate candidates with budget constraints: {dict(metrics.candidates_found)}")
         return candidates, metrics
     
+    async def _rank_blocks_by_intent(
+        self,
+        request: CompositionRequest,
+        strategy: Dict[str, Any],
+        recency_cutoff: datetime
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Retrieval stage: top blocks by similarity to the intent (pgvector),
+        followed by the basket's most recent blocks that have no embedding yet.
+
+        Returns None when the intent cannot be embedded, the RPC fails or the
+        basket has no embedded blocks; the caller then uses the plain query.
+        """
+        intent_text = "\n".join(
+            [request.intent, ", ".join(strategy.get("key_themes") or [])]
+        ).strip()
+        request.intent_embedding = await embed_text(intent_text)
+        if not request.intent_embedding:
+            return None
+
+        since = recency_cutoff.replace(tzinfo=timezone.utc)
+        window_start = _parse_timestamp(request.window.get("start_date"))
+        if window_start and window_start > since:
+            since = window_start
+        window_end = _parse_timestamp(request.window.get("end_date"))
+
+        try:
+            response = await asyncio.to_thread(
+                supabase.rpc("fn_rank_blocks_for_composition", {
+                    "p_basket_id": str(request.basket_id),
+                    "p_query_embedding": request.intent_embedding,
+                    "p_since": since.isoformat(),
+                    "p_until": window_end.isoformat() if window_end else None,
+                    "p_limit": P4_VECTOR_PREFILTER_LIMIT,
+                }).execute
+            )
+        except Exception as e:
+            logger.warning(f"P4 vector prefilter unavailable, using plain block query: {e}")
+            return None
+
+        if not response.data:
+            return None
+        unembedded = await self._recent_unembedded_blocks(request, since, window_end)
+        logger.info(
+            f"P4 Phase 1: Vector prefilter returned {len(response.data)} blocks "
+            f"(+{len(unembedded)} without embeddings)"
+        )
+        return response.data + unembedded
+
+    async def _recent_unembedded_blocks(
+        self,
+        request: CompositionRequest,
+        since: datetime,
+        until: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Recent blocks the vector prefilter cannot see (embedding not generated yet)."""
+        query = (
+            supabase.table("blocks")
+            .select("id, content, title, semantic_type, state, confidence_score, metadata, created_at")
+            .eq("basket_id", str(request.basket_id))
+            .is_("embedding", "null")
+            .neq("state", "REJECTED")
+            .gte("created_at", since.isoformat())
+        )
+        if until:
+            query = query.lte("created_at", until.isoformat())
+        try:
+            response = await asyncio.to_thread(
+                query.order("created_at", desc=True).limit(P4_UNEMBEDDED_CANDIDATES).execute
+            )
+        except Exception as e:
+            logger.warning(f"P4 unembedded block query failed, using vector hits only: {e}")
+            return []
+        return response.data or []
+
+    async def _mmr_order(
+        self,
+        candidates: List[Dict[str, Any]],
+        request: CompositionRequest,
+        k: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Order candidates by Maximal Marginal Relevance against the intent.
+
+        Returns the top k, or None when there is nothing to rank with.
+        Candidates without an embedding follow the MMR picks, ordered by
+        term overlap with the intent; up to P4_UNEMBEDDED_SHARE of the k
+        slots are kept for them.
+        """
+        if not request.intent_embedding:
+            return None
+        vectors = [c.get("embedding") for c in candidates]
+        if not any(vectors):
+            return None
+
+        relevance = None
+        if all(c.get("similarity") is not None for c in candidates if c.get("embedding")):
+            relevance = [float(c.get("similarity") or 0.0) for c in candidates]
+
+        unembedded = [c for c in candidates if not c.get("embedding")]
+        if unembedded:
+            intent_terms = _terms(request.intent)
+            unembedded.sort(
+                key=lambda c: _term_overlap(intent_terms, f"{c.get('title') or ''} {c.get('content') or ''}"),
+                reverse=True,
+            )
+        reserved = min(len(unembedded), int(k * P4_UNEMBEDDED_SHARE))
+
+        order = await asyncio.to_thread(
+            mmr_select,
+            request.intent_embedding,
+            vectors,
+            k - reserved,
+            RetrievalBudget().mmr_lambda,
+            relevance,
+        )
+        ordered = [candidates[i] for i in order]
+        ordered.extend(unembedded)
+        return ordered[:k]
+
     async def _score_and_select(
         self,
         candidates: List[Dict[str, Any]],
@@ -332,7 +519,33 @@ Example response:
         """
         if not candidates:
             return [], query_metrics
-        
+
+        # Vectors are only needed for ranking
+        def _without_vector(candidate: Dict[str, Any]) -> Dict[str, Any]:
+            return {k: v for k, v in candidate.items() if k != "embedding"}
+
+        fast = request.fast or P4_FAST_SELECTION
+        ordered = await self._mmr_order(
+            candidates, request, P4_FAST_SELECTION_K if fast else P4_LLM_CANDIDATES
+        )
+        if ordered is not None:
+            candidates = ordered
+            if fast:
+                selected = []
+                for candidate in candidates:
+                    chosen = _without_vector(candidate)
+                    chosen["selection_reason"] = "mmr: relevance to intent with diversity"
+                    selected.append(chosen)
+                for substrate in selected:
+                    substrate_type = substrate.get("type", "unknown")
+                    query_metrics.candidates_selected[substrate_type] = query_metrics.candidates_selected.get(substrate_type, 0) + 1
+                query_metrics.coverage_percentage = self._calculate_coverage_percentage(selected, strategy)
+                query_metrics.freshness_score = self._calculate_average_freshness(selected)
+                query_metrics.provenance_percentage = self._calculate_provenance_percentage(selected)
+                logger.info(f"P4 Phase 1: Fast mode selected {len(selected)} substrate items via MMR")
+                return selected, query_metrics
+        candidates = [_without_vector(c) for c in candidates]
+
         # Prepare candidates for LLM scoring
         def _preview_content(value: Any, limit: int = 500) -> str:
             if value is None:
@@ -417,6 +630,7 @@ Example:
             scoring_prompt,
             temperature=1.0,  # Use default temperature for model compatibility
             schema_name="p4_scoring_selection",
+            cache=True,
         )
 
         if not response.success or not isinstance(response.parsed, dict):
@@ -562,6 +776,7 @@ Example:
             narrative_prompt,
             temperature=1.0,  # Use default temperature for model compatibility
             schema_name="p4_narrative_structure",
+            cache=True,
         )
         
         narrative = response.parsed
@@ -704,6 +919,75 @@ Write in a {narrative.get('tone', 'analytical')} tone. Focus on synthesis, not s
 
         return generated
     
+    async def _generate_sections(
+        self,
+        document_id: str,
+        sections: List[Dict[str, Any]],
+        selected_substrate: List[Dict[str, Any]],
+        narrative: Dict[str, Any],
+        existing_metadata: Dict[str, Any]
+    ) -> List[str]:
+        """
+        Generate all sections concurrently (bounded by P4_SECTION_CONCURRENCY).
+
+        Returns contents in outline order. Each finished section is written to
+        the document metadata (composition_progress) so the UI can show
+        content as it arrives; latency is ~max(section) instead of the sum.
+        """
+        total = len(sections)
+        if total == 0:
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, P4_SECTION_CONCURRENCY))
+        contents: List[Optional[str]] = [None] * total
+        progress_lock = asyncio.Lock()
+
+        async def generate(index: int) -> None:
+            async with semaphore:
+                contents[index] = await self._generate_section_content(
+                    sections[index], selected_substrate, narrative
+                )
+            async with progress_lock:
+                await self._write_section_progress(
+                    document_id, sections, contents, existing_metadata
+                )
+
+        await asyncio.gather(*(generate(index) for index in range(total)))
+        return [content or "" for content in contents]
+
+    async def _write_section_progress(
+        self,
+        document_id: str,
+        sections: List[Dict[str, Any]],
+        contents: List[Optional[str]],
+        existing_metadata: Dict[str, Any]
+    ) -> None:
+        """Persist partial composition progress; failures never stop composition."""
+        completed = [
+            {"order": index, "title": sections[index].get("title", ""), "content": content}
+            for index, content in enumerate(contents)
+            if content is not None
+        ]
+        progress_metadata = {
+            **existing_metadata,
+            "composition_status": "composing_sections",
+            "composition_progress": {
+                "sections_completed": len(completed),
+                "sections_total": len(sections),
+                "sections": completed,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            },
+        }
+        try:
+            await asyncio.to_thread(
+                lambda: supabase.table("documents")
+                .update({"metadata": progress_metadata})
+                .eq("id", str(document_id))
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write section progress for {document_id}: {e}")
+
     async def _compose_document(
         self,
         document_id: str,
@@ -750,15 +1034,14 @@ Write in a {narrative.get('tone', 'analytical')} tone. Focus on synthesis, not s
             # Get relationship map for metadata
             _, relationship_map = self._prepare_substrate_with_relationships(selected_substrate)
             
-            # Generate relationship-aware section content
-            for section in narrative.get("sections", []):
+            # Generate section content concurrently, assemble in outline order
+            sections = narrative.get("sections", [])
+            section_contents = await self._generate_sections(
+                document_id, sections, selected_substrate, narrative, existing_metadata
+            )
+            for section, section_content in zip(sections, section_contents):
                 content_parts.append(f"## {section['title']}")
                 content_parts.append("")
-                
-                # Generate detailed content using relationships
-                section_content = await self._generate_section_content(
-                    section, selected_substrate, narrative
-                )
                 content_parts.append(section_content)
                 content_parts.append("")
             
@@ -773,6 +1056,10 @@ Write in a {narrative.get('tone', 'analytical')} tone. Focus on synthesis, not s
                 "composition_summary": narrative.get("summary", ""),
                 "composition_substrate_count": len(selected_substrate),
                 "composition_narrative": narrative,
+                "composition_progress": {
+                    "sections_completed": len(sections),
+                    "sections_total": len(sections),
+                },
                 "relationship_map": relationship_map,
                 "synthesis_approach": narrative.get("synthesis_approach", "Connected intelligence"),
                 "phase1_metrics": {
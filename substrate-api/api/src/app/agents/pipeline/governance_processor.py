@@ -9,13 +9,16 @@ import hashlib
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 from app.agents.pipeline.improved_substrate_agent import ImprovedP1SubstrateAgent
 from infra.utils.supabase_client import supabase_admin_client as supabase
 from services.enhanced_cascade_manager import canonical_cascade_manager
-from infra.substrate.services.semantic_primitives import (
+from services.semantic_primitives import (
+    collapse_batch_duplicates,
+    embed_texts,
+    find_semantic_duplicates_batch,
     semantic_search,
     SemanticSearchFilters,
     DUPLICATE_HIGH_CONFIDENCE,
@@ -51,6 +54,14 @@ class GovernanceProposal:
     origin: str = "agent"
 
 
+def _content_fingerprint(body: str) -> Optional[str]:
+    """metadata.content_hash of a block body (normalized for exact-duplicate checks)."""
+    try:
+        return hashlib.sha256(body.strip().lower().encode("utf-8")).hexdigest()
+    except Exception:
+        return None
+
+
 def _sanitize_for_json(value: Any) -> Any:
     if isinstance(value, dict):
         return {k: _sanitize_for_json(v) for k, v in value.items()}
@@ -652,7 +663,14 @@ class GovernanceDumpProcessor:
             return False
     
     async def _execute_proposal_operations(self, proposal: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the operations in an approved proposal to create substrate."""
+        """
+        Execute the operations in an approved proposal to create substrate.
+
+        CreateBlock ops run as one batch: a single embedding call for all op
+        texts, one set-based duplicate check, one bulk insert (storing the
+        vectors already computed) and one timeline emit. Results are still
+        reported per op, in proposal order.
+        """
         try:
             proposal_id = proposal["id"]
             ops = proposal.get("ops", [])
@@ -661,198 +679,48 @@ class GovernanceDumpProcessor:
 
             self.logger.info(f"Executing {len(ops)} operations for proposal {proposal_id}")
 
-            executed_operations = []
+            # One result slot per op keeps reporting in proposal order
+            op_results: List[Optional[Dict[str, Any]]] = [None] * len(ops)
             created_substrate_ids: Dict[str, List[str]] = {
                 "blocks": []
                 # V3.0: No context_items (all substrate is blocks)
             }
+            create_block_ops: List[Dict[str, Any]] = []
 
             for i, op in enumerate(ops):
                 op_type = (op.get("type") if isinstance(op, dict) else None) or (op.get("operation_type") if isinstance(op, dict) else None)
                 op_data = op.get("data", op) if isinstance(op, dict) else op
                 try:
                     if op_type == "CreateBlock":
-                        metadata = _sanitize_for_json(op_data.get("metadata") or {})
-                        # Canon-compliant: P1 agent provides title and content separately
-                        title = op_data.get("title") or metadata.get("title") or "Untitled insight"
-                        semantic_type_raw = (
-                            op_data.get("semantic_type")
-                            or metadata.get("semantic_type")
-                            or metadata.get("fact_type")
-                            or metadata.get("semanticType")
-                        )
-                        if isinstance(semantic_type_raw, str):
-                            semantic_type = semantic_type_raw.strip() or "insight"
-                        else:
-                            semantic_type = "insight"
-                        if not semantic_type:
-                            semantic_type = "insight"
-                            self.logger.warning(
-                                "Proposal %s CreateBlock missing semantic_type; defaulting to insight. op_data=%s",
-                                proposal_id,
-                                op_data
-                            )
-                        confidence = op_data.get("confidence") or metadata.get("confidence") or 0.7
-                        try:
-                            confidence_value = float(confidence)
-                        except Exception:
-                            confidence_value = 0.7
-                        # Canon-compliant: P1 agent provides content in 'content' field
-                        content = op_data.get("content", "")
-                        if not content:
-                            self.logger.warning(f"Block missing content: {title}")
-                            content = metadata.get("summary", "No content provided")
-                        
-                        body = content if isinstance(content, str) else str(content)
-
-                        # V3.1: Semantic duplicate detection before block creation
-                        duplicate_check_result = await self._check_semantic_duplicate(
-                            basket_id=str(basket_id),
-                            title=title,
-                            content=body,
-                            semantic_type=semantic_type
-                        )
-
-                        # If high confidence duplicate found, skip creation and log merge suggestion
-                        if duplicate_check_result and duplicate_check_result['is_duplicate']:
-                            self.logger.info(
-                                f"V3.1 Semantic duplicate detected: similarity={duplicate_check_result['similarity']:.2f}, "
-                                f"existing_block={duplicate_check_result['existing_block_id']}. "
-                                f"Skipping creation of '{title[:50]}...'"
-                            )
-
-                            # Record as skipped operation (future: could create MERGE proposal)
-                            executed_operations.append({
-                                "type": "CreateBlock",
-                                "success": True,
-                                "skipped": True,
-                                "reason": "semantic_duplicate",
-                                "duplicate_of": duplicate_check_result['existing_block_id'],
-                                "similarity_score": duplicate_check_result['similarity']
-                            })
-                            continue  # Skip to next operation
-
-                        # V3.0: Canon-compliant block creation with emergent anchors
-                        # V3.1: Enhanced with duplicate detection metadata
-                        block_metadata = metadata.copy() if metadata else {}
-                        try:
-                            fingerprint = hashlib.sha256(body.strip().lower().encode("utf-8")).hexdigest()
-                            block_metadata.setdefault("content_hash", fingerprint)
-                        except Exception:
-                            fingerprint = None
-                        if duplicate_check_result and duplicate_check_result.get('similar_blocks'):
-                            block_metadata['v3_1_similar_blocks'] = [
-                                {
-                                    'block_id': sb['id'],
-                                    'similarity': sb['similarity']
-                                }
-                                for sb in duplicate_check_result['similar_blocks']
-                            ]
-
-                        block_payload = _sanitize_for_json({
-                            "basket_id": str(basket_id),
-                            "workspace_id": str(workspace_id),
-                            "title": title,
-                            "content": body,
-                            "semantic_type": semantic_type,
-                            "confidence_score": confidence_value,
-                            "metadata": block_metadata,
-                            "state": "ACCEPTED",
-                            "status": "accepted",
-                            # V3.0: Emergent anchor fields
-                            "anchor_role": op_data.get("anchor_role"),
-                            "anchor_status": op_data.get("anchor_status") or ("proposed" if op_data.get("anchor_role") else None),
-                            "anchor_confidence": op_data.get("anchor_confidence")
-                        })
-
-                        insert_resp = (
-                            supabase
-                            .table("blocks")
-                            .insert(block_payload)
-                            .execute()
-                        )
-
-                        if getattr(insert_resp, "error", None):
-                            raise RuntimeError(f"block insert failed: {insert_resp.error}")
-
-                        created_id = None
-                        if insert_resp.data:
-                            created_id = insert_resp.data[0].get("id") if isinstance(insert_resp.data, list) else insert_resp.data.get("id")
-
-                        if not created_id:
-                            # Fallback: lookup most recent block with same basket/title
-                            lookup_resp = (
-                                supabase
-                                .table("blocks")
-                                .select("id")
-                                .eq("basket_id", str(basket_id))
-                                .eq("title", title)
-                                .order("created_at", desc=True)
-                                .limit(1)
-                                .execute()
-                            )
-                            if lookup_resp.data:
-                                candidate = lookup_resp.data[0]
-                                created_id = candidate.get("id")
-
-                        if not created_id:
-                            raise RuntimeError("block insert returned no id")
-
-                        # V3.1: Queue embedding generation for newly created ACCEPTED block
-                        try:
-                            await queue_embedding_generation(str(created_id))
-                            self.logger.debug(f"V3.1: Queued embedding generation for block {created_id}")
-                        except Exception as embed_error:
-                            # Non-blocking: log error but continue
-                            self.logger.warning(f"V3.1: Failed to queue embedding for block {created_id}: {embed_error}")
-
-                        if self._timeline_enabled:
-                            try:
-                                timeline_resp = supabase.rpc(
-                                    'fn_timeline_emit',
-                                    {
-                                        "p_basket_id": str(basket_id),
-                                        "p_kind": "block.created",
-                                        "p_ref_id": str(created_id),
-                                        "p_preview": (title or "")[:140],
-                                        "p_payload": _sanitize_for_json({
-                                            "source": "governance_auto_execute",
-                                            "proposal_id": proposal_id,
-                                            "semantic_type": semantic_type,
-                                            "confidence": confidence_value
-                                        })
-                                    }
-                                ).execute()
-                                if getattr(timeline_resp, "error", None):
-                                    raise RuntimeError(timeline_resp.error)
-                            except Exception as timeline_error:
-                                self._timeline_enabled = False
-                                self.logger.warning(
-                                    "Failed to emit timeline event for block %s: %s",
-                                    created_id,
-                                    timeline_error
-                                )
-
-                        executed_operations.append({
-                            "type": "CreateBlock",
-                            "success": True,
-                            "created_id": created_id
-                        })
-                        created_substrate_ids["blocks"].append(str(created_id))
+                        prepared = self._prepare_create_block(proposal_id, op_data)
+                        prepared["index"] = i
+                        create_block_ops.append(prepared)
 
                     # V3.0: CreateContextItem removed - all substrate is blocks now
 
                     else:
                         self.logger.warning(f"Unsupported operation type: {op_type}")
-                        
+
                 except Exception as op_error:
                     self.logger.error(f"Failed to execute operation {i}: {op_error}")
-                    executed_operations.append({
+                    op_results[i] = {
                         "type": op_type,
                         "success": False,
                         "error": str(op_error)
-                    })
-            
+                    }
+
+            if create_block_ops:
+                await self._execute_create_blocks(
+                    proposal_id=proposal_id,
+                    basket_id=basket_id,
+                    workspace_id=workspace_id,
+                    create_block_ops=create_block_ops,
+                    op_results=op_results,
+                    created_substrate_ids=created_substrate_ids
+                )
+
+            executed_operations = [result for result in op_results if result is not None]
+
             # Record execution results; tolerate older schema variants
             execution_summary = {
                 "executed": executed_operations,
@@ -917,6 +785,375 @@ class GovernanceDumpProcessor:
             self.logger.error(f"Failed to execute proposal operations: {e}")
             raise
 
+    def _prepare_create_block(self, proposal_id: Any, op_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a CreateBlock op into the fields used for block creation."""
+        metadata = _sanitize_for_json(op_data.get("metadata") or {})
+        # Canon-compliant: P1 agent provides title and content separately
+        title = op_data.get("title") or metadata.get("title") or "Untitled insight"
+        semantic_type_raw = (
+            op_data.get("semantic_type")
+            or metadata.get("semantic_type")
+            or metadata.get("fact_type")
+            or metadata.get("semanticType")
+        )
+        if isinstance(semantic_type_raw, str):
+            semantic_type = semantic_type_raw.strip() or "insight"
+        else:
+            semantic_type = "insight"
+        if not semantic_type:
+            semantic_type = "insight"
+            self.logger.warning(
+                "Proposal %s CreateBlock missing semantic_type; defaulting to insight. op_data=%s",
+                proposal_id,
+                op_data
+            )
+        confidence = op_data.get("confidence") or metadata.get("confidence") or 0.7
+        try:
+            confidence_value = float(confidence)
+        except Exception:
+            confidence_value = 0.7
+        # Canon-compliant: P1 agent provides content in 'content' field
+        content = op_data.get("content", "")
+        if not content:
+            self.logger.warning(f"Block missing content: {title}")
+            content = metadata.get("summary", "No content provided")
+
+        body = content if isinstance(content, str) else str(content)
+
+        return {
+            "op_data": op_data,
+            "metadata": metadata,
+            "title": title,
+            "semantic_type": semantic_type,
+            "confidence": confidence_value,
+            "body": body,
+            "content_hash": _content_fingerprint(body),
+        }
+
+    async def _execute_create_blocks(
+        self,
+        proposal_id: Any,
+        basket_id: Any,
+        workspace_id: Any,
+        create_block_ops: List[Dict[str, Any]],
+        op_results: List[Optional[Dict[str, Any]]],
+        created_substrate_ids: Dict[str, List[str]]
+    ) -> None:
+        """Batched CreateBlock execution; fills op_results by op index."""
+        # Exact duplicates within the proposal never need an embedding
+        create_block_ops, _ = self._collapse_intra_proposal_duplicates(create_block_ops, None, op_results)
+
+        # 1. Embed all op texts in one call (title + content, as stored embeddings use)
+        texts = [f"{prepared['title']} {prepared['body']}".strip() for prepared in create_block_ops]
+        try:
+            embeddings = await embed_texts(texts)
+        except Exception as embed_error:
+            self.logger.warning(f"V3.1: Batch embedding failed for proposal {proposal_id}: {embed_error}")
+            embeddings = [None] * len(texts)
+
+        # Near-duplicates within the proposal, using the batch's own vectors
+        create_block_ops, embeddings = self._collapse_intra_proposal_duplicates(
+            create_block_ops, embeddings, op_results
+        )
+
+        # 2. V3.1: Semantic duplicate detection for all ops in one query
+        duplicate_results = await self._check_semantic_duplicates_batch(
+            basket_id=str(basket_id),
+            create_block_ops=create_block_ops,
+            embeddings=embeddings
+        )
+
+        survivors = []
+        for prepared, embedding, duplicate_check_result in zip(create_block_ops, embeddings, duplicate_results):
+            title = prepared["title"]
+
+            # If high confidence duplicate found, skip creation and log merge suggestion
+            if duplicate_check_result and duplicate_check_result['is_duplicate']:
+                self.logger.info(
+                    f"V3.1 Semantic duplicate detected: similarity={duplicate_check_result['similarity']:.2f}, "
+                    f"existing_block={duplicate_check_result['existing_block_id']}. "
+                    f"Skipping creation of '{title[:50]}...'"
+                )
+
+                # Record as skipped operation (future: could create MERGE proposal)
+                op_results[prepared["index"]] = {
+                    "type": "CreateBlock",
+                    "success": True,
+                    "skipped": True,
+                    "reason": "semantic_duplicate",
+                    "duplicate_of": duplicate_check_result['existing_block_id'],
+                    "similarity_score": duplicate_check_result['similarity']
+                }
+                continue
+
+            # V3.0: Canon-compliant block creation with emergent anchors
+            # V3.1: Enhanced with duplicate detection metadata
+            block_metadata = prepared["metadata"].copy() if prepared["metadata"] else {}
+            if prepared["content_hash"]:
+                block_metadata.setdefault("content_hash", prepared["content_hash"])
+            if duplicate_check_result and duplicate_check_result.get('similar_blocks'):
+                block_metadata['v3_1_similar_blocks'] = [
+                    {
+                        'block_id': sb['id'],
+                        'similarity': sb['similarity']
+                    }
+                    for sb in duplicate_check_result['similar_blocks']
+                ]
+
+            if prepared.get("merged_ops"):
+                block_metadata['v3_1_merged_ops'] = prepared["merged_ops"]
+
+            op_data = prepared["op_data"]
+            survivors.append((prepared, embedding, _sanitize_for_json({
+                "basket_id": str(basket_id),
+                "workspace_id": str(workspace_id),
+                "title": title,
+                "content": prepared["body"],
+                "semantic_type": prepared["semantic_type"],
+                "confidence_score": prepared["confidence"],
+                "metadata": block_metadata,
+                "state": "ACCEPTED",
+                "status": "accepted",
+                # V3.0: Emergent anchor fields
+                "anchor_role": op_data.get("anchor_role"),
+                "anchor_status": op_data.get("anchor_status") or ("proposed" if op_data.get("anchor_role") else None),
+                "anchor_confidence": op_data.get("anchor_confidence"),
+                # V3.1: Reuse the vector computed for duplicate detection
+                "embedding": embedding
+            })))
+
+        if not survivors:
+            return
+
+        # 3. Bulk insert returning ids
+        insert_results = self._insert_blocks(str(basket_id), [payload for _, _, payload in survivors])
+
+        timeline_events: List[Dict[str, Any]] = []
+        missing_embeddings: List[str] = []
+        for (prepared, embedding, _), (created_id, error) in zip(survivors, insert_results):
+            if error:
+                self.logger.error(f"Failed to execute operation {prepared['index']}: {error}")
+                op_results[prepared["index"]] = {
+                    "type": "CreateBlock",
+                    "success": False,
+                    "error": error
+                }
+                continue
+
+            if embedding is None:
+                missing_embeddings.append(str(created_id))
+
+            timeline_events.append({
+                "kind": "block.created",
+                "ref_id": str(created_id),
+                "preview": (prepared["title"] or "")[:140],
+                "payload": _sanitize_for_json({
+                    "source": "governance_auto_execute",
+                    "proposal_id": proposal_id,
+                    "semantic_type": prepared["semantic_type"],
+                    "confidence": prepared["confidence"]
+                })
+            })
+            op_results[prepared["index"]] = {
+                "type": "CreateBlock",
+                "success": True,
+                "created_id": created_id
+            }
+            created_substrate_ids["blocks"].append(str(created_id))
+
+        # 4. V3.1: Blocks inserted without a vector still get one generated
+        for block_id in missing_embeddings:
+            try:
+                await queue_embedding_generation(block_id)
+                self.logger.debug(f"V3.1: Queued embedding generation for block {block_id}")
+            except Exception as embed_error:
+                # Non-blocking: log error but continue
+                self.logger.warning(f"V3.1: Failed to queue embedding for block {block_id}: {embed_error}")
+
+        # 5. Timeline events in one batch
+        if self._timeline_enabled and timeline_events:
+            self._emit_timeline_events(str(basket_id), timeline_events)
+
+    def _collapse_intra_proposal_duplicates(
+        self,
+        create_block_ops: List[Dict[str, Any]],
+        embeddings: Optional[List[Optional[List[float]]]],
+        op_results: List[Optional[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], List[Optional[List[float]]]]:
+        """
+        V3.1: Drop CreateBlock ops that duplicate an earlier op in the same proposal.
+
+        The first op of each group is kept and absorbs the others (highest
+        confidence, merged op indices recorded in its metadata); dropped ops
+        are reported as skipped.
+        """
+        collapsed = collapse_batch_duplicates(
+            [
+                {"semantic_type": prepared["semantic_type"], "content_hash": prepared["content_hash"]}
+                for prepared in create_block_ops
+            ],
+            embeddings
+        )
+
+        kept_ops: List[Dict[str, Any]] = []
+        kept_embeddings: List[Optional[List[float]]] = []
+        for position, (prepared, duplicate) in enumerate(zip(create_block_ops, collapsed)):
+            if duplicate is None:
+                kept_ops.append(prepared)
+                kept_embeddings.append(embeddings[position] if embeddings else None)
+                continue
+
+            kept = create_block_ops[duplicate["duplicate_of"]]
+            kept["confidence"] = max(kept["confidence"], prepared["confidence"])
+            kept.setdefault("merged_ops", []).append(prepared["index"])
+
+            self.logger.info(
+                f"V3.1 Intra-proposal duplicate ({duplicate['match_kind']}, "
+                f"similarity={duplicate['similarity']:.2f}): op {prepared['index']} "
+                f"collapsed into op {kept['index']}"
+            )
+            op_results[prepared["index"]] = {
+                "type": "CreateBlock",
+                "success": True,
+                "skipped": True,
+                "reason": "intra_proposal_duplicate",
+                "duplicate_of_op": kept["index"],
+                "similarity_score": duplicate["similarity"]
+            }
+
+        return kept_ops, kept_embeddings
+
+    async def _check_semantic_duplicates_batch(
+        self,
+        basket_id: str,
+        create_block_ops: List[Dict[str, Any]],
+        embeddings: List[Optional[List[float]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Set-based duplicate check; falls back to per-op checks if the RPC fails."""
+        try:
+            return await find_semantic_duplicates_batch(
+                supabase,
+                basket_id,
+                [
+                    {
+                        "semantic_type": prepared["semantic_type"],
+                        "embedding": embedding,
+                        "content_hash": prepared["content_hash"]
+                    }
+                    for prepared, embedding in zip(create_block_ops, embeddings)
+                ]
+            )
+        except Exception as exc:
+            self.logger.warning(f"V3.1 Batch duplicate check failed, checking per block: {exc}")
+            return [
+                await self._check_semantic_duplicate(
+                    basket_id=basket_id,
+                    title=prepared["title"],
+                    content=prepared["body"],
+                    semantic_type=prepared["semantic_type"]
+                )
+                for prepared in create_block_ops
+            ]
+
+    def _insert_blocks(
+        self,
+        basket_id: str,
+        payloads: List[Dict[str, Any]]
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Insert blocks in one statement; returns (created_id, error) per payload."""
+        try:
+            insert_resp = supabase.table("blocks").insert(payloads).execute()
+            if getattr(insert_resp, "error", None):
+                raise RuntimeError(f"block insert failed: {insert_resp.error}")
+        except Exception as bulk_error:
+            # A single INSERT is atomic, so nothing was written: retry row by
+            # row so one bad op does not fail the others
+            self.logger.warning(f"Bulk block insert failed, inserting individually: {bulk_error}")
+            return [self._insert_block(basket_id, payload) for payload in payloads]
+
+        rows = insert_resp.data or []
+        if isinstance(rows, dict):
+            rows = [rows]
+
+        results: List[Tuple[Optional[str], Optional[str]]] = []
+        for index, payload in enumerate(payloads):
+            created_id = rows[index].get("id") if index < len(rows) else None
+            if not created_id:
+                created_id = self._lookup_created_block_id(basket_id, payload["title"])
+            if created_id:
+                results.append((created_id, None))
+            else:
+                results.append((None, "block insert returned no id"))
+        return results
+
+    def _insert_block(self, basket_id: str, payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        try:
+            insert_resp = supabase.table("blocks").insert(payload).execute()
+            if getattr(insert_resp, "error", None):
+                raise RuntimeError(f"block insert failed: {insert_resp.error}")
+
+            created_id = None
+            if insert_resp.data:
+                created_id = insert_resp.data[0].get("id") if isinstance(insert_resp.data, list) else insert_resp.data.get("id")
+            if not created_id:
+                created_id = self._lookup_created_block_id(basket_id, payload["title"])
+            if not created_id:
+                raise RuntimeError("block insert returned no id")
+            return created_id, None
+        except Exception as exc:
+            return None, str(exc)
+
+    def _lookup_created_block_id(self, basket_id: str, title: str) -> Optional[str]:
+        # Fallback: lookup most recent block with same basket/title
+        lookup_resp = (
+            supabase
+            .table("blocks")
+            .select("id")
+            .eq("basket_id", basket_id)
+            .eq("title", title)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if lookup_resp.data:
+            return lookup_resp.data[0].get("id")
+        return None
+
+    def _emit_timeline_events(self, basket_id: str, events: List[Dict[str, Any]]) -> None:
+        try:
+            timeline_resp = supabase.rpc(
+                'fn_timeline_emit_batch',
+                {"p_basket_id": basket_id, "p_events": events}
+            ).execute()
+            if getattr(timeline_resp, "error", None):
+                raise RuntimeError(timeline_resp.error)
+            return
+        except Exception as batch_error:
+            self.logger.debug(f"fn_timeline_emit_batch unavailable, emitting individually: {batch_error}")
+
+        for event in events:
+            try:
+                timeline_resp = supabase.rpc(
+                    'fn_timeline_emit',
+                    {
+                        "p_basket_id": basket_id,
+                        "p_kind": event["kind"],
+                        "p_ref_id": event["ref_id"],
+                        "p_preview": event["preview"],
+                        "p_payload": event["payload"]
+                    }
+                ).execute()
+                if getattr(timeline_resp, "error", None):
+                    raise RuntimeError(timeline_resp.error)
+            except Exception as timeline_error:
+                self._timeline_enabled = False
+                self.logger.warning(
+                    "Failed to emit timeline event for block %s: %s",
+                    event["ref_id"],
+                    timeline_error
+                )
+                return
+
     async def _check_semantic_duplicate(
         self,
         basket_id: str,
@@ -952,7 +1189,8 @@ class GovernanceDumpProcessor:
             if not query_text:
                 return None
 
-            fingerprint = hashlib.sha256(query_text.lower().encode("utf-8")).hexdigest()
+            # Same fingerprint as stored in metadata.content_hash at creation
+            fingerprint = _content_fingerprint(content)
 
             # Search for semantically similar blocks
             similar_blocks = await semantic_search(
@@ -4,18 +4,21 @@ Improved P1 Substrate Agent - Focused on Quality Over Complexity
 Implements a practical, domain-aware approach that delivers quality extraction.
 """
 
+import asyncio
 import logging
 import json
-import time
 import re
 from copy import deepcopy
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 import os
-from openai import OpenAI
+from collections import Counter
 
 from infra.utils.supabase_client import supabase_admin_client as supabase
+from services.llm_cache import get_llm_cache
+from services.llm_transport import get_llm_transport, llm_workspace_scope
+from app.ingestion.pipeline import chunk_text
 from app.schemas.focused_extraction import (
     FocusedExtraction, EXTRACTION_TEMPLATES, detect_content_type,
     ContentType, ExtractedFact, ExtractedInsight, ExtractedAction, ExtractedContext
@@ -26,11 +29,24 @@ MODEL_P1 = os.getenv("LLM_MODEL_P1", "gpt-4o-mini")
 TEMP_P1 = float(os.getenv("LLM_TEMP_P1", "0.1"))
 SEED_P1 = int(os.getenv("LLM_SEED_P1", "1"))
 
+# Chunked (map-reduce) extraction for large dumps; smaller dumps use one call
+P1_CHUNK_THRESHOLD_CHARS = int(os.getenv("P1_CHUNK_THRESHOLD_CHARS", "12000"))
+P1_CHUNK_MAX_CHARS = int(os.getenv("P1_CHUNK_MAX_CHARS", "6000"))
+P1_CHUNK_CONCURRENCY = int(os.getenv("P1_CHUNK_CONCURRENCY", "4"))
+P1_MERGED_SUMMARY_MAX_CHARS = 600
+
+ACTION_PRIORITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
 STRUCTURED_EXTRACTION_METHOD = "llm_structured_v3"
 
 logger = logging.getLogger("uvicorn.error")
 
 
+def _dedup_key(text: str) -> str:
+    """Normalize extracted text so the same item from different chunks collapses"""
+    return " ".join(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+
 class ImprovedP1SubstrateAgent:
     """
     Improved P1 Substrate Agent focused on extraction quality.
@@ -51,10 +67,6 @@ class ImprovedP1SubstrateAgent:
             raise RuntimeError("OPENAI_API_KEY not set")
         self.logger.info(f"Improved P1 Substrate Agent initialized with model={MODEL_P1}")
     
-    def _client(self) -> OpenAI:
-        """Get OpenAI client"""
-        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     async def create_substrate(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create quality substrate using focused extraction.
@@ -81,11 +93,12 @@ class ImprovedP1SubstrateAgent:
             self.logger.info(f"Detected content type: {content_type} for dump {dump_id}")
 
             # Extract using focused approach (NO basket context - anchor-blind)
-            extraction_result = await self._extract_focused(
-                content,
-                content_type,
-                str(dump_id)
-            )
+            with llm_workspace_scope(workspace_id):
+                extraction_result = await self._extract_focused(
+                    content,
+                    content_type,
+                    str(dump_id)
+                )
             
             # V3.0: Transform to unified blocks (all semantic_types)
             substrate_blocks = self._transform_to_substrate(
@@ -166,7 +179,68 @@ class ImprovedP1SubstrateAgent:
         content_type: ContentType,
         dump_id: str
     ) -> FocusedExtraction:
-        """Extract using focused, domain-specific approach (anchor-blind)"""
+        """Extract using focused, domain-specific approach (anchor-blind)
+
+        Large dumps are split into chunks that are extracted concurrently and
+        merged (map-reduce); small dumps keep the single-call path. Calls go
+        through the shared LLM transport.
+        """
+        if len(content) <= P1_CHUNK_THRESHOLD_CHARS:
+            return await self._extract_chunk(content, content_type)
+
+        chunks = self._split_content(content)
+        if len(chunks) <= 1:
+            return await self._extract_chunk(content, content_type)
+
+        self.logger.info(
+            f"Chunked extraction for dump {dump_id}: {len(content)} chars in {len(chunks)} chunks"
+        )
+        semaphore = asyncio.Semaphore(max(1, P1_CHUNK_CONCURRENCY))
+
+        async def _extract_part(index: int, text: str) -> FocusedExtraction:
+            async with semaphore:
+                return await self._extract_chunk(
+                    text,
+                    content_type,
+                    part_label=f"part {index + 1} of {len(chunks)} of a longer document"
+                )
+
+        extractions = await asyncio.gather(
+            *(_extract_part(index, text) for index, text in enumerate(chunks))
+        )
+        return self._merge_extractions(extractions, content_type)
+
+    def _split_content(self, content: str) -> List[str]:
+        """Paragraph chunks from chunk_text; oversized paragraphs are split by line, then hard-cut."""
+        parts: List[str] = []
+        for chunk in chunk_text(content, max_len=P1_CHUNK_MAX_CHARS):
+            if len(chunk.text) <= P1_CHUNK_MAX_CHARS:
+                parts.append(chunk.text)
+                continue
+            # PDF text often has no blank lines: fall back to line boundaries
+            current = ""
+            for line in chunk.text.split("\n"):
+                while len(line) > P1_CHUNK_MAX_CHARS:
+                    if current:
+                        parts.append(current)
+                        current = ""
+                    parts.append(line[:P1_CHUNK_MAX_CHARS])
+                    line = line[P1_CHUNK_MAX_CHARS:]
+                if current and len(current) + len(line) + 1 > P1_CHUNK_MAX_CHARS:
+                    parts.append(current)
+                    current = ""
+                current = f"{current}\n{line}" if current else line
+            if current:
+                parts.append(current)
+        return [part for part in parts if part.strip()]
+
+    async def _extract_chunk(
+        self,
+        content: str,
+        content_type: ContentType,
+        part_label: Optional[str] = None
+    ) -> FocusedExtraction:
+        """Single structured extraction call (with retries) for one piece of content"""
 
         # Get appropriate template
         template = EXTRACTION_TEMPLATES[content_type]
@@ -174,9 +248,11 @@ class ImprovedP1SubstrateAgent:
         # Build extraction prompt (no basket context)
         system_prompt = template.system_prompt
 
+        content_heading = f"CONTENT TO ANALYZE ({part_label}):" if part_label else "CONTENT TO ANALYZE:"
+
         user_prompt = f"""{template.extraction_guidance}
 
-CONTENT TO ANALYZE:
+{content_heading}
 {content}
 
 Extract the information above in the specified JSON format. Focus on quality over quantity - better to have fewer high-quality extractions than many low-quality ones.
@@ -196,9 +272,23 @@ EXTRACTION GUIDELINES:
             }
         }
         
-        client = self._client()
-        
-        # Retry logic for reliability
+        # Seeded extraction of identical content is reusable (opt-in cache)
+        cache = get_llm_cache()
+        if cache is not None and not cache.enabled_for("focused_extraction"):
+            cache = None
+        cache_prompt = f"{system_prompt}\n\n{user_prompt}\n\nseed={SEED_P1}"
+        if cache is not None:
+            cached = await asyncio.to_thread(
+                cache.get, MODEL_P1, "focused_extraction", template.temperature, cache_prompt
+            )
+            if cached is not None:
+                try:
+                    return FocusedExtraction.model_validate(cached)
+                except Exception as e:
+                    self.logger.warning(f"Ignoring invalid cached extraction: {e}")
+
+        # Retry logic for reliability (transient API errors are already
+        # retried by the transport; this also covers invalid JSON)
         for attempt in range(3):
             try:
                 # Build request parameters
@@ -218,11 +308,15 @@ EXTRACTION GUIDELINES:
                 if template.temperature != 1.0:
                     request_params["temperature"] = template.temperature
                 
-                response = client.chat.completions.create(**request_params)
+                response = await get_llm_transport().chat(schema_name="focused_extraction", **request_params)
                 
                 raw_response = response.choices[0].message.content
                 data = json.loads(raw_response)
                 extraction = FocusedExtraction.model_validate(data)
+                if cache is not None:
+                    await asyncio.to_thread(
+                        cache.put, MODEL_P1, "focused_extraction", template.temperature, cache_prompt, data
+                    )
                 
                 # Set detected content type if not provided
                 if not hasattr(extraction, 'content_type') or not extraction.content_type:
@@ -249,7 +343,83 @@ EXTRACTION GUIDELINES:
                     )
                     
                 self.logger.warning(f"Extraction attempt {attempt + 1} failed: {e}")
-                time.sleep(1.0 * (attempt + 1))
+                await asyncio.sleep(1.0 * (attempt + 1))
+
+    def _merge_extractions(
+        self,
+        extractions: List[FocusedExtraction],
+        content_type: ContentType
+    ) -> FocusedExtraction:
+        """Reduce step: merge chunk extractions, collapsing repeated items"""
+        succeeded = [e for e in extractions if e.primary_theme != "extraction_failed"]
+        if not succeeded:
+            return extractions[0]
+        if len(succeeded) < len(extractions):
+            self.logger.warning(
+                f"Chunked extraction: {len(extractions) - len(succeeded)} of {len(extractions)} chunks failed"
+            )
+
+        facts: Dict[str, ExtractedFact] = {}
+        insights: Dict[str, ExtractedInsight] = {}
+        actions: Dict[str, ExtractedAction] = {}
+        context: Dict[str, ExtractedContext] = {}
+
+        for extraction in succeeded:
+            for fact in extraction.facts:
+                key = _dedup_key(fact.text)
+                existing = facts.get(key)
+                if existing is None:
+                    facts[key] = fact.model_copy()
+                elif fact.confidence > existing.confidence:
+                    existing.confidence = fact.confidence
+
+            for insight in extraction.insights:
+                key = _dedup_key(insight.insight)
+                existing = insights.get(key)
+                if existing is None:
+                    insights[key] = insight.model_copy(update={"supporting_facts": list(insight.supporting_facts)})
+                    continue
+                existing.confidence = max(existing.confidence, insight.confidence)
+                for supporting in insight.supporting_facts:
+                    if supporting not in existing.supporting_facts:
+                        existing.supporting_facts.append(supporting)
+
+            for action in extraction.actions:
+                key = _dedup_key(action.action)
+                existing = actions.get(key)
+                if existing is None:
+                    actions[key] = action.model_copy()
+                    continue
+                if ACTION_PRIORITY_RANK[action.priority] > ACTION_PRIORITY_RANK[existing.priority]:
+                    existing.priority = action.priority
+                existing.timeline = existing.timeline or action.timeline
+                existing.owner = existing.owner or action.owner
+
+            for item in extraction.context:
+                key = _dedup_key(item.entity)
+                existing = context.get(key)
+                if existing is None:
+                    context[key] = item.model_copy()
+                elif not existing.details and item.details:
+                    existing.details = item.details
+
+        summary = " ".join(e.summary.strip() for e in succeeded if e.summary)
+        if len(summary) > P1_MERGED_SUMMARY_MAX_CHARS:
+            summary = summary[:P1_MERGED_SUMMARY_MAX_CHARS].rsplit(" ", 1)[0] + "..."
+
+        # Most frequent chunk theme; ties go to the earliest chunk
+        primary_theme = Counter(e.primary_theme for e in succeeded).most_common(1)[0][0]
+
+        return FocusedExtraction(
+            summary=summary,
+            facts=list(facts.values()),
+            insights=list(insights.values()),
+            actions=list(actions.values()),
+            context=list(context.values()),
+            content_type=content_type,
+            primary_theme=primary_theme,
+            extraction_confidence=sum(e.extraction_confidence for e in succeeded) / len(succeeded)
+        )
 
     def _format_content_type(self, content_type: ContentType) -> str:
         """Return a JSON-safe representation of a ContentType value."""
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Set
@@ -13,6 +14,7 @@ from src.schemas.basket_intelligence_schema import (
 )
 from .pattern_recognition import BasketPatternRecognitionService
 from ...utils.supabase_client import supabase_client as supabase
+from ...utils.substrate_view import get_basket_view
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -240,61 +242,19 @@ class InconsistencyAccommodationService:
         basket_id: UUID,
         workspace_id: str
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Get basket contents for inconsistency analysis."""
+        """Get basket contents for inconsistency analysis (request-scoped view)."""
         
-        contents = {
-            "documents": [],
-            "blocks": [],
-            "context_items": [],
-            "raw_dumps": []
-        }
-        
-        try:
-            # Get documents
-            docs_resp = (
-                supabase.table("documents")
-                .select("id,title,content_raw,document_type,created_at")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .execute()
-            )
-            contents["documents"] = docs_resp.data or []
-            
-            # Get blocks
-            blocks_resp = (
-                supabase.table("blocks")
-                .select("id,semantic_type,content,state,created_at")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .neq("state", "REJECTED")
-                .execute()
-            )
-            contents["blocks"] = blocks_resp.data or []
-            
-            # Get context items
-            contexts_resp = (
-                supabase.table("context_items")
-                .select("id,type,content,scope,block_id,document_id,created_at")
-                .eq("basket_id", str(basket_id))
-                .eq("status", "active")
-                .execute()
-            )
-            contents["context_items"] = contexts_resp.data or []
-            
-            # Get raw dumps
-            dumps_resp = (
-                supabase.table("raw_dumps")
-                .select("id,content,source,created_at")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .execute()
-            )
-            contents["raw_dumps"] = dumps_resp.data or []
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket contents for inconsistency analysis: {e}")
+        view = get_basket_view(supabase, basket_id, workspace_id)
+        documents, blocks, context_items, raw_dumps = await asyncio.gather(
+            view.documents(), view.blocks(), view.context_items(), view.raw_dumps()
+        )
         
-        return contents
+        return {
+            "documents": documents,
+            "blocks": blocks,
+            "context_items": context_items,
+            "raw_dumps": raw_dumps
+        }
     
     @classmethod
     def _detect_inconsistencies_accommodatingly(
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, FrozenSet, Optional, Set, Tuple
 from uuid import UUID, uuid4
 from collections import defaultdict
 import re
@@ -14,6 +15,8 @@ from src.schemas.basket_intelligence_schema import (
 )
 from .pattern_recognition import BasketPatternRecognitionService
 from ...utils.supabase_client import supabase_client as supabase
+from ...utils.lexical_index import LexicalSimilarityIndex
+from ...utils.substrate_view import get_basket_view, substrate_terms
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -55,6 +58,13 @@ class RelationshipDiscoveryService:
         }
     }
     
+    # Stop words removed before term similarity
+    COMMON_WORDS = frozenset({
+        "this", "that", "with", "from", "they", "will", "have", "been",
+        "were", "said", "each", "which", "their", "would", "there",
+        "could", "should", "more", "very", "what", "know", "just"
+    })
+    
     @classmethod
     async def discover_document_relationships(
         cls,
@@ -207,40 +217,16 @@ class RelationshipDiscoveryService:
         basket_id: UUID,
         workspace_id: str
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Get basket contents for relationship analysis."""
+        """Get basket contents for relationship analysis (request-scoped view)."""
         
-        contents = {
-            "documents": [],
-            "blocks": []
-            # V3.0: No context_items (merged into blocks)
-        }
-
-        try:
-            # Get documents with full content
-            docs_resp = (
-                supabase.table("documents")
-                .select("id,title,content_raw,document_type,created_at")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .execute()
-            )
-            contents["documents"] = docs_resp.data or []
-
-            # V3.0: Get blocks (includes all substrate types: knowledge, meaning, entities)
-            blocks_resp = (
-                supabase.table("blocks")
-                .select("id,content,semantic_type,anchor_role,document_id")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .neq("state", "REJECTED")
-                .execute()
-            )
-            contents["blocks"] = blocks_resp.data or []
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket contents for relationships: {e}")
+        view = get_basket_view(supabase, basket_id, workspace_id)
+        documents, blocks = await asyncio.gather(view.documents(), view.blocks())
         
-        return contents
+        # V3.0: No context_items (merged into blocks)
+        return {
+            "documents": documents,
+            "blocks": blocks
+        }
     
     @classmethod
     def _discover_pairwise_relationships(
@@ -253,41 +239,110 @@ class RelationshipDiscoveryService:
         
         relationships = []
         
-        for i, doc_a in enumerate(documents):
-            for doc_b in documents[i+1:]:
-                # Analyze relationship between this pair
-                relationship = cls._analyze_document_pair(
-                    doc_a, doc_b, thematic_analysis
-                )
-                
-                if relationship and (include_weak or relationship.strength > 0.4):
-                    relationships.append(relationship)
+        # Tokenize and extract indicators once per document, then score only
+        # the pairs that can reach a relationship's min_confidence
+        features = [cls._document_features(doc, thematic_analysis) for doc in documents]
+        
+        for i, j in sorted(cls._candidate_document_pairs(features)):
+            # Analyze relationship between this pair
+            relationship = cls._analyze_document_pair(
+                documents[i], documents[j], thematic_analysis, features[i], features[j]
+            )
+            
+            if relationship and (include_weak or relationship.strength > 0.4):
+                relationships.append(relationship)
         
         return relationships
     
+    @classmethod
+    def _document_features(
+        cls,
+        doc: Dict[str, Any],
+        thematic_analysis: BasketThematicAnalysis
+    ) -> Dict[str, Any]:
+        """Per-document inputs of relationship scoring, computed once."""
+        
+        content = ((doc.get("content_raw") or "") + " " + (doc.get("title") or "")).lower()
+        keywords = {
+            keyword
+            for indicators in cls.RELATIONSHIP_INDICATORS.values()
+            for keyword in indicators["keywords"]
+            if keyword in content
+        }
+        themes = {
+            pattern.theme_name
+            for pattern in thematic_analysis.discovered_patterns
+            if any(keyword in content for keyword in pattern.keywords)
+        }
+        return {
+            "content": content,
+            "terms": substrate_terms(content) - cls.COMMON_WORDS,
+            "keywords": keywords,
+            "themes": themes,
+            "urls": set(re.findall(r'https?://[^\s]+', content)),
+            "citations": set(re.findall(r'\b[A-Z][a-z]+ \(\d{4}\)', content)),
+        }
+    
+    @classmethod
+    def _candidate_document_pairs(cls, features: List[Dict[str, Any]]) -> Set[Tuple[int, int]]:
+        """Document pairs worth scoring.
+        
+        A pair that shares no keyword, theme, URL or citation scores at most
+        0.2 + 0.2 * similarity, so it needs a term Jaccard of 0.5 to reach the
+        lowest min_confidence (0.3); the LSH index proposes those pairs.
+        """
+        
+        index: LexicalSimilarityIndex[int] = LexicalSimilarityIndex()
+        by_feature: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, doc_features in enumerate(features):
+            if not doc_features["content"].strip():
+                continue
+            index.add(i, doc_features["terms"])
+            for kind in ("keywords", "themes", "urls", "citations"):
+                for value in doc_features[kind]:
+                    by_feature[(kind, value)].append(i)
+        
+        pairs = index.candidate_pairs()
+        for members in by_feature.values():
+            for a, position in enumerate(members):
+                for b in members[a + 1:]:
+                    pairs.add((position, b))
+        return pairs
+    
     @classmethod
     def _analyze_document_pair(
         cls,
         doc_a: Dict[str, Any],
         doc_b: Dict[str, Any],
-        thematic_analysis: BasketThematicAnalysis
+        thematic_analysis: BasketThematicAnalysis,
+        features_a: Optional[Dict[str, Any]] = None,
+        features_b: Optional[Dict[str, Any]] = None
     ) -> Optional[DocumentRelationship]:
         """Analyze relationship between two specific documents."""
         
         # Get content from both documents
-        content_a = (doc_a.get("content_raw", "") + " " + doc_a.get("title", "")).lower()
-        content_b = (doc_b.get("content_raw", "") + " " + doc_b.get("title", "")).lower()
+        features_a = features_a or cls._document_features(doc_a, thematic_analysis)
+        features_b = features_b or cls._document_features(doc_b, thematic_analysis)
         
-        if not content_a.strip() or not content_b.strip():
+        if not features_a["content"].strip() or not features_b["content"].strip():
             return None
         
+        # Shared across relationship types
+        shared_themes = [
+            pattern.theme_name for pattern in thematic_analysis.discovered_patterns
+            if pattern.theme_name in features_a["themes"] and pattern.theme_name in features_b["themes"]
+        ]
+        similarity = cls._calculate_content_similarity(features_a["terms"], features_b["terms"])
+        cross_refs = cls._find_cross_references(features_a, features_b)
+        
         # Calculate different types of relationships
         relationship_scores = {}
         evidence_collections = {}
         
         for rel_type, indicators in cls.RELATIONSHIP_INDICATORS.items():
             score, evidence = cls._calculate_relationship_score(
-                content_a, content_b, indicators, thematic_analysis
+                features_a, features_b, indicators, thematic_analysis,
+                shared_themes, similarity, cross_refs
             )
             relationship_scores[rel_type] = score
             evidence_collections[rel_type] = evidence
@@ -327,10 +382,13 @@ class RelationshipDiscoveryService:
     @classmethod
     def _calculate_relationship_score(
         cls,
-        content_a: str,
-        content_b: str,
+        features_a: Dict[str, Any],
+        features_b: Dict[str, Any],
         indicators: Dict[str, Any],
-        thematic_analysis: BasketThematicAnalysis
+        thematic_analysis: BasketThematicAnalysis,
+        shared_themes: List[str],
+        similarity: float,
+        cross_refs: List[str]
     ) -> Tuple[float, List[str]]:
         """Calculate relationship score and gather evidence."""
         
@@ -341,10 +399,12 @@ class RelationshipDiscoveryService:
         keywords = indicators["keywords"]
         keyword_matches = 0
         for keyword in keywords:
-            if keyword in content_a and keyword in content_b:
+            in_a = keyword in features_a["keywords"]
+            in_b = keyword in features_b["keywords"]
+            if in_a and in_b:
                 keyword_matches += 1
                 evidence.append(f"Both documents mention '{keyword}'")
-            elif keyword in content_a or keyword in content_b:
+            elif in_a or in_b:
                 keyword_matches += 0.5
         
         if keywords:
@@ -352,21 +412,18 @@ class RelationshipDiscoveryService:
             score += keyword_score * 0.4
         
         # Thematic overlap scoring
-        shared_themes = cls._find_shared_themes(content_a, content_b, thematic_analysis)
         if shared_themes:
             theme_score = len(shared_themes) / max(len(thematic_analysis.dominant_themes), 1)
             score += theme_score * 0.3
             evidence.extend([f"Share theme: {theme}" for theme in shared_themes])
         
         # Content similarity scoring
-        similarity = cls._calculate_content_similarity(content_a, content_b)
         score += similarity * 0.2
         
         if similarity > 0.3:
             evidence.append(f"Content similarity: {similarity:.2f}")
         
         # Cross-reference scoring
-        cross_refs = cls._find_cross_references(content_a, content_b)
         if cross_refs:
             score += min(len(cross_refs) * 0.1, 0.1)
             evidence.extend([f"Cross-reference: {ref}" for ref in cross_refs[:2]])
@@ -374,47 +431,8 @@ class RelationshipDiscoveryService:
         return min(score, 1.0), evidence[:5]  # Limit evidence
     
     @classmethod
-    def _find_shared_themes(
-        cls,
-        content_a: str,
-        content_b: str,
-        thematic_analysis: BasketThematicAnalysis
-    ) -> List[str]:
-        """Find themes that appear in both documents."""
-        
-        shared_themes = []
-        
-        for pattern in thematic_analysis.discovered_patterns:
-            keywords = pattern.keywords
-            
-            a_has_theme = any(keyword in content_a for keyword in keywords)
-            b_has_theme = any(keyword in content_b for keyword in keywords)
-            
-            if a_has_theme and b_has_theme:
-                shared_themes.append(pattern.theme_name)
-        
-        return shared_themes
-    
-    @classmethod
-    def _calculate_content_similarity(cls, content_a: str, content_b: str) -> float:
-        """Calculate similarity between document contents."""
-        
-        if not content_a or not content_b:
-            return 0.0
-        
-        # Extract meaningful words
-        words_a = set(re.findall(r'\b[a-zA-Z]{4,}\b', content_a.lower()))
-        words_b = set(re.findall(r'\b[a-zA-Z]{4,}\b', content_b.lower()))
-        
-        # Remove common words
-        common_words = {
-            "this", "that", "with", "from", "they", "will", "have", "been",
-            "were", "said", "each", "which", "their", "would", "there",
-            "could", "should", "more", "very", "what", "know", "just"
-        }
-        
-        words_a = words_a - common_words
-        words_b = words_b - common_words
+    def _calculate_content_similarity(cls, words_a: FrozenSet[str], words_b: FrozenSet[str]) -> float:
+        """Calculate similarity between document term sets."""
         
         if not words_a or not words_b:
             return 0.0
@@ -425,23 +443,17 @@ class RelationshipDiscoveryService:
         return len(intersection) / len(union) if union else 0.0
     
     @classmethod
-    def _find_cross_references(cls, content_a: str, content_b: str) -> List[str]:
+    def _find_cross_references(cls, features_a: Dict[str, Any], features_b: Dict[str, Any]) -> List[str]:
         """Find cross-references between documents."""
         
         cross_refs = []
         
         # Simple URL detection
-        urls_a = set(re.findall(r'https?://[^\s]+', content_a))
-        urls_b = set(re.findall(r'https?://[^\s]+', content_b))
-        
-        shared_urls = urls_a.intersection(urls_b)
+        shared_urls = features_a["urls"].intersection(features_b["urls"])
         cross_refs.extend([f"URL: {url[:30]}..." for url in list(shared_urls)[:2]])
         
         # Simple citation pattern detection
-        citations_a = set(re.findall(r'\b[A-Z][a-z]+ \(\d{4}\)', content_a))
-        citations_b = set(re.findall(r'\b[A-Z][a-z]+ \(\d{4}\)', content_b))
-        
-        shared_citations = citations_a.intersection(citations_b)
+        shared_citations = features_a["citations"].intersection(features_b["citations"])
         cross_refs.extend([f"Citation: {cite}" for cite in list(shared_citations)[:2]])
         
         return cross_refs
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, FrozenSet, Optional, Tuple, Set
 from uuid import UUID, uuid4
 import math
 
@@ -15,9 +15,35 @@ from src.schemas.context_composition_schema import (
     BlockRelevanceScore
 )
 from ...utils.supabase_client import supabase_client as supabase
+from ...utils.substrate_view import get_basket_view
+from ...utils.lexical_index import PrefixFilterIndex
 
 logger = logging.getLogger("uvicorn.error")
 
+# Largest phrase bonus _calculate_semantic_similarity adds on top of Jaccard
+MAX_PHRASE_BONUS = 0.3
+
+# A block joins a cluster at relevance >= BLOCK_CLUSTER_RELEVANCE. The state
+# bonus is at most 0.4, so the block also needs a content similarity above
+# BLOCK_SIMILARITY_FLOOR with one of the cluster's contexts.
+BLOCK_CLUSTER_RELEVANCE = 0.5
+BLOCK_SIMILARITY_FLOOR = 0.3
+
+TextFeatures = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def _text_features(text: str, memo: Optional[Dict[str, TextFeatures]] = None) -> TextFeatures:
+    """Word set and 2-/3-word phrase set of ``text`` (memoized in ``memo`` for one call)."""
+    if memo is not None and text in memo:
+        return memo[text]
+    features = (
+        frozenset(text.lower().split()),
+        frozenset(ContextDiscoveryService._extract_key_phrases(text)),
+    )
+    if memo is not None:
+        memo[text] = features
+    return features
+
 
 class ContextDiscoveryService:
     """Service for discovering relevant memory objects based on composition context."""
@@ -134,11 +160,36 @@ class ContextDiscoveryService:
         contexts = await cls._get_basket_contexts(basket_id, workspace_id)
         blocks = await cls._get_basket_blocks(basket_id, workspace_id, "blocks")
         
+        # Word/phrase sets are computed once per text for this call
+        features: Dict[str, TextFeatures] = {}
+        
+        # Similarity adds at most MAX_PHRASE_BONUS to word Jaccard, so only
+        # pairs with Jaccard >= threshold - MAX_PHRASE_BONUS can cluster, and the
+        # prefix index finds exactly those without comparing all pairs.
+        context_words = [_text_features(c.content or "", features)[0] for c in contexts]
+        context_index = PrefixFilterIndex(
+            enumerate(context_words), cluster_threshold - MAX_PHRASE_BONUS
+        )
+        
+        # A block above BLOCK_SIMILARITY_FLOOR shares a phrase with a context
+        # or has word Jaccard above the floor, so both indexes together find
+        # every block that can reach BLOCK_CLUSTER_RELEVANCE.
+        block_features = [
+            _text_features((block.get("content") or "").lower(), features) for block in blocks
+        ]
+        block_index = PrefixFilterIndex(
+            ((i, words) for i, (words, _) in enumerate(block_features)), BLOCK_SIMILARITY_FLOOR
+        )
+        blocks_by_phrase: Dict[str, List[int]] = {}
+        for i, (_, phrases) in enumerate(block_features):
+            for phrase in phrases:
+                blocks_by_phrase.setdefault(phrase, []).append(i)
+        
         # Create clusters based on semantic similarity
         clusters = []
         processed_items = set()
         
-        for context in contexts:
+        for position, context in enumerate(contexts):
             if context.id in processed_items:
                 continue
             
@@ -148,12 +199,20 @@ class ContextDiscoveryService:
             processed_items.add(context.id)
             
             # Find semantically similar contexts
-            for other_context in contexts:
+            if cluster_threshold > 0:
+                candidates = sorted(
+                    other for other in context_index.matches(context_words[position])
+                    if other > position
+                )
+            else:
+                candidates = range(position + 1, len(contexts))
+            for other in candidates:
+                other_context = contexts[other]
                 if other_context.id in processed_items:
                     continue
                 
                 similarity = cls._calculate_semantic_similarity(
-                    context.content, other_context.content
+                    context.content, other_context.content, features
                 )
                 
                 if similarity >= cluster_threshold:
@@ -161,12 +220,21 @@ class ContextDiscoveryService:
                     processed_items.add(other_context.id)
             
             # Find blocks relevant to this context cluster
-            for block in blocks:
+            block_candidates: Set[int] = set()
+            for cluster_context in cluster_contexts:
+                words, phrases = _text_features(
+                    (cluster_context.content or "").lower(), features
+                )
+                block_candidates |= block_index.matches(words)
+                for phrase in phrases:
+                    block_candidates.update(blocks_by_phrase.get(phrase, ()))
+            for i in sorted(block_candidates):
+                block = blocks[i]
                 relevance_score = await cls._calculate_block_relevance(
-                    block, cluster_contexts, workspace_id
+                    block, cluster_contexts, workspace_id, features
                 )
                 
-                if relevance_score.relevance_score >= 0.5:
+                if relevance_score.relevance_score >= BLOCK_CLUSTER_RELEVANCE:
                     cluster_blocks.append({
                         "block": block,
                         "relevance_score": relevance_score.relevance_score
@@ -198,7 +266,8 @@ class ContextDiscoveryService:
         cls,
         block: Dict[str, Any],
         target_contexts: List[ContextItem],
-        workspace_id: str
+        workspace_id: str,
+        features: Optional[Dict[str, TextFeatures]] = None
     ) -> BlockRelevanceScore:
         """Calculate how relevant a block is to target contexts."""
         
@@ -217,10 +286,10 @@ class ContextDiscoveryService:
             
             # Content similarity score
             content_similarity = cls._calculate_semantic_similarity(
-                block_content, context_content
+                block_content, context_content, features
             )
             
-            if content_similarity > 0.3:
+            if content_similarity > BLOCK_SIMILARITY_FLOOR:
                 relevance_factors.append(content_similarity)
                 contributing_contexts.append(context.id)
                 reasoning_parts.append(f"Content similarity to '{context.content[:30]}...'")
@@ -281,15 +350,20 @@ class ContextDiscoveryService:
         )
     
     @classmethod
-    def _calculate_semantic_similarity(cls, text1: str, text2: str) -> float:
+    def _calculate_semantic_similarity(
+        cls,
+        text1: str,
+        text2: str,
+        features: Optional[Dict[str, TextFeatures]] = None
+    ) -> float:
         """Calculate semantic similarity between two texts."""
         
         if not text1 or not text2:
             return 0.0
         
         # Simple word-based similarity (can be enhanced with embeddings later)
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        words1, phrases1 = _text_features(text1, features)
+        words2, phrases2 = _text_features(text2, features)
         
         if not words1 or not words2:
             return 0.0
@@ -301,11 +375,8 @@ class ContextDiscoveryService:
         jaccard_similarity = len(intersection) / len(union)
         
         # Enhance with phrase matching
-        phrases1 = cls._extract_key_phrases(text1)
-        phrases2 = cls._extract_key_phrases(text2)
-        
         phrase_overlap = len(phrases1.intersection(phrases2))
-        phrase_bonus = min(phrase_overlap * 0.1, 0.3)
+        phrase_bonus = min(phrase_overlap * 0.1, MAX_PHRASE_BONUS)
         
         return min(jaccard_similarity + phrase_bonus, 1.0)
     
@@ -408,33 +479,25 @@ class ContextDiscoveryService:
     
     @classmethod
     async def _get_basket_contexts(cls, basket_id: UUID, workspace_id: str) -> List[ContextItem]:
-        """Get all context items for a basket."""
-        
-        try:
-            resp = (
-                supabase.table("context_items")
-                .select("*")
-                .eq("basket_id", str(basket_id))
-                .eq("status", "active")
-                .execute()
-            )
-            
-            contexts = []
-            for item in resp.data or []:
-                context_data = {
-                    **item,
-                    "composition_weight": item.get("composition_weight", 1.0),
-                    "hierarchy_level": item.get("hierarchy_level", "secondary"),
-                    "intent_category": item.get("intent_category"),
-                    "composition_metadata": item.get("composition_metadata", {})
-                }
+        """Get all context items for a basket (request-scoped view)."""
+        
+        view = get_basket_view(supabase, basket_id, workspace_id)
+        contexts = []
+        for item in await view.context_items():
+            # Composition intelligence fields default when absent
+            context_data = {
+                **item,
+                "composition_weight": item.get("composition_weight", 1.0),
+                "hierarchy_level": item.get("hierarchy_level", "secondary"),
+                "intent_category": item.get("intent_category"),
+                "composition_metadata": item.get("composition_metadata", {})
+            }
+            try:
                 contexts.append(ContextItem(**context_data))
-            
-            return contexts
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket contexts: {e}")
-            return []
+            except Exception as e:
+                logger.warning(f"Skipping invalid context item {item.get('id')}: {e}")
+        
+        return contexts
     
     @classmethod
     async def _get_basket_blocks(
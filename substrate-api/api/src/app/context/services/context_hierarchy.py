@@ -11,6 +11,7 @@ from ...models.context import (
     ContextItem, CompositionIntent, ContextHierarchy
 )
 from ...utils.supabase_client import supabase_client as supabase
+from ...utils.substrate_view import get_basket_view, invalidate_basket_view
 from ...utils.db import as_json
 
 logger = logging.getLogger("uvicorn.error")
@@ -97,7 +98,8 @@ class ContextHierarchyService:
             for opportunity in enhancement_opportunities:
                 await cls._apply_hierarchy_enhancement(opportunity, workspace_id)
             
-            # Re-analyze after enhancements
+            # Re-analyze after enhancements (the request's view predates them)
+            invalidate_basket_view(basket_id, workspace_id, "context_items")
             current_hierarchy = await cls.analyze_context_hierarchy(basket_id, workspace_id)
         
         # Log hierarchy analysis
@@ -216,33 +218,25 @@ class ContextHierarchyService:
     
     @classmethod
     async def _get_basket_contexts(cls, basket_id: UUID, workspace_id: str) -> List[ContextItem]:
-        """Get all context items for a basket with composition intelligence fields."""
-        try:
-            resp = (
-                supabase.table("context_items")
-                .select("*")
-                .eq("basket_id", str(basket_id))
-                .eq("status", "active")
-                .execute()
-            )
-            
-            contexts = []
-            for item in resp.data or []:
-                # Ensure composition intelligence fields have defaults
-                context_data = {
-                    **item,
-                    "composition_weight": item.get("composition_weight", 1.0),
-                    "hierarchy_level": item.get("hierarchy_level", "secondary"),
-                    "intent_category": item.get("intent_category"),
-                    "composition_metadata": item.get("composition_metadata", {})
-                }
+        """Get all context items for a basket (request-scoped view)."""
+        
+        view = get_basket_view(supabase, basket_id, workspace_id)
+        contexts = []
+        for item in await view.context_items():
+            # Composition intelligence fields default when absent
+            context_data = {
+                **item,
+                "composition_weight": item.get("composition_weight", 1.0),
+                "hierarchy_level": item.get("hierarchy_level", "secondary"),
+                "intent_category": item.get("intent_category"),
+                "composition_metadata": item.get("composition_metadata", {})
+            }
+            try:
                 contexts.append(ContextItem(**context_data))
-            
-            return contexts
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket contexts: {e}")
-            return []
+            except Exception as e:
+                logger.warning(f"Skipping invalid context item {item.get('id')}: {e}")
+        
+        return contexts
     
     @classmethod
     def _classify_contexts_by_hierarchy(
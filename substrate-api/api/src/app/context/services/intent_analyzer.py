@@ -11,6 +11,7 @@ import re
 from ...models.context import ContextItem, CompositionIntent
 from src.schemas.context_composition_schema import IntentAnalysisResult
 from ...utils.supabase_client import supabase_client as supabase
+from ...utils.substrate_view import get_basket_view
 from ...utils.db import as_json
 
 logger = logging.getLogger("uvicorn.error")
@@ -574,48 +575,28 @@ class IntentAnalyzerService:
     
     @classmethod
     async def _get_basket_contexts(cls, basket_id: UUID, workspace_id: str) -> List[ContextItem]:
-        """Get all context items for a basket."""
-        try:
-            resp = (
-                supabase.table("context_items")
-                .select("*")
-                .eq("basket_id", str(basket_id))
-                .eq("status", "active")
-                .execute()
-            )
-            
-            contexts = []
-            for item in resp.data or []:
-                context_data = {
-                    **item,
-                    "composition_weight": item.get("composition_weight", 1.0),
-                    "hierarchy_level": item.get("hierarchy_level", "secondary"),
-                    "intent_category": item.get("intent_category"),
-                    "composition_metadata": item.get("composition_metadata", {})
-                }
+        """Get all context items for a basket (request-scoped view)."""
+        
+        view = get_basket_view(supabase, basket_id, workspace_id)
+        contexts = []
+        for item in await view.context_items():
+            # Composition intelligence fields default when absent
+            context_data = {
+                **item,
+                "composition_weight": item.get("composition_weight", 1.0),
+                "hierarchy_level": item.get("hierarchy_level", "secondary"),
+                "intent_category": item.get("intent_category"),
+                "composition_metadata": item.get("composition_metadata", {})
+            }
+            try:
                 contexts.append(ContextItem(**context_data))
-            
-            return contexts
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket contexts: {e}")
-            return []
+            except Exception as e:
+                logger.warning(f"Skipping invalid context item {item.get('id')}: {e}")
+        
+        return contexts
     
     @classmethod
     async def _get_basket_blocks(cls, basket_id: UUID, workspace_id: str) -> List[Dict[str, Any]]:
-        """Get all blocks for a basket."""
-        try:
-            resp = (
-                supabase.table("blocks")
-                .select("id,semantic_type,content,state")
-                .eq("basket_id", str(basket_id))
-                .eq("workspace_id", workspace_id)
-                .neq("state", "REJECTED")
-                .execute()
-            )
-            
-            return resp.data or []
-            
-        except Exception as e:
-            logger.exception(f"Failed to get basket blocks: {e}")
-            return []
\ No newline at end of file
+        """Get all blocks for a basket (request-scoped view)."""
+        
+        return await get_basket_view(supabase, basket_id, workspace_id).blocks()
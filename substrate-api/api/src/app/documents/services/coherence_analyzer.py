@@ -11,6 +11,7 @@ import re
 from ...models.document import Document
 from src.schemas.document_composition_schema import DocumentContextAlignment
 from ...context.services.composition_intelligence import CompositionIntelligenceService
+from ...utils.substrate_view import get_context_items
 from ...utils.supabase_client import supabase_client as supabase
 from ...utils.db import as_json
 
@@ -232,10 +233,11 @@ class CoherenceAnalyzerService:
         # Simple coverage: check if context content appears in document
         covered_contexts = 0
         content_lower = document.content_raw.lower()
+        context_contents = await cls._get_context_contents(all_contexts, workspace_id)
         
         for context_id in all_contexts:
             # Get context content
-            context_content = await cls._get_context_content(context_id, workspace_id)
+            context_content = context_contents.get(str(context_id))
             if context_content:
                 # Check if key words from context appear in document
                 context_words = set(context_content.lower().split())
@@ -424,9 +426,10 @@ class CoherenceAnalyzerService:
         
         # Check coverage of each context
         content_lower = document.content_raw.lower()
+        context_contents = await cls._get_context_contents(all_contexts, workspace_id)
         
         for context_id in all_contexts:
-            context_content = await cls._get_context_content(context_id, workspace_id)
+            context_content = context_contents.get(str(context_id))
             if context_content:
                 # Check representation in document
                 context_words = set(context_content.lower().split())
@@ -753,22 +756,20 @@ class CoherenceAnalyzerService:
         
         return factors
     
+    @classmethod
+    async def _get_context_contents(cls, context_ids: List[UUID], workspace_id: str) -> Dict[str, str]:
+        """Get context contents by IDs in one query, memoized for the request."""
+        
+        contexts = await get_context_items(supabase, context_ids)
+        return {
+            context_id: context["content"]
+            for context_id, context in contexts.items()
+            if context.get("content")
+        }
+    
     @classmethod
     async def _get_context_content(cls, context_id: UUID, workspace_id: str) -> Optional[str]:
         """Get context content by ID."""
         
-        try:
-            resp = (
-                supabase.table("context_items")
-                .select("content")
-                .eq("id", str(context_id))
-                .eq("status", "active")
-                .single()
-                .execute()
-            )
-            
-            return resp.data.get("content") if resp.data else None
-            
-        except Exception as e:
-            logger.warning(f"Failed to get context {context_id}: {e}")
-            return None
\ No newline at end of file
+        contents = await cls._get_context_contents([context_id], workspace_id)
+        return contents.get(str(context_id))
\ No newline at end of file
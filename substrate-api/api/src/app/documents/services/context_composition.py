@@ -35,6 +35,7 @@ from ...models.document import (
     NarrativeMetadata,
 )
 from ...utils.db import as_json
+from ...utils.substrate_view import get_blocks
 from ...utils.supabase_client import supabase_client as supabase
 from src.lib.canon import SubstrateEqualityEngine, SubstrateType, SubstrateReference
 
@@ -241,12 +242,19 @@ class ContextCompositionService:
                     max_results=request.max_blocks
                 )
 
+                blocks = await cls._get_blocks(
+                    [block_score.block_id for block_score in discovery_result.discovered_blocks],
+                    workspace_id,
+                )
+
                 for block_score in discovery_result.discovered_blocks:
+                    block_details = blocks.get(str(block_score.block_id), {})
+
                     discovered_blocks.append(DiscoveredBlock(
                         block_id=block_score.block_id,
-                        content=await cls._get_block_content(block_score.block_id, workspace_id),
-                        semantic_type=await cls._get_block_semantic_type(block_score.block_id, workspace_id),
-                        state=await cls._get_block_state(block_score.block_id, workspace_id),
+                        content=block_details.get("content", ""),
+                        semantic_type=block_details.get("semantic_type", "insight"),
+                        state=block_details.get("state", "PROPOSED"),
                         relevance_score=block_score.relevance_score,
                         context_alignment=block_score.context_alignment,
                         composition_value=block_score.composition_value,
@@ -271,8 +279,13 @@ class ContextCompositionService:
                 discovery_request, workspace_id
             )
 
+            blocks = await cls._get_blocks(
+                [block_score.block_id for block_score in discovery_result.discovered_blocks],
+                workspace_id,
+            )
+
             for block_score in discovery_result.discovered_blocks:
-                block_details = await cls._get_block_details(block_score.block_id, workspace_id)
+                block_details = blocks.get(str(block_score.block_id), {})
 
                 discovered_blocks.append(DiscoveredBlock(
                     block_id=block_score.block_id,
@@ -932,22 +945,16 @@ class ContextCompositionService:
             logger.exception(f"Failed to get contexts by IDs: {e}")
             return []
 
+    @classmethod
+    async def _get_blocks(cls, block_ids: List[UUID], workspace_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get blocks by IDs in one query, memoized for the request."""
+        return await get_blocks(supabase, block_ids, workspace_id)
+
     @classmethod
     async def _get_block_details(cls, block_id: UUID, workspace_id: str) -> Dict[str, Any]:
         """Get block details by ID."""
-        try:
-            resp = (
-                supabase.table("blocks")
-                .select("*")
-                .eq("id", str(block_id))
-                .eq("workspace_id", workspace_id)
-                .single()
-                .execute()
-            )
-            return resp.data or {}
-        except Exception as e:
-            logger.warning(f"Failed to get block {block_id}: {e}")
-            return {}
+        blocks = await cls._get_blocks([block_id], workspace_id)
+        return blocks.get(str(block_id), {})
 
     @classmethod
     async def _get_block_content(cls, block_id: UUID, workspace_id: str) -> str:
@@ -64,7 +64,8 @@ async def subscribe(topics: list[str]):
     """
     q: asyncio.Queue[Event] = asyncio.Queue()
     await init_pool()
-    callback = lambda *_, payload: asyncio.create_task(_dispatch(payload, topics, q))
+    # asyncpg passes (connection, pid, channel, payload) positionally
+    callback = lambda _conn, _pid, _channel, payload: asyncio.create_task(_dispatch(payload, topics, q))
     conn = None
     try:
         conn = await POOL.acquire()
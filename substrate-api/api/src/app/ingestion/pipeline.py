@@ -1,5 +1,5 @@
 from typing import List
-from .types import RawDumpChunk
+from .ingestion_types import RawDumpChunk
 
 def chunk_text(text: str, max_len: int = 6000) -> List[RawDumpChunk]:
     if not text:
@@ -0,0 +1,120 @@
+# Standalone canonical pipeline worker
+# ruff: noqa: E402
+"""
+Run canonical queue processing outside the HTTP tier.
+
+Each process is one sharded worker: baskets are spread over live workers by
+consistent hashing (services/queue_sharding.py), so pipeline throughput scales
+with the number of worker processes/nodes instead of API replicas. Set
+CANONICAL_QUEUE_IN_PROCESS=false on the API service once workers are deployed.
+
+On SIGTERM/SIGINT the worker drains: it stops claiming, waits up to
+--drain-timeout seconds for in-flight items and hands the rest back to the
+queue. Per-worker counters are reported at /health/queue on the API.
+
+Usage (from substrate-api/api):
+    python -m src.app.pipeline_worker --concurrency 4
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+# Same sys.path layout as agent_server
+base_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(base_dir, "..")))
+sys.path.append(base_dir)
+repo_root = os.path.abspath(os.path.join(base_dir, "..", "..", "..", ".."))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from services.canonical_queue_processor import (
+    DEFAULT_DRAIN_SECONDS,
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_QUEUE_CONCURRENCY,
+    CanonicalQueueProcessor,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def run_worker(
+    worker_id: str | None = None,
+    concurrency: int = DEFAULT_QUEUE_CONCURRENCY,
+    poll_interval: int = 10,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    drain_timeout: float = DEFAULT_DRAIN_SECONDS,
+) -> dict:
+    """Process the queue until SIGTERM/SIGINT, then drain."""
+    processor = CanonicalQueueProcessor(
+        worker_id=worker_id,
+        poll_interval=poll_interval,
+        max_concurrency=concurrency,
+        lease_seconds=lease_seconds,
+        sharded=True,
+    )
+
+    shutdown = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, shutdown.set)
+
+    runner = asyncio.create_task(processor.start())
+    stop_waiter = asyncio.create_task(shutdown.wait())
+    await asyncio.wait({runner, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+
+    logger.info(f"Pipeline worker {processor.worker_id} shutting down")
+    result = await processor.drain(timeout=drain_timeout)
+    stop_waiter.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+    logger.info(
+        f"Pipeline worker {processor.worker_id} stopped: "
+        f"{result['finished']} finished during drain, {result['released']} released"
+    )
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Standalone canonical pipeline worker")
+    parser.add_argument('--worker-id', type=str, default=os.getenv("PIPELINE_WORKER_ID"),
+                        help='Stable worker id (default: random)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_QUEUE_CONCURRENCY,
+                        help='Items processed concurrently by this worker')
+    parser.add_argument('--poll-interval', type=int, default=10,
+                        help='Fallback poll interval in seconds (NOTIFY wakes workers immediately)')
+    parser.add_argument('--lease-seconds', type=int, default=DEFAULT_LEASE_SECONDS,
+                        help='Claim lease, renewed by heartbeat')
+    parser.add_argument('--drain-timeout', type=float, default=DEFAULT_DRAIN_SECONDS,
+                        help='Seconds to wait for in-flight items on shutdown')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s'
+    )
+
+    asyncio.run(run_worker(
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        lease_seconds=args.lease_seconds,
+        drain_timeout=args.drain_timeout,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Async data access for the hot substrate tables.
+
+Repositories run prepared statements on one shared asyncpg pool and return
+PostgREST-shaped rows; without a direct database URL they fall back to
+PostgREST through the supplied supabase client. Queries on other tables go
+through ``execute_async``, which keeps the sync supabase-py call off the
+event loop.
+"""
+
+from .base import Repository, execute_async, rows_of
+from .blocks import BlocksRepository
+from .pool import close_pool, get_pool
+from .proposals import ProposalsRepository
+from .raw_dumps import RawDumpsRepository
+from .reflections import ReflectionsRepository
+from .timeline_events import TimelineEventsRepository
+from .work_queue import WorkQueueRepository
+
+__all__ = [
+    "BlocksRepository",
+    "ProposalsRepository",
+    "RawDumpsRepository",
+    "ReflectionsRepository",
+    "Repository",
+    "TimelineEventsRepository",
+    "WorkQueueRepository",
+    "close_pool",
+    "execute_async",
+    "get_pool",
+    "rows_of",
+]
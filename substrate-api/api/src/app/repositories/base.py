@@ -0,0 +1,126 @@
+"""Repository base class and the PostgREST compatibility shim."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from .pool import get_pool
+from .rows import columns_of, to_row
+
+# Applied to a PostgREST select builder when no asyncpg pool is available
+RestQuery = Callable[[Any], Any]
+
+
+async def execute_async(query: Any) -> Any:
+    """Run a supabase-py query builder's ``execute()`` off the event loop.
+
+    Compatibility shim for tables and queries that have no repository yet:
+    ``await execute_async(supabase.table(...)...)`` behaves like ``.execute()``
+    without blocking other requests for the HTTP round trip.
+    """
+    return await asyncio.to_thread(query.execute)
+
+
+def rows_of(response: Any) -> List[Dict[str, Any]]:
+    """``.data`` of a PostgREST response as a list (single()/maybe_single() return a dict)."""
+    data = getattr(response, "data", None) if response is not None else None
+    if data is None:
+        return []
+    if isinstance(data, dict):
+        return [data]
+    return list(data)
+
+
+class Repository:
+    """Typed async access to one table.
+
+    Queries run as prepared statements on the shared asyncpg pool; without a
+    pool, the equivalent PostgREST query runs through ``supabase`` via
+    ``execute_async``. Both paths return the same PostgREST-shaped rows.
+    """
+
+    table: str
+    row_type: Type[Any]
+
+    def __init__(self, supabase: Any = None) -> None:
+        self.supabase = supabase
+
+    @property
+    def columns(self) -> Sequence[str]:
+        return columns_of(self.row_type)
+
+    def _client(self) -> Any:
+        if self.supabase is None:
+            from ..utils.supabase_client import supabase_admin_client
+
+            self.supabase = supabase_admin_client
+        return self.supabase
+
+    def _rest_select(self) -> Any:
+        return self._client().table(self.table).select(",".join(self.columns))
+
+    def _sql_select(self) -> str:
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f"SELECT {columns} FROM public.{self.table}"
+
+    async def _fetch(
+        self,
+        where: str,
+        args: Sequence[Any],
+        rest: RestQuery,
+        *,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        pool = await get_pool()
+        if pool is None:
+            return rows_of(await execute_async(rest(self._rest_select())))
+
+        sql = f"{self._sql_select()} WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        async with pool.acquire() as conn:
+            records = await conn.fetch(sql, *args)
+        return [to_row(record) for record in records]
+
+    async def _fetch_one(
+        self, where: str, args: Sequence[Any], rest: RestQuery
+    ) -> Optional[Dict[str, Any]]:
+        rows = await self._fetch(where, args, lambda q: rest(q).limit(1), limit=1)
+        return rows[0] if rows else None
+
+    async def _count(self, where: str, args: Sequence[Any], rest: Callable[[Any], Any]) -> int:
+        pool = await get_pool()
+        if pool is None:
+            query = rest(self._client().table(self.table).select("id", count="exact"))
+            response = await execute_async(query)
+            return getattr(response, "count", None) or 0
+
+        async with pool.acquire() as conn:
+            return await conn.fetchval(
+                f"SELECT count(*) FROM public.{self.table} WHERE {where}", *args
+            )
+
+    async def _update(
+        self,
+        values: Dict[str, Any],
+        where: str,
+        args: Sequence[Any],
+        rest: RestQuery,
+    ) -> None:
+        pool = await get_pool()
+        if pool is None:
+            await execute_async(rest(self._client().table(self.table).update(values)))
+            return
+
+        offset = len(args)
+        assignments = ", ".join(f'"{column}" = ${offset + i}' for i, column in enumerate(values, 1))
+        async with pool.acquire() as conn:
+            await conn.execute(
+                f"UPDATE public.{self.table} SET {assignments} WHERE {where}",
+                *args,
+                *values.values(),
+            )
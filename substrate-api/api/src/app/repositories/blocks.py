@@ -0,0 +1,67 @@
+"""Blocks repository."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import Repository
+from .rows import BlockRow
+
+
+class BlocksRepository(Repository):
+    table = "blocks"
+    row_type = BlockRow
+
+    async def list_for_basket(
+        self,
+        basket_id: str,
+        *,
+        states: Optional[Sequence[str]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Blocks of a basket, optionally limited to states and a created_at window."""
+        where = ["basket_id = $1::uuid"]
+        args: List[Any] = [str(basket_id)]
+
+        def rest(query):
+            query = query.eq("basket_id", str(basket_id))
+            if states is not None:
+                query = query.in_("state", list(states))
+            if created_from is not None:
+                query = query.gte("created_at", created_from.isoformat())
+            if created_to is not None:
+                query = query.lte("created_at", created_to.isoformat())
+            return query
+
+        if states is not None:
+            args.append(list(states))
+            where.append(f"state::text = ANY(${len(args)}::text[])")
+        if created_from is not None:
+            args.append(created_from)
+            where.append(f"created_at >= ${len(args)}")
+        if created_to is not None:
+            args.append(created_to)
+            where.append(f"created_at <= ${len(args)}")
+        return await self._fetch(" AND ".join(where), args, rest)
+
+    async def get_many(self, ids: Sequence[str]) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        ids = [str(i) for i in ids]
+        return await self._fetch("id = ANY($1::uuid[])", [ids], lambda q: q.in_("id", ids))
+
+    async def count_for_basket(self, basket_id: str, *, created_since: Optional[str] = None) -> int:
+        """Number of blocks in a basket (created at or after ``created_since``)."""
+        if created_since is None:
+            return await self._count(
+                "basket_id = $1::uuid",
+                [str(basket_id)],
+                lambda q: q.eq("basket_id", str(basket_id)),
+            )
+        return await self._count(
+            "basket_id = $1::uuid AND created_at >= $2::timestamptz",
+            [str(basket_id), datetime.fromisoformat(created_since.replace("Z", "+00:00"))],
+            lambda q: q.eq("basket_id", str(basket_id)).gte("created_at", created_since),
+        )
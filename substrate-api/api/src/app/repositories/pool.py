@@ -0,0 +1,98 @@
+"""Shared asyncpg pool for the repository layer.
+
+One pool per process, created on first use from ``REPOSITORY_DATABASE_URL``
+(falling back to ``DATABASE_URL``). When neither is set, or asyncpg cannot
+connect, ``get_pool()`` returns ``None`` and repositories use PostgREST
+through the caller's supabase client instead, so deployments without a
+direct database URL keep working.
+
+Statements are prepared and cached per connection by asyncpg. Supabase's
+transaction-mode pooler (port 6543 / ``pgbouncer=true``) cannot keep prepared
+statements, so the statement cache is disabled for such URLs unless
+``REPOSITORY_STATEMENT_CACHE_SIZE`` says otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+log = logging.getLogger("uvicorn.error")
+
+# After a failed connect, wait this long before trying again
+RETRY_AFTER_SECONDS = 60.0
+
+_pool: Optional[Any] = None
+_pool_lock = asyncio.Lock()
+_failed_at: Optional[float] = None
+
+
+def database_url() -> Optional[str]:
+    url = os.getenv("REPOSITORY_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url or None
+
+
+def statement_cache_size(url: str) -> int:
+    configured = os.getenv("REPOSITORY_STATEMENT_CACHE_SIZE")
+    if configured is not None:
+        return int(configured)
+    if ":6543" in url or "pgbouncer=true" in url:
+        return 0
+    return 256
+
+
+async def _init_connection(conn) -> None:
+    # Decode json/jsonb like PostgREST does
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
+async def get_pool():
+    """The shared pool, or None when no direct database connection is available."""
+    global _pool, _failed_at
+
+    if _pool is not None:
+        return _pool
+    url = database_url()
+    if not url:
+        return None
+    if _failed_at is not None and time.monotonic() - _failed_at < RETRY_AFTER_SECONDS:
+        return None
+
+    async with _pool_lock:
+        if _pool is not None:
+            return _pool
+        try:
+            import asyncpg
+
+            _pool = await asyncpg.create_pool(
+                url,
+                min_size=int(os.getenv("REPOSITORY_POOL_MIN_SIZE", "1")),
+                max_size=int(os.getenv("REPOSITORY_POOL_MAX_SIZE", "10")),
+                statement_cache_size=statement_cache_size(url),
+                command_timeout=60,
+                init=_init_connection,
+            )
+            _failed_at = None
+            log.info("Repository pool ready (statement cache %d)", statement_cache_size(url))
+        except Exception as exc:
+            _failed_at = time.monotonic()
+            log.warning("Repository pool unavailable, using PostgREST: %s", exc)
+            return None
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared pool (app shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,48 @@
+"""Proposals repository."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .base import Repository
+from .rows import ProposalRow
+
+
+class ProposalsRepository(Repository):
+    table = "proposals"
+    row_type = ProposalRow
+
+    async def get(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(
+            "id = $1::uuid", [str(proposal_id)], lambda q: q.eq("id", str(proposal_id))
+        )
+
+    async def list_from_source(self, source_id: str) -> List[Dict[str, Any]]:
+        """Proposals whose provenance includes ``source_id`` (e.g. a dump id)."""
+        return await self._fetch(
+            "provenance @> $1::jsonb",
+            [json.dumps([str(source_id)])],
+            lambda q: q.contains("provenance", [str(source_id)]),
+        )
+
+    async def list_for_basket(
+        self, basket_id: str, *, status: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        if status is None:
+            return await self._fetch(
+                "basket_id = $1::uuid",
+                [str(basket_id)],
+                lambda q: q.eq("basket_id", str(basket_id)).order("created_at", desc=True),
+                order_by="created_at DESC",
+            )
+        return await self._fetch(
+            "basket_id = $1::uuid AND status::text = $2",
+            [str(basket_id), status],
+            lambda q: (
+                q.eq("basket_id", str(basket_id))
+                .eq("status", status)
+                .order("created_at", desc=True)
+            ),
+            order_by="created_at DESC",
+        )
@@ -0,0 +1,52 @@
+"""Raw dumps repository."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import Repository
+from .rows import RawDumpRow
+
+
+class RawDumpsRepository(Repository):
+    table = "raw_dumps"
+    row_type = RawDumpRow
+
+    async def get(self, dump_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(
+            "id = $1::uuid", [str(dump_id)], lambda q: q.eq("id", str(dump_id))
+        )
+
+    async def list_for_basket(
+        self,
+        basket_id: str,
+        *,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Dumps of a basket, optionally within a created_at window."""
+        where = ["basket_id = $1::uuid"]
+        args: List[Any] = [str(basket_id)]
+
+        def rest(query):
+            query = query.eq("basket_id", str(basket_id))
+            if created_from is not None:
+                query = query.gte("created_at", created_from.isoformat())
+            if created_to is not None:
+                query = query.lte("created_at", created_to.isoformat())
+            return query
+
+        if created_from is not None:
+            args.append(created_from)
+            where.append(f"created_at >= ${len(args)}")
+        if created_to is not None:
+            args.append(created_to)
+            where.append(f"created_at <= ${len(args)}")
+        return await self._fetch(" AND ".join(where), args, rest)
+
+    async def get_many(self, ids: Sequence[str]) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        ids = [str(i) for i in ids]
+        return await self._fetch("id = ANY($1::uuid[])", [ids], lambda q: q.in_("id", ids))
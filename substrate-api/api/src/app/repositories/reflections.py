@@ -0,0 +1,45 @@
+"""reflections_artifact repository (P3 insights)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from .base import Repository
+from .rows import ReflectionRow
+
+
+class ReflectionsRepository(Repository):
+    table = "reflections_artifact"
+    row_type = ReflectionRow
+
+    async def current(self, basket_id: str, insight_type: str) -> Optional[Dict[str, Any]]:
+        """The basket's current insight of ``insight_type``."""
+        return await self._fetch_one(
+            "basket_id = $1::uuid AND insight_type = $2 AND is_current",
+            [str(basket_id), insight_type],
+            lambda q: (
+                q.eq("basket_id", str(basket_id))
+                .eq("insight_type", insight_type)
+                .eq("is_current", True)
+            ),
+        )
+
+    async def find_by_hash(
+        self, basket_id: str, insight_type: str, substrate_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """An insight already computed for ``substrate_hash``."""
+        return await self._fetch_one(
+            "basket_id = $1::uuid AND insight_type = $2 AND substrate_hash = $3",
+            [str(basket_id), insight_type, substrate_hash],
+            lambda q: q.eq("basket_id", str(basket_id)).eq("insight_type", insight_type).eq(
+                "substrate_hash", substrate_hash
+            ),
+        )
+
+    async def set_current(self, insight_id: str, is_current: bool) -> None:
+        await self._update(
+            {"is_current": is_current},
+            "id = $1::uuid",
+            [str(insight_id)],
+            lambda q: q.eq("id", str(insight_id)),
+        )
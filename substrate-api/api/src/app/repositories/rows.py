@@ -0,0 +1,180 @@
+"""Typed rows of the hot tables and the asyncpg record mapper.
+
+Rows are plain dicts shaped like PostgREST responses (UUIDs and timestamps as
+strings, jsonb decoded), so call sites can switch from
+``supabase.table(...).execute().data`` to a repository without changes. The
+TypedDict fields double as each repository's column projection; large
+columns such as ``blocks.embedding`` are deliberately left out.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple, Type, TypedDict
+from uuid import UUID
+
+
+class BlockRow(TypedDict, total=False):
+    id: str
+    basket_id: Optional[str]
+    workspace_id: str
+    parent_block_id: Optional[str]
+    semantic_type: str
+    title: Optional[str]
+    content: Optional[str]
+    body_md: Optional[str]
+    state: str
+    status: Optional[str]
+    scope: Optional[str]
+    version: int
+    confidence_score: Optional[float]
+    metadata: Dict[str, Any]
+    anchor_role: Optional[str]
+    anchor_status: Optional[str]
+    anchor_confidence: Optional[float]
+    label: Optional[str]
+    normalized_label: Optional[str]
+    canonical_value: Optional[str]
+    origin_ref: Optional[str]
+    meta_agent_notes: Optional[str]
+    meta_tags: Optional[List[str]]
+    is_required: Optional[bool]
+    processing_agent: Optional[str]
+    raw_dump_id: Optional[str]
+    proposal_id: Optional[str]
+    derived_from_asset_id: Optional[str]
+    approved_at: Optional[str]
+    approved_by: Optional[str]
+    created_at: str
+    updated_at: Optional[str]
+    last_validated_at: Optional[str]
+
+
+class RawDumpRow(TypedDict, total=False):
+    id: str
+    basket_id: str
+    workspace_id: str
+    body_md: Optional[str]
+    text_dump: Optional[str]
+    file_url: Optional[str]
+    document_id: Optional[str]
+    fragments: List[Any]
+    processing_status: Optional[str]
+    processed_at: Optional[str]
+    source_meta: Dict[str, Any]
+    ingest_trace_id: Optional[str]
+    dump_request_id: Optional[str]
+    created_at: str
+
+
+class ProposalRow(TypedDict, total=False):
+    id: str
+    basket_id: Optional[str]
+    workspace_id: str
+    proposal_kind: str
+    origin: str
+    basis_snapshot_id: Optional[str]
+    provenance: List[Any]
+    ops: List[Any]
+    validator_report: Dict[str, Any]
+    validator_version: Optional[str]
+    validation_required: Optional[bool]
+    validation_bypassed: Optional[bool]
+    bypass_reason: Optional[str]
+    status: str
+    metadata: Dict[str, Any]
+    blast_radius: Optional[str]
+    is_executed: bool
+    executed_at: Optional[str]
+    execution_log: List[Any]
+    commit_id: Optional[str]
+    scope: Optional[str]
+    target_basket_id: Optional[str]
+    affected_basket_ids: Optional[List[str]]
+    source_host: Optional[str]
+    source_session: Optional[str]
+    created_at: str
+    created_by: Optional[str]
+    reviewed_by: Optional[str]
+    reviewed_at: Optional[str]
+    review_notes: Optional[str]
+
+
+class ReflectionRow(TypedDict, total=False):
+    id: str
+    basket_id: Optional[str]
+    workspace_id: str
+    insight_type: Optional[str]
+    reflection_text: str
+    substrate_hash: str
+    graph_signature: Optional[str]
+    substrate_window_start: Optional[str]
+    substrate_window_end: Optional[str]
+    computation_timestamp: str
+    last_accessed_at: Optional[str]
+    is_current: bool
+    previous_id: Optional[str]
+    derived_from: List[Any]
+    meta: Dict[str, Any]
+    scope_level: Optional[str]
+    created_at: str
+    updated_at: Optional[str]
+
+
+class TimelineEventRow(TypedDict, total=False):
+    id: int
+    basket_id: str
+    workspace_id: str
+    ts: str
+    kind: str
+    ref_id: Optional[str]
+    preview: Optional[str]
+    payload: Optional[Dict[str, Any]]
+    source_host: Optional[str]
+    source_session: Optional[str]
+
+
+class WorkQueueRow(TypedDict, total=False):
+    id: str
+    work_id: Optional[str]
+    work_type: str
+    processing_state: str
+    processing_stage: Optional[str]
+    dump_id: Optional[str]
+    basket_id: Optional[str]
+    workspace_id: str
+    user_id: Optional[str]
+    parent_work_id: Optional[str]
+    priority: int
+    attempts: int
+    error_message: Optional[str]
+    work_payload: Dict[str, Any]
+    work_result: Dict[str, Any]
+    cascade_metadata: Dict[str, Any]
+    claimed_at: Optional[str]
+    claimed_by: Optional[str]
+    completed_at: Optional[str]
+    created_at: str
+
+
+def columns_of(row_type: Type[Any]) -> Tuple[str, ...]:
+    """Column projection of a row TypedDict."""
+    return tuple(row_type.__annotations__)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def to_row(record: Any) -> Dict[str, Any]:
+    """asyncpg Record -> PostgREST-shaped dict."""
+    return {key: _plain(value) for key, value in record.items()}
@@ -0,0 +1,47 @@
+"""Timeline events repository."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import Repository
+from .rows import TimelineEventRow
+
+
+class TimelineEventsRepository(Repository):
+    table = "timeline_events"
+    row_type = TimelineEventRow
+
+    async def list_for_basket(
+        self,
+        basket_id: str,
+        *,
+        ts_from: Optional[datetime] = None,
+        ts_to: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Events of a basket, optionally within a ts window."""
+        where = ["basket_id = $1::uuid"]
+        args: List[Any] = [str(basket_id)]
+
+        def rest(query):
+            query = query.eq("basket_id", str(basket_id))
+            if ts_from is not None:
+                query = query.gte("ts", ts_from.isoformat())
+            if ts_to is not None:
+                query = query.lte("ts", ts_to.isoformat())
+            return query
+
+        if ts_from is not None:
+            args.append(ts_from)
+            where.append(f"ts >= ${len(args)}")
+        if ts_to is not None:
+            args.append(ts_to)
+            where.append(f"ts <= ${len(args)}")
+        return await self._fetch(" AND ".join(where), args, rest)
+
+    async def get_many(self, ids: Sequence[Any]) -> List[Dict[str, Any]]:
+        ids = [int(i) for i in ids if str(i).isdigit()]
+        if not ids:
+            return []
+        return await self._fetch("id = ANY($1::bigint[])", [ids], lambda q: q.in_("id", ids))
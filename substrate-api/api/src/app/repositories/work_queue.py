@@ -0,0 +1,34 @@
+"""agent_processing_queue repository (work status)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from .base import Repository
+from .rows import WorkQueueRow
+
+
+class WorkQueueRepository(Repository):
+    table = "agent_processing_queue"
+    row_type = WorkQueueRow
+
+    async def get(self, work_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(
+            "work_id = $1", [str(work_id)], lambda q: q.eq("work_id", str(work_id))
+        )
+
+    async def list_for_workspace(self, workspace_id: str) -> List[Dict[str, Any]]:
+        """All work of a workspace, newest first."""
+        return await self._fetch(
+            "workspace_id = $1::uuid",
+            [str(workspace_id)],
+            lambda q: q.eq("workspace_id", str(workspace_id)).order("created_at", desc=True),
+            order_by="created_at DESC",
+        )
+
+    async def list_children(self, parent_work_id: str) -> List[Dict[str, Any]]:
+        return await self._fetch(
+            "parent_work_id::text = $1",
+            [str(parent_work_id)],
+            lambda q: q.eq("parent_work_id", str(parent_work_id)),
+        )
@@ -8,7 +8,7 @@ from typing import Optional
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
 
 from contracts.basket import BasketChangeRequest, BasketDelta
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field, ValidationError
 from ..baskets.schemas import BasketWorkRequest
 from typing import Union
@@ -23,6 +23,15 @@ from src.services.canonical_queue_processor import CanonicalQueueProcessor, get_
 
 # Import deps AFTER path setup
 from ..deps import get_db
+from ..utils.block_listing import (
+    MAX_PAGE_SIZE,
+    basket_blocks_version,
+    etag_matches,
+    list_blocks_page,
+    listing_headers,
+    parse_fields,
+    weak_etag,
+)
 from ..utils.jwt import verify_jwt
 from ..utils.workspace import get_or_create_workspace
 
@@ -63,8 +72,13 @@ class CreateBasketResponse(BaseModel):
 @router.get("/{basket_id}/blocks")
 async def list_basket_blocks(
     basket_id: str,
+    request: Request,
+    response: Response,
     states: Optional[str] = None,
     limit: int = 20,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
     db=Depends(get_db),  # noqa: B008
 ):
     """
@@ -79,15 +93,20 @@ async def list_basket_blocks(
     Args:
         basket_id: Basket UUID
         states: Optional comma-separated list of block states (e.g., "ACCEPTED,LOCKED")
-        limit: Maximum number of blocks to return (default: 20)
+        limit: Maximum number of blocks to return (default: 20, at most 500)
+        fields: Optional comma-separated projection (e.g., "id,title")
+        cursor: X-Next-Cursor of the previous page
+        since: X-Since-Cursor of an earlier listing; only blocks updated after it
         db: Database connection
 
     Returns:
         List of block dictionaries with id, title, content, semantic_type,
-        confidence_score, state, created_at, updated_at
+        confidence_score, state, created_at, updated_at (or the requested fields).
+        ETag, X-Next-Cursor and X-Since-Cursor headers; 304 when If-None-Match
+        matches.
 
     Raises:
-        HTTPException 400: Invalid basket_id format
+        HTTPException 400: Invalid basket_id format, fields, cursor or since
         HTTPException 500: Database error
     """
     import logging
@@ -104,33 +123,28 @@ async def list_basket_blocks(
                 detail=f"Invalid basket_id format: {basket_id}",
             ) from e
 
-        # Build query with optional state filtering
-        query = """
-            SELECT id, title, content, semantic_type, confidence_score, state, created_at, updated_at
-            FROM blocks
-            WHERE basket_id = :basket_id
-        """
-
-        query_values = {"basket_id": str(basket_uuid)}
-
-        # Add state filtering if provided
-        if states:
-            state_list = [s.strip().upper() for s in states.split(",")]
-            # Use ANY for array comparison
-            query += " AND state = ANY(:states)"
-            query_values["states"] = state_list
-
-        query += " ORDER BY created_at DESC LIMIT :limit"
-        query_values["limit"] = limit
-
-        results = await db.fetch_all(query, values=query_values)
-
-        # Convert to dict format
-        blocks = [dict(row) for row in results]
+        projection = parse_fields(fields)
+        state_list = [s.strip().upper() for s in states.split(",")] if states else None
+
+        version = await basket_blocks_version(db, str(basket_uuid))
+        etag = weak_etag(str(basket_uuid), version, str(request.url.query))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=listing_headers(etag, version))
+
+        blocks, next_cursor = await list_blocks_page(
+            db,
+            str(basket_uuid),
+            states=state_list,
+            fields=projection,
+            limit=max(1, min(limit, MAX_PAGE_SIZE)),
+            cursor=cursor,
+            since=since,
+        )
+        response.headers.update(listing_headers(etag, version, next_cursor))
 
         logger.debug(
             f"[SERVICE] Fetched {len(blocks)} blocks for basket {basket_id} "
-            f"(states={states}, limit={limit})"
+            f"(states={states}, limit={limit}, since={since})"
         )
 
         return blocks
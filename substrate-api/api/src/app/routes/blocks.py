@@ -1,9 +1,20 @@
 # ruff: noqa
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from ..deps import get_db
+from ..utils.block_listing import (
+    MAX_PAGE_SIZE,
+    basket_blocks_version,
+    etag_matches,
+    list_blocks_page,
+    listing_headers,
+    parse_fields,
+    weak_etag,
+)
 from ..utils.jwt import verify_jwt
 from ..utils.workspace import get_or_create_workspace
 
@@ -20,6 +31,12 @@ logger = logging.getLogger("uvicorn.error")
 @router.get("/blocks/by-basket/{basket_id}")
 async def list_blocks(
     basket_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
     user: dict = Depends(verify_jwt),
     db=Depends(get_db),  # noqa: B008
 ):
@@ -27,34 +44,37 @@ async def list_blocks(
     List blocks for a basket (user-facing endpoint with workspace filtering).
 
     Requires JWT auth. Filters blocks by user's workspace_id for security.
+    Supports ``limit``/``cursor`` keyset pagination, ``fields`` projection,
+    ``since`` deltas and If-None-Match (see app.utils.block_listing).
+    Without ``limit`` the whole basket is returned, as before.
 
     Note: For service-to-service calls, use /api/baskets/{basket_id}/blocks instead
     (no auth required, returns all blocks in basket).
     """
     try:
         workspace_id = get_or_create_workspace(user["user_id"])
+        projection = parse_fields(fields)
 
         # Direct SQL query (bypasses RLS, consistent with basket routes)
-        query = """
-            SELECT id, title, content, semantic_type, confidence_score, state, created_at, updated_at
-            FROM blocks
-            WHERE basket_id = :basket_id
-            AND workspace_id = :workspace_id
-            ORDER BY created_at DESC
-        """
-
-        results = await db.fetch_all(
-            query,
-            values={
-                "basket_id": basket_id,
-                "workspace_id": workspace_id,
-            }
+        version = await basket_blocks_version(db, basket_id, workspace_id)
+        etag = weak_etag(basket_id, version, str(request.url.query))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=listing_headers(etag, version))
+
+        blocks, next_cursor = await list_blocks_page(
+            db,
+            basket_id,
+            workspace_id=workspace_id,
+            fields=projection,
+            limit=max(1, min(limit, MAX_PAGE_SIZE)) if limit is not None else None,
+            cursor=cursor,
+            since=since,
         )
-
-        # Convert to dict format
-        blocks = [dict(row) for row in results]
+        response.headers.update(listing_headers(etag, version, next_cursor))
         return blocks
 
+    except HTTPException:
+        raise
     except Exception as err:
         logger.exception("list_blocks failed")
         raise HTTPException(status_code=500, detail="internal error") from err
@@ -7,6 +7,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from auth.integration_tokens import INTEGRATION_TOKEN_PREFIX, invalidate_integration_token
+
 from ..utils.jwt import verify_jwt
 from ..utils.supabase import supabase_admin
 from ..utils.workspace import get_or_create_workspace
@@ -53,7 +55,7 @@ async def create_token(
 
     import secrets
 
-    raw_token = "yit_" + secrets.token_urlsafe(32)
+    raw_token = INTEGRATION_TOKEN_PREFIX + secrets.token_urlsafe(32)
     token_hash = _hash_token(raw_token)
 
     insert_payload = {
@@ -109,6 +111,8 @@ async def revoke_token(token_id: str, user: Annotated[dict, Depends(verify_jwt)]
     if not update.data:
         raise HTTPException(status_code=404, detail="Token not found")
 
+    invalidate_integration_token(token_id)
+
     return JSONResponse(status_code=204, content=None)
 
 
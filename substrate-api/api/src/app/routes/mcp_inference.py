@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import math
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
@@ -13,6 +16,16 @@ from ..utils.supabase import supabase_admin
 
 router = APIRouter(prefix="/mcp/baskets", tags=["mcp"])
 
+logger = logging.getLogger("uvicorn.error")
+
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 50
+
+# Candidate score weights; keep in sync with basketSelector.ts in the MCP server
+SIMILARITY_WEIGHT = 0.75
+RECENCY_WEIGHT = 0.15
+AFFINITY_WEIGHT = 0.10
+
 
 class Fingerprint(BaseModel):
     embedding: List[float]
@@ -25,18 +38,24 @@ class Fingerprint(BaseModel):
 class BasketInferenceRequest(BaseModel):
     tool: str = Field(..., description="Tool requesting basket inference")
     fingerprint: Fingerprint
+    top_k: int = Field(
+        DEFAULT_TOP_K, ge=1, le=MAX_TOP_K, description="Number of ranked candidates to return"
+    )
 
 
 class BasketSignatureModel(BaseModel):
     id: str
     name: Optional[str]
-    embedding: List[float]
+    # Ranking happens server-side; kept (empty) for older clients
+    embedding: List[float] = Field(default_factory=list)
     summary: Optional[str]
     last_updated: Optional[str]
 
 
 class BasketCandidateModel(BaseModel):
     signature: BasketSignatureModel
+    similarity: float = 0.0
+    score: float = 0.0
     recency_boost: float = 0.0
     user_affinity: float = 0.0
     conflict: bool = False
@@ -69,67 +88,135 @@ def _recency_boost(last_refreshed: Optional[str]) -> float:
     return max(0.0, 1.0 - (diff_days / 30.0))
 
 
+def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def _score(similarity: float, recency_boost: float, user_affinity: float = 0.0) -> float:
+    return (
+        SIMILARITY_WEIGHT * similarity
+        + RECENCY_WEIGHT * recency_boost
+        + AFFINITY_WEIGHT * user_affinity
+    )
+
+
+def _candidate(
+    row: Dict[str, Any], name: Optional[str], similarity: float, recency: float
+) -> BasketCandidateModel:
+    return BasketCandidateModel(
+        signature=BasketSignatureModel(
+            id=str(row.get("basket_id")),
+            name=name or "Untitled basket",
+            summary=row.get("summary"),
+            last_updated=row.get("last_refreshed"),
+        ),
+        similarity=similarity,
+        score=_score(similarity, recency),
+        recency_boost=recency,
+        user_affinity=0.0,
+        conflict=False,
+    )
+
+
+async def _rank_in_database(
+    sb, workspace_id: str, embedding: List[float], top_k: int
+) -> Optional[List[BasketCandidateModel]]:
+    """Top-k candidates via fn_rank_basket_signatures, or None when the function is unavailable."""
+    try:
+        response = await asyncio.to_thread(
+            sb.rpc("fn_rank_basket_signatures", {
+                "p_workspace_id": workspace_id,
+                "p_query_embedding": embedding,
+                "p_limit": top_k,
+            }).execute
+        )
+    except Exception as e:
+        logger.warning(f"Basket signature ranking unavailable, ranking in process: {e}")
+        return None
+
+    return [
+        _candidate(
+            row,
+            row.get("name"),
+            float(row.get("similarity") or 0.0),
+            float(row.get("recency_boost") or 0.0),
+        )
+        for row in response.data or []
+    ]
+
+
+async def _rank_in_process(
+    sb, workspace_id: str, embedding: List[float], top_k: int
+) -> List[BasketCandidateModel]:
+    """Same ranking as fn_rank_basket_signatures over the workspace's signatures."""
+    signature_resp = await asyncio.to_thread(
+        sb.table("basket_signatures")
+        .select("basket_id, summary, embedding, last_refreshed")
+        .eq("workspace_id", workspace_id)
+        .execute
+    )
+    rows = [
+        row for row in signature_resp.data or []
+        if row.get("embedding") and row.get("basket_id")
+    ]
+    if not rows:
+        return []
+
+    scored = []
+    for row in rows:
+        similarity = _cosine_similarity(embedding, row["embedding"])
+        recency = _recency_boost(row.get("last_refreshed"))
+        scored.append((_score(similarity, recency), similarity, recency, row))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    top = scored[:top_k]
+
+    basket_names: Dict[str, str] = {}
+    info_resp = await asyncio.to_thread(
+        sb.table("baskets")
+        .select("id, name")
+        .in_("id", [str(row["basket_id"]) for *_, row in top])
+        .execute
+    )
+    for record in info_resp.data or []:
+        basket_names[str(record.get("id"))] = record.get("name")
+
+    return [
+        _candidate(row, basket_names.get(str(row["basket_id"])), similarity, recency)
+        for _, similarity, recency, row in top
+    ]
+
+
 @router.post("/infer", response_model=BasketInferenceResponse)
 async def infer_basket(
     payload: BasketInferenceRequest,
     request: Request,
     user: dict = Depends(verify_jwt),
 ):
+    """Rank the workspace's baskets against the session fingerprint.
+
+    Scores are computed server-side (cosine similarity blended with recency,
+    same weights as the MCP basket selector) across every basket signature
+    of the workspace; only the top-k are returned, without embeddings.
+    """
     if not payload.fingerprint.embedding:
         raise HTTPException(status_code=400, detail="fingerprint_missing_embedding")
 
     workspace_id = _resolve_workspace(request, user)
+    embedding = list(payload.fingerprint.embedding)
 
     sb = supabase_admin()
-    signature_resp = (
-        sb.table("basket_signatures")
-        .select("basket_id, summary, anchors, entities, keywords, embedding, last_refreshed")
-        .eq("workspace_id", workspace_id)
-        .order("last_refreshed", desc=True)
-        .limit(50)
-        .execute()
-    )
-
-    rows = signature_resp.data or []
-    if not rows:
-        return BasketInferenceResponse(candidates=[])
-
-    basket_ids = [row["basket_id"] for row in rows if row.get("basket_id")]
-
-    basket_names: dict[str, str] = {}
-    if basket_ids:
-        info_resp = (
-            sb.table("baskets")
-            .select("id, name")
-            .in_("id", basket_ids)
-            .execute()
-        )
-        if info_resp.data:
-            for record in info_resp.data:
-                basket_names[str(record.get("id"))] = record.get("name")
-
-    candidates: List[BasketCandidateModel] = []
-    for row in rows:
-        embedding = row.get("embedding") or []
-        if not embedding:
-            continue
-        basket_id = str(row.get("basket_id"))
-        basket_name = basket_names.get(basket_id) or "Untitled basket"
-        candidate = BasketCandidateModel(
-            signature=BasketSignatureModel(
-                id=basket_id,
-                name=basket_name,
-                embedding=list(embedding),
-                summary=row.get("summary"),
-                last_updated=row.get("last_refreshed"),
-            ),
-            recency_boost=_recency_boost(row.get("last_refreshed")),
-            user_affinity=0.0,
-            conflict=False,
-        )
-        candidates.append(candidate)
+    candidates = await _rank_in_database(sb, workspace_id, embedding, payload.top_k)
+    if candidates is None:
+        candidates = await _rank_in_process(sb, workspace_id, embedding, payload.top_k)
 
-    return BasketInferenceResponse(candidates=candidates[:20])
+    return BasketInferenceResponse(candidates=candidates)
 
 
 __all__ = ["router"]
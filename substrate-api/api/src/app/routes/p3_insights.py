@@ -16,20 +16,32 @@ V3.0 Migration Completed:
 """
 
 
+import asyncio
 import logging
-import logging
+import os
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
 
 from infra.utils.supabase import supabase_admin
+from app.repositories import (
+    BlocksRepository,
+    RawDumpsRepository,
+    ReflectionsRepository,
+    TimelineEventsRepository,
+    execute_async,
+    rows_of,
+)
 from lib.freshness import (
     should_regenerate_insight_canon,
+    changed_substrate_ids,
     compute_basket_substrate_hash,
-    compute_graph_signature
+    get_basket_digests,
+    capture_substrate_snapshot,
+    store_substrate_snapshot
 )
 from infra.utils.jwt import verify_jwt
 
@@ -37,7 +49,9 @@ router = APIRouter(prefix="/p3", tags=["p3-insights"])
 
 logger = logging.getLogger("uvicorn.error")
 
-logger = logging.getLogger("uvicorn.error")
+# Revise the previous canon from changed rows only when at most this share
+# of the basket's substrate changed; otherwise regenerate from scratch.
+INSIGHT_CANON_INCREMENTAL_MAX_RATIO = float(os.getenv("INSIGHT_CANON_INCREMENTAL_MAX_RATIO", "0.5"))
 
 
 # =============================================================================
@@ -98,6 +112,11 @@ class GenerateTimeboxedInsightResponse(BaseModel):
 # INSIGHT CANON ENDPOINTS
 # =============================================================================
 
+# In-flight insight_canon generations keyed by (basket_id, force) (single-flight);
+# a forced request never settles for a non-forced run that may reuse stale output
+_insight_canon_inflight: Dict[Tuple[str, bool], "asyncio.Task[GenerateInsightCanonResponse]"] = {}
+
+
 @router.post("/insight-canon", response_model=GenerateInsightCanonResponse)
 async def generate_insight_canon(
     request: GenerateInsightCanonRequest,
@@ -113,130 +132,177 @@ async def generate_insight_canon(
     Process:
     1. Check if basket has current insight_canon
     2. If exists and fresh (unless force), return existing
-    3. Otherwise, generate new insight from substrate
-    4. Mark old as is_current=false, new as is_current=true
-    5. Link via previous_id for version chain
+    3. If an artifact for the current substrate_hash exists (unless force),
+       make it current without any LLM work
+    4. Otherwise, generate new insight from substrate
+    5. Mark old as is_current=false, new as is_current=true
+    6. Link via previous_id for version chain
+
+    Concurrent requests for the same basket (UI + work-platform) share one
+    in-flight generation instead of racing LLM calls and upserts; forced and
+    non-forced requests only join their own kind.
     """
-    supabase = supabase_admin()
+    basket_id = request.basket_id
+    inflight_key = (basket_id, request.force)
+    task = _insight_canon_inflight.get(inflight_key)
+    if task is None or task.done():
+        task = asyncio.create_task(_generate_insight_canon(request))
+        _insight_canon_inflight[inflight_key] = task
+
+        def _release(done: asyncio.Task, key: Tuple[str, bool] = inflight_key) -> None:
+            if _insight_canon_inflight.get(key) is done:
+                del _insight_canon_inflight[key]
+
+        task.add_done_callback(_release)
+    else:
+        logger.info(
+            "Joining in-flight insight_canon generation for basket %s (force=%s)", basket_id, request.force
+        )
 
-    # Check staleness
-    staleness_check = should_regenerate_insight_canon(supabase, request.basket_id)
+    # Shield so one caller disconnecting does not cancel the shared generation
+    return await asyncio.shield(task)
 
-    if not staleness_check['stale'] and not request.force:
-        # Return existing fresh insight
-        current = staleness_check['current_canon']
-        return GenerateInsightCanonResponse(
-            insight_id=current['id'],
-            basket_id=current['basket_id'],
-            is_fresh=True,
-            previous_id=current.get('previous_id'),
-            substrate_hash=current['substrate_hash'],
-            graph_signature=current.get('graph_signature', ''),
-            reflection_text=current['reflection_text'],
-            derived_from=current.get('derived_from', []),
-            created_at=current['created_at']
-        )
 
-    # Get basket workspace
-    basket_result = supabase.table('baskets').select('workspace_id').eq('id', request.basket_id).single().execute()
-    if not basket_result.data:
-        raise HTTPException(status_code=404, detail="Basket not found")
+def _canon_response(insight: Dict[str, Any], **fallbacks: Any) -> GenerateInsightCanonResponse:
+    return GenerateInsightCanonResponse(
+        insight_id=insight['id'],
+        basket_id=insight['basket_id'],
+        is_fresh=True,
+        previous_id=insight.get('previous_id'),
+        substrate_hash=insight.get('substrate_hash') or fallbacks.get('substrate_hash', ''),
+        graph_signature=insight.get('graph_signature') or fallbacks.get('graph_signature', ''),
+        reflection_text=insight.get('reflection_text') or fallbacks.get('reflection_text', ''),
+        derived_from=insight.get('derived_from') or fallbacks.get('derived_from', []),
+        created_at=insight['created_at']
+    )
 
-    workspace_id = basket_result.data['workspace_id']
 
-    # Fetch substrate for AI generation
-    substrate = await _fetch_basket_substrate(supabase, request.basket_id)
+async def _generate_insight_canon(request: GenerateInsightCanonRequest) -> GenerateInsightCanonResponse:
+    supabase = supabase_admin()
 
-    # Generate insight via AI (placeholder - integrate with your LLM service)
-    reflection_text = await _generate_insight_text(
-        substrate=substrate,
-        insight_type='insight_canon',
-        agent_context=request.agent_context
+    # Check staleness (sync PostgREST calls: keep them off the event loop)
+    staleness_check = await asyncio.to_thread(
+        should_regenerate_insight_canon, supabase, request.basket_id
     )
+    current_canon = staleness_check['current_canon']
 
-    # Compute current hashes
-    substrate_hash = compute_basket_substrate_hash(supabase, request.basket_id)
-    graph_signature = compute_graph_signature(supabase, request.basket_id)
-
-    # Build derived_from provenance
-    derived_from = _build_substrate_provenance(substrate)
+    if not staleness_check['stale'] and not request.force:
+        # Return existing fresh insight
+        return _canon_response(current_canon)
+
+    # Hashes first: the staleness check already computed them when a canon exists
+    substrate_hash = staleness_check.get('current_substrate_hash')
+    graph_signature = staleness_check.get('current_graph_signature')
+    if not substrate_hash or not graph_signature:
+        digests = await asyncio.to_thread(get_basket_digests, supabase, request.basket_id)
+        substrate_hash = digests['substrate_hash']
+        graph_signature = digests['graph_signature']
+
+    # Pin the rows this hash describes before generation: writes made while
+    # the LLM runs must not land in the snapshot stored under this hash
+    snapshot, snapshot_stored = await asyncio.to_thread(
+        capture_substrate_snapshot, supabase, request.basket_id, substrate_hash
+    )
 
     # Check if insight with this substrate_hash already exists (cache hit)
-    existing_response = supabase.table('reflections_artifact').select('*').eq(
-        'basket_id', request.basket_id
-    ).eq('insight_type', 'insight_canon').eq(
-        'substrate_hash', substrate_hash
-    ).maybe_single().execute()
-
-    existing_insight = None
-    if existing_response is not None:
-        existing_insight = getattr(existing_response, 'data', None)
-        if isinstance(existing_insight, list):
-            existing_insight = existing_insight[0] if existing_insight else None
+    reflections = ReflectionsRepository(supabase)
+    existing_insight = await reflections.find_by_hash(request.basket_id, 'insight_canon', substrate_hash)
 
     forced_previous_id: Optional[str] = None
     if request.force and existing_insight:
         forced_previous_id = existing_insight['id']
-        supabase.table('reflections_artifact').update({
-            'is_current': False
-        }).eq('id', forced_previous_id).execute()
+        await reflections.set_current(forced_previous_id, False)
         existing_insight = None
 
     if existing_insight:
-        # Reuse cached insight - just mark it as current
+        # Reuse cached insight - just mark it as current (no substrate fetch, no LLM)
         insight = existing_insight
 
         # Mark old insight as not current (if different from cached)
-        if staleness_check['current_canon'] and staleness_check['current_canon']['id'] != insight['id']:
-            supabase.table('reflections_artifact').update({
-                'is_current': False
-            }).eq('id', staleness_check['current_canon']['id']).execute()
+        if current_canon and current_canon['id'] != insight['id']:
+            await reflections.set_current(current_canon['id'], False)
 
         # Mark cached insight as current
-        supabase.table('reflections_artifact').update({
-            'is_current': True
-        }).eq('id', insight['id']).execute()
+        await reflections.set_current(insight['id'], True)
 
         insight['is_current'] = True  # Update local copy
+        return _canon_response(insight, substrate_hash=substrate_hash, graph_signature=graph_signature)
+
+    # Get basket workspace
+    basket_result = await execute_async(
+        supabase.table('baskets').select('workspace_id').eq('id', request.basket_id).single()
+    )
+    if not basket_result.data:
+        raise HTTPException(status_code=404, detail="Basket not found")
+
+    workspace_id = basket_result.data['workspace_id']
+
+    # Small exact delta: revise the previous canon from the changed rows only
+    delta = staleness_check.get('substrate_delta')
+    changed_ids = changed_substrate_ids(delta)
+    previous_text = (current_canon or {}).get('reflection_text')
+    if not request.force and previous_text and _is_incremental_delta(delta, changed_ids):
+        substrate = await _fetch_substrate_by_ids(supabase, changed_ids)
+        reflection_text = await _generate_insight_text(
+            substrate=substrate,
+            insight_type='insight_canon_update',
+            agent_context={
+                **(request.agent_context or {}),
+                'previous_insight': previous_text,
+                'removed_counts': {t: len(c['removed']) for t, c in delta['changes'].items()},
+            }
+        )
+        derived_from = _provenance_from_snapshot(snapshot) if snapshot else []
     else:
-        # Generate new insight - substrate has changed
-        # Mark old insight as not current but keep row for previous_id chain
-        previous_id = forced_previous_id
-        if previous_id is None and staleness_check['current_canon']:
-            previous_id = staleness_check['current_canon']['id']
-            supabase.table('reflections_artifact').update({
-                'is_current': False
-            }).eq('id', previous_id).execute()
-
-        # Insert new insight
-        new_insight = supabase.table('reflections_artifact').upsert({
-            'basket_id': request.basket_id,
-            'workspace_id': workspace_id,
-            'reflection_text': reflection_text,
-            'substrate_hash': substrate_hash,
-            'graph_signature': graph_signature,
-            'insight_type': 'insight_canon',
-            'is_current': True,
-            'previous_id': previous_id,
-            'derived_from': derived_from,
-            'computation_timestamp': datetime.utcnow().isoformat()
-        }, on_conflict='basket_id,substrate_hash').execute()
-
-        if not new_insight.data:
-            raise HTTPException(status_code=500, detail="Failed to create insight")
-
-        insight = new_insight.data[0]
+        # Fetch substrate for AI generation
+        substrate = await _fetch_basket_substrate(supabase, request.basket_id)
 
-    return GenerateInsightCanonResponse(
-        insight_id=insight['id'],
-        basket_id=insight['basket_id'],
-        is_fresh=True,
-        previous_id=insight.get('previous_id'),
-        substrate_hash=insight.get('substrate_hash', substrate_hash),
-        graph_signature=insight.get('graph_signature', graph_signature),
-        reflection_text=insight.get('reflection_text', reflection_text),
-        derived_from=insight.get('derived_from', derived_from),
-        created_at=insight['created_at']
+        # Generate insight via AI
+        reflection_text = await _generate_insight_text(
+            substrate=substrate,
+            insight_type='insight_canon',
+            agent_context=request.agent_context
+        )
+
+        # Build derived_from provenance
+        derived_from = _build_substrate_provenance(substrate)
+
+    # Keep a snapshot for this hash so the next regeneration can diff against it
+    if not snapshot_stored:
+        await asyncio.to_thread(
+            store_substrate_snapshot, supabase, request.basket_id, substrate_hash, snapshot
+        )
+
+    # Generate new insight - substrate has changed
+    # Mark old insight as not current but keep row for previous_id chain
+    previous_id = forced_previous_id
+    if previous_id is None and current_canon:
+        previous_id = current_canon['id']
+        await reflections.set_current(previous_id, False)
+
+    # Insert new insight
+    new_insight = await execute_async(supabase.table('reflections_artifact').upsert({
+        'basket_id': request.basket_id,
+        'workspace_id': workspace_id,
+        'reflection_text': reflection_text,
+        'substrate_hash': substrate_hash,
+        'graph_signature': graph_signature,
+        'insight_type': 'insight_canon',
+        'is_current': True,
+        'previous_id': previous_id,
+        'derived_from': derived_from,
+        'computation_timestamp': datetime.utcnow().isoformat()
+    }, on_conflict='basket_id,substrate_hash'))
+
+    if not new_insight.data:
+        raise HTTPException(status_code=500, detail="Failed to create insight")
+
+    return _canon_response(
+        new_insight.data[0],
+        substrate_hash=substrate_hash,
+        graph_signature=graph_signature,
+        reflection_text=reflection_text,
+        derived_from=derived_from,
     )
 
 
@@ -318,11 +384,9 @@ async def generate_doc_insight(
 
     document = doc_result.data
 
-    insight_result = supabase.table('reflections_artifact').select('reflection_text').eq(
-        'basket_id', document['basket_id']
-    ).eq('insight_type', 'insight_canon').eq('is_current', True).maybe_single().execute()
+    basket_insight = await ReflectionsRepository(supabase).current(document['basket_id'], 'insight_canon')
 
-    basket_insight_text = insight_result.data['reflection_text'] if insight_result.data else ""
+    basket_insight_text = basket_insight['reflection_text'] if basket_insight else ""
 
     # Check if doc_insight already exists (unless force)
     if not request.force:
@@ -505,31 +569,67 @@ async def _fetch_basket_substrate(supabase, basket_id: str) -> Dict[str, Any]:
     """
     # Query blocks with valid states (ACCEPTED, LOCKED, CONSTANT)
     # Exclude PROPOSED (not yet approved) and REJECTED (invalid)
-    blocks = supabase.table('blocks').select('*').eq('basket_id', basket_id).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT']).execute()
-
-    dumps = supabase.table('raw_dumps').select('*').eq('basket_id', basket_id).execute()
-    events = supabase.table('timeline_events').select('*').eq('basket_id', basket_id).execute()
+    blocks, dumps, events = await asyncio.gather(
+        BlocksRepository(supabase).list_for_basket(basket_id, states=['ACCEPTED', 'LOCKED', 'CONSTANT']),
+        RawDumpsRepository(supabase).list_for_basket(basket_id),
+        TimelineEventsRepository(supabase).list_for_basket(basket_id),
+    )
 
     # Get relationships: Join through blocks to filter by basket
     # Query relationships where EITHER from_block or to_block is in this basket
-    block_ids = [block['id'] for block in blocks.data] if blocks.data else []
+    block_ids = [block['id'] for block in blocks]
 
+    relationships = []
     if block_ids:
         # Get relationships connected to any block in this basket
-        relationships = supabase.table('substrate_relationships').select('*').in_(
-            'from_block_id', block_ids
-        ).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT']).execute()
-    else:
-        relationships = type('obj', (object,), {'data': []})()  # Empty result
+        relationships = rows_of(await execute_async(
+            supabase.table('substrate_relationships').select('*').in_(
+                'from_block_id', block_ids
+            ).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT'])
+        ))
 
     return {
-        'blocks': blocks.data,
-        'dumps': dumps.data,
-        'events': events.data,
-        'relationships': relationships.data
+        'blocks': blocks,
+        'dumps': dumps,
+        'events': events,
+        'relationships': relationships
     }
 
 
+def _is_incremental_delta(
+    delta: Optional[Dict[str, Any]],
+    changed_ids: Optional[Dict[str, List[str]]]
+) -> bool:
+    if not changed_ids:
+        return False
+    total = delta['blocks_accepted'] + delta['dumps_total'] + delta['events_total']
+    touched = sum(len(ids) for ids in changed_ids.values()) + sum(
+        len(change['removed']) for change in delta['changes'].values()
+    )
+    return 0 < touched <= INSIGHT_CANON_INCREMENTAL_MAX_RATIO * max(total, 1)
+
+
+async def _fetch_substrate_by_ids(supabase, ids_by_type: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Fetch only the given substrate rows (added/modified since the last canon)."""
+    blocks, dumps, events = await asyncio.gather(
+        BlocksRepository(supabase).get_many(ids_by_type.get('block', [])),
+        RawDumpsRepository(supabase).get_many(ids_by_type.get('dump', [])),
+        TimelineEventsRepository(supabase).get_many(ids_by_type.get('event', [])),
+    )
+    return {'blocks': blocks, 'dumps': dumps, 'events': events, 'relationships': []}
+
+
+def _provenance_from_snapshot(snapshot: Dict[str, List[List[str]]]) -> List[Dict[str, Any]]:
+    """derived_from for the whole basket, from a substrate snapshot's ids."""
+    provenance = [{'type': 'block', 'id': entry[0]} for entry in snapshot.get('block', [])]
+    provenance.extend({'type': 'dump', 'id': entry[0]} for entry in snapshot.get('dump', []))
+    provenance.extend(
+        {'type': 'timeline_event', 'id': int(entry[0]) if entry[0].isdigit() else entry[0]}
+        for entry in snapshot.get('event', [])
+    )
+    return provenance
+
+
 async def _fetch_basket_substrate_timeboxed(
     supabase,
     basket_id: str,
@@ -544,24 +644,25 @@ async def _fetch_basket_substrate_timeboxed(
     - Query blocks with ACCEPTED+ states only
     """
     # Filter by created_at within window, valid states only
-    blocks = supabase.table('blocks').select('*').eq('basket_id', basket_id).in_(
-        'state', ['ACCEPTED', 'LOCKED', 'CONSTANT']
-    ).gte('created_at', window_start.isoformat()).lte(
-        'created_at', window_end.isoformat()
-    ).execute()
-
-    dumps = supabase.table('raw_dumps').select('*').eq('basket_id', basket_id).gte(
-        'created_at', window_start.isoformat()
-    ).lte('created_at', window_end.isoformat()).execute()
-
-    events = supabase.table('timeline_events').select('*').eq('basket_id', basket_id).gte(
-        'ts', window_start.isoformat()
-    ).lte('ts', window_end.isoformat()).execute()
+    blocks, dumps, events = await asyncio.gather(
+        BlocksRepository(supabase).list_for_basket(
+            basket_id,
+            states=['ACCEPTED', 'LOCKED', 'CONSTANT'],
+            created_from=window_start,
+            created_to=window_end,
+        ),
+        RawDumpsRepository(supabase).list_for_basket(
+            basket_id, created_from=window_start, created_to=window_end
+        ),
+        TimelineEventsRepository(supabase).list_for_basket(
+            basket_id, ts_from=window_start, ts_to=window_end
+        ),
+    )
 
     return {
-        'blocks': blocks.data,
-        'dumps': dumps.data,
-        'events': events.data
+        'blocks': blocks,
+        'dumps': dumps,
+        'events': events
     }
 
 
@@ -646,6 +747,26 @@ async def _generate_insight_text(
 
 Write a clear, direct insight canon (300-500 words) that someone could read to quickly understand what this basket is about."""
 
+    elif insight_type == 'insight_canon_update':
+        previous_insight = (agent_context or {}).get('previous_insight', '')
+        removed_counts = (agent_context or {}).get('removed_counts') or {}
+        removed_line = ", ".join(f"{count} {kind}(s)" for kind, count in removed_counts.items() if count)
+        prompt = f"""You are updating an existing Insight Canon - the core understanding of "what matters now" in a knowledge basket.
+
+## Current Insight Canon
+{previous_insight}
+
+## Substrate added or changed since it was written
+{substrate_text}
+{f"Removed since then: {removed_line}" if removed_line else ""}
+
+**Task**: Revise the insight canon so it reflects these changes:
+1. Keep themes and tensions that still hold
+2. Integrate what the new or changed substrate adds, shifts or contradicts
+3. Drop points that relied only on removed substrate
+
+Write the full revised insight canon (300-500 words), not a changelog."""
+
     elif insight_type == 'doc_insight':
         doc_title = substrate.get('document_title', 'Untitled')
         doc_content = substrate.get('document_content', '')
@@ -687,7 +808,13 @@ Write a clear insight (200-400 words)."""
 
     # Call LLM (temperature=1 is default, some models don't support other values)
     llm = get_llm()
-    response = await llm.get_text_response(prompt, max_tokens=1800)
+    # Document insights are a pure function of the document version
+    response = await llm.get_text_response(
+        prompt,
+        max_tokens=1800,
+        schema_name=insight_type,
+        cache=insight_type == 'doc_insight',
+    )
 
     if response.success:
         content = (response.content or "").strip()
@@ -703,6 +830,10 @@ Write a clear insight (200-400 words)."""
             response.error,
         )
 
+    if insight_type == 'insight_canon_update' and (agent_context or {}).get('previous_insight'):
+        # Changed rows alone are not a basket summary: keep the previous canon
+        return agent_context['previous_insight']
+
     # Fallback summary derived from substrate when LLM fails or returns empty
     lines = [
         "Insight Canon Fallback Summary",
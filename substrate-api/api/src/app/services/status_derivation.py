@@ -22,6 +22,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 
 from infra.utils.supabase_client import supabase_admin_client as supabase
+from app.repositories import WorkQueueRepository
 from app.schemas.work_status import WorkStatusResponse, SubstrateImpact, CascadeFlow, WorkError
 
 logger = logging.getLogger("uvicorn.error")
@@ -39,6 +40,7 @@ class StatusDerivationService:
     """
     
     def __init__(self):
+        self.work_queue = WorkQueueRepository(supabase)
         logger.info("Status Derivation Service initialized - Canon v2.1 compliant")
     
     async def derive_work_status(self, work_id: str, user_workspace_ids: List[str]) -> Optional[WorkStatusResponse]:
@@ -100,15 +102,11 @@ class StatusDerivationService:
         """
         try:
             # Get work with cascade metadata
-            work_response = supabase.table("agent_processing_queue").select(
-                "work_id, work_type, processing_state, cascade_metadata, parent_work_id, created_at"
-            ).eq("work_id", work_id).single().execute()
+            work = await self.work_queue.get(work_id)
             
-            if not work_response.data:
+            if not work:
                 return {'cascade_active': False, 'reason': 'work_not_found'}
             
-            work = work_response.data
-            
             # Find cascade family (parent + children)
             cascade_family = await self._get_cascade_family(work_id)
             
@@ -146,11 +144,7 @@ class StatusDerivationService:
         """
         try:
             # Get all work for workspace
-            work_response = supabase.table("agent_processing_queue").select(
-                "work_id, work_type, processing_state, created_at, parent_work_id"
-            ).eq("workspace_id", workspace_id).order("created_at", desc=True).execute()
-            
-            work_items = work_response.data or []
+            work_items = await self.work_queue.list_for_workspace(workspace_id)
             
             # Categorize work by status
             status_counts = self._categorize_work_by_status(work_items)
@@ -178,15 +172,11 @@ class StatusDerivationService:
     async def _get_work_data(self, work_id: str, user_workspace_ids: List[str]) -> Optional[Dict[str, Any]]:
         """Get work data with workspace isolation check."""
         try:
-            work_response = supabase.table("agent_processing_queue").select("*").eq(
-                "work_id", work_id
-            ).single().execute()
+            work = await self.work_queue.get(work_id)
             
-            if not work_response.data:
+            if not work:
                 return None
             
-            work = work_response.data
-            
             # Check workspace access
             if work['workspace_id'] not in user_workspace_ids:
                 logger.warning(f"Access denied: work {work_id} not in user workspaces")
@@ -366,31 +356,24 @@ class StatusDerivationService:
         """Get cascade family (parent and children) for a work item."""
         try:
             # Get current work
-            current_response = supabase.table("agent_processing_queue").select(
-                "work_id, parent_work_id, work_type, processing_state"
-            ).eq("work_id", work_id).single().execute()
+            current = await self.work_queue.get(work_id)
             
-            if not current_response.data:
+            if not current:
                 return {'parent': None, 'children': []}
             
-            current = current_response.data
             parent_work = None
             
             # Get parent work if exists
             if current.get('parent_work_id'):
-                parent_response = supabase.table("agent_processing_queue").select(
-                    "work_id, work_type, processing_state, created_at"
-                ).eq("work_id", current['parent_work_id']).execute()
+                parent = await self.work_queue.get(current['parent_work_id'])
                 
-                if parent_response.data:
-                    parent_work = parent_response.data[0]
+                if parent:
+                    parent_work = self._family_member(parent)
             
             # Get children work
-            children_response = supabase.table("agent_processing_queue").select(
-                "work_id, work_type, processing_state, created_at"
-            ).eq("parent_work_id", work_id).execute()
+            children = await self.work_queue.list_children(work_id)
             
-            children_work = children_response.data or []
+            children_work = [self._family_member(child) for child in children]
             
             return {
                 'parent': parent_work,
@@ -401,6 +384,10 @@ class StatusDerivationService:
             logger.error(f"Failed to get cascade family for {work_id}: {e}")
             return {'parent': None, 'children': []}
     
+    @staticmethod
+    def _family_member(work: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: work.get(key) for key in ('work_id', 'work_type', 'processing_state', 'created_at')}
+    
     def _determine_cascade_stage(self, work_type: str, cascade_family: Dict[str, Any]) -> str:
         """Determine which stage of cascade flow this work represents."""
         if work_type == 'P1_SUBSTRATE':
@@ -0,0 +1,186 @@
+"""Block listing queries shared by the basket block endpoints.
+
+Lists are ordered newest first and paginated by keyset on
+``(created_at, id)``: the response carries an ``X-Next-Cursor`` header
+and the next page is ``?cursor=<that value>``. ``fields=`` narrows the
+columns (e.g. ``fields=id,title``). ``since=`` returns only the blocks
+updated after a previous ``X-Since-Cursor`` value (delta sync).
+
+Each listing also carries a weak ETag derived from the basket's latest
+block ``updated_at`` and block count, so clients can poll with
+``If-None-Match`` and get a 304 without any rows being read.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+BLOCK_LIST_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "semantic_type",
+    "confidence_score",
+    "state",
+    "created_at",
+    "updated_at",
+)
+
+MAX_PAGE_SIZE = 500
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a ``fields=`` projection (all list fields when omitted)."""
+    if not fields:
+        return BLOCK_LIST_FIELDS
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in BLOCK_LIST_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unknown fields: {', '.join(unknown)}; "
+                f"allowed: {', '.join(BLOCK_LIST_FIELDS)}"
+            ),
+        )
+    return requested
+
+
+def _parse_timestamp(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError) as err:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}") from err
+
+
+def _isoformat(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def encode_cursor(created_at: Any, block_id: Any) -> str:
+    raw = json.dumps([_isoformat(created_at), str(block_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, block_id = json.loads(raw)
+    except (ValueError, TypeError) as err:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from err
+    return _parse_timestamp(created_at, "cursor"), str(block_id)
+
+
+def parse_since(since: str) -> datetime:
+    return _parse_timestamp(since, "since")
+
+
+def _scope(basket_id: str, workspace_id: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    where = "basket_id = CAST(:basket_id AS uuid)"
+    values: Dict[str, Any] = {"basket_id": str(basket_id)}
+    if workspace_id is not None:
+        where += " AND workspace_id = CAST(:workspace_id AS uuid)"
+        values["workspace_id"] = str(workspace_id)
+    return where, values
+
+
+async def basket_blocks_version(
+    db, basket_id: str, workspace_id: Optional[str] = None
+) -> Tuple[Optional[datetime], int]:
+    """(latest block change, block count) of a basket; cheap enough to run per request."""
+    where, values = _scope(basket_id, workspace_id)
+    row = await db.fetch_one(
+        "SELECT max(COALESCE(updated_at, created_at)) AS latest, count(*) AS total "
+        f"FROM blocks WHERE {where}",
+        values=values,
+    )
+    if row is None:
+        return None, 0
+    row = dict(row)
+    return row["latest"], row["total"] or 0
+
+
+def weak_etag(basket_id: str, version: Tuple[Optional[datetime], int], query: str) -> str:
+    """Weak ETag for one listing: basket version plus the query that shaped the body."""
+    latest, total = version
+    digest = hashlib.sha1(
+        f"{basket_id}|{latest.isoformat() if latest else ''}|{total}|{query}".encode()
+    ).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+async def list_blocks_page(
+    db,
+    basket_id: str,
+    *,
+    workspace_id: Optional[str] = None,
+    states: Optional[Sequence[str]] = None,
+    fields: Sequence[str] = BLOCK_LIST_FIELDS,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of a basket's blocks and the cursor of the next page (None on the last)."""
+    where, values = _scope(basket_id, workspace_id)
+
+    if states:
+        where += " AND state = ANY(:states)"
+        values["states"] = list(states)
+    if since:
+        where += " AND COALESCE(updated_at, created_at) > :since"
+        values["since"] = parse_since(since)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        where += " AND (created_at, id) < (:cursor_created_at, CAST(:cursor_id AS uuid))"
+        values["cursor_created_at"] = cursor_created_at
+        values["cursor_id"] = cursor_id
+
+    # The keyset columns are always read so the next cursor can be built
+    columns = list(dict.fromkeys([*fields, "created_at", "id"]))
+    query = (
+        f"SELECT {', '.join(columns)} FROM blocks WHERE {where} "
+        "ORDER BY created_at DESC, id DESC"
+    )
+    if limit is not None:
+        # One extra row tells whether another page exists
+        query += " LIMIT :limit"
+        values["limit"] = limit + 1
+
+    rows = [dict(row) for row in await db.fetch_all(query, values=values)]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    if tuple(columns) != tuple(fields):
+        rows = [{field: row[field] for field in fields} for row in rows]
+    return rows, next_cursor
+
+
+def listing_headers(
+    etag: str, version: Tuple[Optional[datetime], int], next_cursor: Optional[str] = None
+) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    latest, _ = version
+    if latest is not None:
+        headers["X-Since-Cursor"] = _isoformat(latest)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
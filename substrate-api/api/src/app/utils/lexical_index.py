@@ -0,0 +1,193 @@
+"""MinHash/LSH index for lexical near-duplicate and clustering queries.
+
+Context clustering and cross-document relationship discovery used to compare
+every item against every other and re-tokenize both texts for each pair. This
+index tokenizes each item once and keeps a MinHash signature for it. LSH
+banding over the signatures produces candidate pairs in near-linear time, and
+exact Jaccard is only computed for those candidates.
+
+Results are approximate: a pair is proposed with probability
+``1 - (1 - J**rows)**bands`` for Jaccard similarity ``J``. The defaults
+(64 hashes, 32 bands of 2 rows) find ~95% of pairs at J=0.3 and practically all
+pairs at J>=0.5, which covers the thresholds the services use.
+
+``PrefixFilterIndex`` is the exact counterpart for callers that must not miss
+a pair: with every token set ordered by one global token order (rarest
+first), two sets with Jaccard >= t share a token within their first
+``|x| - ceil(t * |x|) + 1`` tokens, so only those prefixes are indexed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, FrozenSet, Generic, Hashable, Iterable, List, Set, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 32
+
+# Buckets larger than this (e.g. every item shares a stock phrase) are skipped
+# rather than expanded into a quadratic number of pairs
+MAX_BUCKET_SIZE = 500
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class LexicalSimilarityIndex(Generic[K]):
+    """Token sets with MinHash signatures, bucketed for candidate generation."""
+
+    def __init__(
+        self,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._token_signatures: Dict[str, Tuple[int, ...]] = {}
+        self._tokens: Dict[K, FrozenSet[str]] = {}
+        self._signatures: Dict[K, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[K]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._tokens
+
+    def add(self, key: K, tokens: Iterable[str]) -> None:
+        """Index ``key`` under its token set (items without tokens are kept but never match)."""
+        if key in self._tokens:
+            raise KeyError(f"{key!r} is already indexed")
+        token_set = frozenset(tokens)
+        self._tokens[key] = token_set
+        if not token_set:
+            return
+        signature = self.signature(token_set)
+        self._signatures[key] = signature
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            self._buckets[(band, bucket_key)].append(key)
+
+    def tokens(self, key: K) -> FrozenSet[str]:
+        return self._tokens[key]
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature: per hash function, the minimum over the tokens."""
+        per_token = [self._signature_of_token(token) for token in tokens]
+        if not per_token:
+            return ()
+        return tuple(map(min, zip(*per_token)))
+
+    def jaccard(self, a: K, b: K) -> float:
+        """Exact Jaccard similarity of two indexed items."""
+        tokens_a, tokens_b = self._tokens[a], self._tokens[b]
+        if not tokens_a or not tokens_b:
+            return 0.0
+        intersection = len(tokens_a & tokens_b)
+        return intersection / (len(tokens_a) + len(tokens_b) - intersection)
+
+    def candidates(self, key: K) -> Set[K]:
+        """Items sharing at least one LSH bucket with ``key``."""
+        signature = self._signatures.get(key)
+        if not signature:
+            return set()
+        found: Set[K] = set()
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets.get((band, bucket_key), ())
+            if len(bucket) <= MAX_BUCKET_SIZE:
+                found.update(bucket)
+        found.discard(key)
+        return found
+
+    def candidate_pairs(self) -> Set[Tuple[K, K]]:
+        """Unordered candidate pairs, each as (earlier-added, later-added)."""
+        order = {key: i for i, key in enumerate(self._tokens)}
+        pairs: Set[Tuple[K, K]] = set()
+        for bucket in self._buckets.values():
+            if 1 < len(bucket) <= MAX_BUCKET_SIZE:
+                for a, b in combinations(bucket, 2):
+                    pairs.add((a, b) if order[a] < order[b] else (b, a))
+        return pairs
+
+    def similar_pairs(self, threshold: float) -> List[Tuple[K, K, float]]:
+        """Candidate pairs whose exact Jaccard is at least ``threshold``."""
+        result = []
+        for a, b in self.candidate_pairs():
+            similarity = self.jaccard(a, b)
+            if similarity >= threshold:
+                result.append((a, b, similarity))
+        return result
+
+    def _signature_of_token(self, token: str) -> Tuple[int, ...]:
+        signature = self._token_signatures.get(token)
+        if signature is None:
+            value = _token_hash(token)
+            signature = tuple([value ^ mask for mask in self._masks])
+            self._token_signatures[token] = signature
+        return signature
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterable[Tuple[int, ...]]:
+        rows = self.rows
+        return (signature[i:i + rows] for i in range(0, self.num_perm, rows))
+
+
+class PrefixFilterIndex(Generic[K]):
+    """Exact ``Jaccard >= threshold`` lookups by prefix filtering.
+
+    Candidates come from the indexed prefixes and are verified against the
+    full token sets, so ``matches`` returns every item at or above the
+    threshold and nothing below it. A threshold <= 0 indexes whole token
+    sets: matches then share at least one token.
+    """
+
+    def __init__(self, items: Iterable[Tuple[K, Iterable[str]]], threshold: float) -> None:
+        self.threshold = threshold
+        self._tokens: Dict[K, FrozenSet[str]] = {
+            key: frozenset(tokens) for key, tokens in items
+        }
+        self._frequency: Dict[str, int] = defaultdict(int)
+        for tokens in self._tokens.values():
+            for token in tokens:
+                self._frequency[token] += 1
+        self._postings: Dict[str, List[K]] = defaultdict(list)
+        for key, tokens in self._tokens.items():
+            for token in self.prefix(tokens):
+                self._postings[token].append(key)
+
+    def prefix(self, tokens: Iterable[str]) -> List[str]:
+        """Rarest tokens of a set, as many as the threshold requires."""
+        ordered = sorted(tokens, key=lambda token: (self._frequency.get(token, 0), token))
+        if self.threshold <= 0:
+            return ordered
+        # Tolerance keeps e.g. 0.3 * 10 from rounding up to 4
+        required_overlap = math.ceil(self.threshold * len(ordered) - 1e-9)
+        return ordered[:len(ordered) - required_overlap + 1]
+
+    def matches(self, tokens: Iterable[str]) -> Set[K]:
+        query = frozenset(tokens)
+        threshold, item_tokens = self.threshold, self._tokens
+        found: Set[K] = set()
+        seen: Set[K] = set()
+        for token in self.prefix(query):
+            for key in self._postings.get(token, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                other = item_tokens[key]
+                shared = len(query & other)
+                # Jaccard >= t  <=>  shared >= t * union, checked without division
+                if shared and shared >= threshold * (len(query) + len(other) - shared) - 1e-9:
+                    found.add(key)
+        return found
@@ -0,0 +1,290 @@
+"""Request-scoped, read-only view of a basket's substrate.
+
+The basket and context intelligence services (pattern recognition,
+relationship discovery, inconsistency accommodation, context discovery,
+composition intelligence, intent analysis, context hierarchy) all read the
+same basket rows, and several call each other within one request. They load
+through ``get_basket_view()`` instead of issuing their own queries:
+
+- each table is fetched at most once per request, with a fixed column
+  projection, the first time any service asks for it
+- text is tokenized once (``view.terms()`` / ``substrate_terms()``)
+- later analysis stages are CPU-only
+
+Services that look rows up by id (document composition, coherence analysis)
+use ``get_blocks()`` / ``get_context_items()``: one ``in_("id", ...)`` query
+for all ids not yet seen in the request, instead of one query per row.
+
+``BasketSubstrateScopeMiddleware`` opens a scope per HTTP request. Outside a
+scope (scripts, background jobs) every call gets a fresh view, which matches
+the previous per-call loading.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+BLOCK_COLUMNS = "id,semantic_type,content,state,anchor_role,created_at"
+DOCUMENT_COLUMNS = "id,title,document_type,created_at,current_version_hash"
+DUMP_COLUMNS = "id,body_md,text_dump,source_meta,created_at"
+CONTEXT_ITEM_COLUMNS = "id,basket_id,type,content,scope,status,metadata,created_at"
+
+# Words of 4+ letters: the "meaningful words" tokenization the services use
+_TERM_RE = re.compile(r"\b[a-zA-Z]{4,}\b")
+
+_scope: contextvars.ContextVar[Optional[Dict[Tuple[str, str], "BasketSubstrateView"]]] = (
+    contextvars.ContextVar("basket_substrate_scope", default=None)
+)
+_resolver_scope: contextvars.ContextVar[Optional[Dict[Tuple[str, str], "RowResolver"]]] = (
+    contextvars.ContextVar("row_resolver_scope", default=None)
+)
+
+
+class BasketSubstrateView:
+    """Lazily loaded, memoized basket rows for one request."""
+
+    def __init__(self, client: Any, basket_id: Any, workspace_id: Any) -> None:
+        self.client = client
+        self.basket_id = str(basket_id)
+        self.workspace_id = str(workspace_id)
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._terms: Dict[str, FrozenSet[str]] = {}
+        self.queries = 0
+
+    async def blocks(self) -> List[Dict[str, Any]]:
+        """Non-rejected blocks."""
+        return await self._load("blocks", self._fetch_blocks)
+
+    async def documents(self) -> List[Dict[str, Any]]:
+        """Documents; ``content_raw`` holds the current version's content."""
+        return await self._load("documents", self._fetch_documents)
+
+    async def raw_dumps(self) -> List[Dict[str, Any]]:
+        """Raw dumps; ``content`` is body_md (or text_dump), ``source`` the source_meta."""
+        return await self._load("raw_dumps", self._fetch_raw_dumps)
+
+    async def context_items(self) -> List[Dict[str, Any]]:
+        """Active context items (legacy table)."""
+        return await self._load("context_items", self._fetch_context_items)
+
+    def terms(self, text: Optional[str]) -> FrozenSet[str]:
+        """Lowercased 4+ letter words of ``text``, computed once per view."""
+        if not text:
+            return frozenset()
+        cached = self._terms.get(text)
+        if cached is None:
+            cached = frozenset(_TERM_RE.findall(text.lower()))
+            self._terms[text] = cached
+        return cached
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop loaded tables (all when none given) after a write."""
+        for table in tables or list(self._tables):
+            self._tables.pop(table, None)
+
+    # Loading -----------------------------------------------------------
+
+    async def _load(self, table: str, fetch) -> List[Dict[str, Any]]:
+        if table in self._tables:
+            return self._tables[table]
+        lock = self._locks.setdefault(table, asyncio.Lock())
+        async with lock:
+            if table not in self._tables:
+                try:
+                    self._tables[table] = await asyncio.to_thread(fetch)
+                except Exception as e:
+                    logger.exception(f"Failed to load basket {table} for {self.basket_id}: {e}")
+                    return []
+        return self._tables[table]
+
+    def _execute(self, query) -> List[Dict[str, Any]]:
+        self.queries += 1
+        return query.execute().data or []
+
+    def _fetch_blocks(self) -> List[Dict[str, Any]]:
+        return self._execute(
+            self.client.table("blocks")
+            .select(BLOCK_COLUMNS)
+            .eq("basket_id", self.basket_id)
+            .eq("workspace_id", self.workspace_id)
+            .neq("state", "REJECTED")
+        )
+
+    def _fetch_documents(self) -> List[Dict[str, Any]]:
+        documents = self._execute(
+            self.client.table("documents")
+            .select(DOCUMENT_COLUMNS)
+            .eq("basket_id", self.basket_id)
+            .eq("workspace_id", self.workspace_id)
+        )
+        hashes = [d["current_version_hash"] for d in documents if d.get("current_version_hash")]
+        contents: Dict[str, str] = {}
+        if hashes:
+            for version in self._execute(
+                self.client.table("document_versions")
+                .select("version_hash,content")
+                .in_("version_hash", hashes)
+            ):
+                contents[version["version_hash"]] = version.get("content") or ""
+        for document in documents:
+            document["content_raw"] = contents.get(document.get("current_version_hash"), "")
+        return documents
+
+    def _fetch_raw_dumps(self) -> List[Dict[str, Any]]:
+        dumps = self._execute(
+            self.client.table("raw_dumps")
+            .select(DUMP_COLUMNS)
+            .eq("basket_id", self.basket_id)
+            .eq("workspace_id", self.workspace_id)
+        )
+        for dump in dumps:
+            dump["content"] = dump.get("body_md") or dump.get("text_dump") or ""
+            dump["source"] = dump.get("source_meta") or {}
+        return dumps
+
+    def _fetch_context_items(self) -> List[Dict[str, Any]]:
+        return self._execute(
+            self.client.table("context_items")
+            .select(CONTEXT_ITEM_COLUMNS)
+            .eq("basket_id", self.basket_id)
+            .eq("status", "active")
+        )
+
+
+class RowResolver:
+    """Batched by-id lookups of one table, memoized for one request."""
+
+    def __init__(
+        self,
+        client: Any,
+        table: str,
+        columns: str,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.client = client
+        self.table = table
+        self.columns = columns
+        self.filters = dict(filters or {})
+        # id -> row, or None when the row does not exist / is filtered out
+        self._rows: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = asyncio.Lock()
+        self.queries = 0
+
+    async def get_many(self, ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Rows for ``ids`` keyed by string id; missing ids are left out."""
+        wanted = list(dict.fromkeys(str(i) for i in ids if i))
+        missing = [i for i in wanted if i not in self._rows]
+        if missing:
+            async with self._lock:
+                missing = [i for i in missing if i not in self._rows]
+                if missing:
+                    try:
+                        rows = await asyncio.to_thread(self._fetch, missing)
+                    except Exception as e:
+                        logger.warning(f"Failed to resolve {len(missing)} {self.table} rows: {e}")
+                        rows = []
+                    else:
+                        for row_id in missing:
+                            self._rows[row_id] = None
+                    for row in rows:
+                        self._rows[str(row["id"])] = row
+        return {i: self._rows[i] for i in wanted if self._rows.get(i) is not None}
+
+    def _fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        self.queries += 1
+        query = self.client.table(self.table).select(self.columns).in_("id", ids)
+        for column, value in self.filters.items():
+            query = query.eq(column, value)
+        return query.execute().data or []
+
+
+@contextmanager
+def basket_substrate_scope() -> Iterator[None]:
+    """Share basket views and row resolvers between all services called inside the block."""
+    token = _scope.set({})
+    resolver_token = _resolver_scope.set({})
+    try:
+        yield
+    finally:
+        _resolver_scope.reset(resolver_token)
+        _scope.reset(token)
+
+
+def get_basket_view(client: Any, basket_id: Any, workspace_id: Any) -> BasketSubstrateView:
+    """The request's view of a basket (a fresh one outside a scope)."""
+    views = _scope.get()
+    if views is None:
+        return BasketSubstrateView(client, basket_id, workspace_id)
+    key = (str(basket_id), str(workspace_id))
+    view = views.get(key)
+    if view is None:
+        view = BasketSubstrateView(client, basket_id, workspace_id)
+        views[key] = view
+    return view
+
+
+def invalidate_basket_view(basket_id: Any, workspace_id: Any, *tables: str) -> None:
+    """Forget loaded rows after a service writes to the basket in this request."""
+    views = _scope.get()
+    if views:
+        view = views.get((str(basket_id), str(workspace_id)))
+        if view is not None:
+            view.invalidate(*tables)
+
+
+def _get_resolver(
+    client: Any, table: str, columns: str, filters: Dict[str, Any]
+) -> RowResolver:
+    resolvers = _resolver_scope.get()
+    if resolvers is None:
+        return RowResolver(client, table, columns, filters)
+    key = (table, repr(sorted(filters.items())))
+    resolver = resolvers.get(key)
+    if resolver is None:
+        resolver = RowResolver(client, table, columns, filters)
+        resolvers[key] = resolver
+    return resolver
+
+
+async def get_blocks(
+    client: Any, ids: Iterable[Any], workspace_id: Any
+) -> Dict[str, Dict[str, Any]]:
+    """Blocks by id (one query for the ids not yet resolved in this request)."""
+    resolver = _get_resolver(client, "blocks", BLOCK_COLUMNS, {"workspace_id": str(workspace_id)})
+    return await resolver.get_many(ids)
+
+
+async def get_context_items(client: Any, ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """Active context items by id, batched like ``get_blocks()``."""
+    resolver = _get_resolver(client, "context_items", CONTEXT_ITEM_COLUMNS, {"status": "active"})
+    return await resolver.get_many(ids)
+
+
+def substrate_terms(text: Optional[str]) -> FrozenSet[str]:
+    """Tokenize via the active scope's memo when there is one."""
+    views = _scope.get()
+    if views:
+        return next(iter(views.values())).terms(text)
+    return frozenset(_TERM_RE.findall((text or "").lower()))
+
+
+class BasketSubstrateScopeMiddleware:
+    """ASGI middleware opening a basket substrate scope per HTTP request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with basket_substrate_scope():
+            await self.app(scope, receive, send)
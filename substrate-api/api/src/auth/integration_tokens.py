@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 from fastapi import HTTPException
@@ -10,16 +15,36 @@ from infra.utils.supabase import supabase_admin
 
 log = logging.getLogger("uvicorn.error")
 
+# Raw integration tokens are issued with this prefix (routes/integration_tokens.py)
+INTEGRATION_TOKEN_PREFIX = "yit_"
+
+# Lookups (including unknown/revoked tokens) are reused for this long; revoking
+# through this process invalidates immediately, other workers within the TTL
+TOKEN_CACHE_TTL = float(os.getenv("INTEGRATION_TOKEN_CACHE_TTL_SECONDS", "30"))
+TOKEN_CACHE_SIZE = int(os.getenv("INTEGRATION_TOKEN_CACHE_SIZE", "2048"))
+# last_used_at is written at most once per interval per token; a use inside the
+# interval is written when it ends
+USAGE_FLUSH_INTERVAL = float(os.getenv("INTEGRATION_TOKEN_USAGE_FLUSH_SECONDS", "60"))
+
+_token_cache: "OrderedDict[str, tuple[float, dict | None]]" = OrderedDict()
+_usage_written: dict[str, float] = {}
+_usage_pending: dict[str, str] = {}
+_lock = threading.Lock()
+
 
 def _hash_token(raw: str) -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def verify_integration_token(token: str) -> dict:
-    """Validate an integration token against the database."""
+def _lookup(token_hash: str) -> dict | None:
+    now = time.monotonic()
+    with _lock:
+        entry = _token_cache.get(token_hash)
+        if entry is not None and entry[0] > now:
+            _token_cache.move_to_end(token_hash)
+            return entry[1]
 
     sb = supabase_admin()
-    token_hash = _hash_token(token)
     resp = (
         sb.table("integration_tokens")
         .select("id, user_id, workspace_id, revoked_at")
@@ -28,24 +53,97 @@ def verify_integration_token(token: str) -> dict:
         .execute()
     )
 
-    # Handle None response (can happen if Supabase client errors)
+    # Handle None response (can happen if Supabase client errors); not cached
     if resp is None or not hasattr(resp, 'data'):
         log.warning("Integration token query returned invalid response")
         raise HTTPException(status_code=401, detail="Invalid integration token")
 
-    record = resp.data
-    if not record or record.get("revoked_at"):
-        log.debug("Integration token invalid or revoked")
-        raise HTTPException(status_code=401, detail="Invalid integration token")
+    record = resp.data or None
+    with _lock:
+        _token_cache[token_hash] = (now + TOKEN_CACHE_TTL, record)
+        _token_cache.move_to_end(token_hash)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return record
+
 
-    # Update last_used_at
+def _write_last_used(token_id: str, used_at: str) -> None:
     try:
-        sb.table("integration_tokens").update({
-            "last_used_at": datetime.now(timezone.utc).isoformat()
-        }).eq("id", record["id"]).execute()
+        supabase_admin().table("integration_tokens").update({
+            "last_used_at": used_at
+        }).eq("id", token_id).execute()
     except Exception as exc:  # pragma: no cover - best effort
         log.warning("Failed to update integration token usage: %s", exc)
 
+
+def _flush_pending_usage(token_id: str) -> None:
+    with _lock:
+        used_at = _usage_pending.pop(token_id, None)
+        if used_at is None:
+            return
+        _usage_written[token_id] = time.monotonic()
+    _write_last_used(token_id, used_at)
+
+
+def _note_usage(token_id: str) -> None:
+    """Record token use, writing last_used_at off the request path."""
+
+    now = time.monotonic()
+    used_at = datetime.now(timezone.utc).isoformat()
+    delay = None
+    with _lock:
+        last = _usage_written.get(token_id)
+        if last is not None and now - last < USAGE_FLUSH_INTERVAL:
+            # Deferred to the end of the interval; later uses only move the timestamp
+            scheduled = token_id in _usage_pending
+            _usage_pending[token_id] = used_at
+            if scheduled:
+                return
+            delay = last + USAGE_FLUSH_INTERVAL - now
+        else:
+            _usage_written[token_id] = now
+            _usage_pending.pop(token_id, None)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if delay is None:
+            _write_last_used(token_id, used_at)
+        else:
+            timer = threading.Timer(delay, _flush_pending_usage, args=(token_id,))
+            timer.daemon = True
+            timer.start()
+    else:
+        if delay is None:
+            loop.run_in_executor(None, _write_last_used, token_id, used_at)
+        else:
+            loop.call_later(delay, loop.run_in_executor, None, _flush_pending_usage, token_id)
+
+
+def invalidate_integration_token(token_id: str) -> None:
+    """Forget cached lookups of a token (call after revoking it)."""
+
+    with _lock:
+        stale = [
+            token_hash for token_hash, (_, record) in _token_cache.items()
+            if record and record.get("id") == token_id
+        ]
+        for token_hash in stale:
+            del _token_cache[token_hash]
+        _usage_written.pop(token_id, None)
+        _usage_pending.pop(token_id, None)
+
+
+def verify_integration_token(token: str) -> dict:
+    """Validate an integration token against the database."""
+
+    record = _lookup(_hash_token(token))
+    if not record or record.get("revoked_at"):
+        log.debug("Integration token invalid or revoked")
+        raise HTTPException(status_code=401, detail="Invalid integration token")
+
+    _note_usage(record["id"])
+
     return {
         "id": record["id"],
         "user_id": record["user_id"],
@@ -54,4 +152,8 @@ def verify_integration_token(token: str) -> dict:
     }
 
 
-__all__ = ["verify_integration_token"]
+__all__ = [
+    "INTEGRATION_TOKEN_PREFIX",
+    "invalidate_integration_token",
+    "verify_integration_token",
+]
@@ -1,4 +1,5 @@
-import os, base64, logging, jwt
+import os, base64, binascii, hashlib, logging, threading, time, jwt
+from collections import OrderedDict
 from fastapi import HTTPException
 
 log = logging.getLogger("uvicorn.error")
@@ -6,6 +7,36 @@ log = logging.getLogger("uvicorn.error")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "").rstrip("/")
 JWT_AUD = os.getenv("SUPABASE_JWT_AUD", "authenticated")
 RAW_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+# "raw" or "base64" pins the secret variant; unset = detect on first success
+SECRET_ENCODING = os.getenv("SUPABASE_JWT_SECRET_ENCODING", "").lower()
+
+# Verified token digest -> claims, kept until the token's exp
+CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", "10000"))
+CLAIMS_CACHE_MAX_TTL = float(os.getenv("JWT_CLAIMS_CACHE_MAX_TTL_SECONDS", "3600"))
+
+
+def _secret_variants() -> list[tuple[str, bytes | str]]:
+    """Candidate signing secrets, decoded once at import."""
+    if not RAW_SECRET:
+        return []
+    variants: list[tuple[str, bytes | str]] = [("raw", RAW_SECRET)]
+    try:
+        variants.append(("base64", base64.b64decode(RAW_SECRET)))
+    except (binascii.Error, ValueError):
+        pass
+    if SECRET_ENCODING:
+        pinned = [v for v in variants if v[0] == SECRET_ENCODING]
+        if pinned:
+            return pinned
+        log.error(
+            "AUTH: SUPABASE_JWT_SECRET_ENCODING=%s does not apply to the secret", SECRET_ENCODING
+        )
+    return variants
+
+
+_SECRETS = _secret_variants()
+_claims_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_cache_lock = threading.Lock()
 
 
 def _decode(token: str, secret: bytes | str):
@@ -19,31 +50,67 @@ def _decode(token: str, secret: bytes | str):
     )
 
 
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _cached_claims(key: str) -> dict | None:
+    with _cache_lock:
+        entry = _claims_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del _claims_cache[key]
+            return None
+        _claims_cache.move_to_end(key)
+        return dict(claims)
+
+
+def _cache_claims(key: str, claims: dict) -> None:
+    now = time.time()
+    expires_at = now + CLAIMS_CACHE_MAX_TTL
+    if isinstance(claims.get("exp"), (int, float)):
+        expires_at = min(expires_at, float(claims["exp"]))
+    if expires_at <= now or CLAIMS_CACHE_SIZE <= 0:
+        return
+    with _cache_lock:
+        _claims_cache[key] = (expires_at, dict(claims))
+        _claims_cache.move_to_end(key)
+        while len(_claims_cache) > CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+
+
 def verify_jwt(token: str) -> dict:
+    global _SECRETS
+
     if not RAW_SECRET:
         log.error("AUTH: SUPABASE_JWT_SECRET is empty")
         raise HTTPException(500, "auth_misconfigured")
 
+    key = _digest(token)
+    claims = _cached_claims(key)
+    if claims is not None:
+        return claims
+
     expected_iss = f"{SUPABASE_URL}/auth/v1" if SUPABASE_URL else None
     errors = []
 
-    # 1) Raw secret (most common for Supabase)
-    try:
-        claims = _decode(token, RAW_SECRET)
-        _post_checks(claims, expected_iss)
-        log.info("AUTH: verified with RAW secret")
-        return claims
-    except Exception as e:
-        errors.append(f"raw:{type(e).__name__}:{e}")
-
-    # 2) Base64-decoded fallback
-    try:
-        claims = _decode(token, base64.b64decode(RAW_SECRET))
-        _post_checks(claims, expected_iss)
-        log.info("AUTH: verified with BASE64-decoded secret")
-        return claims
-    except Exception as e:
-        errors.append(f"b64:{type(e).__name__}:{e}")
+    # Raw secret is the most common for Supabase; the base64-decoded fallback
+    # is dropped once a token has verified with one of them
+    secrets = _SECRETS
+    for variant, secret in secrets:
+        try:
+            claims = _decode(token, secret)
+            _post_checks(claims, expected_iss)
+        except Exception as e:
+            errors.append(f"{variant}:{type(e).__name__}:{e}")
+            continue
+        if len(secrets) > 1:
+            _SECRETS = [(variant, secret)]
+            log.info("AUTH: JWT secret variant resolved to %s", variant.upper())
+        _cache_claims(key, claims)
+        return dict(claims)
 
     log.error("AUTH: JWT verification failed (%s)", " ; ".join(errors))
     raise HTTPException(401, "Invalid authentication token")
@@ -63,4 +130,3 @@ def _post_checks(claims: dict, expected_iss: str | None):
 
 
 __all__ = ["verify_jwt"]
-
@@ -10,16 +10,26 @@ This is useful for:
 Usage:
   python -m jobs.batch_relationship_inference --workspace-id <uuid>
   python -m jobs.batch_relationship_inference --basket-id <uuid>
+  python -m jobs.batch_relationship_inference --workspace-id <uuid> --workers 16 --rpm 1000
+
+Blocks are processed by a concurrent worker pool rate limited by OpenAI
+RPM/TPM token buckets. Progress is checkpointed per run id (default: derived
+from the workspace/basket id), so re-running the same command after a crash
+resumes; pass --restart to reprocess everything.
 """
 
 import argparse
 import asyncio
 import logging
+import os
+import time
 from typing import List, Optional
 from uuid import UUID
 
 from infra.utils.supabase_client import supabase_admin_client as supabase
-from infra.substrate.services.semantic_primitives import (
+from jobs.progress import BackfillCheckpoint, ThroughputReporter
+from services.rate_limiter import OpenAIRateLimiter
+from services.semantic_primitives import (
     infer_relationships,
     RELATIONSHIP_HIGH_CONFIDENCE,
     RELATIONSHIP_MEDIUM_CONFIDENCE,
@@ -29,47 +39,62 @@ from infra.substrate.services.semantic_primitives import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+JOB_NAME = "relationship_inference"
+DEFAULT_WORKERS = int(os.getenv("RELATIONSHIP_BACKFILL_WORKERS", "8"))
+
+
+# Estimated OpenAI cost of inferring relationships for one block: one
+# embedding (usually cached) plus one or two batched verification calls.
+REQUESTS_PER_BLOCK_ESTIMATE = 3
+VERIFICATION_PROMPT_OVERHEAD_TOKENS = 1500
+
+
+def _estimate_block_tokens(block: dict) -> int:
+    text = f"{block.get('title') or ''} {block.get('content') or ''}"
+    return VERIFICATION_PROMPT_OVERHEAD_TOKENS + len(text) // 4
+
 
 async def batch_infer_relationships(
     basket_id: str,
     batch_size: int = 10,
-    dry_run: bool = False
+    dry_run: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    rate_limiter: Optional[OpenAIRateLimiter] = None,
+    checkpoint: Optional[BackfillCheckpoint] = None
 ) -> dict:
     """
     Infer relationships for all blocks in a basket.
 
+    Blocks are processed by a pool of concurrent workers gated by a shared
+    RPM/TPM token bucket. Completed blocks are checkpointed so an interrupted
+    run resumes where it left off.
+
     Args:
         basket_id: Basket UUID
-        batch_size: Number of blocks to process concurrently
+        batch_size: Proposals buffered per relationship write
         dry_run: If True, only log proposals without creating relationships
+        workers: Number of blocks processed concurrently
+        rate_limiter: Shared OpenAI limiter (one is created if omitted)
+        checkpoint: Progress tracker for resumable runs (optional)
 
     Returns:
-        Statistics dict with counts
+        Statistics dict with counts and throughput
     """
     logger.info(f"Starting batch relationship inference for basket {basket_id}")
+    rate_limiter = rate_limiter or OpenAIRateLimiter()
 
     # Get all blocks in basket that need relationship inference
-    blocks_response = supabase.table("blocks").select("id, title, semantic_type").eq(
-        "basket_id", basket_id
-    ).in_("state", ["ACCEPTED", "LOCKED", "CONSTANT"]).execute()
+    blocks_response = await asyncio.to_thread(
+        supabase.table("blocks").select("id, title, content, semantic_type").eq(
+            "basket_id", basket_id
+        ).in_("state", ["ACCEPTED", "LOCKED", "CONSTANT"]).order("id").execute
+    )
 
-    block_ids = [block["id"] for block in blocks_response.data]
-
-    if not block_ids:
-        logger.info(f"No blocks found in basket {basket_id}")
-        return {
-            "blocks_processed": 0,
-            "proposals_generated": 0,
-            "relationships_created": 0,
-            "high_confidence": 0,
-            "medium_confidence": 0,
-            "errors": 0
-        }
-
-    logger.info(f"Processing {len(block_ids)} blocks in batches of {batch_size}")
+    blocks = blocks_response.data or []
 
     stats = {
         "blocks_processed": 0,
+        "blocks_skipped": 0,
         "proposals_generated": 0,
         "relationships_created": 0,
         "high_confidence": 0,
@@ -77,52 +102,117 @@ async def batch_infer_relationships(
         "errors": 0
     }
 
-    # Process blocks in batches
-    for i in range(0, len(block_ids), batch_size):
-        batch = block_ids[i:i + batch_size]
-        logger.info(f"Processing batch {i//batch_size + 1}/{(len(block_ids) + batch_size - 1)//batch_size}")
+    if checkpoint:
+        completed = await checkpoint.completed_items(basket_id)
+        if completed:
+            stats["blocks_skipped"] = len([b for b in blocks if b["id"] in completed])
+            blocks = [b for b in blocks if b["id"] not in completed]
+            logger.info(f"Resuming basket {basket_id}: {stats['blocks_skipped']} blocks already done")
+
+    if not blocks:
+        logger.info(f"No blocks to process in basket {basket_id}")
+        return stats
+
+    workers = max(1, min(workers, len(blocks)))
+    logger.info(f"Processing {len(blocks)} blocks with {workers} workers")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for block in blocks:
+        queue.put_nowait(block)
+
+    reporter = ThroughputReporter(f"basket {basket_id}", total=len(blocks))
+    pending: List[RelationshipProposal] = []
+    pending_block_ids: List[str] = []
+    write_lock = asyncio.Lock()
+    last_flush = time.monotonic()
+
+    def checkpoint_due() -> bool:
+        # Completed blocks are checkpointed by count or age, even when they
+        # produced too few proposals to fill a write batch
+        if not checkpoint or dry_run or not pending_block_ids:
+            return False
+        return (
+            len(pending_block_ids) >= checkpoint.flush_size
+            or time.monotonic() - last_flush >= checkpoint.flush_interval_seconds
+        )
+
+    async def flush_pending(force: bool = False) -> None:
+        nonlocal pending, pending_block_ids, last_flush
+        async with write_lock:
+            if not force and len(pending) < batch_size and not checkpoint_due():
+                return
+            proposals, block_ids = pending, pending_block_ids
+            pending, pending_block_ids = [], []
+            last_flush = time.monotonic()
+
+            if proposals and not dry_run:
+                try:
+                    created = await _create_relationships_batch(basket_id, proposals)
+                except Exception as exc:
+                    # Not checkpointed: these blocks are retried on the next run
+                    logger.error(
+                        f"Failed to write relationships for {len(block_ids)} blocks "
+                        f"in basket {basket_id}: {exc}"
+                    )
+                    stats["errors"] += len(block_ids)
+                    return
+                stats["relationships_created"] += len(created)
+
+                # Count by confidence
+                for proposal in proposals:
+                    if proposal.confidence_score >= RELATIONSHIP_HIGH_CONFIDENCE:
+                        stats["high_confidence"] += 1
+                    elif proposal.confidence_score >= RELATIONSHIP_MEDIUM_CONFIDENCE:
+                        stats["medium_confidence"] += 1
+            elif proposals:
+                logger.info(f"[DRY RUN] Would create {len(proposals)} relationships")
+
+            # Checkpoint only once the block's relationships are persisted
+            if checkpoint and block_ids and not dry_run:
+                await checkpoint.mark_completed(basket_id, block_ids)
+
+    async def worker() -> None:
+        while True:
+            try:
+                block = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            tokens = _estimate_block_tokens(block)
+            await rate_limiter.acquire(requests=REQUESTS_PER_BLOCK_ESTIMATE, tokens=tokens)
 
-        # Infer relationships for each block in batch
-        batch_proposals = []
-        for block_id in batch:
             try:
                 proposals = await infer_relationships(
                     supabase=supabase,
-                    block_id=block_id,
-                    basket_id=basket_id
+                    block_id=block["id"],
+                    basket_id=basket_id,
+                    raise_errors=True
                 )
-                batch_proposals.extend(proposals)
-                stats["blocks_processed"] += 1
-
-                logger.info(
-                    f"Block {block_id}: Found {len(proposals)} relationship proposals"
-                )
-
             except Exception as exc:
-                logger.error(f"Failed to infer relationships for block {block_id}: {exc}")
+                logger.error(f"Failed to infer relationships for block {block['id']}: {exc}")
                 stats["errors"] += 1
+                reporter.record(items=0, errors=1)
                 continue
 
-        stats["proposals_generated"] += len(batch_proposals)
+            stats["blocks_processed"] += 1
+            stats["proposals_generated"] += len(proposals)
+            pending.extend(proposals)
+            pending_block_ids.append(block["id"])
+            reporter.record(items=1, tokens=tokens)
 
-        # Create relationships (unless dry run)
-        if not dry_run and batch_proposals:
-            created = await _create_relationships_batch(basket_id, batch_proposals)
-            stats["relationships_created"] += len(created)
-
-            # Count by confidence
-            for proposal in batch_proposals:
-                if proposal.confidence_score >= RELATIONSHIP_HIGH_CONFIDENCE:
-                    stats["high_confidence"] += 1
-                elif proposal.confidence_score >= RELATIONSHIP_MEDIUM_CONFIDENCE:
-                    stats["medium_confidence"] += 1
+            logger.info(
+                f"Block {block['id']}: Found {len(proposals)} relationship proposals"
+            )
+            await flush_pending()
 
-        elif dry_run:
-            logger.info(f"[DRY RUN] Would create {len(batch_proposals)} relationships")
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await flush_pending(force=True)
+    if checkpoint:
+        await checkpoint.flush()
 
-        # Rate limiting: brief pause between batches
-        if i + batch_size < len(block_ids):
-            await asyncio.sleep(0.5)
+    throughput = reporter.report(final=True)
+    stats["blocks_per_second"] = round(throughput["items_per_second"], 3)
+    stats["tokens_per_second"] = round(throughput["tokens_per_second"], 1)
 
     logger.info(f"Batch inference complete: {stats}")
     return stats
@@ -141,71 +231,80 @@ async def _create_relationships_batch(
 
     Returns:
         List of created relationship records
+
+    Raises:
+        Exception: The upsert failed (callers must not checkpoint the blocks)
     """
     if not proposals:
         return []
 
-    try:
-        # Prepare relationship data
-        relationship_data = []
-        for proposal in proposals:
-            # Determine state based on confidence
-            if proposal.confidence_score >= RELATIONSHIP_HIGH_CONFIDENCE:
-                state = "ACCEPTED"
-            elif proposal.confidence_score >= RELATIONSHIP_MEDIUM_CONFIDENCE:
-                state = "PROPOSED"
-            else:
-                # Skip low confidence
-                continue
+    # Prepare relationship data
+    relationship_data = []
+    for proposal in proposals:
+        # Determine state based on confidence
+        if proposal.confidence_score >= RELATIONSHIP_HIGH_CONFIDENCE:
+            state = "ACCEPTED"
+        elif proposal.confidence_score >= RELATIONSHIP_MEDIUM_CONFIDENCE:
+            state = "PROPOSED"
+        else:
+            # Skip low confidence
+            continue
+
+        relationship_data.append({
+            "from_block_id": str(proposal.from_block_id),
+            "to_block_id": str(proposal.to_block_id),
+            "relationship_type": proposal.relationship_type,
+            "confidence_score": proposal.confidence_score,
+            "inference_method": proposal.inference_method,
+            "state": state,
+            "metadata": {
+                "reasoning": proposal.reasoning,
+                "inferred_by": "batch_relationship_inference_job"
+            }
+        })
+
+    if not relationship_data:
+        logger.warning("No valid relationships to create (all below confidence threshold)")
+        return []
 
-            relationship_data.append({
-                "from_block_id": str(proposal.from_block_id),
-                "to_block_id": str(proposal.to_block_id),
-                "relationship_type": proposal.relationship_type,
-                "confidence_score": proposal.confidence_score,
-                "inference_method": proposal.inference_method,
-                "state": state,
-                "metadata": {
-                    "reasoning": proposal.reasoning,
-                    "inferred_by": "batch_relationship_inference_job"
-                }
-            })
-
-        if not relationship_data:
-            logger.warning("No valid relationships to create (all below confidence threshold)")
-            return []
-
-        # Upsert to avoid duplicates
-        response = supabase.table("substrate_relationships").upsert(
+    # Upsert to avoid duplicates
+    response = await asyncio.to_thread(
+        supabase.table("substrate_relationships").upsert(
             relationship_data,
             on_conflict="from_block_id,to_block_id,relationship_type"
-        ).execute()
+        ).execute
+    )
 
-        logger.info(
-            f"Created {len(response.data or [])} relationships "
-            f"(accepted: {len([r for r in relationship_data if r['state'] == 'ACCEPTED'])}, "
-            f"proposed: {len([r for r in relationship_data if r['state'] == 'PROPOSED'])})"
-        )
+    logger.info(
+        f"Created {len(response.data or [])} relationships "
+        f"(accepted: {len([r for r in relationship_data if r['state'] == 'ACCEPTED'])}, "
+        f"proposed: {len([r for r in relationship_data if r['state'] == 'PROPOSED'])})"
+    )
 
-        return response.data or []
-
-    except Exception as exc:
-        logger.error(f"Failed to create relationships batch: {exc}")
-        return []
+    return response.data or []
 
 
 async def batch_infer_for_workspace(
     workspace_id: str,
     batch_size: int = 10,
-    dry_run: bool = False
+    dry_run: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    rate_limiter: Optional[OpenAIRateLimiter] = None,
+    checkpoint: Optional[BackfillCheckpoint] = None
 ) -> dict:
     """
     Infer relationships for all baskets in a workspace.
 
+    All baskets share one rate limiter so the workspace as a whole stays
+    within OpenAI limits.
+
     Args:
         workspace_id: Workspace UUID
-        batch_size: Number of blocks to process concurrently per basket
+        batch_size: Proposals buffered per relationship write
         dry_run: If True, only log proposals without creating relationships
+        workers: Number of blocks processed concurrently per basket
+        rate_limiter: Shared OpenAI limiter (one is created if omitted)
+        checkpoint: Progress tracker for resumable runs (optional)
 
     Returns:
         Aggregated statistics dict
@@ -232,10 +331,12 @@ async def batch_infer_for_workspace(
         }
 
     logger.info(f"Processing {len(basket_ids)} baskets")
+    rate_limiter = rate_limiter or OpenAIRateLimiter()
 
     total_stats = {
         "baskets_processed": 0,
         "blocks_processed": 0,
+        "blocks_skipped": 0,
         "proposals_generated": 0,
         "relationships_created": 0,
         "high_confidence": 0,
@@ -250,11 +351,15 @@ async def batch_infer_for_workspace(
             basket_stats = await batch_infer_relationships(
                 basket_id=basket_id,
                 batch_size=batch_size,
-                dry_run=dry_run
+                dry_run=dry_run,
+                workers=workers,
+                rate_limiter=rate_limiter,
+                checkpoint=checkpoint
             )
 
             total_stats["baskets_processed"] += 1
             total_stats["blocks_processed"] += basket_stats["blocks_processed"]
+            total_stats["blocks_skipped"] += basket_stats["blocks_skipped"]
             total_stats["proposals_generated"] += basket_stats["proposals_generated"]
             total_stats["relationships_created"] += basket_stats["relationships_created"]
             total_stats["high_confidence"] += basket_stats["high_confidence"]
@@ -275,7 +380,12 @@ async def main():
     parser = argparse.ArgumentParser(description="Batch infer semantic relationships")
     parser.add_argument("--workspace-id", type=str, help="Workspace UUID (process all baskets)")
     parser.add_argument("--basket-id", type=str, help="Basket UUID (process single basket)")
-    parser.add_argument("--batch-size", type=int, default=10, help="Concurrent blocks per batch")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Blocks processed concurrently")
+    parser.add_argument("--batch-size", type=int, default=10, help="Proposals buffered per relationship write")
+    parser.add_argument("--rpm", type=int, default=None, help="OpenAI requests per minute budget")
+    parser.add_argument("--tpm", type=int, default=None, help="OpenAI tokens per minute budget")
+    parser.add_argument("--run-id", type=str, default=None, help="Checkpoint run id (default: derived from target id)")
+    parser.add_argument("--restart", action="store_true", help="Discard checkpoints for this run and start over")
     parser.add_argument("--dry-run", action="store_true", help="Log proposals without creating relationships")
 
     args = parser.parse_args()
@@ -284,17 +394,36 @@ async def main():
         print("Error: Must specify either --workspace-id or --basket-id")
         return
 
+    limiter_kwargs = {}
+    if args.rpm:
+        limiter_kwargs["rpm"] = args.rpm
+    if args.tpm:
+        limiter_kwargs["tpm"] = args.tpm
+    rate_limiter = OpenAIRateLimiter(**limiter_kwargs)
+
+    run_id = args.run_id or f"{JOB_NAME}:{args.workspace_id or args.basket_id}"
+    checkpoint = BackfillCheckpoint(JOB_NAME, run_id)
+    if args.restart:
+        await checkpoint.reset()
+    print(f"Checkpoint run id: {run_id}")
+
     if args.workspace_id:
         stats = await batch_infer_for_workspace(
             workspace_id=args.workspace_id,
             batch_size=args.batch_size,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            workers=args.workers,
+            rate_limiter=rate_limiter,
+            checkpoint=checkpoint
         )
     else:
         stats = await batch_infer_relationships(
             basket_id=args.basket_id,
             batch_size=args.batch_size,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            workers=args.workers,
+            rate_limiter=rate_limiter,
+            checkpoint=checkpoint
         )
 
     print("\n" + "="*60)
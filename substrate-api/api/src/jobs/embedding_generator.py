@@ -6,28 +6,43 @@ blocking P1 agent operations. This job is triggered after governance approval.
 
 Design:
 - Runs as background worker (non-blocking)
-- Processes blocks in batches for efficiency
 - Idempotent (skips blocks that already have embeddings)
 - Graceful error handling (logs errors, continues processing)
 
+Bulk backfill mode (process_basket_embeddings / process_workspace_embeddings):
+- Blocks are paged with keyset pagination (id > last_id ORDER BY id)
+- Each page is embedded with as few ``embeddings.create`` calls as possible,
+  packing texts up to a token budget per call (--batch-tokens)
+- Texts already in the embedding cache are not sent to the API
+- Each page is written back with one fn_set_block_embeddings call
+- Several baskets run concurrently (--concurrency) under one shared
+  OpenAIRateLimiter, so total RPM/TPM stays within quota
+
 Usage:
     # Trigger for single block (after governance approval)
     await queue_embedding_generation(supabase, block_id)
 
     # Batch processing (backfill)
-    python -m api.src.jobs.embedding_generator --workspace-id <uuid>
+    python -m api.src.jobs.embedding_generator --workspace-id <uuid> --concurrency 4
 
 Reference: docs/V3.1_IMPLEMENTATION_SEQUENCING.md Week 1
 """
 
 import asyncio
 import logging
+import os
 import sys
-from typing import Optional, List
-from uuid import UUID
+from typing import Dict, List, Optional
 
 from infra.utils.supabase_client import supabase_admin_client as supabase
-from infra.substrate.services.semantic_primitives import generate_and_store_embedding
+from jobs.progress import ThroughputReporter
+from services.embedding_cache import get_embedding_cache, normalize_embedding_text
+from services.rate_limiter import OpenAIRateLimiter
+from services.semantic_primitives import (
+    EMBEDDING_MODEL,
+    generate_and_store_embedding,
+    get_embedding_engine,
+)
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -35,8 +50,12 @@ logger = logging.getLogger("uvicorn.error")
 # Configuration
 # ============================================================================
 
-BATCH_SIZE = 50  # Process 50 blocks at a time
-RATE_LIMIT_DELAY = 0.5  # 500ms between blocks (OpenAI rate limiting)
+BATCH_SIZE = int(os.getenv("EMBEDDING_BACKFILL_PAGE_SIZE", "200"))  # Blocks per page (one DB write each)
+DEFAULT_BATCH_TOKENS = int(os.getenv("EMBEDDING_BACKFILL_BATCH_TOKENS", "100000"))  # Per embeddings.create call
+DEFAULT_CONCURRENCY = int(os.getenv("EMBEDDING_BACKFILL_CONCURRENCY", "4"))  # Baskets in flight
+MAX_INPUTS_PER_REQUEST = 2048  # OpenAI embeddings input array limit
+
+EMBEDDABLE_STATES = ['ACCEPTED', 'LOCKED', 'CONSTANT']
 
 # ============================================================================
 # Queue Management (Simple Implementation)
@@ -76,90 +95,252 @@ async def queue_embedding_generation(block_id: str) -> bool:
 # Batch Processing (Backfill / Catch-up)
 # ============================================================================
 
-async def process_basket_embeddings(basket_id: str) -> dict:
+def _block_embedding_text(block: dict) -> str:
+    # Same text as generate_and_store_embedding, so cache entries are shared
+    return normalize_embedding_text(f"{block.get('title') or ''} {block.get('content') or ''}")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def pack_token_batches(
+    items: List[dict],
+    batch_tokens: int,
+    max_inputs: int = MAX_INPUTS_PER_REQUEST,
+) -> List[List[dict]]:
+    """
+    Greedily pack items (each with a 'tokens' estimate) into API batches.
+
+    A batch closes once adding the next item would exceed ``batch_tokens`` or
+    ``max_inputs``; an item larger than the budget gets a batch of its own.
+    """
+    batches: List[List[dict]] = []
+    current: List[dict] = []
+    current_tokens = 0
+    for item in items:
+        if current and (current_tokens + item['tokens'] > batch_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += item['tokens']
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _count_pending_blocks(basket_id: str) -> int:
+    response = await asyncio.to_thread(
+        supabase.table('blocks').select('id', count='exact').eq(
+            'basket_id', str(basket_id)
+        ).in_(
+            'state', EMBEDDABLE_STATES
+        ).is_(
+            'embedding', 'null'
+        ).limit(1).execute
+    )
+    return response.count or 0
+
+
+async def _fetch_page(basket_id: str, after_id: Optional[str], page_size: int) -> List[dict]:
+    """Next page of ACCEPTED blocks without embeddings, keyset-paginated by id."""
+    query = supabase.table('blocks').select('id, title, content').eq(
+        'basket_id', str(basket_id)
+    ).in_(
+        'state', EMBEDDABLE_STATES
+    ).is_(
+        'embedding', 'null'
+    )
+    if after_id:
+        query = query.gt('id', after_id)
+    response = await asyncio.to_thread(query.order('id').limit(page_size).execute)
+    return response.data or []
+
+
+async def _embed_page(
+    items: List[dict],
+    batch_tokens: int,
+    rate_limiter: OpenAIRateLimiter,
+    stats: dict,
+) -> Dict[str, List[float]]:
+    """Embed one page of items; returns {block_id: vector} for successes."""
+    cache = get_embedding_cache()
+    texts = [item['text'] for item in items]
+    try:
+        cached = await asyncio.to_thread(cache.get_many, EMBEDDING_MODEL, texts)
+    except Exception as exc:
+        logger.warning(f"Embedding cache lookup failed: {exc}")
+        cached = [None] * len(items)
+
+    vectors: Dict[str, List[float]] = {}
+    misses = []
+    for item, vector in zip(items, cached):
+        if vector is not None:
+            vectors[item['id']] = vector
+            stats['cache_hits'] += 1
+        else:
+            misses.append(item)
+
+    engine = get_embedding_engine()
+    for batch in pack_token_batches(misses, batch_tokens):
+        tokens = sum(item['tokens'] for item in batch)
+        await rate_limiter.acquire(requests=1, tokens=tokens)
+        try:
+            results = await engine.embed_batch([item['text'] for item in batch])
+        except Exception as exc:
+            logger.error(f"Embedding batch of {len(batch)} blocks failed: {exc}")
+            continue
+
+        stats['api_calls'] += 1
+        stats['tokens_estimated'] += tokens
+        fresh = []
+        for item, vector in zip(batch, results):
+            if vector:
+                vectors[item['id']] = vector
+                fresh.append((item['text'], vector))
+        try:
+            await asyncio.to_thread(cache.put_many, EMBEDDING_MODEL, fresh)
+        except Exception as exc:
+            logger.warning(f"Embedding cache write failed: {exc}")
+
+    return vectors
+
+
+async def process_basket_embeddings(
+    basket_id: str,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    page_size: int = BATCH_SIZE,
+    dry_run: bool = False,
+    rate_limiter: Optional[OpenAIRateLimiter] = None,
+) -> dict:
     """
     Generate embeddings for all ACCEPTED blocks in a basket that don't have them.
 
     Args:
         basket_id: Basket to process
+        batch_tokens: Token budget per embeddings.create call
+        page_size: Blocks fetched (and written back) per page
+        dry_run: Only report how many blocks/API calls a real run would need
+        rate_limiter: Shared limiter (pass one when running baskets concurrently)
 
     Returns:
         {
             'basket_id': str,
             'blocks_processed': int,
             'blocks_succeeded': int,
-            'blocks_failed': int
+            'blocks_failed': int,
+            'pages': int,
+            'api_calls': int,
+            'cache_hits': int,
+            'tokens_estimated': int,
+            'dry_run': bool
         }
     """
-    try:
-        # Fetch ACCEPTED blocks without embeddings
-        response = supabase.table('blocks').select('id').eq(
-            'basket_id', str(basket_id)
-        ).in_(
-            'state', ['ACCEPTED', 'LOCKED', 'CONSTANT']
-        ).is_(
-            'embedding', 'null'
-        ).execute()
+    rate_limiter = rate_limiter or OpenAIRateLimiter()
+    stats = {
+        'basket_id': basket_id,
+        'blocks_processed': 0,
+        'blocks_succeeded': 0,
+        'blocks_failed': 0,
+        'pages': 0,
+        'api_calls': 0,
+        'cache_hits': 0,
+        'tokens_estimated': 0,
+        'dry_run': dry_run,
+    }
 
-        if not response.data:
+    try:
+        total = await _count_pending_blocks(basket_id)
+        if total == 0:
             logger.info(f"No blocks need embeddings in basket {basket_id}")
-            return {
-                'basket_id': basket_id,
-                'blocks_processed': 0,
-                'blocks_succeeded': 0,
-                'blocks_failed': 0
-            }
-
-        block_ids = [row['id'] for row in response.data]
-        logger.info(f"Processing {len(block_ids)} blocks in basket {basket_id}")
-
-        succeeded = 0
-        failed = 0
-
-        # Process in batches with rate limiting
-        for block_id in block_ids:
-            try:
-                success = await generate_and_store_embedding(supabase, block_id)
-                if success:
-                    succeeded += 1
+            return stats
+
+        logger.info(f"Processing {total} blocks in basket {basket_id}")
+        reporter = ThroughputReporter(f"basket {basket_id}", total=total)
+        last_id: Optional[str] = None
+
+        while True:
+            page = await _fetch_page(basket_id, last_id, page_size)
+            if not page:
+                break
+            # Advance the cursor even if writes fail, so a bad page cannot loop
+            last_id = page[-1]['id']
+            stats['pages'] += 1
+            stats['blocks_processed'] += len(page)
+
+            items = []
+            for block in page:
+                text = _block_embedding_text(block)
+                if text:
+                    items.append({'id': block['id'], 'text': text, 'tokens': _estimate_tokens(text)})
                 else:
-                    failed += 1
-
-                # Rate limiting (avoid OpenAI quota errors)
-                await asyncio.sleep(RATE_LIMIT_DELAY)
-
-            except Exception as exc:
-                logger.error(f"Failed to process block {block_id}: {exc}")
-                failed += 1
+                    stats['blocks_failed'] += 1
+
+            if dry_run:
+                stats['api_calls'] += len(pack_token_batches(items, batch_tokens))
+                stats['tokens_estimated'] += sum(item['tokens'] for item in items)
+                reporter.record(items=len(page))
+                continue
+
+            vectors = await _embed_page(items, batch_tokens, rate_limiter, stats)
+            if vectors:
+                try:
+                    await asyncio.to_thread(
+                        supabase.rpc('fn_set_block_embeddings', {
+                            'p_items': [
+                                {'id': block_id, 'embedding': vector}
+                                for block_id, vector in vectors.items()
+                            ]
+                        }).execute
+                    )
+                except Exception as exc:
+                    logger.error(f"Bulk embedding write failed for basket {basket_id}: {exc}")
+                    vectors = {}
+
+            failed = len(items) - len(vectors)
+            stats['blocks_succeeded'] += len(vectors)
+            stats['blocks_failed'] += failed
+            reporter.record(
+                items=len(page),
+                tokens=sum(item['tokens'] for item in items if item['id'] in vectors),
+                errors=failed,
+            )
+
+        throughput = reporter.report(final=True)
+        stats['blocks_per_second'] = throughput['items_per_second']
+        stats['tokens_per_second'] = throughput['tokens_per_second']
 
         logger.info(
-            f"Basket {basket_id} complete: {succeeded} succeeded, {failed} failed"
+            f"Basket {basket_id} complete: {stats['blocks_succeeded']} succeeded, "
+            f"{stats['blocks_failed']} failed, {stats['api_calls']} API calls"
         )
-
-        return {
-            'basket_id': basket_id,
-            'blocks_processed': len(block_ids),
-            'blocks_succeeded': succeeded,
-            'blocks_failed': failed
-        }
+        return stats
 
     except Exception as exc:
         logger.error(f"process_basket_embeddings failed for {basket_id}: {exc}")
-        return {
-            'basket_id': basket_id,
-            'blocks_processed': 0,
-            'blocks_succeeded': 0,
-            'blocks_failed': 0,
-            'error': str(exc)
-        }
+        stats['error'] = str(exc)
+        return stats
 
 
-async def process_workspace_embeddings(workspace_id: str) -> dict:
+async def process_workspace_embeddings(
+    workspace_id: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    dry_run: bool = False,
+    rate_limiter: Optional[OpenAIRateLimiter] = None,
+) -> dict:
     """
     Generate embeddings for all ACCEPTED blocks in a workspace.
 
+    Up to ``concurrency`` baskets are processed at once; all of them draw from
+    the same rate limiter.
+
     Args:
         workspace_id: Workspace to process
+        concurrency: Baskets processed concurrently
+        batch_tokens: Token budget per embeddings.create call
+        dry_run: Only report what a real run would do
+        rate_limiter: Shared limiter (defaults to OPENAI_RPM_LIMIT/OPENAI_TPM_LIMIT)
 
     Returns:
         {
@@ -167,14 +348,18 @@ async def process_workspace_embeddings(workspace_id: str) -> dict:
             'baskets_processed': int,
             'total_blocks_succeeded': int,
             'total_blocks_failed': int,
+            'total_api_calls': int,
             'basket_results': [...]
         }
     """
+    rate_limiter = rate_limiter or OpenAIRateLimiter()
     try:
         # Fetch all baskets in workspace
-        response = supabase.table('baskets').select('id').eq(
-            'workspace_id', str(workspace_id)
-        ).execute()
+        response = await asyncio.to_thread(
+            supabase.table('baskets').select('id').eq(
+                'workspace_id', str(workspace_id)
+            ).execute
+        )
 
         if not response.data:
             logger.warning(f"No baskets found in workspace {workspace_id}")
@@ -183,21 +368,30 @@ async def process_workspace_embeddings(workspace_id: str) -> dict:
                 'baskets_processed': 0,
                 'total_blocks_succeeded': 0,
                 'total_blocks_failed': 0,
+                'total_api_calls': 0,
                 'basket_results': []
             }
 
         basket_ids = [row['id'] for row in response.data]
-        logger.info(f"Processing {len(basket_ids)} baskets in workspace {workspace_id}")
+        logger.info(
+            f"Processing {len(basket_ids)} baskets in workspace {workspace_id} "
+            f"(concurrency={concurrency})"
+        )
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        basket_results = []
-        total_succeeded = 0
-        total_failed = 0
+        async def run_basket(basket_id: str) -> dict:
+            async with semaphore:
+                return await process_basket_embeddings(
+                    basket_id,
+                    batch_tokens=batch_tokens,
+                    dry_run=dry_run,
+                    rate_limiter=rate_limiter,
+                )
 
-        for basket_id in basket_ids:
-            result = await process_basket_embeddings(basket_id)
-            basket_results.append(result)
-            total_succeeded += result['blocks_succeeded']
-            total_failed += result['blocks_failed']
+        basket_results = list(await asyncio.gather(*(run_basket(b) for b in basket_ids)))
+        total_succeeded = sum(r['blocks_succeeded'] for r in basket_results)
+        total_failed = sum(r['blocks_failed'] for r in basket_results)
 
         logger.info(
             f"Workspace {workspace_id} complete: {total_succeeded} succeeded, {total_failed} failed"
@@ -208,6 +402,7 @@ async def process_workspace_embeddings(workspace_id: str) -> dict:
             'baskets_processed': len(basket_ids),
             'total_blocks_succeeded': total_succeeded,
             'total_blocks_failed': total_failed,
+            'total_api_calls': sum(r['api_calls'] for r in basket_results),
             'basket_results': basket_results
         }
 
@@ -218,6 +413,7 @@ async def process_workspace_embeddings(workspace_id: str) -> dict:
             'baskets_processed': 0,
             'total_blocks_succeeded': 0,
             'total_blocks_failed': 0,
+            'total_api_calls': 0,
             'error': str(exc)
         }
 
@@ -236,6 +432,9 @@ async def main():
 
         # Process specific basket
         python -m api.src.jobs.embedding_generator --basket-id <uuid>
+
+        # Estimate work without calling OpenAI or writing
+        python -m api.src.jobs.embedding_generator --workspace-id <uuid> --dry-run
     """
     import argparse
 
@@ -252,6 +451,23 @@ async def main():
         type=str,
         help='Process specific basket'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Baskets processed concurrently (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--batch-tokens',
+        type=int,
+        default=DEFAULT_BATCH_TOKENS,
+        help=f'Token budget per embeddings API call (default: {DEFAULT_BATCH_TOKENS})'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Count blocks and API calls without embedding or writing'
+    )
 
     args = parser.parse_args()
 
@@ -267,14 +483,20 @@ async def main():
     try:
         if args.workspace_id:
             logger.info(f"Starting workspace embedding generation: {args.workspace_id}")
-            result = await process_workspace_embeddings(args.workspace_id)
+            result = await process_workspace_embeddings(
+                args.workspace_id,
+                concurrency=args.concurrency,
+                batch_tokens=args.batch_tokens,
+                dry_run=args.dry_run,
+            )
             print("\n" + "="*60)
-            print("WORKSPACE EMBEDDING GENERATION COMPLETE")
+            print("WORKSPACE EMBEDDING GENERATION COMPLETE" + (" (DRY RUN)" if args.dry_run else ""))
             print("="*60)
             print(f"Workspace ID: {result['workspace_id']}")
             print(f"Baskets Processed: {result['baskets_processed']}")
             print(f"Total Blocks Succeeded: {result['total_blocks_succeeded']}")
             print(f"Total Blocks Failed: {result['total_blocks_failed']}")
+            print(f"Total API Calls: {result['total_api_calls']}")
             print("="*60 + "\n")
 
             if result['total_blocks_failed'] > 0:
@@ -282,14 +504,19 @@ async def main():
 
         elif args.basket_id:
             logger.info(f"Starting basket embedding generation: {args.basket_id}")
-            result = await process_basket_embeddings(args.basket_id)
+            result = await process_basket_embeddings(
+                args.basket_id,
+                batch_tokens=args.batch_tokens,
+                dry_run=args.dry_run,
+            )
             print("\n" + "="*60)
-            print("BASKET EMBEDDING GENERATION COMPLETE")
+            print("BASKET EMBEDDING GENERATION COMPLETE" + (" (DRY RUN)" if args.dry_run else ""))
             print("="*60)
             print(f"Basket ID: {result['basket_id']}")
             print(f"Blocks Processed: {result['blocks_processed']}")
             print(f"Blocks Succeeded: {result['blocks_succeeded']}")
             print(f"Blocks Failed: {result['blocks_failed']}")
+            print(f"API Calls: {result['api_calls']} ({result['cache_hits']} cache hits)")
             print("="*60 + "\n")
 
             if result['blocks_failed'] > 0:
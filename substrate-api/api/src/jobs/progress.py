@@ -0,0 +1,156 @@
+"""
+Progress tracking for backfill jobs: resumable checkpoints and throughput.
+
+Backfills over large workspaces take long enough that crashes and deploys
+interrupt them. Each job records completed items in ``backfill_progress``
+keyed by (job_name, run_id, basket_id, item_id); a restarted run with the
+same run id skips everything already recorded.
+
+Writes are buffered and flushed in small batches (or every
+CHECKPOINT_FLUSH_SECONDS) so checkpointing does not add a round trip per
+block. At most one unflushed batch is redone after a crash, which is safe
+because every backfill step is idempotent.
+
+ThroughputReporter prints per-basket items/s and tokens/s to stdout while a
+backfill runs, so operators can see whether rate limits are the bottleneck.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Set
+
+from infra.utils.supabase_client import supabase_admin_client as supabase
+
+logger = logging.getLogger("uvicorn.error")
+
+BACKFILL_PROGRESS_TABLE = "backfill_progress"
+CHECKPOINT_FLUSH_SIZE = 25
+CHECKPOINT_FLUSH_SECONDS = 30.0
+
+
+class BackfillCheckpoint:
+    """Tracks completed items for one (job_name, run_id) backfill run."""
+
+    def __init__(
+        self,
+        job_name: str,
+        run_id: str,
+        flush_size: int = CHECKPOINT_FLUSH_SIZE,
+        flush_interval_seconds: float = CHECKPOINT_FLUSH_SECONDS,
+    ) -> None:
+        self.job_name = job_name
+        self.run_id = run_id
+        self.flush_size = max(1, flush_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._buffer: List[Dict[str, str]] = []
+        self._lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+
+    async def completed_items(self, basket_id: str) -> Set[str]:
+        """Item ids already completed for this basket in this run."""
+        try:
+            resp = await asyncio.to_thread(
+                supabase.table(BACKFILL_PROGRESS_TABLE)
+                .select("item_id")
+                .eq("job_name", self.job_name)
+                .eq("run_id", self.run_id)
+                .eq("basket_id", str(basket_id))
+                .execute
+            )
+            return {row["item_id"] for row in resp.data or []}
+        except Exception as exc:
+            logger.warning(f"Checkpoint lookup failed ({self.job_name}/{self.run_id}): {exc}")
+            return set()
+
+    async def mark_completed(self, basket_id: str, item_ids: Iterable[str]) -> None:
+        async with self._lock:
+            self._buffer.extend(
+                {
+                    "job_name": self.job_name,
+                    "run_id": self.run_id,
+                    "basket_id": str(basket_id),
+                    "item_id": str(item_id),
+                }
+                for item_id in item_ids
+            )
+            if (
+                len(self._buffer) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval_seconds
+            ):
+                await self._flush_locked()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(
+                supabase.table(BACKFILL_PROGRESS_TABLE)
+                .upsert(rows, on_conflict="job_name,run_id,basket_id,item_id")
+                .execute
+            )
+        except Exception as exc:
+            # Losing a checkpoint only means redoing idempotent work on restart
+            logger.warning(f"Checkpoint flush failed ({self.job_name}/{self.run_id}): {exc}")
+
+    async def reset(self) -> None:
+        """Forget all progress for this run (used by --restart)."""
+        async with self._lock:
+            self._buffer = []
+        await asyncio.to_thread(
+            supabase.table(BACKFILL_PROGRESS_TABLE)
+            .delete()
+            .eq("job_name", self.job_name)
+            .eq("run_id", self.run_id)
+            .execute
+        )
+
+
+class ThroughputReporter:
+    """Periodic per-basket throughput line (items/s, tokens/s) on stdout."""
+
+    def __init__(self, label: str, total: int, unit: str = "blocks", interval_seconds: float = 10.0) -> None:
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval_seconds = interval_seconds
+        self.items = 0
+        self.tokens = 0
+        self.errors = 0
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    def record(self, items: int = 1, tokens: int = 0, errors: int = 0) -> None:
+        self.items += items
+        self.tokens += tokens
+        self.errors += errors
+        now = time.monotonic()
+        if now - self._last_report >= self.interval_seconds:
+            self._last_report = now
+            self.report()
+
+    def report(self, final: bool = False) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        stats = {
+            "items_per_second": self.items / elapsed,
+            "tokens_per_second": self.tokens / elapsed,
+            "elapsed_seconds": elapsed,
+        }
+        prefix = "DONE" if final else "PROGRESS"
+        print(
+            f"[{prefix}] {self.label}: {self.items}/{self.total} {self.unit} "
+            f"({stats['items_per_second']:.2f} {self.unit}/s, "
+            f"{stats['tokens_per_second']:.0f} tokens/s, "
+            f"errors={self.errors}, elapsed={elapsed:.1f}s)",
+            flush=True,
+        )
+        return stats
+
+
+__all__ = ["BackfillCheckpoint", "ThroughputReporter"]
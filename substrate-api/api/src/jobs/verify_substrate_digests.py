@@ -0,0 +1,101 @@
+"""
+Substrate digest verification job.
+
+P3/P4 freshness reads per-basket digests that database triggers maintain
+incrementally (basket_substrate_digest). This job recomputes them from
+scratch and reports drift, e.g. after bulk imports with triggers disabled.
+
+Usage:
+    # Report drift for one basket
+    python -m api.src.jobs.verify_substrate_digests --basket-id <uuid>
+
+    # Verify and repair every basket in a workspace
+    python -m api.src.jobs.verify_substrate_digests --workspace-id <uuid> --repair
+"""
+
+import asyncio
+import logging
+import sys
+from typing import List
+
+from infra.utils.supabase_client import supabase_admin_client as supabase
+from lib.freshness import verify_basket_digest
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def verify_baskets(basket_ids: List[str], repair: bool = False) -> dict:
+    """
+    Verify substrate digests for several baskets.
+
+    Returns:
+        {
+            'baskets_checked': int,
+            'baskets_drifted': [basket_id, ...],
+            'baskets_repaired': int
+        }
+    """
+    drifted = []
+    repaired = 0
+    for basket_id in basket_ids:
+        try:
+            result = await asyncio.to_thread(verify_basket_digest, supabase, basket_id, repair)
+        except Exception as exc:
+            logger.error(f"Digest verification failed for basket {basket_id}: {exc}")
+            continue
+        if result['drift']:
+            drifted.append(basket_id)
+            mismatched = [t for t, entry in result['types'].items() if not entry['match']]
+            print(f"[DRIFT] basket {basket_id}: {', '.join(mismatched)}", flush=True)
+        if result['repaired']:
+            repaired += 1
+
+    return {
+        'baskets_checked': len(basket_ids),
+        'baskets_drifted': drifted,
+        'baskets_repaired': repaired,
+    }
+
+
+async def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Verify incremental substrate digests against a full recompute'
+    )
+    parser.add_argument('--workspace-id', type=str, help='Verify all baskets in workspace')
+    parser.add_argument('--basket-id', type=str, help='Verify specific basket')
+    parser.add_argument('--repair', action='store_true', help='Rebuild drifted digests in the database')
+
+    args = parser.parse_args()
+
+    if not args.workspace_id and not args.basket_id:
+        parser.error("Must specify either --workspace-id or --basket-id")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s'
+    )
+
+    if args.basket_id:
+        basket_ids = [args.basket_id]
+    else:
+        response = supabase.table('baskets').select('id').eq('workspace_id', args.workspace_id).execute()
+        basket_ids = [row['id'] for row in response.data or []]
+
+    result = await verify_baskets(basket_ids, repair=args.repair)
+
+    print("\n" + "="*60)
+    print("SUBSTRATE DIGEST VERIFICATION COMPLETE")
+    print("="*60)
+    print(f"Baskets Checked: {result['baskets_checked']}")
+    print(f"Baskets Drifted: {len(result['baskets_drifted'])}")
+    print(f"Baskets Repaired: {result['baskets_repaired']}")
+    print("="*60 + "\n")
+
+    if result['baskets_drifted'] and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -7,6 +7,15 @@ NOT time-based thresholds (per YARNNN Canon v3.1).
 Freshness Model:
   Staleness = f(substrate_hash_changed, graph_topology_changed, temporal_scope_invalid)
 
+Hashes come from per-basket digests maintained incrementally by database
+triggers (basket_substrate_digest), so a staleness check is one small read
+instead of a scan of the whole basket. verify_basket_digest() recomputes
+from scratch to detect drift.
+
+Snapshots of (id, content_hash) pairs stored per substrate_hash make
+compute_substrate_diff exact, so regeneration can work from the changed
+rows only.
+
 V3.0 Migration Completed:
 - Removed context_items references (merged into blocks table)
 - Updated state queries to use V3.0 enum values (ACCEPTED, LOCKED, CONSTANT)
@@ -14,8 +23,10 @@ V3.0 Migration Completed:
 
 
 import hashlib
-from typing import Optional, Dict, Any, List
+import logging
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
 from uuid import UUID
 
 from typing import TYPE_CHECKING
@@ -25,90 +36,260 @@ if TYPE_CHECKING:
 else:
     Client = object  # Runtime placeholder
 
+logger = logging.getLogger("uvicorn.error")
 
-def compute_basket_substrate_hash(supabase: Client, basket_id: str) -> str:
-    """
-    Compute deterministic hash of basket's current substrate state (V3.0 compliant).
 
-    Includes:
-    - All ACCEPTED+ blocks (content + semantic_type)
-    - All raw_dumps (body_md)
-    - All timeline_events (event_type + summary)
+ACCEPTED_STATES = ['ACCEPTED', 'LOCKED', 'CONSTANT']
 
-    V3.0 Changes:
-    - context_items removed (merged into blocks)
-    - Query blocks with ACCEPTED, LOCKED, CONSTANT states only
+DIGEST_TABLE = 'basket_substrate_digest'
+SUBSTRATE_DIGEST_TYPES = ('block', 'dump', 'event')
+GRAPH_DIGEST_TYPES = ('relationship',)
+ALL_DIGEST_TYPES = SUBSTRATE_DIGEST_TYPES + GRAPH_DIGEST_TYPES
 
-    Returns SHA256 hex digest.
-    """
-    hasher = hashlib.sha256()
+SNAPSHOT_TABLE = 'substrate_snapshots'
+SNAPSHOT_TYPES = SUBSTRATE_DIGEST_TYPES
 
-    # Fetch all substrate ordered deterministically
-    blocks = supabase.table('blocks').select('id, content, semantic_type').eq(
-        'basket_id', basket_id
-    ).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT']).order('created_at').execute()
+# PostgREST encodes in_() filters in the URL; keep id lists bounded
+_IN_CHUNK_SIZE = 200
 
-    dumps = supabase.table('raw_dumps').select('id, body_md').eq(
-        'basket_id', basket_id
-    ).order('created_at').execute()
 
-    events = supabase.table('timeline_events').select('id, kind, preview').eq(
-        'basket_id', basket_id
-    ).order('ts').execute()
+# =============================================================================
+# Row digests
+#
+# Each substrate row hashes to sha256(row text) split into four signed 64-bit
+# words. A basket's digest per substrate type is the XOR of its row hashes
+# plus a row count, so it can be maintained incrementally: the
+# basket_substrate_digest table is updated by triggers on every write
+# (supabase/migrations/20261016_basket_substrate_digest.sql). The row texts
+# below must stay byte-identical to the fn_*_digest_text SQL functions.
+# =============================================================================
+
+def block_digest_text(block: Dict[str, Any]) -> str:
+    return f"block:{block['id']}:{block.get('semantic_type') or ''}:{block.get('content') or ''}"
 
-    # Hash each substrate component
-    for block in blocks.data:
-        hasher.update(f"block:{block['id']}:{block['semantic_type']}:{block.get('content', '')}".encode())
 
-    for dump in dumps.data:
-        hasher.update(f"dump:{dump['id']}:{dump.get('body_md', '')}".encode())
+def dump_digest_text(dump: Dict[str, Any]) -> str:
+    return f"dump:{dump['id']}:{dump.get('body_md') or ''}"
 
-    for event in events.data:
-        hasher.update(f"event:{event['id']}:{event['kind']}:{event.get('preview', '')}".encode())
 
+def event_digest_text(event: Dict[str, Any]) -> str:
+    return f"event:{event['id']}:{event.get('kind') or ''}:{event.get('preview') or ''}"
+
+
+def relationship_digest_text(rel: Dict[str, Any]) -> str:
+    confidence = rel.get('confidence_score')
+    # Mirrors SQL round(numeric): the value is cast to numeric from its shortest
+    # text form, then rounded half away from zero
+    scaled = Decimal(str(0.5 if confidence is None else confidence)) * 100
+    confidence_pct = int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return (
+        f"rel:{rel['from_block_id']}:{rel['to_block_id']}:"
+        f"{rel['relationship_type']}:{confidence_pct}"
+    )
+
+
+def _row_hash(text: str) -> List[int]:
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return [int.from_bytes(digest[i:i + 8], 'big', signed=True) for i in range(0, 32, 8)]
+
+
+def _empty_digest() -> Dict[str, int]:
+    return {'row_count': 0, 'd0': 0, 'd1': 0, 'd2': 0, 'd3': 0}
+
+
+def _accumulate(texts) -> Dict[str, int]:
+    digest = _empty_digest()
+    for text in texts:
+        for i, word in enumerate(_row_hash(text)):
+            digest[f'd{i}'] ^= word
+        digest['row_count'] += 1
+    return digest
+
+
+def _combine_digests(digests: Dict[str, Dict[str, int]], types) -> str:
+    """Fold per-type digests into the hex hash stored on artifacts."""
+    hasher = hashlib.sha256()
+    for substrate_type in types:
+        d = digests.get(substrate_type) or _empty_digest()
+        hasher.update(
+            f"{substrate_type}:{d['row_count']}:{d['d0']}:{d['d1']}:{d['d2']}:{d['d3']}|".encode()
+        )
     return hasher.hexdigest()
 
 
+def _read_basket_digests(supabase: Client, basket_id: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """Maintained per-type digests (one small read), or None if unavailable."""
+    try:
+        result = supabase.table(DIGEST_TABLE).select(
+            'substrate_type, row_count, d0, d1, d2, d3'
+        ).eq('basket_id', basket_id).execute()
+    except Exception as exc:
+        # Migration not applied yet: fall back to a full scan
+        logger.warning(f"Substrate digest read failed for basket {basket_id}: {exc}")
+        return None
+    return {
+        row['substrate_type']: {k: int(row[k]) for k in ('row_count', 'd0', 'd1', 'd2', 'd3')}
+        for row in result.data or []
+    }
+
+
+def recompute_basket_digests(
+    supabase: Client,
+    basket_id: str,
+    types=ALL_DIGEST_TYPES,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Recompute per-type digests from scratch (O(basket size) scan).
+
+    Used when the maintained digests are unavailable and by
+    verify_basket_digest() to detect drift.
+    """
+    digests: Dict[str, Dict[str, int]] = {}
+
+    if 'block' in types:
+        blocks = supabase.table('blocks').select('id, content, semantic_type').eq(
+            'basket_id', basket_id
+        ).in_('state', ACCEPTED_STATES).execute()
+        digests['block'] = _accumulate(block_digest_text(b) for b in blocks.data or [])
+
+    if 'dump' in types:
+        dumps = supabase.table('raw_dumps').select('id, body_md').eq(
+            'basket_id', basket_id
+        ).execute()
+        digests['dump'] = _accumulate(dump_digest_text(d) for d in dumps.data or [])
+
+    if 'event' in types:
+        events = supabase.table('timeline_events').select('id, kind, preview').eq(
+            'basket_id', basket_id
+        ).execute()
+        digests['event'] = _accumulate(event_digest_text(e) for e in events.data or [])
+
+    if 'relationship' in types:
+        # Relationships belong to the basket of their from_block
+        blocks = supabase.table('blocks').select('id').eq('basket_id', basket_id).execute()
+        block_ids = [block['id'] for block in blocks.data or []]
+        relationships: List[Dict[str, Any]] = []
+        for i in range(0, len(block_ids), _IN_CHUNK_SIZE):
+            chunk = supabase.table('substrate_relationships').select(
+                'from_block_id, to_block_id, relationship_type, confidence_score'
+            ).in_('from_block_id', block_ids[i:i + _IN_CHUNK_SIZE]).in_(
+                'state', ACCEPTED_STATES
+            ).execute()
+            relationships.extend(chunk.data or [])
+        digests['relationship'] = _accumulate(relationship_digest_text(r) for r in relationships)
+
+    return digests
+
+
+def get_basket_digests(supabase: Client, basket_id: str) -> Dict[str, str]:
+    """
+    Current substrate_hash and graph_signature for a basket.
+
+    O(1): reads the trigger-maintained basket_substrate_digest rows. Falls
+    back to a full recompute when the digest table is unavailable.
+
+    Returns {"substrate_hash": str, "graph_signature": str}
+    """
+    digests = _read_basket_digests(supabase, basket_id)
+    if digests is None:
+        digests = recompute_basket_digests(supabase, basket_id)
+    return {
+        'substrate_hash': _combine_digests(digests, SUBSTRATE_DIGEST_TYPES),
+        'graph_signature': _combine_digests(digests, GRAPH_DIGEST_TYPES),
+    }
+
+
+def compute_basket_substrate_hash(supabase: Client, basket_id: str) -> str:
+    """
+    Deterministic hash of basket's current substrate state (V3.0 compliant).
+
+    Includes:
+    - All ACCEPTED+ blocks (content + semantic_type)
+    - All raw_dumps (body_md)
+    - All timeline_events (kind + preview)
+
+    Read from the maintained per-basket digest rather than scanning the
+    basket (see get_basket_digests).
+
+    Returns SHA256 hex digest.
+    """
+    digests = _read_basket_digests(supabase, basket_id)
+    if digests is None:
+        digests = recompute_basket_digests(supabase, basket_id, SUBSTRATE_DIGEST_TYPES)
+    return _combine_digests(digests, SUBSTRATE_DIGEST_TYPES)
+
+
 def compute_graph_signature(supabase: Client, basket_id: str) -> str:
     """
-    Compute deterministic signature of basket's relationship graph topology (V3.1 compliant).
+    Deterministic signature of basket's relationship graph topology (V3.1 compliant).
 
-    Captures:
-    - All substrate_relationships (from_block_id, to_block_id, relationship_type)
-    - Ordered by creation to ensure determinism
+    Captures all ACCEPTED+ substrate_relationships whose from_block is in the
+    basket (from_block_id, to_block_id, relationship_type, confidence_score).
 
-    V3.1 Changes:
-    - substrate_relationships is graph edge table (no basket_id column)
-    - Must join through blocks table to filter by basket
-    - Uses from_block_id/to_block_id (not from_type/from_id)
+    Read from the maintained per-basket digest rather than scanning the
+    basket (see get_basket_digests).
 
     Returns SHA256 hex digest.
     """
-    hasher = hashlib.sha256()
+    digests = _read_basket_digests(supabase, basket_id)
+    if digests is None:
+        digests = recompute_basket_digests(supabase, basket_id, GRAPH_DIGEST_TYPES)
+    return _combine_digests(digests, GRAPH_DIGEST_TYPES)
 
-    # Get all blocks in basket first
-    blocks = supabase.table('blocks').select('id').eq('basket_id', basket_id).in_(
-        'state', ['ACCEPTED', 'LOCKED', 'CONSTANT']
-    ).execute()
 
-    block_ids = [block['id'] for block in blocks.data] if blocks.data else []
+def verify_basket_digest(supabase: Client, basket_id: str, repair: bool = False) -> Dict[str, Any]:
+    """
+    Verification mode: recompute digests from scratch and report drift.
 
-    if not block_ids:
-        return hasher.hexdigest()  # Empty basket = empty hash
+    Drift means a write bypassed the triggers (or they were disabled). With
+    repair=True the digest is rebuilt inside the database by
+    fn_rebuild_basket_substrate_digest. The Python recomputation only reports
+    drift: its reads are capped per table, are not transactional, and race
+    the triggers, so writing it back could replace a correct digest.
 
-    # Get relationships where from_block is in this basket
-    relationships = supabase.table('substrate_relationships').select(
-        'from_block_id, to_block_id, relationship_type, confidence_score'
-    ).in_('from_block_id', block_ids).in_(
-        'state', ['ACCEPTED', 'LOCKED', 'CONSTANT']
-    ).order('created_at').execute()
+    Returns:
+    {
+        "basket_id": str,
+        "drift": bool,
+        "types": {substrate_type: {"match": bool, "maintained": {...}, "recomputed": {...}}},
+        "substrate_hash": str (recomputed),
+        "graph_signature": str (recomputed),
+        "repaired": bool
+    }
+    """
+    maintained = _read_basket_digests(supabase, basket_id) or {}
+    recomputed = recompute_basket_digests(supabase, basket_id)
+
+    types = {}
+    for substrate_type in ALL_DIGEST_TYPES:
+        expected = recomputed.get(substrate_type) or _empty_digest()
+        actual = maintained.get(substrate_type) or _empty_digest()
+        types[substrate_type] = {
+            "match": expected == actual,
+            "maintained": actual,
+            "recomputed": expected,
+        }
 
-    for rel in relationships.data:
-        hasher.update(
-            f"rel:{rel['from_block_id']}:{rel['to_block_id']}:{rel['relationship_type']}:{rel.get('confidence_score', 0.5)}".encode()
+    drift = not all(entry["match"] for entry in types.values())
+    if drift:
+        logger.warning(
+            f"Substrate digest drift for basket {basket_id}: "
+            f"{[t for t, entry in types.items() if not entry['match']]}"
         )
 
-    return hasher.hexdigest()
+    repaired = False
+    if drift and repair:
+        supabase.rpc('fn_rebuild_basket_substrate_digest', {'p_basket_id': basket_id}).execute()
+        repaired = True
+
+    return {
+        "basket_id": basket_id,
+        "drift": drift,
+        "types": types,
+        "substrate_hash": _combine_digests(recomputed, SUBSTRATE_DIGEST_TYPES),
+        "graph_signature": _combine_digests(recomputed, GRAPH_DIGEST_TYPES),
+        "repaired": repaired,
+    }
 
 
 def check_temporal_scope_validity(insight: Dict[str, Any]) -> bool:
@@ -142,6 +323,148 @@ def check_temporal_scope_validity(insight: Dict[str, Any]) -> bool:
     return now.timestamp() > drift_threshold
 
 
+# =============================================================================
+# Substrate snapshots and exact diffs
+#
+# A snapshot maps each substrate type to a list of [id, content_hash] pairs
+# sorted by id, stored per (basket_id, substrate_hash) in substrate_snapshots.
+# Diffing two snapshots is a merge-join of sorted lists.
+# =============================================================================
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _snapshot_entries(rows, digest_text) -> List[List[str]]:
+    return sorted(([str(row['id']), _content_hash(digest_text(row))] for row in rows or []),
+                  key=lambda entry: entry[0])
+
+
+def build_substrate_snapshot(supabase: Client, basket_id: str) -> Dict[str, List[List[str]]]:
+    """
+    Snapshot of the basket's current substrate: {type: [[id, content_hash], ...]}.
+
+    Built server-side by fn_basket_substrate_snapshot (only ids and short
+    hashes are transferred); falls back to fetching rows.
+    """
+    try:
+        result = supabase.rpc('fn_basket_substrate_snapshot', {'p_basket_id': basket_id}).execute()
+        if isinstance(result.data, dict):
+            return {t: result.data.get(t) or [] for t in SNAPSHOT_TYPES}
+    except Exception as exc:
+        logger.warning(f"fn_basket_substrate_snapshot failed for basket {basket_id}: {exc}")
+
+    blocks = supabase.table('blocks').select('id, content, semantic_type').eq(
+        'basket_id', basket_id
+    ).in_('state', ACCEPTED_STATES).execute()
+    dumps = supabase.table('raw_dumps').select('id, body_md').eq('basket_id', basket_id).execute()
+    events = supabase.table('timeline_events').select('id, kind, preview').eq(
+        'basket_id', basket_id
+    ).execute()
+    return {
+        'block': _snapshot_entries(blocks.data, block_digest_text),
+        'dump': _snapshot_entries(dumps.data, dump_digest_text),
+        'event': _snapshot_entries(events.data, event_digest_text),
+    }
+
+
+def load_substrate_snapshot(
+    supabase: Client,
+    basket_id: str,
+    substrate_hash: str
+) -> Optional[Dict[str, List[List[str]]]]:
+    """Stored snapshot for a substrate_hash, or None."""
+    if not substrate_hash:
+        return None
+    try:
+        result = supabase.table(SNAPSHOT_TABLE).select('entries').eq(
+            'basket_id', basket_id
+        ).eq('substrate_hash', substrate_hash).limit(1).execute()
+    except Exception as exc:
+        logger.warning(f"Substrate snapshot read failed for basket {basket_id}: {exc}")
+        return None
+    if not result.data:
+        return None
+    return result.data[0].get('entries')
+
+
+def capture_substrate_snapshot(
+    supabase: Client,
+    basket_id: str,
+    substrate_hash: str
+) -> Tuple[Dict[str, List[List[str]]], bool]:
+    """
+    Snapshot for substrate_hash as (entries, already_stored).
+
+    Call right after reading substrate_hash and before slow work (LLM
+    generation): rows written in between would otherwise end up in a
+    snapshot labeled with a hash that does not describe them. Persist the
+    entries with store_substrate_snapshot(..., snapshot=entries) unless
+    already_stored.
+    """
+    snapshot = load_substrate_snapshot(supabase, basket_id, substrate_hash)
+    if snapshot is not None:
+        return snapshot, True
+    return build_substrate_snapshot(supabase, basket_id), False
+
+
+def store_substrate_snapshot(
+    supabase: Client,
+    basket_id: str,
+    substrate_hash: str,
+    snapshot: Optional[Dict[str, List[List[str]]]] = None
+) -> Dict[str, List[List[str]]]:
+    """
+    Record the snapshot for substrate_hash (builds it when not given).
+
+    Call when an artifact is generated from substrate_hash so a later
+    regeneration can diff against it. Failures are logged, not raised.
+    """
+    if snapshot is None:
+        snapshot = build_substrate_snapshot(supabase, basket_id)
+    try:
+        supabase.table(SNAPSHOT_TABLE).upsert({
+            'basket_id': basket_id,
+            'substrate_hash': substrate_hash,
+            'entries': snapshot,
+        }, on_conflict='basket_id,substrate_hash').execute()
+    except Exception as exc:
+        logger.warning(f"Substrate snapshot write failed for basket {basket_id}: {exc}")
+    return snapshot
+
+
+def diff_snapshot_entries(old: List[List[str]], new: List[List[str]]) -> Dict[str, List[str]]:
+    """Merge-join two id-sorted [id, content_hash] lists."""
+    added: List[str] = []
+    removed: List[str] = []
+    modified: List[str] = []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        old_id, old_hash = old[i]
+        new_id, new_hash = new[j]
+        if old_id == new_id:
+            if old_hash != new_hash:
+                modified.append(new_id)
+            i += 1
+            j += 1
+        elif old_id < new_id:
+            removed.append(old_id)
+            i += 1
+        else:
+            added.append(new_id)
+            j += 1
+    removed.extend(entry[0] for entry in old[i:])
+    added.extend(entry[0] for entry in new[j:])
+    return {'added': added, 'removed': removed, 'modified': modified}
+
+
+def diff_substrate_snapshots(
+    old: Dict[str, List[List[str]]],
+    new: Dict[str, List[List[str]]]
+) -> Dict[str, Dict[str, List[str]]]:
+    return {t: diff_snapshot_entries(old.get(t) or [], new.get(t) or []) for t in SNAPSHOT_TYPES}
+
+
 def compute_substrate_diff(
     supabase: Client,
     basket_id: str,
@@ -149,52 +472,49 @@ def compute_substrate_diff(
     new_hash: str
 ) -> Optional[Dict[str, Any]]:
     """
-    Compute high-level summary of what changed in substrate (V3.0 compliant).
+    Compute what changed in substrate between two substrate hashes (V3.0 compliant).
 
     Returns dict with:
-    - blocks_accepted: int (ACCEPTED, LOCKED, CONSTANT states)
-    - dumps_total: int
-    - relationships_total: int
+    - blocks_accepted / dumps_total / events_total / relationships_total: current counts
+    - exact: bool (False when no snapshot was stored for old_hash)
+    - changes: {"block"|"dump"|"event": {"added": [ids], "removed": [ids], "modified": [ids]}}
+      (only when exact)
 
-    V3.0 Changes:
-    - context_items removed (merged into blocks)
-    - Query blocks with ACCEPTED+ states only
-    - substrate_relationships requires join through blocks
-
-    (Note: Full diff would require storing substrate snapshot at old_hash time.
-     This is a simplified version that shows current counts.)
+    The snapshot for new_hash is stored on first use, so repeated checks at
+    the same hash read it instead of rebuilding.
     """
     if old_hash == new_hash:
         return None
 
-    # For now, return high-level counts
-    # Full implementation would store substrate snapshots keyed by hash
-
-    blocks_count = supabase.table('blocks').select('id', count='exact').eq(
-        'basket_id', basket_id
-    ).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT']).execute().count
+    new_snapshot = load_substrate_snapshot(supabase, basket_id, new_hash)
+    if new_snapshot is None:
+        new_snapshot = store_substrate_snapshot(supabase, basket_id, new_hash)
+    old_snapshot = load_substrate_snapshot(supabase, basket_id, old_hash)
+
+    digests = _read_basket_digests(supabase, basket_id) or {}
+    delta: Dict[str, Any] = {
+        "blocks_accepted": len(new_snapshot.get('block') or []),
+        "dumps_total": len(new_snapshot.get('dump') or []),
+        "events_total": len(new_snapshot.get('event') or []),
+        "relationships_total": (digests.get('relationship') or _empty_digest())['row_count'],
+        "exact": old_snapshot is not None,
+    }
 
-    dumps_count = supabase.table('raw_dumps').select('id', count='exact').eq(
-        'basket_id', basket_id
-    ).execute().count
+    if old_snapshot is None:
+        delta["note"] = "No snapshot stored for previous substrate_hash; showing current totals"
+        return delta
 
-    # Get relationships: join through blocks
-    blocks = supabase.table('blocks').select('id').eq('basket_id', basket_id).in_(
-        'state', ['ACCEPTED', 'LOCKED', 'CONSTANT']
-    ).execute()
-    block_ids = [block['id'] for block in blocks.data] if blocks.data else []
+    delta["changes"] = diff_substrate_snapshots(old_snapshot, new_snapshot)
+    return delta
 
-    relationships_count = 0
-    if block_ids:
-        relationships_count = supabase.table('substrate_relationships').select('id', count='exact').in_(
-            'from_block_id', block_ids
-        ).in_('state', ['ACCEPTED', 'LOCKED', 'CONSTANT']).execute().count
 
+def changed_substrate_ids(delta: Optional[Dict[str, Any]]) -> Optional[Dict[str, List[str]]]:
+    """Added + modified ids per substrate type from an exact delta, else None."""
+    if not delta or not delta.get('exact'):
+        return None
     return {
-        "blocks_accepted": blocks_count,
-        "dumps_total": dumps_count,
-        "relationships_total": relationships_count,
-        "note": "Full delta requires substrate snapshots (future enhancement)"
+        t: change['added'] + change['modified']
+        for t, change in delta['changes'].items()
     }
 
 
@@ -232,12 +552,15 @@ def should_regenerate_insight_canon(
 
     current_canon = result.data[0]
 
+    # One digest read covers both checks
+    digests = get_basket_digests(supabase, basket_id)
+
     # Check 1: Substrate changed?
-    current_substrate_hash = compute_basket_substrate_hash(supabase, basket_id)
+    current_substrate_hash = digests['substrate_hash']
     substrate_changed = current_substrate_hash != current_canon.get('substrate_hash')
 
     # Check 2: Relationship graph changed?
-    current_graph_signature = compute_graph_signature(supabase, basket_id)
+    current_graph_signature = digests['graph_signature']
     graph_changed = current_graph_signature != current_canon.get('graph_signature')
 
     # Check 3: Temporal drift (should not apply to insight_canon, but check anyway)
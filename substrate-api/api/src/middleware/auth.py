@@ -8,7 +8,8 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from auth.jwt_verifier import verify_jwt  # your verifier
-from auth.integration_tokens import verify_integration_token
+from auth.integration_tokens import INTEGRATION_TOKEN_PREFIX, verify_integration_token
+from app.utils.workspace import resolve_workspace
 
 log = logging.getLogger("uvicorn.error")
 
@@ -20,11 +21,14 @@ class AuthMiddleware(BaseHTTPMiddleware):
         *,
         exempt_paths: Iterable[str] | None = None,
         exempt_prefixes: Iterable[str] | None = None,
+        preresolve_workspace: bool = False,
     ):
         super().__init__(app)
         self.exempt_exact = set(exempt_paths or [])
         # Only *true* prefixes belong here; NEVER include "/"
         self.exempt_prefixes = set(exempt_prefixes or [])
+        # Resolve the caller's workspace onto request.state (off the event loop)
+        self.preresolve_workspace = preresolve_workspace
 
     async def dispatch(self, request: Request, call_next):  # type: ignore[override]
         path = request.url.path or "/"
@@ -45,11 +49,20 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 log.debug("AuthMiddleware: missing bearer token for %s", path)
             return JSONResponse(status_code=401, content={"error": "missing_token"})
 
-        # Verify (return rich detail in debug mode)
+        # Verify (return rich detail in debug mode). Integration tokens are
+        # recognisable by prefix and skip JWT decoding entirely.
         try:
+            if token.startswith(INTEGRATION_TOKEN_PREFIX):
+                raise HTTPException(401, "integration_token")
             claims = verify_jwt(token)
             request.state.user_id = claims.get("sub")
             request.state.jwt_payload = claims
+            if self.preresolve_workspace and request.state.user_id:
+                try:
+                    request.state.workspace_id = await resolve_workspace(request.state.user_id)
+                except Exception as exc:
+                    # Routes still resolve it themselves
+                    log.debug("AuthMiddleware: workspace pre-resolution failed for %s: %s", path, exc)
             return await call_next(request)
         except HTTPException as jwt_error:
             try:
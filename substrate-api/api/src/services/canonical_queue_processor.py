@@ -22,8 +22,9 @@ import asyncio
 import logging
 import math
 import os
+import socket
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from uuid import uuid4, UUID
 
 from app.agents.pipeline import (
@@ -41,9 +42,25 @@ from contracts.basket import BasketDelta, BasketChangeRequest
 from services.clock import now_iso
 from services.universal_work_tracker import universal_work_tracker
 from infra.substrate.services.events import EventService
+from app import event_bus
+from services.queue_sharding import QUEUE_BUCKET_COUNT, owned_buckets
+from services.llm_transport import llm_workspace_scope
 
 logger = logging.getLogger("uvicorn.error")
 
+# Claimed items processed concurrently by one worker (items of the same
+# basket always run one at a time, in queue order)
+DEFAULT_QUEUE_CONCURRENCY = int(os.getenv("CANONICAL_QUEUE_CONCURRENCY", "4"))
+# Claim lease; renewed by the worker heartbeat every lease/3 seconds
+DEFAULT_LEASE_SECONDS = int(os.getenv("CANONICAL_QUEUE_LEASE_SECONDS", "120"))
+# Event bus topic NOTIFY'd by agent_processing_queue inserts
+QUEUE_WORK_TOPIC = "queue.work_available"
+# How long shutdown waits for in-flight items before handing them back
+DEFAULT_DRAIN_SECONDS = float(os.getenv("CANONICAL_QUEUE_DRAIN_SECONDS", "25"))
+WORKER_REGISTRY_TABLE = "pipeline_workers"
+# PostgREST "function not found" / Postgres undefined_function
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
 
 class CanonicalQueueProcessor:
     """
@@ -54,13 +71,49 @@ class CanonicalQueueProcessor:
     for comprehensive status visibility across all async operations.
     """
     
-    def __init__(self, worker_id: Optional[str] = None, poll_interval: int = 10):
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        poll_interval: int = 10,
+        max_concurrency: int = DEFAULT_QUEUE_CONCURRENCY,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        sharded: bool = False
+    ):
         if not supabase:
             raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY required for canonical queue processing")
         
         self.worker_id = worker_id or f"canonical-worker-{uuid4().hex[:8]}"
+        # With LISTEN/NOTIFY wakeups, polling is only a fallback
         self.poll_interval = poll_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.lease_seconds = max(30, lease_seconds)
         self.running = False
+
+        # In-flight work: queue_id -> task, and per-basket serialization
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._in_flight_baskets: Dict[str, str] = {}
+        self._basket_locks: Dict[str, asyncio.Lock] = {}
+        self._basket_lock_refs: Dict[str, int] = {}
+        # Items whose lease another worker took over: never finalized here
+        self._lost_leases: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._listening = False
+        self._leased_claims = True
+
+        # Sharding: claim only baskets whose hash bucket this worker owns
+        self.sharded = sharded
+        self._owned_buckets: Optional[List[int]] = None
+        self._draining = False
+        self._started_at = datetime.now(timezone.utc)
+        self.stats: Dict[str, Any] = {
+            "claimed": 0,
+            "processed": 0,
+            "failed": 0,
+            "last_lag_seconds": None,
+            "max_lag_seconds": 0.0,
+            "lost_leases": 0,
+        }
         
         # Initialize canonical pipeline agents
         self.p0_capture = P0CaptureAgent()
@@ -77,57 +130,261 @@ class CanonicalQueueProcessor:
     async def start(self):
         """Start the canonical queue processing loop."""
         self.running = True
-        logger.info(f"Starting Canonical Queue Processor: {self.worker_id}")
-        
-        while self.running:
-            try:
-                # Claim work from queue (handles all work types now)
-                queue_entries = await self._claim_work()
-                
-                if queue_entries:
-                    logger.info(f"Claimed {len(queue_entries)} work items for canonical processing")
-                    
-                    # Process each claimed work item based on work_type
-                    for entry in queue_entries:
-                        try:
-                            work_type = entry.get('work_type', 'P1_SUBSTRATE')  # Default for legacy entries
-
-                            if work_type in ['P0_CAPTURE', 'P1_SUBSTRATE']:
-                                # Traditional dump-based processing
-                                await self._process_dump_canonically(entry)
-                            elif work_type == 'P2_GRAPH':
-                                # P2_GRAPH deprecated in Canon v3.1 - mark as completed
-                                logger.info(f"Skipping deprecated P2_GRAPH work: {entry.get('work_id')}")
-                                await self._mark_completed(entry['work_id'], {
-                                    "status": "deprecated",
-                                    "message": "P2 Graph removed in Canon v3.1 - use Neural Map for visualization"
-                                })
-                            # P3_REFLECTION removed - now direct artifact operations via /api/reflections
-                            # P4_COMPOSE_NEW and P4_RECOMPOSE removed - now direct artifact operations via /api/documents
-                            else:
-                                # Governance-only items like MANUAL_EDIT are not processed here.
-                                # Return the entry to pending to be handled by governance/proposal executors.
-                                logger.info(f"Skipping non-pipeline work type: {work_type} (queue_id={entry.get('id')})")
-                                try:
-                                    await self._update_queue_state(entry['id'], 'pending')
-                                except Exception:
-                                    pass
+        self._wake = asyncio.Event()
+        logger.info(
+            f"Starting Canonical Queue Processor: {self.worker_id} "
+            f"(concurrency={self.max_concurrency}, lease={self.lease_seconds}s)"
+        )
+
+        # Register before the first claim so sharded workers know their buckets
+        await self._report_worker()
+
+        listener = asyncio.create_task(self._listen_for_work())
+        # Runs until in-flight items finish, so leases survive a drain
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while self.running:
+                try:
+                    capacity = self.max_concurrency - len(self._in_flight)
+                    if capacity > 0:
+                        # Claim work from queue (handles all work types now)
+                        queue_entries = await self._claim_work(limit=capacity)
+                        if queue_entries:
+                            logger.info(f"Claimed {len(queue_entries)} work items for canonical processing")
+                            for entry in queue_entries:
+                                self._spawn(entry)
+                            if len(queue_entries) == capacity:
+                                # More work may be waiting: claim again once a slot frees
                                 continue
-                        except Exception as e:
-                            logger.exception(f"Work processing failed for {entry.get('work_id', entry['id'])}: {e}")
-                            await self._mark_failed(entry['id'], str(e))
-                else:
-                    # No work available, wait before next poll
+
+                    # Wait for a NOTIFY, a finished item, or the poll fallback
+                    await self._wait_for_work()
+
+                except Exception as e:
+                    logger.exception(f"Canonical queue processing error: {e}")
                     await asyncio.sleep(self.poll_interval)
-                    
-            except Exception as e:
-                logger.exception(f"Canonical queue processing error: {e}")
-                await asyncio.sleep(self.poll_interval)
+        finally:
+            listener.cancel()
     
     async def stop(self):
         """Stop the canonical queue processing loop."""
         self.running = False
+        if self._wake is not None:
+            self._wake.set()
         logger.info(f"Stopping Canonical Queue Processor: {self.worker_id}")
+        if not self._draining:
+            # drain() keeps renewing leases until in-flight items are settled
+            await self._stop_heartbeat()
+
+    async def drain(self, timeout: float = DEFAULT_DRAIN_SECONDS) -> Dict[str, int]:
+        """
+        Graceful shutdown: stop claiming, let in-flight items finish for up to
+        ``timeout`` seconds, then cancel the rest and hand them back to the queue.
+        """
+        self._draining = True
+        await self.stop()
+        await self._report_worker()
+
+        tasks = list(self._in_flight.values())
+        if tasks:
+            logger.info(f"Draining {len(tasks)} in-flight items (timeout={timeout}s)")
+            await asyncio.wait(tasks, timeout=timeout)
+
+        unfinished = {queue_id: task for queue_id, task in self._in_flight.items() if not task.done()}
+        for task in unfinished.values():
+            task.cancel()
+        if unfinished:
+            await asyncio.gather(*unfinished.values(), return_exceptions=True)
+            try:
+                await asyncio.to_thread(
+                    supabase.rpc(
+                        'fn_release_queue_items',
+                        {'p_worker_id': self.worker_id, 'p_ids': list(unfinished)}
+                    ).execute
+                )
+                logger.info(f"Released {len(unfinished)} unfinished items back to the queue")
+            except Exception as e:
+                # Leases expire on their own; another worker reclaims them then
+                logger.warning(f"Failed to release unfinished queue items: {e}")
+
+        await self._stop_heartbeat()
+        await self._report_worker()
+        return {"finished": len(tasks) - len(unfinished), "released": len(unfinished)}
+
+    async def _stop_heartbeat(self):
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _listen_for_work(self):
+        """Wake the claim loop on queue NOTIFYs; polling covers any gaps."""
+        if not event_bus.DATABASE_URL:
+            logger.info("EVENT_BUS_DATABASE_URL not set - canonical queue falls back to polling")
+            return
+
+        while self.running:
+            try:
+                async with event_bus.subscribe([QUEUE_WORK_TOPIC]) as events:
+                    self._listening = True
+                    # Catch anything queued while the listener was down
+                    self._wake.set()
+                    while self.running:
+                        await events.get()
+                        self._wake.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Queue LISTEN failed, polling until reconnect: {e}")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                self._listening = False
+
+    def _spawn(self, entry: Dict[str, Any]):
+        queue_id = str(entry['id'])
+        self.stats["claimed"] += 1
+        lag = _queue_lag_seconds(entry.get('created_at'))
+        if lag is not None:
+            self.stats["last_lag_seconds"] = lag
+            self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], lag)
+        self._in_flight_baskets[queue_id] = str(entry.get('basket_id') or queue_id)
+        task = asyncio.create_task(self._run_entry(entry))
+        self._in_flight[queue_id] = task
+
+        def _done(_task: asyncio.Task):
+            self._in_flight.pop(queue_id, None)
+            self._in_flight_baskets.pop(queue_id, None)
+            self._lost_leases.discard(queue_id)
+            if self._wake is not None:
+                self._wake.set()
+
+        task.add_done_callback(_done)
+
+    async def _run_entry(self, entry: Dict[str, Any]):
+        """Process one claimed item, serialized with other items of its basket."""
+        basket_key = str(entry.get('basket_id') or entry['id'])
+        lock = self._basket_locks.setdefault(basket_key, asyncio.Lock())
+        self._basket_lock_refs[basket_key] = self._basket_lock_refs.get(basket_key, 0) + 1
+        try:
+            async with lock:
+                # LLM calls made for this item count against its workspace's limit
+                with llm_workspace_scope(entry.get('workspace_id')):
+                    await self._process_entry(entry)
+        finally:
+            self._basket_lock_refs[basket_key] -= 1
+            if not self._basket_lock_refs[basket_key]:
+                del self._basket_lock_refs[basket_key]
+                self._basket_locks.pop(basket_key, None)
+
+    async def _process_entry(self, entry: Dict[str, Any]):
+        try:
+            work_type = entry.get('work_type', 'P1_SUBSTRATE')  # Default for legacy entries
+
+            if work_type in ['P0_CAPTURE', 'P1_SUBSTRATE']:
+                # Traditional dump-based processing
+                await self._process_dump_canonically(entry)
+            elif work_type == 'P2_GRAPH':
+                # P2_GRAPH deprecated in Canon v3.1 - mark as completed
+                logger.info(f"Skipping deprecated P2_GRAPH work: {entry.get('work_id')}")
+                await self._mark_completed(entry['work_id'], {
+                    "status": "deprecated",
+                    "message": "P2 Graph removed in Canon v3.1 - use Neural Map for visualization"
+                })
+            # P3_REFLECTION removed - now direct artifact operations via /api/reflections
+            # P4_COMPOSE_NEW and P4_RECOMPOSE removed - now direct artifact operations via /api/documents
+            else:
+                # Governance-only items like MANUAL_EDIT are not processed here.
+                # Return the entry to pending to be handled by governance/proposal executors.
+                logger.info(f"Skipping non-pipeline work type: {work_type} (queue_id={entry.get('id')})")
+                try:
+                    await self._update_queue_state(entry['id'], 'pending')
+                except Exception:
+                    pass
+                return
+            self.stats["processed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.exception(f"Work processing failed for {entry.get('work_id', entry['id'])}: {e}")
+            await self._mark_failed(entry['id'], str(e))
+
+    async def _heartbeat_loop(self):
+        """Renew leases of in-flight items so slow extractions are not reclaimed."""
+        interval = self.lease_seconds / 3
+        while self.running or self._in_flight:
+            await asyncio.sleep(interval)
+            await self._report_worker()
+            if not self._in_flight or not self._leased_claims:
+                continue
+            queue_ids = list(self._in_flight)
+            try:
+                response = await asyncio.to_thread(
+                    supabase.rpc(
+                        'fn_renew_queue_leases',
+                        {
+                            'p_worker_id': self.worker_id,
+                            'p_ids': queue_ids,
+                            'p_lease_seconds': self.lease_seconds
+                        }
+                    ).execute
+                )
+            except Exception as e:
+                logger.warning(f"Failed to renew queue leases: {e}")
+                continue
+
+            renewed = {
+                str(row if not isinstance(row, dict) else next(iter(row.values())))
+                for row in (response.data or [])
+            }
+            lost = [queue_id for queue_id in queue_ids if queue_id not in renewed and queue_id in self._in_flight]
+            if lost:
+                logger.warning(f"Queue leases lost for {lost} (reclaimed or finished elsewhere), abandoning them")
+                self.stats["lost_leases"] += len(lost)
+                for queue_id in lost:
+                    # The new owner processes and finalizes the item
+                    self._lost_leases.add(queue_id)
+                    self._in_flight[queue_id].cancel()
+
+    async def _report_worker(self):
+        """Heartbeat this worker's registry row and refresh its bucket ownership."""
+        now = datetime.now(timezone.utc)
+        try:
+            await asyncio.to_thread(
+                supabase.table(WORKER_REGISTRY_TABLE).upsert({
+                    "worker_id": self.worker_id,
+                    "hostname": socket.gethostname(),
+                    "pid": os.getpid(),
+                    "max_concurrency": self.max_concurrency,
+                    "sharded": self.sharded,
+                    "draining": self._draining,
+                    "stats": {**self.stats, "in_flight": len(self._in_flight)},
+                    "started_at": self._started_at.isoformat(),
+                    "heartbeat_at": now.isoformat(),
+                }).execute
+            )
+        except Exception as e:
+            logger.debug(f"Worker registry heartbeat failed: {e}")
+            return
+
+        if not self.sharded:
+            return
+        try:
+            live_workers = await asyncio.to_thread(_fetch_live_workers, self.lease_seconds, True, True)
+        except Exception as e:
+            logger.warning(f"Failed to load live workers, claiming all baskets: {e}")
+            self._owned_buckets = None
+            return
+        self._owned_buckets = owned_buckets(
+            self.worker_id,
+            [row["worker_id"] for row in live_workers]
+        )
 
     def _get_dump_word_count(self, dump_id: UUID) -> int:
         """Fetch dump body and return approximate word count."""
@@ -200,8 +457,41 @@ class CanonicalQueueProcessor:
             created_at=now_iso(),
         )
     
+    def _claim_params(self, limit: int) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            'p_worker_id': self.worker_id,
+            'p_limit': limit,
+            'p_lease_seconds': self.lease_seconds,
+            'p_exclude_baskets': sorted(set(self._in_flight_baskets.values()))
+        }
+        if self.sharded and self._owned_buckets is not None:
+            params['p_buckets'] = self._owned_buckets
+            params['p_bucket_count'] = QUEUE_BUCKET_COUNT
+        return params
+
     async def _claim_work(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Atomically claim work from the queue (all work types)."""
+        """Atomically claim work from the queue (all work types) under a lease."""
+        if self._leased_claims:
+            try:
+                response = await asyncio.to_thread(
+                    supabase.rpc(
+                        'fn_claim_pipeline_work_leased',
+                        self._claim_params(limit)
+                    ).execute
+                )
+                if response.data:
+                    logger.info(f"Successfully claimed {len(response.data)} work items")
+                    return response.data
+                return []
+            except Exception as e:
+                if not _is_missing_function(e):
+                    # Transient (network, timeout, lock): retry on the next poll
+                    logger.error(f"Failed to claim work: {e}")
+                    return []
+                # Leased claims need the 20261016 queue migration
+                logger.warning(f"Leased claim unavailable, using fn_claim_pipeline_work: {e}")
+                self._leased_claims = False
+
         try:
             response = supabase.rpc(
                 'fn_claim_pipeline_work',
@@ -455,6 +745,9 @@ class CanonicalQueueProcessor:
     
     async def _update_queue_state(self, queue_id: str, state: str, error: Optional[str] = None):
         """Update queue entry state."""
+        if str(queue_id) in self._lost_leases:
+            logger.info(f"Not setting {queue_id} to {state}: its lease moved to another worker")
+            return
         try:
             supabase.rpc('fn_update_queue_state', {
                 'p_id': queue_id,
@@ -482,6 +775,13 @@ class CanonicalQueueProcessor:
                 # P4_COMPOSITION removed - now direct artifact operations via /api/documents
             },
             "processing_sequence": ["P0_CAPTURE", "P1_GOVERNANCE", "P2_DEFERRED"],
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._in_flight),
+            "sharded": self.sharded,
+            "owned_buckets": len(self._owned_buckets) if self._owned_buckets is not None else None,
+            "draining": self._draining,
+            "stats": dict(self.stats),
+            "wakeup": "listen_notify" if self._listening else "polling",
             "sacred_principles": [
                 "Capture is Sacred",
                 "All Substrates are Peers",
@@ -496,6 +796,47 @@ class CanonicalQueueProcessor:
     # Recomposition: POST /api/documents/[id]/recompose
 
 
+def _queue_lag_seconds(created_at: Any) -> Optional[float]:
+    """Seconds an item waited in the queue before being claimed."""
+    if not created_at:
+        return None
+    try:
+        if isinstance(created_at, datetime):
+            created = created_at
+        else:
+            created = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        if created.tzinfo is None:
+            # agent_processing_queue.created_at is a UTC timestamp without zone
+            created = created.replace(tzinfo=timezone.utc)
+        return max(0.0, (datetime.now(timezone.utc) - created).total_seconds())
+    except Exception:
+        return None
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """Whether an RPC failed because the database function does not exist."""
+    code = getattr(error, "code", None)
+    return code in MISSING_FUNCTION_CODES or any(c in str(error) for c in MISSING_FUNCTION_CODES)
+
+
+def _fetch_live_workers(
+    ttl_seconds: int, exclude_draining: bool = False, sharded_only: bool = False
+) -> List[Dict[str, Any]]:
+    """Registry rows whose heartbeat is within ttl_seconds."""
+    cutoff = datetime.now(timezone.utc).timestamp() - ttl_seconds
+    query = (
+        supabase.table(WORKER_REGISTRY_TABLE)
+        .select("*")
+        .gt("heartbeat_at", datetime.fromtimestamp(cutoff, timezone.utc).isoformat())
+    )
+    if exclude_draining:
+        query = query.eq("draining", False)
+    if sharded_only:
+        # Unsharded workers claim every basket and own no buckets
+        query = query.eq("sharded", True)
+    return query.order("worker_id").execute().data or []
+
+
 # Global canonical processor instance for lifecycle management  
 _canonical_processor: Optional[CanonicalQueueProcessor] = None
 
@@ -503,6 +844,10 @@ _canonical_processor: Optional[CanonicalQueueProcessor] = None
 async def start_canonical_queue_processor():
     """Start the global canonical queue processor."""
     global _canonical_processor
+    if os.getenv("CANONICAL_QUEUE_IN_PROCESS", "true").lower() in ("0", "false", "no"):
+        # Standalone pipeline workers (app/pipeline_worker.py) own the queue
+        logger.info("In-process canonical queue processor disabled (CANONICAL_QUEUE_IN_PROCESS=false)")
+        return
     if _canonical_processor is None:
         _canonical_processor = CanonicalQueueProcessor()
         asyncio.create_task(_canonical_processor.start())
@@ -513,7 +858,7 @@ async def stop_canonical_queue_processor():
     """Stop the global canonical queue processor."""
     global _canonical_processor
     if _canonical_processor:
-        await _canonical_processor.stop()
+        await _canonical_processor.drain()
         _canonical_processor = None
         logger.info("Canonical queue processor stopped")
 
@@ -530,11 +875,40 @@ async def get_canonical_queue_health() -> Dict[str, Any]:
             "processor_name": "CanonicalQueueProcessor",
             "status": "not_running"
         }
+
+        # Workers may run in other processes/nodes: report them from the registry
+        try:
+            workers = [
+                {
+                    "worker_id": row.get("worker_id"),
+                    "hostname": row.get("hostname"),
+                    "sharded": row.get("sharded"),
+                    "draining": row.get("draining"),
+                    "heartbeat_at": row.get("heartbeat_at"),
+                    **(row.get("stats") or {}),
+                }
+                for row in _fetch_live_workers(DEFAULT_LEASE_SECONDS)
+            ]
+        except Exception as e:
+            logger.debug(f"Worker registry unavailable: {e}")
+            workers = []
+
+        # Queue lag: age of the oldest item still waiting to be claimed
+        lag_seconds = max(
+            (
+                float(row.get("max_age_seconds") or 0)
+                for row in queue_stats
+                if isinstance(row, dict) and row.get("processing_state") == "pending"
+            ),
+            default=0.0
+        )
         
         return {
             "status": "healthy",
             "canon_version": "v2.1",
             "queue_stats": queue_stats,
+            "lag_seconds": lag_seconds,
+            "workers": workers,
             "processor_info": processor_info,
             "pipeline_boundaries_enforced": True,
             "sacred_principles_active": True
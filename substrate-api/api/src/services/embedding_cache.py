@@ -0,0 +1,293 @@
+"""
+Content-addressed embedding cache.
+
+The same block text is embedded several times along the substrate pipeline:
+duplicate detection before insert, embedding storage after insert, and
+relationship inference afterwards. Embeddings are a pure function of
+(model, text), so vectors are cached under
+
+    (model, sha256(normalized text))
+
+in two tiers:
+- Memory: process-local LRU bounded by a byte budget (float32 vectors)
+- Persistent: ``embedding_cache`` table (Postgres) or a local SQLite file,
+  so re-processing a basket after a restart performs no repeat API calls
+
+Persistent-tier failures are logged and treated as misses; the cache must
+never break an embedding path.
+"""
+
+import array
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.embedding_engine import MAX_EMBEDDING_CHARS
+
+logger = logging.getLogger("uvicorn.error")
+
+DEFAULT_MEMORY_BUDGET_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_TABLE = "embedding_cache"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Canonical form of text sent to the embeddings API."""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()[:MAX_EMBEDDING_CHARS]
+
+
+def embedding_text_hash(text: str) -> str:
+    """sha256 of the normalized text (hex)."""
+    return hashlib.sha256(normalize_embedding_text(text).encode("utf-8")).hexdigest()
+
+
+def _parse_vector(value) -> Optional[List[float]]:
+    # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    try:
+        return [float(v) for v in value]
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================================
+# Persistent tiers
+# ============================================================================
+
+class SupabaseEmbeddingStore:
+    """Persistent tier backed by the ``embedding_cache`` Postgres table."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def fetch_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        if not hashes:
+            return {}
+        resp = (
+            self.client.table(EMBEDDING_CACHE_TABLE)
+            .select("text_hash, embedding")
+            .eq("model", model)
+            .in_("text_hash", list(hashes))
+            .execute()
+        )
+        found: Dict[str, List[float]] = {}
+        for row in resp.data or []:
+            vector = _parse_vector(row.get("embedding"))
+            if vector:
+                found[row["text_hash"]] = vector
+        return found
+
+    def store_many(self, model: str, items: Sequence[Tuple[str, List[float]]]) -> None:
+        if not items:
+            return
+        rows = [
+            {"model": model, "text_hash": text_hash, "embedding": vector}
+            for text_hash, vector in items
+        ]
+        self.client.table(EMBEDDING_CACHE_TABLE).upsert(
+            rows, on_conflict="model,text_hash"
+        ).execute()
+
+
+class SQLiteEmbeddingStore:
+    """Persistent tier backed by a local SQLite file (jobs, dev, harness runs)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {EMBEDDING_CACHE_TABLE} ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+
+    def fetch_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" for _ in hashes)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT text_hash, embedding FROM {EMBEDDING_CACHE_TABLE}"
+                f" WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *hashes],
+            ).fetchall()
+        found: Dict[str, List[float]] = {}
+        for text_hash, blob in rows:
+            found[text_hash] = list(array.array("f", blob))
+        return found
+
+    def store_many(self, model: str, items: Sequence[Tuple[str, List[float]]]) -> None:
+        if not items:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {EMBEDDING_CACHE_TABLE}"
+                " (model, text_hash, embedding, created_at) VALUES (?, ?, ?, ?)",
+                [(model, h, array.array("f", v).tobytes(), now) for h, v in items],
+            )
+            self._conn.commit()
+
+
+# ============================================================================
+# Two-tier cache
+# ============================================================================
+
+class EmbeddingCache:
+    """Memory LRU (byte-budgeted) in front of an optional persistent store."""
+
+    def __init__(self, store=None, max_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES) -> None:
+        self.store = store
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], array.array]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "evictions": 0}
+
+    # Memory tier -------------------------------------------------------
+
+    def _memory_get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            packed = self._entries.get(key)
+            if packed is None:
+                return None
+            self._entries.move_to_end(key)
+            return list(packed)
+
+    def _memory_put(self, key: Tuple[str, str], vector: Sequence[float]) -> None:
+        packed = array.array("f", vector)
+        size = packed.itemsize * len(packed)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.itemsize * len(previous)
+            self._entries[key] = packed
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.itemsize * len(evicted)
+                self.stats["evictions"] += 1
+
+    # Public API --------------------------------------------------------
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up vectors for texts; ``None`` marks a miss in both tiers."""
+        hashes = [embedding_text_hash(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        missing: Dict[str, List[int]] = {}
+        for index, text_hash in enumerate(hashes):
+            vector = self._memory_get((model, text_hash))
+            if vector is not None:
+                self.stats["memory_hits"] += 1
+                results[index] = vector
+            else:
+                missing.setdefault(text_hash, []).append(index)
+
+        if missing and self.store is not None:
+            try:
+                found = self.store.fetch_many(model, list(missing))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Embedding cache store lookup failed: {exc}")
+                found = {}
+            for text_hash, vector in found.items():
+                self._memory_put((model, text_hash), vector)
+                for index in missing.pop(text_hash, []):
+                    self.stats["store_hits"] += 1
+                    results[index] = vector
+
+        self.stats["misses"] += sum(len(indices) for indices in missing.values())
+        return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, Optional[List[float]]]]) -> None:
+        """Store (text, vector) pairs in both tiers; ``None`` vectors are ignored."""
+        to_store: Dict[str, List[float]] = {}
+        for text, vector in items:
+            if not vector:
+                continue
+            text_hash = embedding_text_hash(text)
+            self._memory_put((model, text_hash), vector)
+            to_store[text_hash] = list(vector)
+
+        if to_store and self.store is not None:
+            try:
+                self.store.store_many(model, list(to_store.items()))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Embedding cache store write failed: {exc}")
+
+    def put(self, model: str, text: str, vector: Optional[List[float]]) -> None:
+        self.put_many(model, [(text, vector)])
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache_singleton: Optional[EmbeddingCache] = None
+
+
+def _default_store():
+    sqlite_path = os.getenv("EMBEDDING_CACHE_SQLITE_PATH")
+    if sqlite_path:
+        return SQLiteEmbeddingStore(sqlite_path)
+    if os.getenv("EMBEDDING_CACHE_PERSIST", "true").lower() in {"0", "false", "no"}:
+        return None
+    try:
+        from infra.utils.supabase_client import supabase_admin_client
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(f"Embedding cache persistent tier unavailable: {exc}")
+        return None
+    return SupabaseEmbeddingStore(supabase_admin_client) if supabase_admin_client else None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache.
+
+    Persistent tier selection:
+    - EMBEDDING_CACHE_SQLITE_PATH set: local SQLite file
+    - otherwise the ``embedding_cache`` table via the service-role client
+    - EMBEDDING_CACHE_PERSIST=false disables the persistent tier
+    """
+    global _cache_singleton
+    if _cache_singleton is None:
+        _cache_singleton = EmbeddingCache(store=_default_store())
+    return _cache_singleton
+
+
+__all__ = [
+    "EmbeddingCache",
+    "SQLiteEmbeddingStore",
+    "SupabaseEmbeddingStore",
+    "embedding_text_hash",
+    "get_embedding_cache",
+    "normalize_embedding_text",
+]
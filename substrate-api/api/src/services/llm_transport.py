@@ -0,0 +1,269 @@
+"""
+Shared async transport for OpenAI calls.
+
+Agents used to build their own clients (some synchronous, some per call), so a
+slow completion could block the uvicorn event loop and stall unrelated
+requests, and nothing bounded how many calls one workspace could have in
+flight. Every OpenAI call goes through ``get_llm_transport()`` instead:
+
+- one pooled ``AsyncOpenAI`` client per event loop
+- a global concurrency limit plus a per-workspace limit (the workspace comes
+  from the ``workspace_id`` argument or the ``llm_workspace_scope`` context)
+- exponential backoff with jitter on 429/5xx/timeouts, honoring Retry-After
+- a request timeout
+- calls, retries, errors, tokens and latency accounted per ``schema_name``
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import time
+import weakref
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+logger = logging.getLogger("uvicorn.error")
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_WORKSPACE_CONCURRENCY = int(os.getenv("LLM_WORKSPACE_CONCURRENCY", "4"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "90"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 30.0
+
+_current_workspace: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "llm_workspace_id", default=None
+)
+
+
+@contextmanager
+def llm_workspace_scope(workspace_id: Optional[Any]) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to ``workspace_id``."""
+    token = _current_workspace.set(str(workspace_id) if workspace_id else None)
+    try:
+        yield
+    finally:
+        _current_workspace.reset(token)
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(
+        exc, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    ):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return False
+
+
+class LLMTransport:
+    """Process-wide async OpenAI transport with limits, retries and accounting."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        workspace_concurrency: int = LLM_WORKSPACE_CONCURRENCY,
+        timeout: float = LLM_REQUEST_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        client: Optional[AsyncOpenAI] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.workspace_concurrency = max(1, workspace_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+
+        self._client = client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        # Only semaphores with calls holding or awaiting them stay alive; an
+        # idle one is back at full capacity, so recreating it later is exact
+        self._workspace_slots: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = (
+            weakref.WeakValueDictionary()
+        )
+
+        self.usage: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("OPENAI_API_KEY not set")
+            # Retries are handled here so they respect the concurrency limits
+            self._client = AsyncOpenAI(api_key=api_key, timeout=self.timeout, max_retries=0)
+        return self._client
+
+    async def chat(
+        self,
+        *,
+        schema_name: str,
+        workspace_id: Optional[Any] = None,
+        **params: Any,
+    ) -> Any:
+        """``chat.completions.create`` through the shared limits."""
+        return await self._call(
+            schema_name,
+            workspace_id,
+            lambda: self.client.chat.completions.create(**params),
+        )
+
+    async def embeddings(
+        self,
+        *,
+        schema_name: str = "embeddings",
+        workspace_id: Optional[Any] = None,
+        **params: Any,
+    ) -> Any:
+        """``embeddings.create`` through the shared limits."""
+        return await self._call(
+            schema_name,
+            workspace_id,
+            lambda: self.client.embeddings.create(**params),
+        )
+
+    def usage_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-schema counters; average latency derived from the totals."""
+        snapshot = {}
+        for schema_name, entry in self.usage.items():
+            calls = entry["calls"] or 1
+            snapshot[schema_name] = {
+                **entry,
+                "latency_ms_avg": round(entry["latency_ms_total"] / calls, 1),
+            }
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            # New event loop (CLI jobs, tests): semaphores and the HTTP pool
+            # are loop-bound, so start fresh
+            self._client = None
+            self._workspace_slots = weakref.WeakValueDictionary()
+        self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        self._loop = loop
+
+    def _workspace_semaphore(self, workspace_id: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not workspace_id:
+            return None
+        semaphore = self._workspace_slots.get(workspace_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.workspace_concurrency)
+            self._workspace_slots[workspace_id] = semaphore
+        return semaphore
+
+    def _account(self, schema_name: str) -> Dict[str, float]:
+        entry = self.usage.get(schema_name)
+        if entry is None:
+            entry = {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latency_ms_total": 0.0,
+                "latency_ms_max": 0.0,
+            }
+            self.usage[schema_name] = entry
+        return entry
+
+    async def _call(self, schema_name: str, workspace_id: Optional[Any], request) -> Any:
+        self._bind_loop()
+        workspace = str(workspace_id) if workspace_id else _current_workspace.get()
+        workspace_slots = self._workspace_semaphore(workspace)
+        entry = self._account(schema_name)
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                if workspace_slots is not None:
+                    async with workspace_slots, self._global_slots:
+                        response = await request()
+                else:
+                    async with self._global_slots:
+                        response = await request()
+            except Exception as exc:
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    entry["errors"] += 1
+                    raise
+                # Slots are released while backing off
+                delay = _retry_after_seconds(exc)
+                if delay is None:
+                    delay = LLM_BACKOFF_BASE_SECONDS * (2 ** attempt) * (1 + random.random() * 0.25)
+                delay = min(delay, LLM_BACKOFF_MAX_SECONDS)
+                attempt += 1
+                entry["retries"] += 1
+                logger.warning(
+                    f"LLM call {schema_name} failed ({type(exc).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            latency_ms = (time.monotonic() - started) * 1000.0
+            usage = getattr(response, "usage", None)
+            entry["calls"] += 1
+            entry["input_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            entry["output_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+            entry["latency_ms_total"] += latency_ms
+            entry["latency_ms_max"] = max(entry["latency_ms_max"], latency_ms)
+            return response
+
+
+_transport: Optional[LLMTransport] = None
+
+
+def get_llm_transport() -> LLMTransport:
+    """Get the process-wide LLM transport."""
+    global _transport
+    if _transport is None:
+        _transport = LLMTransport()
+    return _transport
+
+
+__all__ = [
+    "LLMTransport",
+    "get_llm_transport",
+    "llm_workspace_scope",
+]
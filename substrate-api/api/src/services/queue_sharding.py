@@ -0,0 +1,83 @@
+"""
+Basket sharding for pipeline workers.
+
+Baskets map to a fixed number of buckets in the database
+(``abs(hashtext(basket_id::text)) % QUEUE_BUCKET_COUNT``); buckets map to live
+workers through a consistent hash ring. When a worker joins or leaves, only
+about 1/N of the buckets move, so most baskets keep their worker.
+
+Ownership only narrows what a worker claims: correctness (one in-flight item
+per basket, queue order) is enforced by fn_claim_pipeline_work_leased, so two
+workers briefly disagreeing about the ring is harmless.
+"""
+
+import bisect
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+QUEUE_BUCKET_COUNT = int(os.getenv("PIPELINE_QUEUE_BUCKETS", "1024"))
+RING_VNODES = 64
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = RING_VNODES):
+        self.nodes = sorted(set(nodes))
+        points: List[Tuple[int, str]] = []
+        for node in self.nodes:
+            for replica in range(vnodes):
+                points.append((_ring_hash(f"{node}#{replica}"), node))
+        points.sort()
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+def assign_buckets(
+    workers: Iterable[str],
+    bucket_count: int = QUEUE_BUCKET_COUNT
+) -> Dict[str, List[int]]:
+    """Map every bucket to a live worker; returns worker_id -> sorted buckets."""
+    ring = ConsistentHashRing(workers)
+    assignment: Dict[str, List[int]] = {node: [] for node in ring.nodes}
+    for bucket in range(bucket_count):
+        owner = ring.owner(f"bucket:{bucket}")
+        if owner is not None:
+            assignment[owner].append(bucket)
+    return assignment
+
+
+def owned_buckets(
+    worker_id: str,
+    live_workers: Iterable[str],
+    bucket_count: int = QUEUE_BUCKET_COUNT
+) -> Optional[List[int]]:
+    """
+    Buckets this worker should claim from.
+
+    Returns None (claim everything) when the worker is not in the live set,
+    e.g. before its first registration or when the registry is unreachable.
+    """
+    workers = set(live_workers)
+    if worker_id not in workers:
+        return None
+    return assign_buckets(workers, bucket_count)[worker_id]
+
+
+__all__ = [
+    "QUEUE_BUCKET_COUNT",
+    "ConsistentHashRing",
+    "assign_buckets",
+    "owned_buckets",
+]
@@ -143,4 +143,161 @@ async def test_score_and_select_falls_back_when_json_call_fails(monkeypatch):
 
     assert selected, "Fallback selection should return candidates"
     assert selected[0]["content"] == "Recent high confidence insight"
-    assert "fallback" in selected[0]["selection_reason"].lower()
\ No newline at end of file
+    assert "fallback" in selected[0]["selection_reason"].lower()
+
+
+class _RecordingDocumentsTable:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, payload):
+        self.updates.append(payload)
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[{}])
+
+
+@pytest.mark.asyncio
+async def test_sections_generate_concurrently_and_keep_outline_order(monkeypatch):
+    import asyncio
+
+    import app.agents.pipeline.composition_agent as composition_module
+
+    table = _RecordingDocumentsTable()
+    monkeypatch.setattr(composition_module, "supabase", types.SimpleNamespace(table=lambda _name: table))
+    monkeypatch.setattr(composition_module, "get_llm", lambda: _StubLLM())
+    monkeypatch.setattr(composition_module, "P4_SECTION_CONCURRENCY", 2)
+
+    agent = P4CompositionAgent()
+    active = {"now": 0, "max": 0}
+
+    async def fake_section(section, _selected, _narrative):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        # Later sections finish first
+        await asyncio.sleep(0.01 * (4 - section["order"]))
+        active["now"] -= 1
+        return f"body {section['order']}"
+
+    monkeypatch.setattr(agent, "_generate_section_content", fake_section)
+    sections = [{"title": f"S{i}", "content": "", "order": i} for i in range(4)]
+
+    contents = await agent._generate_sections("doc-1", sections, [], {}, {"existing": True})
+
+    assert contents == ["body 0", "body 1", "body 2", "body 3"]
+    assert active["max"] == 2
+    progress = [update["metadata"]["composition_progress"] for update in table.updates]
+    assert [p["sections_completed"] for p in progress] == [1, 2, 3, 4]
+    assert all(p["sections_total"] == 4 for p in progress)
+    assert table.updates[-1]["metadata"]["existing"] is True
+    assert [s["order"] for s in progress[-1]["sections"]] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_selects_by_mmr_without_llm_scoring(monkeypatch):
+    import app.agents.pipeline.composition_agent as composition_module
+    from app.agents.pipeline.composition_agent import CompositionMetrics
+    from datetime import datetime
+
+    monkeypatch.setattr(composition_module, "get_llm", lambda: _StubLLM())
+    monkeypatch.setattr(composition_module, "P4_FAST_SELECTION_K", 2)
+
+    agent = P4CompositionAgent()
+    request = CompositionRequest(
+        document_id="doc-1", basket_id="basket-1", workspace_id="ws-1", intent="Roadmap", fast=True
+    )
+    request.intent_embedding = [1.0, 0.0, 0.0]
+    candidates = [
+        {"type": "block", "id": "a", "content": "A", "embedding": [0.95, 0.05, 0.0], "similarity": 0.95},
+        {"type": "block", "id": "a2", "content": "A again", "embedding": [0.94, 0.06, 0.0], "similarity": 0.85},
+        {"type": "block", "id": "b", "content": "B", "embedding": [0.0, 0.0, 1.0], "similarity": 0.7},
+    ]
+
+    selected, metrics = await agent._score_and_select(
+        candidates, request, {"document_type": "summary", "key_themes": []},
+        CompositionMetrics(start_time=datetime.utcnow()),
+    )
+
+    assert [s["id"] for s in selected] == ["a", "b"]
+    assert all("embedding" not in s for s in selected)
+    assert metrics.candidates_selected == {"block": 2}
+
+
+class _PrefilterSupabase:
+    """rpc() returns embedded blocks; table() returns the unembedded query's rows."""
+
+    def __init__(self, ranked, unembedded):
+        self.ranked = ranked
+        self.unembedded = unembedded
+        self.filters = []
+
+    def rpc(self, _name, _params):
+        return types.SimpleNamespace(execute=lambda: types.SimpleNamespace(data=self.ranked))
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_args):
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **_kwargs):
+            self.filters.append((name, *args))
+            return self
+        return record
+
+    def execute(self):
+        return types.SimpleNamespace(data=self.unembedded)
+
+
+@pytest.mark.asyncio
+async def test_unembedded_blocks_are_merged_after_vector_hits(monkeypatch):
+    import app.agents.pipeline.composition_agent as composition_module
+    from datetime import datetime, timedelta
+
+    ranked = [
+        {"id": f"e{i}", "content": f"embedded {i}", "created_at": "2026-10-01T00:00:00+00:00",
+         "embedding": f"[{1.0 - i * 0.01},{i * 0.1},0]", "similarity_score": 0.9 - i * 0.01}
+        for i in range(6)
+    ]
+    unembedded = [
+        {"id": "new-other", "content": "lunch menu", "created_at": "2026-10-15T00:00:00+00:00"},
+        {"id": "new-roadmap", "content": "roadmap milestones for launch",
+         "created_at": "2026-10-14T00:00:00+00:00"},
+    ]
+    db = _PrefilterSupabase(ranked, unembedded)
+
+    async def fake_embed(_text):
+        return [1.0, 0.0, 0.0]
+
+    monkeypatch.setattr(composition_module, "supabase", db)
+    monkeypatch.setattr(composition_module, "embed_text", fake_embed)
+    monkeypatch.setattr(composition_module, "get_llm", lambda: _StubLLM())
+
+    agent = P4CompositionAgent()
+    request = CompositionRequest(
+        document_id="doc-1", basket_id="basket-1", workspace_id="ws-1", intent="Roadmap milestones"
+    )
+    blocks = await agent._rank_blocks_by_intent(
+        request, {"key_themes": []}, datetime.utcnow() - timedelta(days=90)
+    )
+
+    assert [b["id"] for b in blocks] == [*(f"e{i}" for i in range(6)), "new-other", "new-roadmap"]
+    assert ("is_", "embedding", "null") in db.filters
+
+    candidates = [
+        {"type": "block", "id": b["id"], "content": b["content"],
+         "embedding": composition_module._parse_embedding(b.get("embedding")),
+         "similarity": b.get("similarity_score")}
+        for b in blocks
+    ]
+    ordered = await agent._mmr_order(candidates, request, 4)
+
+    # One of four slots is kept for unembedded blocks, best lexical match first
+    assert len(ordered) == 4
+    assert all(c["embedding"] for c in ordered[:3])
+    assert ordered[3]["id"] == "new-roadmap"
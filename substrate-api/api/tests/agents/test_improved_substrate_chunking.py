@@ -0,0 +1,99 @@
+import pytest
+
+import app.agents.pipeline.improved_substrate_agent as agent_module
+from app.schemas.focused_extraction import (
+    ContentType,
+    ExtractedAction,
+    ExtractedFact,
+    ExtractedInsight,
+    FocusedExtraction,
+)
+
+
+def _extraction(facts=(), insights=(), actions=(), theme="roadmap", confidence=0.8):
+    return FocusedExtraction(
+        summary=f"Summary about {theme}.",
+        facts=list(facts),
+        insights=list(insights),
+        actions=list(actions),
+        context=[],
+        content_type=ContentType.GENERAL,
+        primary_theme=theme,
+        extraction_confidence=confidence,
+    )
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return agent_module.ImprovedP1SubstrateAgent()
+
+
+@pytest.mark.asyncio
+async def test_small_dump_uses_single_call(agent, monkeypatch):
+    calls = []
+
+    async def fake_extract_chunk(content, content_type, part_label=None):
+        calls.append(part_label)
+        return _extraction()
+
+    monkeypatch.setattr(agent, "_extract_chunk", fake_extract_chunk)
+
+    await agent._extract_focused("short dump", ContentType.GENERAL, "dump-1")
+
+    assert calls == [None]
+
+
+@pytest.mark.asyncio
+async def test_large_dump_is_chunked_and_merged(agent, monkeypatch):
+    monkeypatch.setattr(agent_module, "P1_CHUNK_THRESHOLD_CHARS", 100)
+    monkeypatch.setattr(agent_module, "P1_CHUNK_MAX_CHARS", 60)
+    content = "\n\n".join(f"Paragraph {i} " + "x" * 40 for i in range(4))
+    labels = []
+
+    async def fake_extract_chunk(text, content_type, part_label=None):
+        labels.append(part_label)
+        return _extraction(
+            facts=[
+                ExtractedFact(text="Revenue grew 10%", type="metric", confidence=0.6 + 0.1 * len(labels)),
+                ExtractedFact(text=f"Detail from {text[:11]}", type="fact"),
+            ],
+            insights=[ExtractedInsight(insight="Growth is steady.", supporting_facts=[text[:11]])],
+            actions=[ExtractedAction(action="Hire more engineers", priority="high" if len(labels) == 2 else "low")],
+        )
+
+    monkeypatch.setattr(agent, "_extract_chunk", fake_extract_chunk)
+
+    merged = await agent._extract_focused(content, ContentType.GENERAL, "dump-1")
+
+    assert len(labels) == 4
+    assert all(label and "of 4" in label for label in labels)
+    # Repeated items collapse; per-chunk details survive
+    assert [f.text for f in merged.facts].count("Revenue grew 10%") == 1
+    assert len(merged.facts) == 5
+    assert max(f.confidence for f in merged.facts if f.text == "Revenue grew 10%") == pytest.approx(1.0)
+    assert len(merged.insights) == 1
+    assert len(merged.insights[0].supporting_facts) == 4
+    assert len(merged.actions) == 1 and merged.actions[0].priority == "high"
+
+
+def test_merge_skips_failed_chunks(agent):
+    failed = _extraction(theme="extraction_failed", confidence=0.1)
+    ok = _extraction(facts=[ExtractedFact(text="A fact", type="fact")], confidence=0.9)
+
+    merged = agent._merge_extractions([failed, ok], ContentType.GENERAL)
+
+    assert merged.primary_theme == "roadmap"
+    assert merged.extraction_confidence == pytest.approx(0.9)
+    assert [f.text for f in merged.facts] == ["A fact"]
+
+
+def test_split_content_cuts_paragraphs_without_blank_lines(agent, monkeypatch):
+    monkeypatch.setattr(agent_module, "P1_CHUNK_MAX_CHARS", 50)
+    content = "\n".join("line %02d " % i + "y" * 20 for i in range(10))
+
+    parts = agent._split_content(content)
+
+    assert len(parts) > 1
+    assert all(len(part) <= 50 for part in parts)
+    assert "\n".join(parts).replace("\n", "") == content.replace("\n", "")
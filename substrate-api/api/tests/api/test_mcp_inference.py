@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import app.routes.mcp_inference as mcp
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class _Supabase:
+    def __init__(self, signatures, ranked=None):
+        self.tables = {
+            "basket_signatures": signatures,
+            "baskets": [{"id": s["basket_id"], "name": s["basket_id"].upper()} for s in signatures],
+        }
+        self.ranked = ranked
+
+    def table(self, name):
+        return _Query(self.tables[name])
+
+    def rpc(self, name, params):
+        if self.ranked is None:
+            raise RuntimeError("function fn_rank_basket_signatures does not exist")
+        self.rpc_params = params
+        return _Query(self.ranked[: params["p_limit"]])
+
+
+def _infer(monkeypatch, db, embedding, top_k=2):
+    monkeypatch.setattr(mcp, "supabase_admin", lambda: db)
+    request = SimpleNamespace(state=SimpleNamespace(workspace_id="ws1"))
+    payload = mcp.BasketInferenceRequest(
+        tool="t", fingerprint={"embedding": embedding}, top_k=top_k
+    )
+    return mcp.infer_basket(payload, request, user={})
+
+
+@pytest.mark.asyncio
+async def test_fallback_ranks_all_signatures_by_similarity_without_vectors(monkeypatch):
+    now = datetime.now(timezone.utc).isoformat()
+    signatures = [
+        {"basket_id": f"old{i}", "summary": None, "embedding": [0.0, 1.0], "last_refreshed": now}
+        for i in range(60)
+    ] + [{
+        "basket_id": "match",
+        "summary": "s",
+        "embedding": [1.0, 0.1],
+        "last_refreshed": "2020-01-01T00:00:00Z",
+    }]
+
+    response = await _infer(monkeypatch, _Supabase(signatures), [1.0, 0.0])
+
+    assert len(response.candidates) == 2
+    best = response.candidates[0]
+    assert best.signature.id == "match" and best.signature.name == "MATCH"
+    assert best.similarity == pytest.approx(0.995, abs=1e-3)
+    assert best.score == pytest.approx(0.75 * best.similarity)
+    assert all(c.signature.embedding == [] for c in response.candidates)
+
+
+@pytest.mark.asyncio
+async def test_database_ranking_is_used_when_available(monkeypatch):
+    ranked = [{"basket_id": "b1", "name": "One", "summary": None, "last_refreshed": None,
+               "similarity": 0.9, "recency_boost": 0.5, "score": 0.75}]
+    db = _Supabase([], ranked=ranked)
+
+    response = await _infer(monkeypatch, db, [1.0, 0.0], top_k=5)
+
+    assert db.rpc_params["p_limit"] == 5
+    assert response.candidates[0].signature.name == "One"
+    assert response.candidates[0].score == pytest.approx(0.75 * 0.9 + 0.15 * 0.5)
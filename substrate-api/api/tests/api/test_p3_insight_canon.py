@@ -0,0 +1,215 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import app.routes.p3_insights as p3
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = {}
+        self.payload = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def update(self, payload):
+        self.payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict=None):
+        self.db.upserts.append(payload)
+        self.payload = payload
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table == "reflections_artifact" and any(self.payload is u for u in self.db.upserts):
+            row = dict(self.payload, id="new", created_at="2026-01-01T00:00:00Z")
+            return SimpleNamespace(data=[row])
+        if self.table == "reflections_artifact" and "substrate_hash" in self.filters:
+            return SimpleNamespace(data=self.db.cached)
+        if self.table == "baskets":
+            return SimpleNamespace(data={"workspace_id": "ws1"})
+        return SimpleNamespace(data=None)
+
+
+class _Supabase:
+    def __init__(self, cached=None):
+        self.cached = cached
+        self.upserts = []
+        self.snapshots = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+@pytest.fixture
+def stale_basket(monkeypatch):
+    def setup(cached=None):
+        db = _Supabase(cached)
+        calls = {"llm": 0}
+
+        async def fake_generate(**kwargs):
+            calls["llm"] += 1
+            calls["insight_type"] = kwargs["insight_type"]
+            calls["substrate"] = kwargs["substrate"]
+            await asyncio.sleep(0.05)
+            return "insight text"
+
+        async def fake_substrate(supabase, basket_id):
+            return {"blocks": [{"id": "b1"}], "dumps": [], "events": []}
+
+        monkeypatch.setattr(p3, "supabase_admin", lambda: db)
+        monkeypatch.setattr(p3, "should_regenerate_insight_canon", lambda sb, b: {
+            "stale": True,
+            "current_canon": None,
+        })
+        monkeypatch.setattr(p3, "get_basket_digests", lambda sb, b: {
+            "substrate_hash": "hash-1",
+            "graph_signature": "graph-1",
+        })
+        monkeypatch.setattr(p3, "_fetch_basket_substrate", fake_substrate)
+        monkeypatch.setattr(
+            p3, "capture_substrate_snapshot", lambda sb, b, h: ({"block": [["b1", "x"]]}, False)
+        )
+        monkeypatch.setattr(
+            p3, "store_substrate_snapshot", lambda sb, b, h, snap: db.snapshots.append((h, snap))
+        )
+        monkeypatch.setattr(p3, "_generate_insight_text", fake_generate)
+        return db, calls
+
+    return setup
+
+
+@pytest.mark.asyncio
+async def test_cached_artifact_is_reused_without_llm(stale_basket):
+    cached = {
+        "id": "cached",
+        "basket_id": "basket-1",
+        "substrate_hash": "hash-1",
+        "graph_signature": "graph-1",
+        "reflection_text": "cached text",
+        "derived_from": [],
+        "created_at": "2026-01-01T00:00:00Z",
+    }
+    db, calls = stale_basket(cached=cached)
+
+    request = p3.GenerateInsightCanonRequest(basket_id="basket-1")
+    response = await p3.generate_insight_canon(request, None, user={})
+
+    assert response.insight_id == "cached"
+    assert calls["llm"] == 0
+    assert db.upserts == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_generation(stale_basket):
+    db, calls = stale_basket()
+
+    request = p3.GenerateInsightCanonRequest(basket_id="basket-1")
+    responses = await asyncio.gather(
+        *(p3.generate_insight_canon(request, None, user={}) for _ in range(5))
+    )
+
+    assert calls["llm"] == 1
+    assert len(db.upserts) == 1
+    assert {r.insight_id for r in responses} == {"new"}
+    assert p3._insight_canon_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_forced_request_does_not_join_unforced_generation(stale_basket):
+    db, calls = stale_basket()
+
+    plain_request = p3.GenerateInsightCanonRequest(basket_id="basket-1")
+    plain = asyncio.create_task(p3.generate_insight_canon(plain_request, None, user={}))
+    await asyncio.sleep(0)
+    forced_request = p3.GenerateInsightCanonRequest(basket_id="basket-1", force=True)
+    forced = await asyncio.gather(
+        *(p3.generate_insight_canon(forced_request, None, user={}) for _ in range(2))
+    )
+    await plain
+
+    # One run for the plain caller, one shared by both forced callers
+    assert calls["llm"] == 2
+    assert len(db.upserts) == 2
+    assert {r.insight_id for r in forced} == {"new"}
+    assert p3._insight_canon_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_small_exact_delta_revises_from_changed_rows_only(stale_basket, monkeypatch):
+    db, calls = stale_basket()
+    previous = {"id": "old", "basket_id": "basket-1", "reflection_text": "previous canon"}
+    delta = {
+        "blocks_accepted": 10, "dumps_total": 0, "events_total": 0, "exact": True,
+        "changes": {
+            "block": {"added": ["b11"], "removed": [], "modified": ["b2"]},
+            "dump": {"added": [], "removed": [], "modified": []},
+            "event": {"added": [], "removed": [], "modified": []},
+        },
+    }
+    fetched = {}
+
+    async def fake_fetch_by_ids(supabase, ids_by_type):
+        fetched.update(ids_by_type)
+        return {"blocks": [{"id": i} for i in ids_by_type["block"]], "dumps": [], "events": []}
+
+    monkeypatch.setattr(p3, "should_regenerate_insight_canon", lambda sb, b: {
+        "stale": True,
+        "current_canon": previous,
+        "substrate_delta": delta,
+        "current_substrate_hash": "hash-2",
+        "current_graph_signature": "graph-1",
+    })
+    monkeypatch.setattr(p3, "_fetch_substrate_by_ids", fake_fetch_by_ids)
+    monkeypatch.setattr(
+        p3,
+        "capture_substrate_snapshot",
+        lambda sb, b, h: ({"block": [["b1", "x"], ["b2", "y"]]}, True),
+    )
+
+    request = p3.GenerateInsightCanonRequest(basket_id="basket-1")
+    response = await p3.generate_insight_canon(request, None, user={})
+
+    assert calls["insight_type"] == "insight_canon_update"
+    assert fetched["block"] == ["b11", "b2"]
+    assert db.upserts[0]["previous_id"] == "old"
+    assert [d["id"] for d in response.derived_from] == ["b1", "b2"]
+    # The staleness check already stored hash-2's snapshot
+    assert db.snapshots == []
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_taken_before_generation(stale_basket, monkeypatch):
+    import lib.freshness as freshness
+
+    db, calls = stale_basket()
+    basket_rows = [["b1", "x"]]
+    monkeypatch.setattr(freshness, "load_substrate_snapshot", lambda sb, b, h: None)
+    monkeypatch.setattr(
+        freshness, "build_substrate_snapshot", lambda sb, b: {"block": list(basket_rows)}
+    )
+    monkeypatch.setattr(p3, "capture_substrate_snapshot", freshness.capture_substrate_snapshot)
+
+    async def generate_while_blocks_arrive(**_kwargs):
+        basket_rows.append(["b2", "written during generation"])
+        return "insight text"
+
+    monkeypatch.setattr(p3, "_generate_insight_text", generate_while_blocks_arrive)
+
+    await p3.generate_insight_canon(
+        p3.GenerateInsightCanonRequest(basket_id="basket-1"), None, user={}
+    )
+
+    assert db.snapshots == [("hash-1", {"block": [["b1", "x"]]})]
@@ -59,6 +59,7 @@ for name in ("supabase", "supabase_py", "asyncpg"):
                     return types.SimpleNamespace(data=[], error=None)
 
             mod.create_client = lambda *a, **k: _SupabaseStub()
+            mod.Client = _SupabaseStub
         if name == "asyncpg":
             mod.Pool = type("Pool", (), {})
             mod.create_pool = lambda *a, **k: None
@@ -69,6 +70,7 @@ sys.modules["supabase_py"] = sys.modules.get("supabase", sys.modules.get("supaba
 
 os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "stub-key")
 os.environ.setdefault("SUPABASE_URL", "http://stub.local")
+os.environ.setdefault("SUPABASE_ANON_KEY", "stub-key")
 os.environ.setdefault("SERVICE_ROLE", "stub-key")
 
 if "app.util.snapshot_assembler" not in sys.modules:
@@ -103,3 +105,15 @@ try:
             pass
 except Exception:
     pass
+
+# Route imports above can put infra/substrate first on sys.path, so
+# ``services`` may resolve to the infra mirror; keep modules that only
+# live under api/src/services importable as well
+try:
+    import services
+
+    _src_services = os.path.abspath(os.path.join(tests_dir, "../src/services"))
+    if _src_services not in services.__path__:
+        services.__path__.append(_src_services)
+except Exception:
+    pass
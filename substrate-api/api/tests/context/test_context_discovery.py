@@ -0,0 +1,154 @@
+import datetime as dt
+import random
+import time
+import uuid
+
+import pytest
+
+from app.context.services import context_discovery as cd
+from app.context.services.context_discovery import ContextDiscoveryService
+from app.models.context import ContextItem
+
+
+def _context(content):
+    return ContextItem(
+        id=uuid.uuid4(),
+        basket_id=uuid.uuid4(),
+        type="theme",
+        content=content,
+        status="active",
+        created_at=dt.datetime(2026, 1, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_long_block_sharing_a_context_phrase_joins_the_cluster(monkeypatch):
+    context = _context("quarterly revenue forecast")
+    filler = " ".join(f"word{i}" for i in range(400))
+    long_block = {
+        "id": str(uuid.uuid4()),
+        "content": f"{filler} the quarterly revenue forecast was revised {filler}",
+        "semantic_type": "insight",
+        "state": "ACCEPTED",
+    }
+    unrelated = {
+        "id": str(uuid.uuid4()),
+        "content": "lunch menu for friday",
+        "semantic_type": "insight",
+        "state": "PROPOSED",
+    }
+
+    async def contexts(cls, basket_id, workspace_id):
+        return [context]
+
+    async def blocks(cls, basket_id, workspace_id, scope="blocks"):
+        return [unrelated, long_block]
+
+    monkeypatch.setattr(ContextDiscoveryService, "_get_basket_contexts", classmethod(contexts))
+    monkeypatch.setattr(ContextDiscoveryService, "_get_basket_blocks", classmethod(blocks))
+
+    clusters = await ContextDiscoveryService.discover_semantic_clusters(uuid.uuid4(), "ws1")
+
+    # Word Jaccard is ~0.004, but phrase and state bonuses make it relevant
+    assert [b["block"]["id"] for b in clusters[0]["relevant_blocks"]] == [long_block["id"]]
+
+
+def test_text_features_are_memoized_per_call_only():
+    memo = {}
+    first = cd._text_features("Alpha beta gamma", memo)
+
+    assert cd._text_features("Alpha beta gamma", memo) is first
+    assert first[0] == frozenset({"alpha", "beta", "gamma"})
+    assert not hasattr(cd._text_features, "cache_info")
+
+
+def _corpus(seed, contexts, blocks):
+    rng = random.Random(seed)
+    topics = [[f"topic{t}term{i}" for i in range(6)] for t in range(contexts // 4)]
+    common = ["the", "and", "of", "plan", "team"]
+
+    def text():
+        topic = rng.choice(topics)
+        return " ".join(rng.sample(topic, 4) + rng.sample(common, 2))
+
+    states = ["PROPOSED", "ACCEPTED", "LOCKED", "CONSTANT"]
+    return (
+        [_context(text()) for _ in range(contexts)],
+        [
+            {"id": str(uuid.uuid4()), "content": text(), "semantic_type": "insight",
+             "state": rng.choice(states)}
+            for _ in range(blocks)
+        ],
+    )
+
+
+def _patch_basket(monkeypatch, contexts, blocks):
+    async def get_contexts(cls, basket_id, workspace_id):
+        return contexts
+
+    async def get_blocks(cls, basket_id, workspace_id, scope="blocks"):
+        return blocks
+
+    monkeypatch.setattr(ContextDiscoveryService, "_get_basket_contexts", classmethod(get_contexts))
+    monkeypatch.setattr(ContextDiscoveryService, "_get_basket_blocks", classmethod(get_blocks))
+
+
+async def _all_pairs_clusters(contexts, blocks, threshold):
+    clusters, processed = [], set()
+    for position, context in enumerate(contexts):
+        if context.id in processed:
+            continue
+        processed.add(context.id)
+        members = [context]
+        for other in contexts[position + 1:]:
+            if other.id not in processed and ContextDiscoveryService._calculate_semantic_similarity(
+                context.content, other.content
+            ) >= threshold:
+                members.append(other)
+                processed.add(other.id)
+        relevant = []
+        for block in blocks:
+            score = await ContextDiscoveryService._calculate_block_relevance(block, members, "ws1")
+            if score.relevance_score >= 0.5:
+                relevant.append(block["id"])
+        clusters.append(([c.id for c in members], relevant))
+    return clusters
+
+
+def _summary(clusters):
+    return sorted(
+        (
+            [c["primary_context"].id] + [c.id for c in c["related_contexts"]],
+            [b["block"]["id"] for b in c["relevant_blocks"]],
+        )
+        for c in clusters
+    )
+
+
+@pytest.mark.asyncio
+async def test_indexed_clustering_matches_all_pairs_scoring(monkeypatch):
+    contexts, blocks = _corpus(7, 120, 120)
+    _patch_basket(monkeypatch, contexts, blocks)
+
+    for threshold in (0.6, 0.4):
+        clusters = await ContextDiscoveryService.discover_semantic_clusters(
+            uuid.uuid4(), "ws1", cluster_threshold=threshold
+        )
+        expected = await _all_pairs_clusters(contexts, blocks, threshold)
+
+        # Block order within a cluster is by relevance, so compare as sets
+        assert [(ids, set(b)) for ids, b in _summary(clusters)] == sorted(
+            (ids, set(b)) for ids, b in expected if len(ids) > 1 or b
+        )
+
+
+@pytest.mark.asyncio
+async def test_clustering_two_thousand_items_is_subsecond(monkeypatch):
+    contexts, blocks = _corpus(11, 1000, 1000)
+    _patch_basket(monkeypatch, contexts, blocks)
+
+    started = time.perf_counter()
+    clusters = await ContextDiscoveryService.discover_semantic_clusters(uuid.uuid4(), "ws1")
+
+    assert time.perf_counter() - started < 1.0
+    assert clusters
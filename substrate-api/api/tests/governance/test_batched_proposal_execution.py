@@ -0,0 +1,154 @@
+"""Batched CreateBlock execution reports the same results as the per-op loop did."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.agents.pipeline.governance_processor as gp
+
+BASKET_ID = "basket-1"
+PROPOSAL_ID = "proposal-1"
+
+OPS = [
+    {"type": "CreateBlock", "data": {"title": "Roadmap", "content": "Ship v2 in Q3",
+                                     "semantic_type": "goal", "confidence": 0.9}},
+    {"type": "CreateBlock", "data": {"title": "Known", "content": "Already recorded",
+                                     "semantic_type": "fact"}},
+    {"type": "CreateBlock", "data": {"title": "Bad", "content": "Violates a constraint",
+                                     "semantic_type": "fact", "confidence": 0.5}},
+    {"type": "CreateBlock", "data": {"title": "Risk", "content": "Vendor may slip",
+                                     "semantic_type": "risk"}},
+]
+
+
+def _old_timeline_params(title, semantic_type, confidence):
+    """What the per-op loop passed to fn_timeline_emit for one created block."""
+    return {
+        "p_basket_id": BASKET_ID,
+        "p_kind": "block.created",
+        "p_ref_id": f"blk-{title}",
+        "p_preview": title,
+        "p_payload": {
+            "source": "governance_auto_execute",
+            "proposal_id": PROPOSAL_ID,
+            "semantic_type": semantic_type,
+            "confidence": confidence,
+        },
+    }
+
+
+# Results and timeline events of the per-op loop for OPS: op 1 is a
+# duplicate of an existing block, op 2's insert fails
+OLD_RESULTS = [
+    {"type": "CreateBlock", "success": True, "created_id": "blk-Roadmap"},
+    {"type": "CreateBlock", "success": True, "skipped": True, "reason": "semantic_duplicate",
+     "duplicate_of": "blk-existing", "similarity_score": 0.97},
+    {"type": "CreateBlock", "success": False, "error": "new row violates check constraint"},
+    {"type": "CreateBlock", "success": True, "created_id": "blk-Risk"},
+]
+OLD_TIMELINE = [
+    _old_timeline_params("Roadmap", "goal", 0.9),
+    _old_timeline_params("Risk", "risk", 0.7),
+]
+
+
+class _Insert:
+    def __init__(self, db, payload):
+        self.db = db
+        self.payload = payload
+
+    def execute(self):
+        if isinstance(self.payload, list):
+            self.db.bulk_inserts.append(self.payload)
+            # Postgres rejects the whole statement when one row is bad
+            if any(row["title"] == "Bad" for row in self.payload):
+                raise RuntimeError("new row violates check constraint")
+            return SimpleNamespace(data=[{"id": f"blk-{row['title']}"} for row in self.payload])
+        if self.payload["title"] == "Bad":
+            raise RuntimeError("new row violates check constraint")
+        return SimpleNamespace(data=[{"id": f"blk-{self.payload['title']}"}])
+
+
+class _FakeSupabase:
+    def __init__(self, batch_timeline=True):
+        self.batch_timeline = batch_timeline
+        self.bulk_inserts = []
+        self.rpcs = []
+
+    def table(self, _name):
+        return SimpleNamespace(insert=lambda payload: _Insert(self, payload))
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+
+        def execute():
+            if name == "fn_timeline_emit_batch" and not self.batch_timeline:
+                raise RuntimeError("function fn_timeline_emit_batch does not exist")
+            return SimpleNamespace(data=None)
+
+        return SimpleNamespace(execute=execute)
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    queued = []
+
+    async def fake_embed_texts(texts):
+        return [[1.0 if i == j else 0.0 for j in range(len(texts))] for i in range(len(texts))]
+
+    async def fake_duplicates(_supabase, _basket_id, items):
+        assert len(items) == len(OPS)
+        return [
+            {"is_duplicate": True, "existing_block_id": "blk-existing", "similarity": 0.97}
+            if position == 1 else None
+            for position in range(len(items))
+        ]
+
+    async def fake_queue_embedding(block_id):
+        queued.append(block_id)
+
+    monkeypatch.setattr(gp, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(gp, "find_semantic_duplicates_batch", fake_duplicates)
+    monkeypatch.setattr(gp, "queue_embedding_generation", fake_queue_embedding)
+
+    processor = gp.GovernanceDumpProcessor()
+    processor._execution_logging_enabled = False
+    processor.queued_embeddings = queued
+    return processor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_timeline", [True, False])
+async def test_batched_execution_matches_per_op_results(processor, monkeypatch, batch_timeline):
+    db = _FakeSupabase(batch_timeline=batch_timeline)
+    monkeypatch.setattr(gp, "supabase", db)
+
+    result = await processor._execute_proposal_operations({
+        "id": PROPOSAL_ID, "ops": OPS, "basket_id": BASKET_ID, "workspace_id": "ws-1",
+    })
+
+    assert result["executed_operations"] == OLD_RESULTS
+    assert result["created_substrate_ids"] == {"blocks": ["blk-Roadmap", "blk-Risk"]}
+
+    # The duplicate never reaches the insert; the bad row fails only itself
+    inserted = [[row["title"] for row in batch] for batch in db.bulk_inserts]
+    assert inserted == [["Roadmap", "Bad", "Risk"]]
+    # Vectors from the batch embed are stored, so nothing is queued
+    assert processor.queued_embeddings == []
+
+    if batch_timeline:
+        batch_calls = [params for name, params in db.rpcs if name == "fn_timeline_emit_batch"]
+        assert len(batch_calls) == 1
+        assert [
+            {
+                "p_basket_id": call["p_basket_id"],
+                "p_kind": event["kind"],
+                "p_ref_id": event["ref_id"],
+                "p_preview": event["preview"],
+                "p_payload": event["payload"],
+            }
+            for call in batch_calls for event in call["p_events"]
+        ] == OLD_TIMELINE
+    else:
+        assert [params for name, params in db.rpcs if name == "fn_timeline_emit"] == OLD_TIMELINE
+    assert processor._timeline_enabled is True
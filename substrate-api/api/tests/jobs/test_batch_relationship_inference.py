@@ -0,0 +1,175 @@
+from types import SimpleNamespace
+
+import pytest
+
+import jobs.batch_relationship_inference as job
+import jobs.progress as progress
+from services.semantic_primitives import RelationshipProposal
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.rows = None
+        self.filters = {}
+
+    def upsert(self, rows, **kwargs):
+        self.op, self.rows = "upsert", rows
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table == "blocks":
+            rows = [{"id": b, "title": "", "content": b} for b in self.db.blocks]
+            return SimpleNamespace(data=rows)
+        if self.table == "substrate_relationships":
+            if self.db.fail_writes:
+                raise RuntimeError("connection reset")
+            self.db.relationships.extend(self.rows)
+            return SimpleNamespace(data=self.rows)
+        # backfill_progress
+        if self.op == "upsert":
+            self.db.progress.update(r["item_id"] for r in self.rows)
+            return SimpleNamespace(data=self.rows)
+        return SimpleNamespace(data=[{"item_id": i} for i in self.db.progress])
+
+
+class _Db:
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.relationships = []
+        self.progress = set()
+        self.fail_writes = False
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+class _NoLimit:
+    async def acquire(self, **kwargs):
+        return None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = _Db(["b1", "b2", "b3"])
+    monkeypatch.setattr(job, "supabase", db)
+    monkeypatch.setattr(progress, "supabase", db)
+    return db
+
+
+def _infer(failing=()):
+    calls = []
+
+    async def infer_relationships(supabase, block_id, basket_id, raise_errors=False):
+        calls.append(block_id)
+        assert raise_errors
+        if block_id in failing:
+            raise RuntimeError("embedding failed")
+        return [RelationshipProposal(
+            from_block_id=block_id,
+            to_block_id="target",
+            relationship_type="causes",
+            confidence_score=0.95,
+            inference_method="llm_verification",
+            reasoning="r",
+        )]
+
+    return infer_relationships, calls
+
+
+async def _run(db, monkeypatch, failing=()):
+    infer, calls = _infer(failing)
+    monkeypatch.setattr(job, "infer_relationships", infer)
+    checkpoint = progress.BackfillCheckpoint("test", "run-1", flush_size=1)
+    stats = await job.batch_infer_relationships(
+        "basket-1", batch_size=1, workers=2, rate_limiter=_NoLimit(), checkpoint=checkpoint
+    )
+    return stats, calls
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_checkpointed_blocks(db, monkeypatch):
+    stats, calls = await _run(db, monkeypatch)
+    assert sorted(calls) == ["b1", "b2", "b3"]
+    assert db.progress == {"b1", "b2", "b3"}
+    assert stats["relationships_created"] == 3
+
+    stats, calls = await _run(db, monkeypatch)
+    assert calls == []
+    assert stats["blocks_skipped"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_inference_is_not_checkpointed(db, monkeypatch):
+    stats, _ = await _run(db, monkeypatch, failing={"b2"})
+    assert db.progress == {"b1", "b3"}
+    assert stats["errors"] == 1
+
+    _, calls = await _run(db, monkeypatch)
+    assert calls == ["b2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_write_is_retried_on_restart(db, monkeypatch):
+    db.fail_writes = True
+    stats, _ = await _run(db, monkeypatch)
+    assert db.progress == set()
+    assert stats["errors"] == 3
+    assert stats["relationships_created"] == 0
+
+    db.fail_writes = False
+    stats, calls = await _run(db, monkeypatch)
+    assert sorted(calls) == ["b1", "b2", "b3"]
+    assert db.progress == {"b1", "b2", "b3"}
+    assert len(db.relationships) == 3
+
+
+async def _run_without_proposals(db, monkeypatch, checkpoint):
+    seen = []
+
+    async def infer_relationships(supabase, block_id, basket_id, raise_errors=False):
+        # Progress persisted before this block started
+        seen.append(set(db.progress))
+        return []
+
+    monkeypatch.setattr(job, "infer_relationships", infer_relationships)
+    await job.batch_infer_relationships(
+        "basket-1", batch_size=10, workers=1, rate_limiter=_NoLimit(), checkpoint=checkpoint
+    )
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_blocks_without_proposals_are_checkpointed_by_count(db, monkeypatch):
+    db.blocks = ["b1", "b2", "b3", "b4", "b5"]
+    checkpoint = progress.BackfillCheckpoint("test", "run-1", flush_size=2)
+
+    seen = await _run_without_proposals(db, monkeypatch, checkpoint)
+
+    assert seen[2] == {"b1", "b2"}
+    assert seen[4] == {"b1", "b2", "b3", "b4"}
+    assert db.progress == set(db.blocks)
+
+
+@pytest.mark.asyncio
+async def test_blocks_without_proposals_are_checkpointed_by_age(db, monkeypatch):
+    checkpoint = progress.BackfillCheckpoint(
+        "test", "run-1", flush_size=100, flush_interval_seconds=0
+    )
+
+    seen = await _run_without_proposals(db, monkeypatch, checkpoint)
+
+    assert seen == [set(), {"b1"}, {"b1", "b2"}]
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+
+import jobs.embedding_generator as eg
+
+
+class _FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.after_id = None
+        self.page_size = None
+        self.count_only = False
+
+    def select(self, *args, count=None, **kwargs):
+        self.count_only = count == "exact"
+        return self
+
+    def gt(self, column, value):
+        self.after_id = value
+        return self
+
+    def limit(self, size):
+        self.page_size = size
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        pending = [b for b in self.db.blocks if b["id"] not in self.db.embedded]
+        if self.count_only:
+            return SimpleNamespace(data=pending[:1], count=len(pending))
+        rows = [b for b in pending if self.after_id is None or b["id"] > self.after_id]
+        return SimpleNamespace(data=rows[: self.page_size], count=None)
+
+
+class _FakeRpc:
+    def __init__(self, db, params):
+        self.db = db
+        self.params = params
+
+    def execute(self):
+        self.db.writes.append(self.params["p_items"])
+        for item in self.params["p_items"]:
+            self.db.embedded[item["id"]] = item["embedding"]
+        return SimpleNamespace(data=len(self.params["p_items"]))
+
+
+class _FakeSupabase:
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.embedded = {}
+        self.writes = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        assert name == "fn_set_block_embeddings"
+        return _FakeRpc(self, params)
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.calls = []
+
+    async def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class _NoCache:
+    def get_many(self, model, texts):
+        return [None] * len(texts)
+
+    def put_many(self, model, items):
+        pass
+
+
+def test_pack_token_batches_respects_budget_and_input_cap():
+    items = [{"id": str(i), "tokens": 40} for i in range(10)]
+
+    batches = eg.pack_token_batches(items, batch_tokens=100, max_inputs=3)
+
+    assert [len(batch) for batch in batches] == [2, 2, 2, 2, 2]
+    assert eg.pack_token_batches([{"id": "big", "tokens": 500}], batch_tokens=100) == [[{"id": "big", "tokens": 500}]]
+
+
+@pytest.mark.asyncio
+async def test_process_basket_embeddings_pages_batches_and_bulk_writes(monkeypatch):
+    blocks = [
+        {"id": f"b{i:02d}", "title": f"Title {i}", "content": "x" * 40}
+        for i in range(7)
+    ]
+    db = _FakeSupabase(blocks)
+    engine = _FakeEngine()
+    monkeypatch.setattr(eg, "supabase", db)
+    monkeypatch.setattr(eg, "get_embedding_engine", lambda: engine)
+    monkeypatch.setattr(eg, "get_embedding_cache", lambda: _NoCache())
+
+    result = await eg.process_basket_embeddings("basket-1", batch_tokens=30, page_size=3)
+
+    assert result["blocks_succeeded"] == 7
+    assert result["blocks_failed"] == 0
+    assert result["pages"] == 3
+    # One bulk write per page, one API call per token-budgeted pair
+    assert [len(items) for items in db.writes] == [3, 3, 1]
+    assert [len(call) for call in engine.calls] == [2, 1, 2, 1, 1]
+    assert set(db.embedded) == {b["id"] for b in blocks}
+
+
+@pytest.mark.asyncio
+async def test_process_basket_embeddings_dry_run_makes_no_calls(monkeypatch):
+    blocks = [{"id": f"b{i}", "title": "t", "content": "c"} for i in range(5)]
+    db = _FakeSupabase(blocks)
+    engine = _FakeEngine()
+    monkeypatch.setattr(eg, "supabase", db)
+    monkeypatch.setattr(eg, "get_embedding_engine", lambda: engine)
+
+    result = await eg.process_basket_embeddings("basket-1", page_size=2, dry_run=True)
+
+    assert result["blocks_processed"] == 5
+    assert result["api_calls"] == 3
+    assert engine.calls == []
+    assert db.writes == []
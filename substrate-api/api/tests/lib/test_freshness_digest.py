@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+from lib import freshness
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+
+    def upsert(self, rows, on_conflict=None):
+        self.db.upserted.extend(rows)
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table == freshness.DIGEST_TABLE:
+            return SimpleNamespace(data=self.db.digest_rows)
+        return SimpleNamespace(data=self.db.tables.get(self.table, []))
+
+
+class _Supabase:
+    def __init__(self, tables, digest_rows):
+        self.tables = tables
+        self.digest_rows = digest_rows
+        self.upserted = []
+        self.reads = []
+        self.rpcs = []
+
+    def table(self, name):
+        self.reads.append(name)
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=None))
+
+
+BLOCKS = [
+    {"id": "b1", "semantic_type": "goal", "content": "ship it"},
+    {"id": "b2", "semantic_type": "constraint", "content": None},
+]
+
+
+def _rows(digests):
+    return [{"substrate_type": t, **d} for t, d in digests.items()]
+
+
+def test_xor_digest_is_order_independent_and_incremental():
+    forward = freshness._accumulate(freshness.block_digest_text(b) for b in BLOCKS)
+    backward = freshness._accumulate(freshness.block_digest_text(b) for b in reversed(BLOCKS))
+    assert forward == backward
+
+    # Removing a row is XOR-ing its hash back out
+    single = freshness._accumulate([freshness.block_digest_text(BLOCKS[0])])
+    removed = dict(forward)
+    for i, word in enumerate(freshness._row_hash(freshness.block_digest_text(BLOCKS[1]))):
+        removed[f"d{i}"] ^= word
+    removed["row_count"] -= 1
+    assert removed == single
+
+
+def test_relationship_confidence_matches_sql_percentage_encoding():
+    rel = {"from_block_id": "a", "to_block_id": "b", "relationship_type": "supports"}
+    assert freshness.relationship_digest_text({**rel, "confidence_score": 0.85}).endswith(":85")
+    assert freshness.relationship_digest_text({**rel, "confidence_score": None}).endswith(":50")
+
+
+def test_relationship_confidence_rounds_half_away_from_zero_like_sql():
+    rel = {"from_block_id": "a", "to_block_id": "b", "relationship_type": "supports"}
+    # round() would give 12 (half to even); 0.285 * 100 is 28.4999... in floats
+    assert freshness.relationship_digest_text({**rel, "confidence_score": 0.125}).endswith(":13")
+    assert freshness.relationship_digest_text({**rel, "confidence_score": 0.285}).endswith(":29")
+
+
+def test_hashes_read_maintained_digest_without_scanning():
+    digests = {"block": freshness._accumulate(freshness.block_digest_text(b) for b in BLOCKS)}
+    db = _Supabase({"blocks": BLOCKS}, _rows(digests))
+
+    result = freshness.get_basket_digests(db, "basket-1")
+
+    assert db.reads == [freshness.DIGEST_TABLE]
+    assert result["substrate_hash"] == freshness._combine_digests(
+        digests, freshness.SUBSTRATE_DIGEST_TYPES
+    )
+
+
+def test_verify_reports_and_repairs_drift():
+    db = _Supabase({"blocks": BLOCKS}, _rows({"block": freshness._accumulate([])}))
+
+    report = freshness.verify_basket_digest(db, "basket-1", repair=True)
+
+    assert report["drift"] is True
+    assert report["types"]["block"]["match"] is False
+    assert report["types"]["dump"]["match"] is True
+    assert report["repaired"] is True
+    # Repair rebuilds in the database; the Python recomputation is never written
+    assert db.rpcs == [("fn_rebuild_basket_substrate_digest", {"p_basket_id": "basket-1"})]
+    assert db.upserted == []
+
+
+def test_verify_without_drift_does_not_repair():
+    digests = {"block": freshness._accumulate(freshness.block_digest_text(b) for b in BLOCKS)}
+    db = _Supabase({"blocks": BLOCKS}, _rows(digests))
+
+    report = freshness.verify_basket_digest(db, "basket-1", repair=True)
+
+    assert report["drift"] is False
+    assert report["repaired"] is False
+    assert db.rpcs == []
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from lib import freshness
+
+
+def test_merge_join_reports_added_removed_modified():
+    old = [["a", "1"], ["b", "2"], ["d", "4"]]
+    new = [["b", "2"], ["c", "3"], ["d", "5"], ["e", "6"]]
+
+    diff = freshness.diff_snapshot_entries(old, new)
+
+    assert diff == {"added": ["c", "e"], "removed": ["a"], "modified": ["d"]}
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = {}
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.db.snapshots[row["substrate_hash"]] = row["entries"]
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table == freshness.SNAPSHOT_TABLE:
+            entries = self.db.snapshots.get(self.filters.get("substrate_hash"))
+            return SimpleNamespace(data=[{"entries": entries}] if entries else [])
+        if self.table == freshness.DIGEST_TABLE:
+            return SimpleNamespace(data=[])
+        return SimpleNamespace(data=None)
+
+
+class _Supabase:
+    def __init__(self, snapshots, current):
+        self.snapshots = snapshots
+        self.current = current
+        self.rpc_calls = 0
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        self.rpc_calls += 1
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.current))
+
+
+def test_compute_substrate_diff_is_exact_and_stores_new_snapshot():
+    old = {"block": [["b1", "h1"], ["b2", "h2"]], "dump": [], "event": []}
+    current = {"block": [["b2", "h2x"], ["b3", "h3"]], "dump": [["d1", "x"]], "event": []}
+    db = _Supabase({"old": old}, current)
+
+    delta = freshness.compute_substrate_diff(db, "basket-1", "old", "new")
+
+    assert delta["exact"] is True
+    assert delta["blocks_accepted"] == 2
+    assert delta["changes"]["block"] == {"added": ["b3"], "removed": ["b1"], "modified": ["b2"]}
+    assert delta["changes"]["dump"]["added"] == ["d1"]
+    assert freshness.changed_substrate_ids(delta)["block"] == ["b3", "b2"]
+    assert db.snapshots["new"] == current
+
+    # Second check at the same hash reads the stored snapshot
+    freshness.compute_substrate_diff(db, "basket-1", "old", "new")
+    assert db.rpc_calls == 1
+
+
+def test_compute_substrate_diff_without_old_snapshot_reports_totals():
+    db = _Supabase({}, {"block": [["b1", "h"]], "dump": [], "event": []})
+
+    delta = freshness.compute_substrate_diff(db, "basket-1", "old", "new")
+
+    assert delta["exact"] is False
+    assert delta["blocks_accepted"] == 1
+    assert freshness.changed_substrate_ids(delta) is None
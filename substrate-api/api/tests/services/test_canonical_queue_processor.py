@@ -0,0 +1,302 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import services.canonical_queue_processor as cqp
+from services.queue_sharding import owned_buckets
+
+
+class _APIError(Exception):
+    def __init__(self, code):
+        super().__init__({"code": code, "message": "rpc failed"})
+        self.code = code
+
+
+class _RegistryQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *_args):
+        return self
+
+    def gt(self, column, value):
+        self.rows = [row for row in self.rows if row[column] > value]
+        return self
+
+    def eq(self, column, value):
+        self.rows = [row for row in self.rows if row[column] == value]
+        return self
+
+    def order(self, column):
+        self.rows = sorted(self.rows, key=lambda row: row[column])
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class _FakeSupabase:
+    """rpc() answers from per-function handlers; table() is the worker registry."""
+
+    def __init__(self, handlers=None, workers=None):
+        self.handlers = handlers or {}
+        self.workers = {row["worker_id"]: row for row in workers or []}
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+
+        def execute():
+            result = self.handlers.get(name, [])
+            if isinstance(result, Exception):
+                raise result
+            if callable(result):
+                result = result(params)
+            return SimpleNamespace(data=result)
+
+        return SimpleNamespace(execute=execute)
+
+    def table(self, _name):
+        return self
+
+    def upsert(self, row):
+        self.workers[row["worker_id"]] = row
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[row]))
+
+    def select(self, *_args):
+        return _RegistryQuery(list(self.workers.values()))
+
+    def rpc_names(self):
+        return [name for name, _params in self.calls]
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(cqp, "supabase", _FakeSupabase())
+    return cqp.CanonicalQueueProcessor(worker_id="w-1", poll_interval=0.01, max_concurrency=2)
+
+
+def _entry(queue_id, basket_id):
+    return {"id": queue_id, "basket_id": basket_id, "workspace_id": "ws-1"}
+
+
+@pytest.mark.asyncio
+async def test_items_of_one_basket_run_one_at_a_time_in_claim_order(processor):
+    order = []
+    active = {"now": 0, "max": 0}
+
+    async def fake_process(entry):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        order.append(("start", entry["id"]))
+        await asyncio.sleep(0.01)
+        order.append(("end", entry["id"]))
+        active["now"] -= 1
+
+    processor._process_entry = fake_process
+    for entry in (_entry("q1", "b1"), _entry("q2", "b1"), _entry("q3", "b2")):
+        processor._spawn(entry)
+
+    assert processor._claim_params(1)["p_exclude_baskets"] == ["b1", "b2"]
+    await asyncio.gather(*processor._in_flight.values())
+
+    assert order.index(("end", "q1")) < order.index(("start", "q2"))
+    # The other basket was not held up by b1
+    assert order.index(("start", "q3")) < order.index(("end", "q1"))
+    assert active["max"] == 2
+    assert processor._basket_locks == {} and processor._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_claim_loop_never_exceeds_max_concurrency(processor, monkeypatch):
+    pending = [_entry(f"q{i}", f"b{i}") for i in range(7)]
+    limits = []
+    active = {"now": 0, "max": 0, "done": 0}
+
+    async def fake_claim(limit=5):
+        limits.append(limit)
+        claimed, pending[:] = pending[:limit], pending[limit:]
+        return claimed
+
+    async def fake_process(_entry):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        active["done"] += 1
+        if active["done"] == 7:
+            await processor.stop()
+
+    async def no_heartbeat():
+        return None
+
+    processor._claim_work = fake_claim
+    processor._process_entry = fake_process
+    monkeypatch.setattr(processor, "_heartbeat_loop", no_heartbeat)
+    monkeypatch.setattr(cqp.event_bus, "DATABASE_URL", None)
+
+    await asyncio.wait_for(processor.start(), timeout=2)
+    await asyncio.gather(*processor._in_flight.values())
+
+    assert active["done"] == 7
+    assert active["max"] == 2
+    assert all(1 <= limit <= 2 for limit in limits)
+
+
+@pytest.mark.asyncio
+async def test_claim_uses_leased_function(processor):
+    processor.sharded = True
+    processor._owned_buckets = [3, 7]
+    cqp.supabase.handlers["fn_claim_pipeline_work_leased"] = [_entry("q1", "b1")]
+
+    claimed = await processor._claim_work(limit=2)
+
+    assert claimed == [_entry("q1", "b1")]
+    name, params = cqp.supabase.calls[-1]
+    assert name == "fn_claim_pipeline_work_leased"
+    assert params["p_limit"] == 2
+    assert params["p_lease_seconds"] == processor.lease_seconds
+    assert params["p_buckets"] == [3, 7]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code", ["PGRST202", "42883"])
+async def test_claim_falls_back_when_leased_function_is_missing(processor, code):
+    cqp.supabase.handlers["fn_claim_pipeline_work_leased"] = _APIError(code)
+    cqp.supabase.handlers["fn_claim_pipeline_work"] = [_entry("q1", "b1")]
+
+    assert await processor._claim_work(limit=2) == [_entry("q1", "b1")]
+    assert processor._leased_claims is False
+
+    await processor._claim_work(limit=2)
+    assert cqp.supabase.rpc_names() == [
+        "fn_claim_pipeline_work_leased", "fn_claim_pipeline_work", "fn_claim_pipeline_work"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transient_claim_error_keeps_leased_claims(processor):
+    cqp.supabase.handlers["fn_claim_pipeline_work_leased"] = _APIError("57014")
+
+    assert await processor._claim_work(limit=2) == []
+    assert processor._leased_claims is True
+    assert cqp.supabase.rpc_names() == ["fn_claim_pipeline_work_leased"]
+
+    cqp.supabase.handlers["fn_claim_pipeline_work_leased"] = [_entry("q1", "b1")]
+    assert await processor._claim_work(limit=2) == [_entry("q1", "b1")]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_leases_and_abandons_lost_items(processor):
+    cqp.supabase.handlers["fn_renew_queue_leases"] = [{"id": "q1"}]
+    release = asyncio.Event()
+
+    async def fake_process(entry):
+        await release.wait()
+        await processor._update_queue_state(entry["id"], "completed")
+
+    processor._process_entry = fake_process
+    processor.lease_seconds = 0.03
+    processor.running = True
+    processor._spawn(_entry("q1", "b1"))
+    processor._spawn(_entry("q2", "b2"))
+    lost_task = processor._in_flight["q2"]
+    heartbeat = asyncio.create_task(processor._heartbeat_loop())
+
+    for _ in range(100):
+        if "q2" not in processor._in_flight:
+            break
+        await asyncio.sleep(0.01)
+
+    assert lost_task.cancelled()
+    assert "q1" in processor._in_flight
+    assert processor.stats["lost_leases"] == 1
+
+    release.set()
+    processor.running = False
+    await asyncio.wait_for(heartbeat, timeout=1)
+
+    renewals = [params for name, params in cqp.supabase.calls if name == "fn_renew_queue_leases"]
+    assert renewals[0]["p_ids"] == ["q1", "q2"]
+    updates = [
+        params["p_id"] for name, params in cqp.supabase.calls if name == "fn_update_queue_state"
+    ]
+    assert updates == ["q1"]
+
+
+@pytest.mark.asyncio
+async def test_drain_releases_unfinished_items_and_stops_heartbeat(processor, monkeypatch):
+    claims = [[_entry("q1", "b1"), _entry("q2", "b2")]]
+
+    async def fake_claim(limit=5):
+        return claims.pop() if claims else []
+
+    async def fake_process(entry):
+        # q1 finishes within the drain timeout, q2 never does
+        await asyncio.sleep(0.1 if entry["id"] == "q1" else 60)
+
+    processor._claim_work = fake_claim
+    processor._process_entry = fake_process
+    monkeypatch.setattr(cqp.event_bus, "DATABASE_URL", None)
+
+    loop_task = asyncio.create_task(processor.start())
+    for _ in range(100):
+        if len(processor._in_flight) == 2:
+            break
+        await asyncio.sleep(0.01)
+    heartbeat = processor._heartbeat_task
+    assert heartbeat is not None and not heartbeat.done()
+
+    result = await processor.drain(timeout=0.5)
+    await asyncio.wait_for(loop_task, timeout=1)
+
+    assert result == {"finished": 1, "released": 1}
+    assert ("fn_release_queue_items", {"p_worker_id": "w-1", "p_ids": ["q2"]}) in cqp.supabase.calls
+    assert heartbeat.cancelled() and processor._heartbeat_task is None
+    assert cqp.supabase.workers["w-1"]["draining"] is True
+    assert cqp.supabase.workers["w-1"]["stats"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_heartbeat(processor, monkeypatch):
+    async def fake_claim(limit=5):
+        return []
+
+    processor._claim_work = fake_claim
+    monkeypatch.setattr(cqp.event_bus, "DATABASE_URL", None)
+
+    loop_task = asyncio.create_task(processor.start())
+    await asyncio.sleep(0.02)
+    heartbeat = processor._heartbeat_task
+
+    await processor.stop()
+    await asyncio.wait_for(loop_task, timeout=1)
+
+    assert heartbeat.cancelled() and processor._heartbeat_task is None
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_split_among_live_sharded_workers_only(processor):
+    now = datetime.now(timezone.utc)
+    fresh = now.isoformat()
+    stale = (now - timedelta(minutes=10)).isoformat()
+    cqp.supabase.workers = {
+        row["worker_id"]: row
+        for row in [
+            {"worker_id": "w-a", "sharded": True, "draining": False, "heartbeat_at": fresh},
+            {"worker_id": "w-b", "sharded": True, "draining": False, "heartbeat_at": stale},
+            {"worker_id": "w-c", "sharded": False, "draining": False, "heartbeat_at": fresh},
+            {"worker_id": "w-d", "sharded": True, "draining": True, "heartbeat_at": fresh},
+        ]
+    }
+    processor.sharded = True
+
+    await processor._report_worker()
+
+    assert processor._owned_buckets == owned_buckets("w-1", ["w-1", "w-a"])
+    # Health reporting still lists every live worker
+    live = cqp._fetch_live_workers(processor.lease_seconds)
+    assert [row["worker_id"] for row in live] == ["w-1", "w-a", "w-c", "w-d"]
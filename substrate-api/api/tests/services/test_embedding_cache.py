@@ -0,0 +1,36 @@
+from services.embedding_cache import (
+    EmbeddingCache,
+    SQLiteEmbeddingStore,
+    embedding_text_hash,
+)
+
+
+def test_hash_ignores_whitespace_differences():
+    assert embedding_text_hash("Rate  limit\nlogin ") == embedding_text_hash("Rate limit login")
+    assert embedding_text_hash("Rate limit login") != embedding_text_hash("rate limit login")
+
+
+def test_memory_tier_respects_byte_budget():
+    # Two float32 vectors of 4 dims = 32 bytes; budget fits exactly two
+    cache = EmbeddingCache(store=None, max_bytes=32)
+    cache.put("m", "a", [1.0, 0.0, 0.0, 0.0])
+    cache.put("m", "b", [0.0, 1.0, 0.0, 0.0])
+    assert cache.get("m", "a") is not None  # touch "a" so "b" is least recent
+    cache.put("m", "c", [0.0, 0.0, 1.0, 0.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0, 0.0, 0.0, 0.0]
+    assert cache.memory_bytes == 32
+    assert cache.stats["evictions"] == 1
+
+
+def test_persistent_tier_survives_new_process(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    EmbeddingCache(store=SQLiteEmbeddingStore(path)).put_many(
+        "m", [("alpha", [0.5, 0.25]), ("beta", None)]
+    )
+
+    fresh = EmbeddingCache(store=SQLiteEmbeddingStore(path))
+    assert fresh.get_many("m", ["alpha", "beta"]) == [[0.5, 0.25], None]
+    assert fresh.get("other-model", "alpha") is None
+    assert fresh.stats["store_hits"] == 1
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.embedding_engine import EmbeddingEngine
+
+
+class _FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+                for i, text in enumerate(input)
+            ]
+        )
+
+
+def _engine(**kwargs):
+    embeddings = _FakeEmbeddings()
+    client = SimpleNamespace(embeddings=embeddings)
+    engine = EmbeddingEngine("test-model", 2, client=client, **kwargs)
+    return engine, embeddings
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    engine, embeddings = _engine(max_wait_ms=5)
+
+    results = await asyncio.gather(
+        engine.embed("alpha"),
+        engine.embed("beta!"),
+        engine.embed("alpha"),
+    )
+
+    assert len(embeddings.calls) == 1
+    assert embeddings.calls[0] == ["alpha", "beta!"]
+    assert results[0] == results[2] == [5.0, 1.0]
+    assert engine.stats["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_size_splits_bursts():
+    engine, embeddings = _engine(max_batch_size=2, max_wait_ms=50)
+
+    results = await engine.embed_many(["a", "bb", "ccc"])
+
+    assert [len(call) for call in embeddings.calls] == [2, 1]
+    assert results == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_empty_text_and_dimension_mismatch_return_none():
+    engine, embeddings = _engine(max_wait_ms=1)
+    engine.dimensions = 3
+
+    assert await engine.embed("   ") is None
+    assert await engine.embed("text") is None
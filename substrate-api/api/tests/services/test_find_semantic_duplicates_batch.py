@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+
+import services.semantic_primitives as sp
+
+
+class _FakeRpc:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def execute(self):
+        return SimpleNamespace(data=self._rows)
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.rpc_calls = []
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        return _FakeRpc(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_batch_duplicates_one_rpc_with_vector_precedence_over_hash():
+    client = _FakeSupabase([
+        {"item_index": 0, "block_id": "b-low", "content": "low", "similarity_score": 0.75, "match_kind": "vector"},
+        {"item_index": 0, "block_id": "b-high", "content": "high", "similarity_score": 0.92, "match_kind": "vector"},
+        {"item_index": 0, "block_id": "b-hash", "content": "same", "similarity_score": 1.0, "match_kind": "hash"},
+        {"item_index": 1, "block_id": "b-exact", "content": "same", "similarity_score": 1.0, "match_kind": "hash"},
+    ])
+    items = [
+        {"semantic_type": "fact", "embedding": [0.1, 0.2], "content_hash": "h0"},
+        {"semantic_type": "fact", "embedding": None, "content_hash": "h1"},
+        {"semantic_type": "goal", "embedding": [0.3, 0.4], "content_hash": "h2"},
+    ]
+
+    results = await sp.find_semantic_duplicates_batch(client, "basket-1", items)
+
+    assert len(client.rpc_calls) == 1
+    name, params = client.rpc_calls[0]
+    assert name == "fn_find_block_duplicates"
+    assert [item["index"] for item in params["p_items"]] == [0, 1, 2]
+
+    assert results[0]["is_duplicate"] is True
+    assert results[0]["existing_block_id"] == "b-high"
+    assert [b["id"] for b in results[0]["similar_blocks"]] == ["b-high", "b-low"]
+    assert results[1] == {
+        "is_duplicate": True,
+        "similarity": 1.0,
+        "existing_block_id": "b-exact",
+        "similar_blocks": [],
+    }
+    assert results[2] is None
+
+
+@pytest.mark.asyncio
+async def test_batch_duplicates_below_high_confidence_is_not_duplicate():
+    client = _FakeSupabase([
+        {"item_index": 0, "block_id": "b-1", "content": "x", "similarity_score": 0.72, "match_kind": "vector"},
+    ])
+
+    results = await sp.find_semantic_duplicates_batch(
+        client, "basket-1", [{"semantic_type": "fact", "embedding": [0.1], "content_hash": None}]
+    )
+
+    assert results[0]["is_duplicate"] is False
+    assert results[0]["similar_blocks"][0]["id"] == "b-1"
+
+
+def test_collapse_batch_duplicates_keeps_first_of_each_group():
+    items = [
+        {"semantic_type": "fact", "content_hash": "h0"},
+        {"semantic_type": "fact", "content_hash": "h0"},
+        {"semantic_type": "fact", "content_hash": "h2"},
+        {"semantic_type": "goal", "content_hash": "h3"},
+        {"semantic_type": "fact", "content_hash": "h4"},
+    ]
+    embeddings = [
+        [1.0, 0.0],
+        [1.0, 0.0],
+        [0.99, 0.05],  # near-duplicate of item 0
+        [1.0, 0.0],    # same vector, different semantic type
+        [0.0, 1.0],
+    ]
+
+    results = sp.collapse_batch_duplicates(items, embeddings)
+
+    assert results[0] is None
+    assert results[1] == {"duplicate_of": 0, "similarity": 1.0, "match_kind": "hash"}
+    assert results[2]["duplicate_of"] == 0
+    assert results[2]["match_kind"] == "vector"
+    assert results[3] is None
+    assert results[4] is None
+
+
+def test_collapse_batch_duplicates_hash_only_without_embeddings():
+    items = [
+        {"semantic_type": "fact", "content_hash": "h0"},
+        {"semantic_type": "goal", "content_hash": "h0"},
+        {"semantic_type": "fact", "content_hash": None},
+    ]
+
+    results = sp.collapse_batch_duplicates(items)
+
+    assert results == [None, {"duplicate_of": 0, "similarity": 1.0, "match_kind": "hash"}, None]
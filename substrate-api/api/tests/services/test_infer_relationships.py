@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import services.semantic_primitives as sp
+
+
+class _FakeQuery:
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self._data)
+
+
+class _FakeSupabase:
+    def __init__(self, source_block, candidates_by_type):
+        self.source_block = source_block
+        self.candidates_by_type = candidates_by_type
+        self.rpc_calls = []
+
+    def table(self, name):
+        return _FakeQuery(self.source_block)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append(params)
+        rows = []
+        for semantic_type in params["p_semantic_types"]:
+            rows.extend(self.candidates_by_type.get(semantic_type, []))
+        return _FakeQuery(rows)
+
+
+def _row(block_id, semantic_type, similarity=0.8):
+    return {
+        "id": block_id,
+        "basket_id": "basket-1",
+        "content": f"content {block_id}",
+        "semantic_type": semantic_type,
+        "state": "ACCEPTED",
+        "similarity_score": similarity,
+    }
+
+
+@pytest.mark.asyncio
+async def test_infer_relationships_embeds_once_and_batches_verification(monkeypatch):
+    embed_calls = []
+    verify_calls = []
+
+    async def fake_embed_text(text):
+        embed_calls.append(text)
+        return [0.1, 0.2]
+
+    async def fake_verify_batch(from_block, candidates):
+        verify_calls.append(candidates)
+        return [
+            {"exists": True, "confidence_score": 0.9, "reasoning": "ok"}
+            if c["to_block"]["id"] != "self-block"
+            else {"exists": False, "confidence_score": 0.0, "reasoning": "self"}
+            for c in candidates
+        ]
+
+    monkeypatch.setattr(sp, "embed_text", fake_embed_text)
+    monkeypatch.setattr(sp, "verify_relationships_batch_with_llm", fake_verify_batch)
+    monkeypatch.setattr(sp, "RELATIONSHIP_VERIFY_BATCH_SIZE", 10)
+
+    # "action" applies to addresses + depends_on
+    supabase = _FakeSupabase(
+        {"id": "self-block", "content": "Add rate limiting", "semantic_type": "action"},
+        {
+            "problem": [_row("p1", "problem"), _row("p2", "problem")],
+            "prerequisite": [_row("q1", "prerequisite")],
+            "action": [_row("self-block", "action")],
+        },
+    )
+
+    proposals = await sp.infer_relationships(supabase, "self-block", "basket-1")
+
+    assert embed_calls == ["Add rate limiting"]
+    assert len(supabase.rpc_calls) == 2
+    assert len(verify_calls) == 1
+    assert sorted((p.relationship_type, p.to_block_id) for p in proposals) == [
+        ("addresses", "p1"),
+        ("addresses", "p2"),
+        ("depends_on", "q1"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_single_candidate_verification_respects_concurrency_limit(monkeypatch):
+    active = {"now": 0, "max": 0}
+
+    async def fake_verify(from_block, to_block, relationship_type):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return {"exists": True, "confidence_score": 0.9, "reasoning": to_block["id"]}
+
+    monkeypatch.setattr(sp, "verify_relationship_with_llm", fake_verify)
+    monkeypatch.setattr(sp, "_verify_semaphore", asyncio.Semaphore(2))
+
+    source = {"id": "s", "content": "source"}
+    results = await asyncio.gather(*(
+        sp.verify_relationships_batch_with_llm(
+            source,
+            [{"relationship_type": "addresses", "to_block": {"id": f"t{i}", "content": "target"}}],
+        )
+        for i in range(5)
+    ))
+
+    assert [r[0]["reasoning"] for r in results] == [f"t{i}" for i in range(5)]
+    assert active["max"] == 2
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+
+import services.llm as llm_module
+import services.llm_cache as cache_module
+from services.llm_cache import LLMResponseCache, llm_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+
+    def fake_time():
+        now["t"] += 1.0
+        return now["t"]
+
+    monkeypatch.setattr(cache_module.time, "time", fake_time)
+    return now
+
+
+def test_key_covers_model_schema_temperature_and_prompt():
+    base = llm_cache_key("m", "p4_scoring_selection", 1.0, "prompt")
+    assert base == llm_cache_key("m", "p4_scoring_selection", 1.0, "prompt")
+    assert base != llm_cache_key("m2", "p4_scoring_selection", 1.0, "prompt")
+    assert base != llm_cache_key("m", "p4_narrative_structure", 1.0, "prompt")
+    assert base != llm_cache_key("m", "p4_scoring_selection", 0.2, "prompt")
+    assert base != llm_cache_key("m", "p4_scoring_selection", 1.0, "prompt!")
+    assert base != llm_cache_key("m", "p4_scoring_selection", 1.0, "prompt", max_tokens=4000)
+    assert llm_cache_key("m", "s", 1.0, "p", 4000) != llm_cache_key("m", "s", 1.0, "p", 2000)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"), ttl_seconds=10)
+    cache.put("m", "s", 1.0, "p", {"content": "x"})
+
+    assert cache.get("m", "s", 1.0, "p") == {"content": "x"}
+    clock["t"] += 60
+    assert cache.get("m", "s", 1.0, "p") is None
+    assert cache.stats["s"] == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"), max_entries=2)
+    cache.put("m", "s", 1.0, "a", {"content": "a"})
+    cache.put("m", "s", 1.0, "b", {"content": "b"})
+    assert cache.get("m", "s", 1.0, "a") is not None  # "b" is now least recent
+    cache.put("m", "s", 1.0, "c", {"content": "c"})
+
+    assert cache.get("m", "s", 1.0, "b") is None
+    assert cache.get("m", "s", 1.0, "a") == {"content": "a"}
+    assert cache.stats_snapshot()["totals"]["evictions"] == 1
+
+
+def test_schema_allowlist_limits_call_sites(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"), schemas=["doc_insight", ""])
+    assert cache.enabled_for("doc_insight")
+    assert not cache.enabled_for("p4_scoring_selection")
+
+
+@pytest.mark.asyncio
+async def test_provider_reuses_cached_json_only_when_opted_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    monkeypatch.setattr(llm_module, "get_llm_cache", lambda: cache)
+
+    calls = []
+
+    async def fake_chat(**params):
+        calls.append(params["schema_name"])
+        message = SimpleNamespace(content='{"selected_indices": [1]}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    provider = llm_module.OpenAIProvider()
+    provider.transport = SimpleNamespace(chat=fake_chat)
+
+    schema = "p4_scoring_selection"
+    first = await provider.get_json_response("prompt", schema_name=schema, cache=True)
+    second = await provider.get_json_response("prompt", schema_name=schema, cache=True)
+    uncached = await provider.get_json_response("prompt", schema_name=schema)
+
+    assert len(calls) == 2
+    assert not first.cached and second.cached and not uncached.cached
+    assert second.parsed == {"selected_indices": [1]}
+    assert cache.stats["p4_scoring_selection"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_text_is_not_cached_and_budget_is_part_of_key(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    monkeypatch.setattr(llm_module, "get_llm_cache", lambda: cache)
+
+    finish_reasons = ["length", "stop", "stop"]
+    calls = []
+
+    async def fake_chat(**params):
+        calls.append(params["max_completion_tokens"])
+        message = SimpleNamespace(content="insight text")
+        choice = SimpleNamespace(message=message, finish_reason=finish_reasons.pop(0))
+        return SimpleNamespace(choices=[choice], usage=None)
+
+    provider = llm_module.OpenAIProvider()
+    provider.transport = SimpleNamespace(chat=fake_chat)
+
+    async def call(max_tokens):
+        return await provider.get_text_response(
+            "prompt", max_tokens=max_tokens, schema_name="doc_insight", cache=True
+        )
+
+    truncated = await call(100)
+    complete = await call(100)
+    reused = await call(100)
+    larger = await call(800)
+
+    assert calls == [100, 100, 800]
+    assert not truncated.cached and not complete.cached and reused.cached and not larger.cached
+    assert cache.stats["doc_insight"]["writes"] == 2
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import services.llm_transport as transport_module
+from services.llm_transport import LLMTransport, llm_workspace_scope
+
+
+def _rate_limit_error(retry_after="0.01"):
+    response = httpx.Response(
+        429,
+        headers={"retry-after": retry_after},
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class _FakeCompletions:
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise _rate_limit_error()
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.active -= 1
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+
+
+def _transport(completions, **kwargs):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMTransport(client=client, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limits_honoring_retry_after(monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(transport_module.asyncio, "sleep", fake_sleep)
+    completions = _FakeCompletions(failures=2)
+    transport = _transport(completions, max_retries=3)
+
+    await transport.chat(schema_name="p4_test", model="m", messages=[])
+
+    assert completions.calls == 3
+    assert sleeps == [0.01, 0.01]
+    usage = transport.usage_snapshot()["p4_test"]
+    assert usage["calls"] == 1
+    assert usage["retries"] == 2
+    assert usage["input_tokens"] == 10 and usage["output_tokens"] == 5
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    transport = _transport(_FakeCompletions(failures=5), max_retries=1)
+
+    with pytest.raises(openai.RateLimitError):
+        await transport.chat(schema_name="p1", model="m", messages=[])
+
+    assert transport.usage["p1"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_workspace_limit_applies_inside_scope():
+    completions = _FakeCompletions(delay=0.01)
+    transport = _transport(completions, max_concurrency=10, workspace_concurrency=2)
+
+    async def call():
+        await transport.chat(schema_name="p1", model="m", messages=[])
+
+    with llm_workspace_scope("ws-1"):
+        await asyncio.gather(*(call() for _ in range(6)))
+    assert completions.max_active == 2
+
+    completions.max_active = 0
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert completions.max_active == 6
+
+
+
+@pytest.mark.asyncio
+async def test_idle_workspace_semaphores_are_released():
+    release = asyncio.Event()
+
+    async def create(**params):
+        if params["model"] == "slow":
+            await release.wait()
+        return SimpleNamespace(usage=None)
+
+    transport = _transport(SimpleNamespace(create=create), workspace_concurrency=1)
+
+    async def call(workspace_id, model="m"):
+        await transport.chat(schema_name="p1", workspace_id=workspace_id, model=model, messages=[])
+
+    # One call holds the busy workspace's slot, the other waits for it
+    busy = [asyncio.create_task(call("ws-busy", "slow")) for _ in range(2)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*(call(f"ws-{i}") for i in range(100)))
+
+    assert list(transport._workspace_slots.keys()) == ["ws-busy"]
+    release.set()
+    await asyncio.gather(*busy)
+    assert len(transport._workspace_slots) == 0
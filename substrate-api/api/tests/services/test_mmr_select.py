@@ -0,0 +1,22 @@
+from services.semantic_primitives import mmr_select
+
+
+def test_mmr_prefers_diverse_candidate_over_near_duplicate():
+    query = [1.0, 0.0, 0.0]
+    embeddings = [
+        [0.95, 0.05, 0.0],   # most relevant
+        [0.94, 0.06, 0.0],   # near-duplicate of 0
+        [0.7, 0.0, 0.7],     # less relevant, different direction
+    ]
+
+    assert mmr_select(query, embeddings, k=2, lambda_=0.5) == [0, 2]
+    # Pure relevance keeps the near-duplicate
+    assert mmr_select(query, embeddings, k=2, lambda_=1.0) == [0, 1]
+
+
+def test_mmr_skips_missing_vectors_and_uses_given_relevance():
+    embeddings = [[1.0, 0.0], None, [0.0, 1.0]]
+
+    order = mmr_select([1.0, 0.0], embeddings, k=5, relevance=[0.1, 0.9, 0.8])
+
+    assert order == [2, 0]
@@ -0,0 +1,27 @@
+from services.queue_sharding import assign_buckets, owned_buckets
+
+
+def test_every_bucket_has_exactly_one_owner():
+    assignment = assign_buckets(["w-a", "w-b", "w-c"], bucket_count=256)
+
+    owned = sorted(bucket for buckets in assignment.values() for bucket in buckets)
+    assert owned == list(range(256))
+    assert all(buckets for buckets in assignment.values())
+
+
+def test_adding_a_worker_moves_only_its_share_of_buckets():
+    before = assign_buckets(["w-a", "w-b", "w-c"], bucket_count=1024)
+    after = assign_buckets(["w-a", "w-b", "w-c", "w-d"], bucket_count=1024)
+
+    owner_before = {b: w for w, buckets in before.items() for b in buckets}
+    owner_after = {b: w for w, buckets in after.items() for b in buckets}
+    moved = [b for b in owner_before if owner_before[b] != owner_after[b]]
+
+    # Only buckets taken over by the new worker move
+    assert all(owner_after[b] == "w-d" for b in moved)
+    assert len(moved) < 1024 / 2
+
+
+def test_unregistered_worker_claims_everything():
+    assert owned_buckets("w-x", ["w-a", "w-b"]) is None
+    assert owned_buckets("w-a", ["w-a"], bucket_count=8) == list(range(8))
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from services.rate_limiter import OpenAIRateLimiter, TokenBucket
+
+
+def test_token_bucket_delay_reflects_deficit():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)  # 1 token/s
+    assert bucket.delay_for(2) == 0.0
+    bucket.consume(2)
+    assert bucket.delay_for(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_oversized_request_is_capped_to_capacity():
+    bucket = TokenBucket(rate_per_minute=60, capacity=5)
+    assert bucket.delay_for(50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_limiter_throttles_on_tokens_per_minute(monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+        # Advance the buckets as if time had passed
+        for bucket in (limiter.requests, limiter.tokens):
+            bucket._updated -= delay
+
+    limiter = OpenAIRateLimiter(rpm=600, tpm=6000)  # 100 tokens/s
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    await limiter.acquire(tokens=6000)
+    await limiter.acquire(tokens=300)
+
+    assert slept and slept[0] == pytest.approx(3.0, abs=0.05)
+    assert limiter.total_tokens == 6300
+    assert limiter.total_requests == 2
@@ -0,0 +1,137 @@
+"""Tests for verified-claims and integration-token caching."""
+
+from __future__ import annotations
+
+import base64
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+import auth.integration_tokens as it
+import auth.jwt_verifier as jv
+
+SECRET_BYTES = b"super-secret-signing-key-for-tests"
+
+
+@pytest.fixture()
+def verifier(monkeypatch):
+    encoded = base64.b64encode(SECRET_BYTES).decode()
+    monkeypatch.setattr(jv, "RAW_SECRET", encoded)
+    monkeypatch.setattr(jv, "SUPABASE_URL", "")
+    monkeypatch.setattr(jv, "_SECRETS", [("raw", encoded), ("base64", SECRET_BYTES)])
+    monkeypatch.setattr(jv, "_claims_cache", jv.OrderedDict())
+
+    decoded = []
+    real_decode = jv._decode
+
+    def counting_decode(token, secret):
+        decoded.append(secret)
+        return real_decode(token, secret)
+
+    monkeypatch.setattr(jv, "_decode", counting_decode)
+    return decoded
+
+
+def _token(exp_in: int = 60) -> str:
+    payload = {"sub": "user123", "aud": "authenticated", "exp": int(time.time()) + exp_in}
+    return jwt.encode(payload, SECRET_BYTES, algorithm="HS256")
+
+
+def test_secret_variant_is_resolved_once_and_claims_are_cached(verifier):
+    first, second = _token(), _token(120)
+
+    assert jv.verify_jwt(first)["sub"] == "user123"
+    assert [variant for variant, _ in jv._SECRETS] == ["base64"]
+    assert jv.verify_jwt(first)["sub"] == "user123"
+    jv.verify_jwt(second)
+
+    # raw + base64 for the first token, cache hit, base64 only for the second
+    assert verifier == [jv.RAW_SECRET, SECRET_BYTES, SECRET_BYTES]
+
+
+def test_cached_claims_expire_with_the_token(verifier, monkeypatch):
+    token = _token(exp_in=5)
+    jv.verify_jwt(token)
+    jv.verify_jwt(token)
+    assert len(verifier) == 2
+
+    later = time.time() + 10
+    monkeypatch.setattr(jv.time, "time", lambda: later)
+    jv.verify_jwt(token)  # past exp in the cache's clock: verified again
+    assert len(verifier) == 3
+
+
+class _IntegrationTokensTable:
+    def __init__(self, record):
+        self.record = record
+        self.selects = 0
+        self.updates = []
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_args):
+        self.selects += 1
+        return self
+
+    def update(self, values):
+        self.updates.append(values)
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=dict(self.record) if self.record else None)
+
+
+def _integration_db(monkeypatch):
+    db = _IntegrationTokensTable(
+        {"id": "tok-1", "user_id": "u", "workspace_id": "w", "revoked_at": None}
+    )
+    monkeypatch.setattr(it, "supabase_admin", lambda: db)
+    monkeypatch.setattr(it, "_token_cache", it.OrderedDict())
+    monkeypatch.setattr(it, "_usage_written", {})
+    monkeypatch.setattr(it, "_usage_pending", {})
+    return db
+
+
+def test_integration_token_lookups_are_cached_until_revoked(monkeypatch):
+    db = _integration_db(monkeypatch)
+
+    for _ in range(3):
+        assert it.verify_integration_token("yit_abc")["workspace_id"] == "w"
+
+    assert db.selects == 1
+    assert len(db.updates) == 1  # last_used_at throttled per token
+
+    db.record["revoked_at"] = "2026-10-16T00:00:00Z"
+    it.invalidate_integration_token("tok-1")
+    with pytest.raises(HTTPException):
+        it.verify_integration_token("yit_abc")
+    assert db.selects == 2
+
+
+@pytest.mark.asyncio
+async def test_usage_inside_the_flush_interval_is_written_when_it_ends(monkeypatch):
+    import asyncio
+
+    db = _integration_db(monkeypatch)
+    monkeypatch.setattr(it, "USAGE_FLUSH_INTERVAL", 0.05)
+
+    for _ in range(3):
+        it.verify_integration_token("yit_abc")
+    await asyncio.sleep(0.01)
+    assert len(db.updates) == 1
+
+    await asyncio.sleep(0.1)
+    # One deferred write carrying the latest use
+    assert len(db.updates) == 2
+    assert db.updates[1]["last_used_at"] >= db.updates[0]["last_used_at"]
+    assert it._usage_pending == {}
@@ -0,0 +1,70 @@
+import datetime as dt
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import block_listing as bl
+
+
+class _Db:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetch_all(self, query, values=None):
+        self.queries.append((query, values))
+        rows = self.rows
+        if "cursor_created_at" in values:
+            key = (values["cursor_created_at"], values["cursor_id"])
+            rows = [r for r in rows if (r["created_at"], r["id"]) < key]
+        return rows[: values.get("limit", len(rows))]
+
+
+def _rows(n):
+    base = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    rows = [
+        {
+            "id": f"b{i:02d}",
+            "title": f"t{i}",
+            "content": "x" * 100,
+            "created_at": base + dt.timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+    return sorted(rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_the_basket_once_with_projection():
+    db = _Db(_rows(5))
+    seen, cursor = [], None
+    while True:
+        page, cursor = await bl.list_blocks_page(
+            db, "basket-1", fields=bl.parse_fields("id,title"), limit=2, cursor=cursor
+        )
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert [r["id"] for r in seen] == ["b04", "b03", "b02", "b01", "b00"]
+    assert all(set(r) == {"id", "title"} for r in seen)
+    assert db.queries[0][0].startswith("SELECT id, title, created_at FROM blocks")
+    assert db.queries[0][1]["limit"] == 3
+
+
+def test_invalid_fields_and_cursors_are_rejected():
+    with pytest.raises(HTTPException):
+        bl.parse_fields("id,embedding")
+    with pytest.raises(HTTPException):
+        bl.decode_cursor("not-a-cursor")
+
+
+def test_weak_etag_tracks_basket_version_and_query():
+    latest = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    etag = bl.weak_etag("basket-1", (latest, 3), "limit=20")
+
+    assert etag.startswith('W/"')
+    assert bl.etag_matches(f'"other", {etag}', etag)
+    assert bl.etag_matches(etag.removeprefix("W/"), etag)
+    assert not bl.etag_matches(bl.weak_etag("basket-1", (latest, 4), "limit=20"), etag)
+    assert not bl.etag_matches(bl.weak_etag("basket-1", (latest, 3), "limit=50"), etag)
@@ -0,0 +1,95 @@
+import random
+import time
+from uuid import uuid4
+
+from app.baskets.services.relationship_discovery import RelationshipDiscoveryService
+from app.utils.lexical_index import LexicalSimilarityIndex, PrefixFilterIndex
+from src.schemas.basket_intelligence_schema import BasketThematicAnalysis, ThematicPattern
+
+
+def _vocabulary(size, seed=7):
+    rng = random.Random(seed)
+    return rng, [f"term{i}" for i in range(size)]
+
+
+def test_near_duplicates_are_candidates_and_unrelated_items_are_not():
+    rng, words = _vocabulary(2000)
+    index = LexicalSimilarityIndex()
+    base = rng.sample(words, 40)
+    index.add("base", base)
+    index.add("near", base[:36] + rng.sample(words, 4))  # Jaccard ~0.8
+    index.add("other", rng.sample(words, 40))
+    index.add("empty", [])
+
+    assert index.candidates("base") == {"near"}
+    assert index.candidate_pairs() == {("base", "near")}
+    assert index.jaccard("base", "near") > 0.6
+    assert [(a, b) for a, b, _ in index.similar_pairs(0.5)] == [("base", "near")]
+
+
+
+def test_prefix_filter_matches_exactly_the_pairs_at_threshold():
+    rng, words = _vocabulary(60)
+    items = {i: frozenset(rng.sample(words, rng.randint(1, 12))) for i in range(300)}
+    query = frozenset(rng.sample(words, 8))
+
+    for threshold in (0.0, 0.3, 0.5):
+        index = PrefixFilterIndex(items.items(), threshold)
+        expected = {
+            key for key, tokens in items.items()
+            if tokens & query and len(tokens & query) / len(tokens | query) >= threshold
+        }
+        assert index.matches(query) == expected
+
+def test_clustering_2k_items_is_subsecond():
+    rng, words = _vocabulary(20000)
+    index = LexicalSimilarityIndex()
+    groups = [rng.sample(words, 30) for _ in range(200)]
+    for i in range(2000):
+        group = groups[i % 200]
+        index.add(i, group[:27] + rng.sample(words, 3))
+
+    started = time.perf_counter()
+    pairs = index.similar_pairs(0.5)
+    elapsed = time.perf_counter() - started
+
+    found = {(a, b) for a, b, _ in pairs}
+    expected = {(a, b) for a in range(2000) for b in range(a + 1, 2000) if a % 200 == b % 200}
+    assert len(found & expected) / len(expected) > 0.95
+    assert elapsed < 1.0
+
+
+def test_pairwise_relationships_match_scoring_every_pair():
+    rng, words = _vocabulary(400)
+    topics = ["method", "step then next phase", "core foundation", "https://example.com/spec", ""]
+    documents = [
+        {
+            "id": str(uuid4()),
+            "title": f"Doc {i}",
+            "content_raw": " ".join(rng.sample(words, 25)) + " " + topics[i % len(topics)],
+        }
+        for i in range(30)
+    ]
+    analysis = BasketThematicAnalysis(
+        basket_id=uuid4(),
+        dominant_themes=["process"],
+        discovered_patterns=[
+            ThematicPattern(
+                pattern_id="p", theme_name="process", keywords=["phase"], confidence=0.8
+            )
+        ],
+    )
+
+    expected = []
+    for i, doc_a in enumerate(documents):
+        for doc_b in documents[i + 1:]:
+            relationship = RelationshipDiscoveryService._analyze_document_pair(
+                doc_a, doc_b, analysis
+            )
+            if relationship:
+                expected.append((relationship.relationship_id, relationship.strength))
+
+    found = RelationshipDiscoveryService._discover_pairwise_relationships(documents, analysis)
+
+    assert expected
+    assert sorted((r.relationship_id, r.strength) for r in found) == sorted(expected)
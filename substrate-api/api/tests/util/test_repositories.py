@@ -0,0 +1,103 @@
+import datetime as dt
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+import app.repositories.base as base
+from app.repositories import BlocksRepository, ReflectionsRepository
+from app.repositories.rows import BlockRow, columns_of, to_row
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.calls = []
+
+    def select(self, columns, **kwargs):
+        self.calls.append(("select", columns))
+        return self
+
+    def update(self, values):
+        self.calls.append(("update", values))
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return record
+
+    def execute(self):
+        self.db.executed.append((self.table, self.calls))
+        return SimpleNamespace(data=self.db.data)
+
+
+class _Supabase:
+    def __init__(self, data=None):
+        self.data = data
+        self.executed = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+@pytest.fixture(autouse=True)
+def no_pool(monkeypatch):
+    async def get_pool():
+        return None
+
+    monkeypatch.setattr(base, "get_pool", get_pool)
+
+
+@pytest.mark.asyncio
+async def test_postgrest_fallback_projects_columns_without_embedding():
+    db = _Supabase([{"id": "b1"}])
+    start = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+
+    rows = await BlocksRepository(db).list_for_basket(
+        "basket-1", states=["ACCEPTED"], created_from=start
+    )
+
+    assert rows == [{"id": "b1"}]
+    table, calls = db.executed[0]
+    assert table == "blocks"
+    assert calls[0] == ("select", ",".join(columns_of(BlockRow)))
+    assert "embedding" not in calls[0][1]
+    assert ("in_", "state", ["ACCEPTED"]) in calls
+    assert ("gte", "created_at", start.isoformat()) in calls
+
+
+@pytest.mark.asyncio
+async def test_single_row_lookups_accept_maybe_single_dicts():
+    db = _Supabase({"id": "r1", "is_current": True})
+    reflections = ReflectionsRepository(db)
+
+    current = await reflections.current("basket-1", "insight_canon")
+    assert current == {"id": "r1", "is_current": True}
+    await reflections.set_current("r1", False)
+    assert db.executed[-1][1][0] == ("update", {"is_current": False})
+
+    db.data = None
+    assert await reflections.find_by_hash("basket-1", "insight_canon", "h") is None
+
+
+def test_records_map_to_postgrest_shapes():
+    block_id = uuid.uuid4()
+    record = {
+        "id": block_id,
+        "created_at": dt.datetime(2026, 1, 1, 12, tzinfo=dt.timezone.utc),
+        "confidence_score": Decimal("0.5"),
+        "meta_tags": ["a"],
+        "metadata": {"k": 1},
+    }
+
+    assert to_row(record) == {
+        "id": str(block_id),
+        "created_at": "2026-01-01T12:00:00+00:00",
+        "confidence_score": 0.5,
+        "meta_tags": ["a"],
+        "metadata": {"k": 1},
+    }
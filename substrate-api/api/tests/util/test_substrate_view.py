@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.substrate_view import (
+    basket_substrate_scope,
+    get_basket_view,
+    get_blocks,
+    invalidate_basket_view,
+    substrate_terms,
+)
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.in_filter = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def neq(self, *_args):
+        return self
+
+    def in_(self, column, values):
+        self.in_filter = (column, list(values))
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.columns))
+        rows = self.client.rows.get(self.table, [])
+        if self.in_filter:
+            column, values = self.in_filter
+            self.client.in_values.append(values)
+            rows = [row for row in rows if row.get(column) in values]
+        return SimpleNamespace(data=[dict(row) for row in rows])
+
+
+class _FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.in_values = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+ROWS = {
+    "blocks": [{"id": "b1", "content": "Launch roadmap"}],
+    "documents": [{"id": "d1", "title": "Plan", "current_version_hash": "v1"}],
+    "document_versions": [{"version_hash": "v1", "content": "Roadmap body"}],
+    "raw_dumps": [{"id": "r1", "body_md": None, "text_dump": "notes"}],
+}
+
+
+@pytest.mark.asyncio
+async def test_scope_loads_each_table_once_across_services():
+    client = _FakeClient(ROWS)
+
+    with basket_substrate_scope():
+        first = get_basket_view(client, "basket-1", "ws-1")
+        await asyncio.gather(first.blocks(), first.blocks(), first.documents())
+        second = get_basket_view(client, "basket-1", "ws-1")
+        blocks = await second.blocks()
+        documents = await second.documents()
+
+    assert second is first
+    assert blocks == ROWS["blocks"]
+    assert [table for table, _ in client.calls] == ["blocks", "documents", "document_versions"]
+    assert all(columns != "*" for _, columns in client.calls)
+    assert documents[0]["content_raw"] == "Roadmap body"
+
+
+@pytest.mark.asyncio
+async def test_views_are_fresh_outside_a_scope_and_after_invalidation():
+    client = _FakeClient(ROWS)
+
+    outside = get_basket_view(client, "basket-1", "ws-1")
+    assert outside is not get_basket_view(client, "basket-1", "ws-1")
+
+    with basket_substrate_scope():
+        view = get_basket_view(client, "basket-1", "ws-1")
+        dumps = await view.raw_dumps()
+        invalidate_basket_view("basket-1", "ws-1", "raw_dumps")
+        await view.raw_dumps()
+        assert substrate_terms("The Roadmap roadmap") is view.terms("The Roadmap roadmap")
+
+    assert dumps[0]["content"] == "notes"
+    assert [table for table, _ in client.calls] == ["raw_dumps", "raw_dumps"]
+    assert substrate_terms("The Roadmap roadmap") == frozenset({"roadmap"})
+
+
+@pytest.mark.asyncio
+async def test_get_blocks_batches_ids_and_memoizes_within_scope():
+    client = _FakeClient({"blocks": [{"id": "b1", "content": "a"}, {"id": "b2", "content": "b"}]})
+
+    with basket_substrate_scope():
+        first = await get_blocks(client, ["b1", "b2", "missing"], "ws-1")
+        again = await get_blocks(client, ["b2", "missing"], "ws-1")
+        await get_blocks(client, ["b1", "b3"], "ws-1")
+
+    assert set(first) == {"b1", "b2"}
+    assert again == {"b2": {"id": "b2", "content": "b"}}
+    # One query for the first batch, one for the only unseen id; misses are memoized
+    assert client.in_values == [["b1", "b2", "missing"], ["b3"]]
+    assert all(columns != "*" for _, columns in client.calls)
@@ -0,0 +1,80 @@
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app.utils.workspace as workspace
+
+
+class _WorkspacesTable:
+    def __init__(self):
+        self.rows = []
+        self.selects = 0
+        self.inserts = 0
+        self._insert = None
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_args):
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def limit(self, *_args):
+        return self
+
+    def insert(self, row):
+        self._insert = row
+        return self
+
+    def execute(self):
+        if self._insert is not None:
+            row, self._insert = dict(self._insert, id=str(uuid.uuid4())), None
+            time.sleep(0.01)  # widen the race window
+            self.inserts += 1
+            self.rows.append(row)
+            return SimpleNamespace(data=[row])
+        self.selects += 1
+        time.sleep(0.01)
+        return SimpleNamespace(data=[{"id": r["id"]} for r in self.rows[:1]])
+
+
+@pytest.fixture
+def db(monkeypatch):
+    table = _WorkspacesTable()
+    monkeypatch.setattr(workspace, "supabase_admin", lambda: table)
+    workspace.clear_workspace_cache()
+    yield table
+    workspace.clear_workspace_cache()
+
+
+def test_concurrent_first_requests_create_one_workspace(db):
+    user_id = str(uuid.uuid4())
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(workspace.get_or_create_workspace(user_id)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert db.inserts == 1
+    assert len(set(results)) == 1 and len(results) == 8
+    # Locks are dropped once nobody holds or waits on them
+    assert workspace._user_locks == {} and workspace._user_lock_refs == {}
+
+
+@pytest.mark.asyncio
+async def test_resolved_workspace_is_served_from_cache(db):
+    user_id = str(uuid.uuid4())
+    first = await workspace.resolve_workspace(user_id)
+
+    assert workspace.get_or_create_workspace(user_id) == first
+    assert await workspace.resolve_workspace(user_id) == first
+    assert db.selects == 1
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- Backfill progress checkpoints
+-- ============================================================================
+-- Purpose: Let long-running backfill jobs (relationship inference, embedding
+--          generation) resume after a crash instead of starting over.
+-- Used by: jobs/progress.py (BackfillCheckpoint)
+
+CREATE TABLE IF NOT EXISTS public.backfill_progress (
+    job_name TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    basket_id UUID NOT NULL,
+    item_id TEXT NOT NULL,
+    completed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job_name, run_id, basket_id, item_id)
+);
+
+COMMENT ON TABLE public.backfill_progress IS
+'Completed items per backfill run. A restarted job with the same (job_name, run_id) skips recorded items. Safe to truncate: jobs are idempotent.';
+
+ALTER TABLE public.backfill_progress ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage backfill progress"
+ON public.backfill_progress FOR ALL
+USING (auth.jwt() ->> 'role' = 'service_role')
+WITH CHECK (auth.jwt() ->> 'role' = 'service_role');
+
+GRANT ALL ON public.backfill_progress TO service_role;
@@ -0,0 +1,65 @@
+-- ============================================================================
+-- MCP basket inference: rank basket signatures in the database
+-- ============================================================================
+-- Purpose: Score every basket signature of a workspace against the session
+--          fingerprint (cosine similarity via pgvector, blended with the
+--          30-day recency decay) and return only the top p_limit rows,
+--          without their embeddings. Weights mirror
+--          mcp-server/packages/core/src/basketSelector.ts.
+-- Used by: app/routes/mcp_inference.py (infer_basket)
+
+CREATE OR REPLACE FUNCTION public.fn_rank_basket_signatures(
+    p_workspace_id UUID,
+    p_query_embedding DOUBLE PRECISION[],
+    p_limit INT DEFAULT 20
+)
+RETURNS TABLE (
+    basket_id UUID,
+    name TEXT,
+    summary TEXT,
+    last_refreshed TIMESTAMPTZ,
+    similarity DOUBLE PRECISION,
+    recency_boost DOUBLE PRECISION,
+    score DOUBLE PRECISION
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH scored AS (
+        SELECT
+            s.basket_id,
+            b.name,
+            s.summary,
+            s.last_refreshed,
+            -- Zero vectors have no direction: <=> yields NaN, scored as 0
+            COALESCE(
+                NULLIF(1 - (s.embedding::vector <=> p_query_embedding::vector), 'NaN'),
+                0
+            )::DOUBLE PRECISION AS similarity,
+            GREATEST(
+                0,
+                LEAST(1, 1 - EXTRACT(EPOCH FROM (now() - s.last_refreshed)) / (30 * 86400))
+            )::DOUBLE PRECISION AS recency_boost
+        FROM public.basket_signatures s
+        LEFT JOIN public.baskets b ON b.id = s.basket_id
+        WHERE s.workspace_id = p_workspace_id
+            AND cardinality(s.embedding) = cardinality(p_query_embedding)
+    )
+    SELECT
+        scored.*,
+        (0.75 * scored.similarity + 0.15 * scored.recency_boost)::DOUBLE PRECISION AS score
+    FROM scored
+    ORDER BY score DESC
+    LIMIT p_limit;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_rank_basket_signatures(UUID, DOUBLE PRECISION[], INT) IS
+'MCP basket inference: top p_limit basket signatures of a workspace by 0.75 * cosine similarity + 0.15 * recency, without embeddings.';
+
+REVOKE ALL ON FUNCTION public.fn_rank_basket_signatures(UUID, DOUBLE PRECISION[], INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.fn_rank_basket_signatures(UUID, DOUBLE PRECISION[], INT) TO service_role;
@@ -0,0 +1,318 @@
+-- ============================================================================
+-- Incremental basket substrate digests (P3/P4 freshness)
+-- ============================================================================
+-- Purpose: Make P3/P4 staleness checks an O(1) read. Before this, every
+--          check re-downloaded all blocks, dumps, timeline events and
+--          relationships of the basket to hash them.
+-- Used by: lib/freshness.py (compute_basket_substrate_hash,
+--          compute_graph_signature, verify_basket_digest)
+--
+-- Model: each substrate row hashes to sha256(row text), split into four
+-- signed bigints. Per (basket, substrate_type) we keep the XOR of all row
+-- hashes plus a row count. XOR is order-independent and self-inverse, so
+-- triggers add a row on insert, remove it on delete and swap old/new on
+-- update. Row texts must match lib/freshness.py exactly.
+
+-- ============================================================================
+-- 1. Digest table
+-- ============================================================================
+
+-- No FK to baskets: digest updates run inside cascaded deletes where the
+-- basket row is already gone. Rows for deleted baskets are inert.
+CREATE TABLE IF NOT EXISTS public.basket_substrate_digest (
+    basket_id UUID NOT NULL,
+    substrate_type TEXT NOT NULL CHECK (substrate_type IN ('block', 'dump', 'event', 'relationship')),
+    row_count BIGINT NOT NULL DEFAULT 0,
+    d0 BIGINT NOT NULL DEFAULT 0,
+    d1 BIGINT NOT NULL DEFAULT 0,
+    d2 BIGINT NOT NULL DEFAULT 0,
+    d3 BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (basket_id, substrate_type)
+);
+
+COMMENT ON TABLE public.basket_substrate_digest IS
+'Per-basket XOR digest of substrate row hashes, maintained by triggers on blocks, raw_dumps, timeline_events and substrate_relationships. Rebuild with fn_rebuild_basket_substrate_digest(basket_id).';
+
+ALTER TABLE public.basket_substrate_digest ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage substrate digests"
+ON public.basket_substrate_digest FOR ALL
+USING (auth.jwt() ->> 'role' = 'service_role')
+WITH CHECK (auth.jwt() ->> 'role' = 'service_role');
+
+GRANT ALL ON public.basket_substrate_digest TO service_role;
+
+-- ============================================================================
+-- 2. Row hashing (must mirror lib/freshness.py)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.fn_substrate_row_hash(p_text TEXT)
+RETURNS BIGINT[]
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    v_hex TEXT := encode(sha256(convert_to(p_text, 'UTF8')), 'hex');
+BEGIN
+    RETURN ARRAY[
+        ('x' || substr(v_hex, 1, 16))::bit(64)::bigint,
+        ('x' || substr(v_hex, 17, 16))::bit(64)::bigint,
+        ('x' || substr(v_hex, 33, 16))::bit(64)::bigint,
+        ('x' || substr(v_hex, 49, 16))::bit(64)::bigint
+    ];
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_block_digest_text(p_id UUID, p_semantic_type TEXT, p_content TEXT)
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+    SELECT 'block:' || p_id::text || ':' || coalesce(p_semantic_type, '') || ':' || coalesce(p_content, '')
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_dump_digest_text(p_id TEXT, p_body_md TEXT)
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+    SELECT 'dump:' || p_id || ':' || coalesce(p_body_md, '')
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_event_digest_text(p_id TEXT, p_kind TEXT, p_preview TEXT)
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+    SELECT 'event:' || p_id || ':' || coalesce(p_kind, '') || ':' || coalesce(p_preview, '')
+$$;
+
+-- Confidence is hashed as an integer percentage so Postgres and Python agree
+CREATE OR REPLACE FUNCTION public.fn_relationship_digest_text(
+    p_from UUID, p_to UUID, p_type TEXT, p_confidence NUMERIC
+)
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+    SELECT 'rel:' || p_from::text || ':' || p_to::text || ':' || p_type || ':'
+        || round(coalesce(p_confidence, 0.5) * 100)::int::text
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_substrate_digest_apply(
+    p_basket_id UUID, p_type TEXT, p_text TEXT, p_sign INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_hash BIGINT[];
+BEGIN
+    IF p_basket_id IS NULL OR p_text IS NULL THEN
+        RETURN;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM public.baskets WHERE id = p_basket_id) THEN
+        RETURN;
+    END IF;
+
+    v_hash := public.fn_substrate_row_hash(p_text);
+
+    INSERT INTO public.basket_substrate_digest AS d
+        (basket_id, substrate_type, row_count, d0, d1, d2, d3, updated_at)
+    VALUES (p_basket_id, p_type, p_sign, v_hash[1], v_hash[2], v_hash[3], v_hash[4], NOW())
+    ON CONFLICT (basket_id, substrate_type) DO UPDATE SET
+        row_count = d.row_count + p_sign,
+        d0 = d.d0 # v_hash[1],
+        d1 = d.d1 # v_hash[2],
+        d2 = d.d2 # v_hash[3],
+        d3 = d.d3 # v_hash[4],
+        updated_at = NOW();
+END;
+$$;
+
+-- ============================================================================
+-- 3. Triggers
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.fn_blocks_digest_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_old TEXT;
+    v_new TEXT;
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT') THEN
+        v_old := fn_block_digest_text(OLD.id, OLD.semantic_type, OLD.content);
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT') THEN
+        v_new := fn_block_digest_text(NEW.id, NEW.semantic_type, NEW.content);
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND v_old IS NOT DISTINCT FROM v_new
+       AND OLD.basket_id IS NOT DISTINCT FROM NEW.basket_id THEN
+        RETURN NULL;
+    END IF;
+
+    IF v_old IS NOT NULL THEN
+        PERFORM fn_substrate_digest_apply(OLD.basket_id, 'block', v_old, -1);
+    END IF;
+    IF v_new IS NOT NULL THEN
+        PERFORM fn_substrate_digest_apply(NEW.basket_id, 'block', v_new, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Relationships are attributed to the basket of their from_block. The FK
+-- cascade deletes them after the block row is gone, so remove them here.
+CREATE OR REPLACE FUNCTION public.fn_blocks_digest_before_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT from_block_id, to_block_id, relationship_type, confidence_score
+        FROM substrate_relationships
+        WHERE from_block_id = OLD.id
+          AND state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT')
+    LOOP
+        PERFORM fn_substrate_digest_apply(
+            OLD.basket_id, 'relationship',
+            fn_relationship_digest_text(r.from_block_id, r.to_block_id, r.relationship_type, r.confidence_score),
+            -1
+        );
+    END LOOP;
+    RETURN OLD;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_raw_dumps_digest_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM fn_substrate_digest_apply(OLD.basket_id, 'dump', fn_dump_digest_text(OLD.id::text, OLD.body_md), -1);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM fn_substrate_digest_apply(NEW.basket_id, 'dump', fn_dump_digest_text(NEW.id::text, NEW.body_md), 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_timeline_events_digest_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM fn_substrate_digest_apply(OLD.basket_id, 'event', fn_event_digest_text(OLD.id::text, OLD.kind, OLD.preview), -1);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM fn_substrate_digest_apply(NEW.basket_id, 'event', fn_event_digest_text(NEW.id::text, NEW.kind, NEW.preview), 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_substrate_relationships_digest_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT') THEN
+        PERFORM fn_substrate_digest_apply(
+            (SELECT basket_id FROM blocks WHERE id = OLD.from_block_id), 'relationship',
+            fn_relationship_digest_text(OLD.from_block_id, OLD.to_block_id, OLD.relationship_type, OLD.confidence_score),
+            -1
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT') THEN
+        PERFORM fn_substrate_digest_apply(
+            (SELECT basket_id FROM blocks WHERE id = NEW.from_block_id), 'relationship',
+            fn_relationship_digest_text(NEW.from_block_id, NEW.to_block_id, NEW.relationship_type, NEW.confidence_score),
+            1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_blocks_substrate_digest ON public.blocks;
+CREATE TRIGGER trg_blocks_substrate_digest
+AFTER INSERT OR DELETE OR UPDATE OF state, content, semantic_type, basket_id ON public.blocks
+FOR EACH ROW EXECUTE FUNCTION public.fn_blocks_digest_trigger();
+
+DROP TRIGGER IF EXISTS trg_blocks_substrate_digest_before_delete ON public.blocks;
+CREATE TRIGGER trg_blocks_substrate_digest_before_delete
+BEFORE DELETE ON public.blocks
+FOR EACH ROW EXECUTE FUNCTION public.fn_blocks_digest_before_delete();
+
+DROP TRIGGER IF EXISTS trg_raw_dumps_substrate_digest ON public.raw_dumps;
+CREATE TRIGGER trg_raw_dumps_substrate_digest
+AFTER INSERT OR DELETE OR UPDATE OF body_md, basket_id ON public.raw_dumps
+FOR EACH ROW EXECUTE FUNCTION public.fn_raw_dumps_digest_trigger();
+
+DROP TRIGGER IF EXISTS trg_timeline_events_substrate_digest ON public.timeline_events;
+CREATE TRIGGER trg_timeline_events_substrate_digest
+AFTER INSERT OR DELETE OR UPDATE OF kind, preview, basket_id ON public.timeline_events
+FOR EACH ROW EXECUTE FUNCTION public.fn_timeline_events_digest_trigger();
+
+DROP TRIGGER IF EXISTS trg_substrate_relationships_digest ON public.substrate_relationships;
+CREATE TRIGGER trg_substrate_relationships_digest
+AFTER INSERT OR DELETE OR UPDATE OF state, confidence_score, relationship_type, from_block_id, to_block_id
+ON public.substrate_relationships
+FOR EACH ROW EXECUTE FUNCTION public.fn_substrate_relationships_digest_trigger();
+
+-- ============================================================================
+-- 4. Rebuild (backfill and repair)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.fn_rebuild_basket_substrate_digest(p_basket_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DELETE FROM basket_substrate_digest WHERE basket_id = p_basket_id;
+
+    INSERT INTO basket_substrate_digest (basket_id, substrate_type, row_count, d0, d1, d2, d3)
+    SELECT p_basket_id, substrate_type, count(*),
+           coalesce(bit_xor(h[1]), 0), coalesce(bit_xor(h[2]), 0),
+           coalesce(bit_xor(h[3]), 0), coalesce(bit_xor(h[4]), 0)
+    FROM (
+        SELECT 'block' AS substrate_type, fn_substrate_row_hash(fn_block_digest_text(id, semantic_type, content)) AS h
+        FROM blocks
+        WHERE basket_id = p_basket_id AND state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT')
+        UNION ALL
+        SELECT 'dump', fn_substrate_row_hash(fn_dump_digest_text(id::text, body_md))
+        FROM raw_dumps WHERE basket_id = p_basket_id
+        UNION ALL
+        SELECT 'event', fn_substrate_row_hash(fn_event_digest_text(id::text, kind, preview))
+        FROM timeline_events WHERE basket_id = p_basket_id
+        UNION ALL
+        SELECT 'relationship', fn_substrate_row_hash(
+            fn_relationship_digest_text(r.from_block_id, r.to_block_id, r.relationship_type, r.confidence_score))
+        FROM substrate_relationships r
+        JOIN blocks b ON b.id = r.from_block_id
+        WHERE b.basket_id = p_basket_id AND r.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT')
+    ) rows
+    GROUP BY substrate_type;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.fn_rebuild_basket_substrate_digest(UUID) TO service_role;
+
+DO $$
+DECLARE
+    v_basket UUID;
+BEGIN
+    FOR v_basket IN SELECT id FROM public.baskets LOOP
+        PERFORM public.fn_rebuild_basket_substrate_digest(v_basket);
+    END LOOP;
+END;
+$$;
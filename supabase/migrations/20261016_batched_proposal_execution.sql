@@ -0,0 +1,110 @@
+-- ============================================================================
+-- Batched proposal execution helpers
+-- ============================================================================
+-- Purpose: Let GovernanceDumpProcessor execute a proposal's CreateBlock ops
+--          with a constant number of round trips instead of ~4 per op.
+-- Used by: services/semantic_primitives.py (find_semantic_duplicates_batch),
+--          app/agents/pipeline/governance_processor.py
+
+-- ============================================================================
+-- 1. Set-based duplicate detection
+-- ============================================================================
+-- p_items: [{"index": int, "semantic_type": text, "embedding": [float]|null,
+--            "content_hash": text|null}, ...]
+-- Returns, per item, up to p_limit vector matches (match_kind = 'vector',
+-- same filters as semantic_search_blocks) plus at most one ACCEPTED block
+-- with the same metadata content_hash (match_kind = 'hash').
+
+CREATE OR REPLACE FUNCTION public.fn_find_block_duplicates(
+    p_basket_id UUID,
+    p_items JSONB,
+    p_min_similarity DECIMAL DEFAULT 0.70,
+    p_limit INT DEFAULT 5
+)
+RETURNS TABLE (
+    item_index INT,
+    block_id UUID,
+    content TEXT,
+    similarity_score DECIMAL,
+    match_kind TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH items AS (
+        SELECT
+            (item->>'index')::int AS item_index,
+            item->>'semantic_type' AS semantic_type,
+            CASE WHEN jsonb_typeof(item->'embedding') = 'array'
+                 THEN (item->>'embedding')::vector(1536) END AS embedding,
+            item->>'content_hash' AS content_hash
+        FROM jsonb_array_elements(p_items) AS item
+    )
+    SELECT i.item_index, m.id, m.content, m.similarity_score, 'vector'
+    FROM items i
+    CROSS JOIN LATERAL (
+        SELECT b.id, b.content, (1 - (b.embedding <=> i.embedding))::DECIMAL AS similarity_score
+        FROM blocks b
+        WHERE b.basket_id = p_basket_id
+          AND b.embedding IS NOT NULL
+          AND b.semantic_type = i.semantic_type
+          AND b.state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT')
+          AND (1 - (b.embedding <=> i.embedding)) >= p_min_similarity
+        ORDER BY b.embedding <=> i.embedding
+        LIMIT p_limit
+    ) m
+    WHERE i.embedding IS NOT NULL
+    UNION ALL
+    SELECT i.item_index, h.id, h.content, 1.0::DECIMAL, 'hash'
+    FROM items i
+    CROSS JOIN LATERAL (
+        SELECT b.id, b.content
+        FROM blocks b
+        WHERE b.basket_id = p_basket_id
+          AND b.state = 'ACCEPTED'
+          AND b.metadata->>'content_hash' = i.content_hash
+        LIMIT 1
+    ) h
+    WHERE i.content_hash IS NOT NULL
+$$;
+
+COMMENT ON FUNCTION public.fn_find_block_duplicates IS
+'Batch duplicate detection for proposal execution: vector matches (per item, same semantic_type) plus content_hash matches, in one call.';
+
+GRANT EXECUTE ON FUNCTION public.fn_find_block_duplicates TO service_role;
+
+-- ============================================================================
+-- 2. Batch timeline emit
+-- ============================================================================
+-- p_events: [{"kind": text, "ref_id": uuid, "preview": text, "payload": jsonb}, ...]
+
+CREATE OR REPLACE FUNCTION public.fn_timeline_emit_batch(
+    p_basket_id UUID,
+    p_events JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_workspace UUID;
+    v_count INTEGER;
+BEGIN
+    SELECT workspace_id INTO v_workspace FROM public.baskets WHERE id = p_basket_id;
+    IF v_workspace IS NULL THEN
+        RAISE EXCEPTION 'basket % not found (workspace missing)', p_basket_id;
+    END IF;
+
+    INSERT INTO public.timeline_events (basket_id, workspace_id, ts, kind, ref_id, preview, payload)
+    SELECT p_basket_id, v_workspace, now(),
+           e->>'kind', (e->>'ref_id')::uuid, e->>'preview', coalesce(e->'payload', '{}'::jsonb)
+    FROM jsonb_array_elements(p_events) AS e;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_timeline_emit_batch IS
+'Insert several timeline events for one basket in one call (same columns as fn_timeline_emit).';
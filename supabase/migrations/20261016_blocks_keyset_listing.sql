@@ -0,0 +1,13 @@
+-- ============================================================================
+-- Keyset pagination and delta sync for basket block listings
+-- ============================================================================
+-- Purpose: Serve GET /api/baskets/{id}/blocks and /blocks/by-basket/{id}
+--          pages ordered by (created_at, id) and the per-basket
+--          max(updated_at) behind their ETags without sorting the basket.
+-- Used by: app/utils/block_listing.py
+
+CREATE INDEX IF NOT EXISTS idx_blocks_basket_created_id
+    ON public.blocks USING btree (basket_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_blocks_basket_updated
+    ON public.blocks USING btree (basket_id, updated_at DESC);
@@ -0,0 +1,32 @@
+-- ============================================================================
+-- Bulk block embedding writes
+-- ============================================================================
+-- Purpose: Let the embedding backfill write a whole page of vectors in one
+--          round trip. A PostgREST upsert cannot be used because blocks has
+--          NOT NULL columns that the backfill does not send.
+-- Used by: jobs/embedding_generator.py (process_basket_embeddings)
+
+CREATE OR REPLACE FUNCTION public.fn_set_block_embeddings(p_items JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.blocks b
+    SET embedding = (item->>'embedding')::vector
+    FROM jsonb_array_elements(p_items) AS item
+    WHERE b.id = (item->>'id')::uuid;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_set_block_embeddings(JSONB) IS
+'Bulk-assign embeddings: p_items = [{"id": uuid, "embedding": [float, ...]}]. Returns rows updated.';
+
+REVOKE ALL ON FUNCTION public.fn_set_block_embeddings(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.fn_set_block_embeddings(JSONB) TO service_role;
@@ -0,0 +1,33 @@
+-- ============================================================================
+-- Content-addressed embedding cache
+-- ============================================================================
+-- Purpose: Persist embeddings keyed by (model, sha256(normalized text)) so the
+--          same block text is never embedded twice, even across restarts.
+-- Used by: services/embedding_cache.py (SupabaseEmbeddingStore)
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS public.embedding_cache (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    -- Untyped vector: models with different dimensions share the table
+    embedding vector NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (model, text_hash)
+);
+
+COMMENT ON TABLE public.embedding_cache IS
+'Content-addressed embedding cache. Key = (embedding model, sha256 of whitespace-normalized text). Pure function cache: rows never need invalidation, only pruning by age.';
+
+CREATE INDEX IF NOT EXISTS embedding_cache_created_at_idx
+ON public.embedding_cache (created_at);
+
+-- Service role only: cache rows carry no workspace scoping
+ALTER TABLE public.embedding_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage embedding cache"
+ON public.embedding_cache FOR ALL
+USING (auth.jwt() ->> 'role' = 'service_role')
+WITH CHECK (auth.jwt() ->> 'role' = 'service_role');
+
+GRANT ALL ON public.embedding_cache TO service_role;
@@ -0,0 +1,63 @@
+-- ============================================================================
+-- P4 composition: vector prefilter of candidate blocks
+-- ============================================================================
+-- Purpose: Rank a basket's blocks against the composition intent in the
+--          database instead of selecting every block and sending them to the
+--          LLM. Returns the top p_limit blocks (with their embedding, needed
+--          for MMR diversity selection in the agent) using the same recency
+--          and window constraints as the legacy query.
+-- Used by: app/agents/pipeline/composition_agent.py (_query_substrate)
+
+CREATE OR REPLACE FUNCTION public.fn_rank_blocks_for_composition(
+    p_basket_id UUID,
+    p_query_embedding vector(1536),
+    p_since TIMESTAMPTZ DEFAULT NULL,
+    p_until TIMESTAMPTZ DEFAULT NULL,
+    p_limit INT DEFAULT 60
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    title TEXT,
+    semantic_type TEXT,
+    state TEXT,
+    confidence_score DOUBLE PRECISION,
+    metadata JSONB,
+    created_at TIMESTAMPTZ,
+    embedding TEXT,
+    similarity_score DOUBLE PRECISION
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        b.id,
+        b.content,
+        b.title,
+        b.semantic_type,
+        b.state::TEXT,
+        b.confidence_score::DOUBLE PRECISION,
+        b.metadata,
+        b.created_at,
+        b.embedding::TEXT,
+        (1 - (b.embedding <=> p_query_embedding))::DOUBLE PRECISION AS similarity_score
+    FROM public.blocks b
+    WHERE b.basket_id = p_basket_id
+        AND b.embedding IS NOT NULL
+        AND b.state::TEXT <> 'REJECTED'
+        AND (p_since IS NULL OR b.created_at >= p_since)
+        AND (p_until IS NULL OR b.created_at <= p_until)
+    ORDER BY b.embedding <=> p_query_embedding
+    LIMIT p_limit;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_rank_blocks_for_composition(UUID, vector, TIMESTAMPTZ, TIMESTAMPTZ, INT) IS
+'P4 retrieval stage: top p_limit non-rejected blocks of a basket by cosine similarity to the intent embedding, with embeddings for MMR.';
+
+REVOKE ALL ON FUNCTION public.fn_rank_blocks_for_composition(UUID, vector, TIMESTAMPTZ, TIMESTAMPTZ, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.fn_rank_blocks_for_composition(UUID, vector, TIMESTAMPTZ, TIMESTAMPTZ, INT) TO service_role;
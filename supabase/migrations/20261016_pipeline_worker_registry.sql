@@ -0,0 +1,149 @@
+-- ============================================================================
+-- Pipeline worker registry and basket sharding
+-- ============================================================================
+-- Purpose: Let standalone pipeline workers (app/pipeline_worker.py) scale
+--          out independently of the HTTP tier:
+--          - pipeline_workers: live worker registry + per-worker counters,
+--            read by /health/queue
+--          - fn_claim_pipeline_work_leased gains bucket filtering so each
+--            worker claims the baskets its consistent-hash ring slot owns
+--          - fn_release_queue_items hands unfinished items back on drain
+-- Used by: services/canonical_queue_processor.py, services/queue_sharding.py
+--
+-- Bucket of a basket: mod(abs(hashtext(basket_id::text)::bigint), p_bucket_count)
+
+CREATE TABLE IF NOT EXISTS public.pipeline_workers (
+    worker_id TEXT PRIMARY KEY,
+    hostname TEXT,
+    pid INTEGER,
+    max_concurrency INTEGER,
+    sharded BOOLEAN NOT NULL DEFAULT FALSE,
+    draining BOOLEAN NOT NULL DEFAULT FALSE,
+    stats JSONB NOT NULL DEFAULT '{}'::jsonb,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.pipeline_workers IS
+'Canonical queue workers and their counters. A worker is live while heartbeat_at is recent; rows of dead workers are harmless.';
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_workers_heartbeat
+ON public.pipeline_workers (heartbeat_at DESC);
+
+ALTER TABLE public.pipeline_workers ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage pipeline workers"
+ON public.pipeline_workers FOR ALL
+USING (auth.jwt() ->> 'role' = 'service_role')
+WITH CHECK (auth.jwt() ->> 'role' = 'service_role');
+
+GRANT ALL ON public.pipeline_workers TO service_role;
+
+-- ============================================================================
+-- Leased claim, restricted to owned buckets
+-- ============================================================================
+
+DROP FUNCTION IF EXISTS public.fn_claim_pipeline_work_leased(TEXT, INTEGER, INTEGER, UUID[]);
+
+CREATE OR REPLACE FUNCTION public.fn_claim_pipeline_work_leased(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 5,
+    p_lease_seconds INTEGER DEFAULT 120,
+    p_exclude_baskets UUID[] DEFAULT '{}',
+    p_buckets INTEGER[] DEFAULT NULL,
+    p_bucket_count INTEGER DEFAULT 1024
+)
+RETURNS SETOF public.agent_processing_queue
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH busy AS (
+        -- Baskets with an item under a live lease (legacy claims without a
+        -- lease count as live for 5 minutes, as before)
+        SELECT DISTINCT basket_id
+        FROM agent_processing_queue
+        WHERE processing_state IN ('claimed', 'processing')
+          AND basket_id IS NOT NULL
+          AND coalesce(lease_expires_at, claimed_at::timestamptz + interval '5 minutes') > now()
+    ),
+    eligible AS (
+        SELECT DISTINCT ON (coalesce(q.basket_id::text, q.id::text)) q.id, q.created_at
+        FROM agent_processing_queue q
+        WHERE q.work_type IN ('P0_CAPTURE', 'P1_SUBSTRATE', 'P2_GRAPH', 'P4_COMPOSE')
+          AND (
+              q.processing_state = 'pending'
+              OR (
+                  q.processing_state IN ('claimed', 'processing')
+                  AND coalesce(
+                      q.lease_expires_at,
+                      CASE WHEN q.processing_state = 'claimed'
+                           THEN q.claimed_at::timestamptz + interval '5 minutes' END
+                  ) < now()
+              )
+          )
+          AND (q.basket_id IS NULL OR q.basket_id NOT IN (SELECT basket_id FROM busy))
+          AND (q.basket_id IS NULL OR NOT (q.basket_id = ANY (coalesce(p_exclude_baskets, '{}'))))
+          AND (
+              p_buckets IS NULL
+              OR q.basket_id IS NULL
+              OR mod(abs(hashtext(q.basket_id::text)::bigint), p_bucket_count) = ANY (p_buckets)
+          )
+        ORDER BY coalesce(q.basket_id::text, q.id::text), q.created_at
+    )
+    UPDATE agent_processing_queue
+    SET
+        processing_state = 'claimed',
+        claimed_at = now(),
+        claimed_by = p_worker_id,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+    WHERE id IN (
+        SELECT q.id
+        FROM agent_processing_queue q
+        WHERE q.id IN (SELECT id FROM eligible)
+        ORDER BY q.created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_claim_pipeline_work_leased IS
+'Claim pipeline work under a renewable lease: oldest eligible item per basket, skipping baskets with live leases, optionally limited to the caller''s hash buckets.';
+
+-- ============================================================================
+-- Drain: hand unfinished items back to the queue
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.fn_release_queue_items(
+    p_worker_id TEXT,
+    p_ids UUID[]
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE agent_processing_queue
+    SET
+        processing_state = 'pending',
+        claimed_at = NULL,
+        claimed_by = NULL,
+        lease_expires_at = NULL
+    WHERE id = ANY (p_ids)
+      AND claimed_by = p_worker_id
+      AND processing_state IN ('claimed', 'processing');
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.fn_claim_pipeline_work_leased(TEXT, INTEGER, INTEGER, UUID[], INTEGER[], INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.fn_release_queue_items(TEXT, UUID[]) TO service_role;
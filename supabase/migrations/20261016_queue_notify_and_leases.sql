@@ -0,0 +1,149 @@
+-- ============================================================================
+-- Event-driven pipeline queue with heartbeat leases
+-- ============================================================================
+-- Purpose: Wake CanonicalQueueProcessor workers as soon as work is queued
+--          (NOTIFY on the event bus channel) and replace the fixed
+--          "stale after N minutes" reclaim with leases that workers renew
+--          while an item is in flight.
+-- Used by: services/canonical_queue_processor.py (fn_claim_pipeline_work_leased,
+--          fn_renew_queue_leases), app/event_bus.py (LISTEN on bus_any)
+--
+-- Ordering: at most one item per basket is in flight across all workers.
+-- A claim only takes the oldest eligible item of each basket, and skips
+-- baskets that already have an item under a live lease.
+
+ALTER TABLE public.agent_processing_queue
+ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN public.agent_processing_queue.lease_expires_at IS
+'Claim lease; renewed by the owning worker heartbeat. Expired leases are reclaimable.';
+
+CREATE INDEX IF NOT EXISTS idx_queue_basket_pending
+ON public.agent_processing_queue (basket_id, created_at)
+WHERE processing_state IN ('pending', 'claimed', 'processing');
+
+-- ============================================================================
+-- 1. NOTIFY on new / re-queued work
+-- ============================================================================
+-- Payload matches app/event_bus.py: {"topic": ..., "payload": {...}}
+
+CREATE OR REPLACE FUNCTION public.fn_notify_pipeline_work()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.processing_state = 'pending' THEN
+        PERFORM pg_notify(
+            'bus_any',
+            json_build_object(
+                'topic', 'queue.work_available',
+                'payload', json_build_object(
+                    'id', NEW.id,
+                    'basket_id', NEW.basket_id,
+                    'work_type', NEW.work_type
+                )
+            )::text
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_notify_pipeline_work ON public.agent_processing_queue;
+CREATE TRIGGER trg_notify_pipeline_work
+AFTER INSERT OR UPDATE OF processing_state ON public.agent_processing_queue
+FOR EACH ROW
+EXECUTE FUNCTION public.fn_notify_pipeline_work();
+
+-- ============================================================================
+-- 2. Leased claim with per-basket ordering
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.fn_claim_pipeline_work_leased(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 5,
+    p_lease_seconds INTEGER DEFAULT 120,
+    p_exclude_baskets UUID[] DEFAULT '{}'
+)
+RETURNS SETOF public.agent_processing_queue
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH busy AS (
+        -- Baskets with an item under a live lease (legacy claims without a
+        -- lease count as live for 5 minutes, as before)
+        SELECT DISTINCT basket_id
+        FROM agent_processing_queue
+        WHERE processing_state IN ('claimed', 'processing')
+          AND basket_id IS NOT NULL
+          AND coalesce(lease_expires_at, claimed_at::timestamptz + interval '5 minutes') > now()
+    ),
+    eligible AS (
+        SELECT DISTINCT ON (coalesce(q.basket_id::text, q.id::text)) q.id, q.created_at
+        FROM agent_processing_queue q
+        WHERE q.work_type IN ('P0_CAPTURE', 'P1_SUBSTRATE', 'P2_GRAPH', 'P4_COMPOSE')
+          AND (
+              q.processing_state = 'pending'
+              OR (
+                  q.processing_state IN ('claimed', 'processing')
+                  AND coalesce(
+                      q.lease_expires_at,
+                      CASE WHEN q.processing_state = 'claimed'
+                           THEN q.claimed_at::timestamptz + interval '5 minutes' END
+                  ) < now()
+              )
+          )
+          AND (q.basket_id IS NULL OR q.basket_id NOT IN (SELECT basket_id FROM busy))
+          AND (q.basket_id IS NULL OR NOT (q.basket_id = ANY (coalesce(p_exclude_baskets, '{}'))))
+        ORDER BY coalesce(q.basket_id::text, q.id::text), q.created_at
+    )
+    UPDATE agent_processing_queue
+    SET
+        processing_state = 'claimed',
+        claimed_at = now(),
+        claimed_by = p_worker_id,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+    WHERE id IN (
+        SELECT q.id
+        FROM agent_processing_queue q
+        WHERE q.id IN (SELECT id FROM eligible)
+        ORDER BY q.created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$;
+
+COMMENT ON FUNCTION public.fn_claim_pipeline_work_leased IS
+'Claim pipeline work under a renewable lease: oldest eligible item per basket, skipping baskets with live leases.';
+
+-- ============================================================================
+-- 3. Heartbeat lease renewal
+-- ============================================================================
+-- Returns the ids whose lease was extended; ids missing from the result were
+-- reclaimed by another worker or already finished.
+
+CREATE OR REPLACE FUNCTION public.fn_renew_queue_leases(
+    p_worker_id TEXT,
+    p_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 120
+)
+RETURNS SETOF UUID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    UPDATE agent_processing_queue
+    SET lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY (p_ids)
+      AND claimed_by = p_worker_id
+      AND processing_state IN ('claimed', 'processing')
+    RETURNING id;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.fn_claim_pipeline_work_leased(TEXT, INTEGER, INTEGER, UUID[]) TO service_role;
+GRANT EXECUTE ON FUNCTION public.fn_renew_queue_leases(TEXT, UUID[], INTEGER) TO service_role;
@@ -0,0 +1,72 @@
+-- ============================================================================
+-- Hash-keyed substrate snapshots (exact P3/P4 substrate diffs)
+-- ============================================================================
+-- Purpose: Store a compact snapshot of a basket's substrate per
+--          substrate_hash, so lib/freshness.py can diff two hashes exactly
+--          (added / removed / modified ids) instead of reporting totals.
+-- Used by: lib/freshness.py (compute_substrate_diff, build_substrate_snapshot)
+--
+-- A snapshot is {"block": [[id, content_hash], ...], "dump": [...],
+-- "event": [...]}, each array sorted by id (text, C collation) so diffs
+-- are a merge-join. content_hash is the first 16 hex chars of
+-- sha256(row digest text); row texts come from the fn_*_digest_text
+-- functions in 20261016_basket_substrate_digest.sql.
+
+CREATE TABLE IF NOT EXISTS public.substrate_snapshots (
+    basket_id UUID NOT NULL,
+    substrate_hash TEXT NOT NULL,
+    entries JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (basket_id, substrate_hash)
+);
+
+COMMENT ON TABLE public.substrate_snapshots IS
+'Per-substrate_hash snapshot of (id, content_hash) pairs by substrate type. Lets freshness checks compute exact substrate diffs. Safe to prune: missing snapshots degrade diffs to totals.';
+
+CREATE INDEX IF NOT EXISTS idx_substrate_snapshots_created
+ON public.substrate_snapshots (basket_id, created_at DESC);
+
+ALTER TABLE public.substrate_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage substrate snapshots"
+ON public.substrate_snapshots FOR ALL
+USING (auth.jwt() ->> 'role' = 'service_role')
+WITH CHECK (auth.jwt() ->> 'role' = 'service_role');
+
+GRANT ALL ON public.substrate_snapshots TO service_role;
+
+-- Build the current snapshot server-side: only ids and short hashes cross
+-- the wire, not block/dump content.
+CREATE OR REPLACE FUNCTION public.fn_basket_substrate_snapshot(p_basket_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'block', coalesce((
+            SELECT jsonb_agg(jsonb_build_array(id::text,
+                       substr(encode(sha256(convert_to(fn_block_digest_text(id, semantic_type, content), 'UTF8')), 'hex'), 1, 16))
+                   ORDER BY id::text COLLATE "C")
+            FROM blocks
+            WHERE basket_id = p_basket_id AND state::text IN ('ACCEPTED', 'LOCKED', 'CONSTANT')
+        ), '[]'::jsonb),
+        'dump', coalesce((
+            SELECT jsonb_agg(jsonb_build_array(id::text,
+                       substr(encode(sha256(convert_to(fn_dump_digest_text(id::text, body_md), 'UTF8')), 'hex'), 1, 16))
+                   ORDER BY id::text COLLATE "C")
+            FROM raw_dumps
+            WHERE basket_id = p_basket_id
+        ), '[]'::jsonb),
+        'event', coalesce((
+            SELECT jsonb_agg(jsonb_build_array(id::text,
+                       substr(encode(sha256(convert_to(fn_event_digest_text(id::text, kind, preview), 'UTF8')), 'hex'), 1, 16))
+                   ORDER BY id::text COLLATE "C")
+            FROM timeline_events
+            WHERE basket_id = p_basket_id
+        ), '[]'::jsonb)
+    )
+$$;
+
+GRANT EXECUTE ON FUNCTION public.fn_basket_substrate_snapshot(UUID) TO service_role;